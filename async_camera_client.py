@@ -0,0 +1,175 @@
+"""
+Async Camera HTTP Client
+========================
+
+An asyncio counterpart to CameraClient. Each client keeps its own pool of
+keep-alive connections to one camera and caps the number of requests in
+flight with a semaphore, so a single event loop can drive many cameras at
+once without overloading any one of them.
+
+Only the small subset of HTTP/1.1 the camera API needs is implemented:
+POST requests with a body, and responses framed by Content-Length, chunked
+transfer encoding or connection close.
+"""
+
+import asyncio
+from camera_client import build_headers
+
+class AsyncHTTPError(Exception):
+    """Raised by AsyncResponse.raise_for_status for 4xx/5xx responses"""
+    def __init__(self, message, response):
+        super().__init__(message)
+        self.response = response
+
+class AsyncResponse:
+    def __init__(self, url, status_code, reason, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode(errors='replace')
+
+    def raise_for_status(self):
+        """Raise AsyncHTTPError if the camera returned an error status"""
+        if 400 <= self.status_code < 600:
+            raise AsyncHTTPError(f"{self.status_code} {self.reason} for url: {self.url}", self)
+
+class AsyncCameraClient:
+    def __init__(self, host, port, username, password, max_concurrency=8, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.base_url = f"http://{host}:{port}"
+        self.headers = build_headers(username, password)
+
+        self._semaphore = None
+        self._idle = []
+        self._request_count = 0
+        self._connection_count = 0
+
+    def url(self, endpoint, *path):
+        """Build the URL for an endpoint, skipping empty path segments"""
+        parts = [endpoint] + [str(part) for part in path if part not in (None, '')]
+        return f"{self.base_url}/{'/'.join(parts)}"
+
+    async def post(self, endpoint, *path, data=None, timeout=None):
+        """Send a POST request, waiting for a free slot under the concurrency cap"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if timeout is None:
+            timeout = self.timeout
+
+        # Created lazily so the semaphore binds to the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        url = self.url(endpoint, *path)
+        request_path = url[len(self.base_url):]
+        async with self._semaphore:
+            response = await asyncio.wait_for(self._send(request_path, data or b'', url), timeout)
+        self._request_count += 1
+        return response
+
+    async def _send(self, request_path, body, url):
+        # A pooled connection may have been closed by the camera while idle.
+        # Skip those before writing anything: the camera's POST endpoints are
+        # not idempotent, so a request that has been written is never resent.
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if reader.at_eof() or writer.is_closing():
+                writer.close()
+                continue
+            return await self._exchange(reader, writer, request_path, body, url)
+
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        self._connection_count += 1
+        return await self._exchange(reader, writer, request_path, body, url)
+
+    async def _exchange(self, reader, writer, request_path, body, url):
+        lines = [f"POST {request_path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        for key, value in self.headers.items():
+            lines.append(f"{key}: {value}")
+        lines.append(f"Content-Length: {len(body)}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+
+        try:
+            await writer.drain()
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionResetError("Connection closed by camera")
+
+            parts = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+            status_code = int(parts[1])
+            reason = parts[2] if len(parts) > 2 else ''
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                key, _, value = line.decode('latin-1').partition(':')
+                headers[key.strip().lower()] = value.strip()
+
+            keep_alive = headers.get('connection', '').lower() != 'close'
+            if headers.get('transfer-encoding', '').lower() == 'chunked':
+                content = await self._read_chunked(reader)
+            elif 'content-length' in headers:
+                content = await reader.readexactly(int(headers['content-length']))
+            else:
+                content = await reader.read()
+                keep_alive = False
+        except BaseException:
+            writer.close()
+            raise
+
+        if keep_alive:
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+        return AsyncResponse(url, status_code, reason, headers, content)
+
+    async def _read_chunked(self, reader):
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b';', 1)[0].strip(), 16)
+            if size == 0:
+                # Skip optional trailers
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    def connection_stats(self):
+        """Report how many requests were served by reused connections"""
+        reused = max(self._request_count - self._connection_count, 0)
+        return {
+            'requests': self._request_count,
+            'connections_opened': self._connection_count,
+            'connections_reused': reused,
+            'reuse_ratio': reused / self._request_count if self._request_count else 0.0
+        }
+
+    async def close(self):
+        """Close every pooled connection"""
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
@@ -0,0 +1,221 @@
+"""
+Async Vehicle Recognition
+=========================
+
+An asyncio version of VehicleRecognition with the same methods and return
+values. Each instance talks to one camera through an AsyncCameraClient, so
+many cameras can be queried from one event loop while each camera stays
+under its own concurrency cap.
+
+Example:
+    async def main():
+        cameras = [AsyncVehicleRecognition(host, 80, "admin", "admin") for host in hosts]
+        results = await asyncio.gather(*[
+            camera.search_vehicles_by_time(start_time, end_time) for camera in cameras
+        ])
+        for camera in cameras:
+            await camera.close()
+"""
+
+import asyncio
+from async_camera_client import AsyncCameraClient
+from vehicle_records import VehicleDetails
+from vehicle_recognition import (
+    build_search_by_time_body, build_search_by_key_body,
+    parse_sd_status, parse_search_response, parse_vehicle_details,
+    split_time_range, merge_search_results, plan_search_windows,
+    build_export_row, default_export_filename, VehicleExportWriter,
+    empty_statistics, accumulate_statistics, hour_distribution, list_type_counts,
+    LIST_TYPE_MAP
+)
+
+class AsyncVehicleRecognition:
+    def __init__(self, host, port, username, password, max_concurrency=8, timeout=30, cache=None):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+
+        # Optional SightingCache shared with the synchronous client
+        self.cache = cache
+        self.cache_key = f"{host}:{port}"
+
+        # Per-camera connection pool and in-flight request cap
+        self.client = AsyncCameraClient(host, port, username, password, max_concurrency, timeout)
+        self.headers = self.client.headers
+
+    async def check_sd_status(self):
+        """Check SD card status before operations"""
+        try:
+            response = await self.client.post('GetSdCardStatus', timeout=15)
+            response.raise_for_status()
+            return parse_sd_status(response.content)
+        except Exception as e:
+            return False, f"Error checking SD card status: {e}"
+
+    async def search_vehicles_by_time(self, start_time, end_time, vehicle_plate="", list_type="", shards=1):
+        """Search for vehicles within a time range, bisecting truncated windows"""
+        windows = split_time_range(start_time, end_time, shards)
+        complete = []
+        while windows:
+            results = await asyncio.gather(*[
+                self.search_time_window(window_start, window_end, vehicle_plate, list_type)
+                for window_start, window_end in windows
+            ])
+            for success, result in results:
+                if not success:
+                    return False, result
+            done, windows = plan_search_windows(windows, [result for _, result in results])
+            complete.extend(done)
+
+        if len(complete) == 1:
+            return True, complete[0]
+        return True, merge_search_results(complete)
+
+    async def search_time_window(self, start_time, end_time, vehicle_plate="", list_type=""):
+        """Send a single SearchSnapVehicleByTime request"""
+        try:
+            xml_body = build_search_by_time_body(start_time, end_time, vehicle_plate, list_type)
+            response = await self.client.post('SearchSnapVehicleByTime', data=xml_body)
+            response.raise_for_status()
+            return parse_search_response(response.content)
+        except Exception as e:
+            return False, f"Error searching vehicles: {e}"
+
+    async def get_vehicle_details(self, vehicle_id, snap_time, request_panoramic_pic=True):
+        """Get detailed information for a specific vehicle"""
+        loop = asyncio.get_running_loop()
+        if self.cache is not None:
+            # SightingCache is blocking SQLite I/O; keep it off the event loop
+            details = await loop.run_in_executor(
+                None, self.cache.get, self.cache_key, vehicle_id, snap_time, request_panoramic_pic
+            )
+            if details is not None:
+                return True, VehicleDetails.from_dict(details)
+
+        try:
+            xml_body = build_search_by_key_body(vehicle_id, snap_time, request_panoramic_pic)
+            response = await self.client.post('SearchSnapVehicleByKey', data=xml_body)
+            response.raise_for_status()
+            success, details = parse_vehicle_details(response.content)
+            if success and self.cache is not None:
+                await loop.run_in_executor(None, self.cache.put, self.cache_key, vehicle_id, snap_time, details)
+            return success, details
+        except Exception as e:
+            return False, f"Error getting vehicle details: {e}"
+
+    async def export_vehicle_data(self, start_time, end_time, vehicle_plate="", list_type="", include_images=True, output_file=None):
+        """Export vehicle data to CSV/ZIP file with optional images"""
+        try:
+            # Check SD card status first
+            sd_ok, sd_message = await self.check_sd_status()
+            if not sd_ok:
+                return False, f"SD card not ready: {sd_message}"
+
+            # Search for vehicles
+            success, result = await self.search_vehicles_by_time(start_time, end_time, vehicle_plate, list_type)
+            if not success:
+                return False, result
+
+            count = result['count']
+            vehicles = result['vehicles']
+
+            if count == 0:
+                return False, "No vehicles found in the specified time range"
+
+            print(f"Found {count} vehicles. Starting export...")
+
+            if output_file is None:
+                output_file = default_export_filename()
+
+            # Fetch details through a bounded window of tasks and write each
+            # row as soon as it is next in order, so only the window's images
+            # are held in memory. Archive writes are blocking file I/O; keep
+            # them off the event loop.
+            loop = asyncio.get_running_loop()
+            window = 2 * self.client.max_concurrency
+            writer = await loop.run_in_executor(None, VehicleExportWriter, output_file, include_images)
+            try:
+                pending = []
+                position = 0
+                while position < len(vehicles) or pending:
+                    while position < len(vehicles) and len(pending) < window:
+                        vehicle = vehicles[position]
+                        task = asyncio.ensure_future(
+                            self.get_vehicle_details(vehicle['vehicleID'], vehicle['snapTime'], include_images)
+                        )
+                        pending.append((vehicle, task))
+                        position += 1
+
+                    vehicle, task = pending.pop(0)
+                    success, details = await task
+                    if success:
+                        row = build_export_row(vehicle, details, include_images)
+                        await loop.run_in_executor(None, writer.add, row)
+                    else:
+                        print(f"Warning: Failed to get details for vehicle {vehicle['vehicleID']}: {details}")
+            finally:
+                for _, task in pending:
+                    task.cancel()
+                await loop.run_in_executor(None, writer.close)
+
+            print(f"Export completed successfully: {output_file}")
+            return True, f"Exported {writer.rows} vehicles to {output_file}"
+
+        except Exception as e:
+            return False, f"Error during export: {e}"
+
+    async def get_vehicle_statistics(self, start_time, end_time, utc_offset=None):
+        """Get statistics from snapTime and listType-filtered searches"""
+        try:
+            success, result = await self.search_vehicles_by_time(start_time, end_time)
+            if not success:
+                return False, result
+
+            vehicles = result['vehicles']
+            if not vehicles:
+                return True, empty_statistics()
+
+            # Analyze data
+            time_distribution, undated = hour_distribution(vehicles, utc_offset)
+
+            searches = await asyncio.gather(*[
+                self.search_time_window(start_time, end_time, list_type=list_type)
+                for list_type in LIST_TYPE_MAP
+            ])
+            list_types = list_type_counts(zip(LIST_TYPE_MAP, searches), len(vehicles))
+
+            # Fall back to vehicle details for anything the searches could not provide
+            need_details = vehicles if list_types is None else undated
+            if need_details:
+                undated_keys = {(vehicle['vehicleID'], vehicle['snapTime']) for vehicle in undated}
+                results = await asyncio.gather(*[
+                    self.get_vehicle_details(vehicle['vehicleID'], vehicle['snapTime'], False)
+                    for vehicle in need_details
+                ])
+                detail_types = {}
+                for vehicle, (success, details) in zip(need_details, results):
+                    if success:
+                        hours = time_distribution if (vehicle['vehicleID'], vehicle['snapTime']) in undated_keys else {}
+                        accumulate_statistics(details, detail_types, hours)
+                if list_types is None:
+                    list_types = detail_types
+
+            return True, {
+                'total_vehicles': len(vehicles),
+                'list_types': list_types,
+                'time_distribution': time_distribution
+            }
+
+        except Exception as e:
+            return False, f"Error getting statistics: {e}"
+
+    async def close(self):
+        """Close pooled connections to the camera"""
+        await self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+XML Backend Benchmark
+=====================
+
+Compares the lxml and ElementTree backends on payloads shaped like the
+camera's largest responses:
+
+- GetSmartVfdConfig: type enums, mutex list, schedules and detection regions
+- GetSmartPerimeterConfig: several rules with point lists and schedules
+- SearchSnapVehicleByKey: vehicle details carrying a base64 picture
+- SearchSnapVehicleByTime: a long captureVehicleList, parsed incrementally
+
+Usage:
+    python benchmarks/bench_xml_backend.py [--repeat 20] [--vehicles 5000]
+"""
+
+import argparse
+import base64
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import xml_backend
+from xml_accessor import XmlIndex
+from vehicle_recognition import parse_vehicle_details
+
+NS = "http://www.ipc.com/ver10"
+
+def enum_list(name, values):
+    return f'<{name} type="enum">' + "".join(f"<enum>{v}</enum>" for v in values) + f"</{name}>"
+
+def schedule():
+    days = []
+    for day in range(7):
+        segments = "".join(
+            f"<item><start>{h:02d}:00:00</start><end>{h:02d}:59:59</end></item>" for h in range(0, 24, 2)
+        )
+        days.append(f'<week id="{day}"><timeList type="list" count="12">{segments}</timeList></week>')
+    return f'<schedule>{"".join(days)}</schedule>'
+
+def region(points):
+    return '<pointList type="list" count="{0}">{1}</pointList>'.format(
+        points, "".join(f"<item><X>{i * 37 % 10000}</X><Y>{i * 53 % 10000}</Y></item>" for i in range(points))
+    )
+
+def vfd_config():
+    types = "".join([
+        enum_list("mutexObjectType", ["osc", "avd", "pea", "cpc", "cdd", "ipd"]),
+        enum_list("detectModeType", ["auto", "interval"]),
+        enum_list("alarmListType", ["strangerList", "whiteList", "blackList"]),
+        enum_list("alarmModeType", ["single", "continuous"]),
+        enum_list("senceModeType", ["indoor", "outdoor", "custom"]),
+    ])
+    mutex = "".join(f"<item><object>{o}</object><status>false</status></item>" for o in ["osc", "avd", "pea", "cpc"])
+    return (f'<?xml version="1.0" encoding="UTF-8"?><config version="1.0" xmlns="{NS}" status="success">'
+            f'<types>{types}</types><vfd><functionStatus>true</functionStatus><switch>true</switch>'
+            f'<mutexList type="list" count="4">{mutex}</mutexList>'
+            f'<detectMode><mode>auto</mode><intervalTime>5</intervalTime><captureCycle>3</captureCycle></detectMode>'
+            f'<regionInfo type="list" count="4">{"".join(f"<item>{region(32)}</item>" for _ in range(4))}</regionInfo>'
+            f'{schedule()}</vfd></config>').encode()
+
+def perimeter_config():
+    rules = "".join(
+        f'<item id="{i}"><switch>true</switch><sensitivity>50</sensitivity><objectFilter><car>true</car>'
+        f'<person>true</person></objectFilter>{region(16)}{schedule()}</item>'
+        for i in range(4)
+    )
+    return (f'<?xml version="1.0" encoding="UTF-8"?><config version="1.0" xmlns="{NS}" status="success">'
+            f'<types>{enum_list("direction", ["A&lt;-&gt;B", "A-&gt;B", "B-&gt;A"])}</types>'
+            f'<perimeter><switch>true</switch><ruleList type="list" count="4">{rules}</ruleList></perimeter>'
+            f'</config>').encode()
+
+def vehicle_details(picture_bytes):
+    picture = base64.b64encode(os.urandom(picture_bytes)).decode()
+    return (f'<?xml version="1.0" encoding="UTF-8"?><config version="1.0" xmlns="{NS}" status="success">'
+            f'<snapVehicle><snapInfo><time type="string">2024-01-01 08:00:00.123</time>'
+            f'<vehiclePlate type="string"><![CDATA[ABC1234]]></vehiclePlate>'
+            f'<listType type="listType">whiteList</listType><color type="string">white</color>'
+            f'<pictureData type="string">{picture}</pictureData></snapInfo></snapVehicle></config>').encode()
+
+def vehicle_list(count):
+    items = "".join(
+        f'<item><vehicleID type="uint32">{i}</vehicleID><snapTime type="uint64">{1704096000000000 + i * 60000000}</snapTime></item>'
+        for i in range(count)
+    )
+    return (f'<?xml version="1.0" encoding="UTF-8"?><config version="1.0" xmlns="{NS}" status="success">'
+            f'<captureVehicleList type="list" count="{count}">{items}</captureVehicleList></config>').encode()
+
+def chunks(content, size=16 * 1024):
+    return [content[i:i + size] for i in range(0, len(content), size)]
+
+def pull_parse(content_chunks, backend):
+    parser = xml_backend.XMLPullParser(events=('start', 'end'), backend=backend)
+    for chunk in content_chunks:
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == 'end' and elem.tag.endswith('item'):
+                elem.clear()
+    parser.close()
+
+def best_time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare XML parser backends on camera payloads")
+    parser.add_argument('--repeat', type=int, default=20, help="runs per case; the best is reported")
+    parser.add_argument('--vehicles', type=int, default=5000, help="items in the search payload")
+    parser.add_argument('--picture-kb', type=int, default=300, help="decoded picture size in the details payload")
+    args = parser.parse_args()
+
+    vfd = vfd_config()
+    perimeter = perimeter_config()
+    details = vehicle_details(args.picture_kb * 1024)
+    search = chunks(vehicle_list(args.vehicles))
+
+    cases = [
+        (f"GetSmartVfdConfig ({len(vfd) // 1024} KB) parse+index", lambda: XmlIndex(vfd)),
+        (f"GetSmartPerimeterConfig ({len(perimeter) // 1024} KB) parse+index", lambda: XmlIndex(perimeter)),
+        (f"SearchSnapVehicleByKey ({len(details) // 1024} KB)", lambda: parse_vehicle_details(details)),
+    ]
+    # The pull parser backend is chosen per call rather than globally
+    streamed = f"SearchSnapVehicleByTime ({args.vehicles} items, streamed)"
+
+    backends = xml_backend.available_backends()
+    if 'lxml' not in backends:
+        print("lxml is not installed; only ElementTree is measured (pip install lxml)\n")
+
+    results = {}
+    for backend in backends:
+        xml_backend.use_backend(backend)
+        for name, func in cases:
+            results[(name, backend)] = best_time(func, args.repeat)
+        results[(streamed, backend)] = best_time(lambda: pull_parse(search, backend), args.repeat)
+    xml_backend.use_backend()
+
+    cases.append((streamed, None))
+    width = max(len(name) for name, _ in cases)
+    print(f"{'payload':<{width}}  " + "  ".join(f"{b:>12}" for b in backends) + ("  speedup" if len(backends) > 1 else ""))
+    for name, _ in cases:
+        row = f"{name:<{width}}  " + "  ".join(f"{results[(name, b)] * 1000:>9.3f} ms" for b in backends)
+        if len(backends) > 1:
+            row += f"  {results[(name, 'elementtree')] / results[(name, 'lxml')]:>6.2f}x"
+        print(row)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Event Push Load Generator
+=========================
+
+Simulates many cameras pushing smart events to an EventReceiver over
+keep-alive connections, and reports how many events per second come out
+of the receiver's queue.
+
+By default the receiver runs in this process, on one core, and the
+simulated cameras run in a child process so they do not compete with it
+for the event loop. Use --target to load a receiver running elsewhere.
+
+Usage:
+    python benchmarks/push_load.py [--cameras 50] [--events 400]
+    python benchmarks/push_load.py --target 127.0.0.1:8080 --cameras 200
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_receiver import EventReceiver
+from event_subscription import SMART_TYPES
+
+NS = "http://www.ipc.com/ver10"
+
+def event_payload(smart_type, sequence):
+    return (f'<?xml version="1.0" encoding="UTF-8"?><config version="1.7" xmlns="{NS}">'
+            f'<smartType type="openAlramObj">{smart_type}</smartType>'
+            f'<subscribeRelation type="subscribeRelation">ALARM_FEATURE</subscribeRelation>'
+            f'<currentTime type="uint64">{1704096000000000 + sequence}</currentTime>'
+            f'<eventId type="uint32">{sequence}</eventId><status type="string">alarm</status>'
+            f'</config>').encode()
+
+async def push_events(host, port, camera, count):
+    """One camera: POST count events on a single keep-alive connection"""
+    reader, writer = await asyncio.open_connection(host, port)
+    retries = 0
+    try:
+        for sequence in range(count):
+            body = event_payload(SMART_TYPES[sequence % len(SMART_TYPES)], sequence)
+            request = (f"POST /event/{camera} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+                       f"Content-Type: application/xml\r\nContent-Length: {len(body)}\r\n\r\n").encode('latin-1') + body
+            while True:
+                writer.write(request)
+                await writer.drain()
+                status = int((await reader.readline()).split()[1])
+                while (await reader.readline()) not in (b'\r\n', b''):
+                    pass
+                if status != 503:
+                    break
+                # The receiver's backlog is full; back off like a camera would
+                retries += 1
+                await asyncio.sleep(0.01)
+    finally:
+        writer.close()
+    return retries
+
+def generate(host, port, cameras, events):
+    async def run():
+        return await asyncio.gather(*(push_events(host, port, f"cam-{i}", events) for i in range(cameras)))
+    start = time.perf_counter()
+    retries = sum(asyncio.run(run()))
+    return time.perf_counter() - start, retries
+
+def generate_in_child(host, port, cameras, events, results):
+    results.put(generate(host, port, cameras, events))
+
+async def run_local(cameras, events):
+    total = cameras * events
+    async with EventReceiver("127.0.0.1", 0) as receiver:
+        results = multiprocessing.Queue()
+        child = multiprocessing.Process(target=generate_in_child, args=("127.0.0.1", receiver.port, cameras, events, results))
+        child.start()
+        loop = asyncio.get_running_loop()
+        started = None
+        for _ in range(total):
+            await receiver.queue.get()
+            if started is None:
+                started = loop.time()
+        elapsed = loop.time() - started
+        send_time, retries = await loop.run_in_executor(None, results.get)
+        await loop.run_in_executor(None, child.join)
+        return elapsed, send_time, retries, receiver.stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Load an event push receiver with simulated cameras")
+    parser.add_argument('--cameras', type=int, default=50, help="simulated cameras, one connection each")
+    parser.add_argument('--events', type=int, default=400, help="events pushed per camera")
+    parser.add_argument('--target', help="host:port of a running receiver (default: start one here)")
+    args = parser.parse_args()
+    total = args.cameras * args.events
+
+    if args.target:
+        host, _, port = args.target.rpartition(':')
+        send_time, retries = generate(host, int(port), args.cameras, args.events)
+        print(f"Pushed {total} events from {args.cameras} cameras in {send_time:.2f}s "
+              f"({total / send_time:,.0f} events/s, {retries} retries after 503)")
+        return
+
+    elapsed, send_time, retries, stats = asyncio.run(run_local(args.cameras, args.events))
+    print(f"Cameras:        {args.cameras} x {args.events} events")
+    print(f"Received:       {stats['events']} events in {stats['requests']} requests ({stats['rejected']} answered 503)")
+    print(f"Push time:      {send_time:.2f}s ({retries} retries)")
+    print(f"Throughput:     {total / elapsed:,.0f} events/s parsed and queued")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Camera HTTP Client
+==================
+
+A per-camera HTTP client that sends every API request through one pooled
+keep-alive session, so repeated calls to the same camera reuse an open TCP
+connection instead of paying for a new handshake each time.
+"""
+
+import base64
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+def build_headers(username, password):
+    """Build the Basic-auth XML headers expected by the camera API"""
+    auth_str = f"{username}:{password}"
+    auth_bytes = auth_str.encode('ascii')
+    base64_auth = base64.b64encode(auth_bytes).decode('ascii')
+    return {
+        'Connection': 'Keep-Alive',
+        'Content-Type': 'application/xml; charset=UTF-8',
+        'Accept': 'application/xml; charset=UTF-8',
+        'Authorization': f'Basic {base64_auth}',
+        'User-Agent': 'Mozilla/5.0'
+    }
+
+class CameraClient:
+    def __init__(self, host, port, username, password, pool_size=10, timeout=None, max_concurrency=None):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.base_url = f"http://{host}:{port}"
+        self.headers = build_headers(username, password)
+
+        # One connection pool per camera; pool_size bounds the number of
+        # sockets kept open for concurrent callers
+        if max_concurrency:
+            pool_size = max(pool_size, max_concurrency)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', self._adapter)
+
+        # Optional cap on requests in flight to this camera across all threads
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+
+        self._lock = threading.Lock()
+        self._request_count = 0
+
+    def url(self, endpoint, *path):
+        """Build the URL for an endpoint, skipping empty path segments"""
+        parts = [endpoint] + [str(part) for part in path if part not in (None, '')]
+        return f"{self.base_url}/{'/'.join(parts)}"
+
+    def post(self, endpoint, *path, data=None, timeout=None, **kwargs):
+        """Send a POST request to an endpoint over the pooled session"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if timeout is None:
+            timeout = self.timeout
+        if self._slots is None:
+            response = self.session.post(self.url(endpoint, *path), data=data, timeout=timeout, **kwargs)
+        else:
+            with self._slots:
+                response = self.session.post(self.url(endpoint, *path), data=data, timeout=timeout, **kwargs)
+        with self._lock:
+            self._request_count += 1
+        return response
+
+    def connection_stats(self):
+        """Report how many requests were served by reused connections"""
+        connections = 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+
+        with self._lock:
+            request_count = self._request_count
+        reused = max(request_count - connections, 0)
+        return {
+            'requests': request_count,
+            'connections_opened': connections,
+            'connections_reused': reused,
+            'reuse_ratio': reused / request_count if request_count else 0.0
+        }
+
+    def close(self):
+        """Close every pooled connection"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
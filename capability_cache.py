@@ -0,0 +1,180 @@
+"""
+Capability Cache
+================
+
+Stream, PTZ and smart feature capabilities are fixed by a camera's model
+and firmware, yet every session used to query them again. This cache
+keeps them in one small JSON file keyed by model and firmware version
+(both read from GetDeviceInfo), so it loads instantly on startup and is
+shared by every camera of the same model. When a camera reports a new
+firmware version it simply maps to a new key; entries no camera uses any
+more are dropped.
+
+Cached per model and firmware:
+- the normalized GetStreamCaps, PtzGetCaps and GetDeviceDetail documents;
+- the <types> enum blocks of every smart configuration section.
+
+Example:
+    capabilities = CapabilityCache()
+    snapshot = collect_snapshot(client, capabilities=capabilities)
+    stream_caps = capabilities.get("IPC-1", "1.2.3")['sections']['GetStreamCaps']
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+DEFAULT_CACHE_PATH = "capability_cache.json"
+
+# Endpoints whose whole response is static for a model and firmware
+CAPABILITY_ENDPOINTS = ('GetStreamCaps', 'PtzGetCaps', 'GetDeviceDetail')
+
+# deviceInfo field names for the model and firmware, in order of preference.
+# GetDeviceInfo reports model and softwareVersion (API V1.9, 2.1.1);
+# firmwareVersion is the SDK's name for the same value.
+MODEL_FIELDS = ('model',)
+FIRMWARE_FIELDS = ('softwareVersion', 'firmwareVersion')
+
+def device_identity(device_info):
+    """(model, firmware) from a normalized GetDeviceInfo document, or None"""
+    if not isinstance(device_info, dict):
+        return None
+    info = device_info.get('deviceInfo', device_info)
+    if not isinstance(info, dict):
+        return None
+    model = next((info[field] for field in MODEL_FIELDS if info.get(field)), None)
+    firmware = next((info[field] for field in FIRMWARE_FIELDS if info.get(field)), None)
+    if not model or not firmware:
+        return None
+    return model, firmware
+
+def write_json_atomic(path, data):
+    """Write JSON to a temporary file and rename it over path, so a crash
+    never leaves a half-written file behind"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def capability_key(model, firmware):
+    return f"{model}|{firmware}"
+
+def types_block(document):
+    """The <types> enum block of a normalized configuration document, or None"""
+    if isinstance(document, dict):
+        return document.get('types')
+    return None
+
+class CapabilityCache:
+    """Capabilities per model and firmware, persisted as JSON
+
+    With refresh=True every model and firmware is queried again once in
+    this session: get() misses until fresh capabilities were stored, and
+    they replace the cached entry instead of being merged into it.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, refresh=False):
+        self.path = path
+        self.refresh = refresh
+        self._refreshed = set()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.entries = {}
+        self.devices = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    data = json.load(f)
+                self.entries = data.get('entries', {})
+                self.devices = data.get('devices', {})
+            except (OSError, ValueError) as e:
+                print(f"Warning: Ignoring unreadable capability cache {path}: {e}")
+
+    def get(self, model, firmware):
+        """Return {'model', 'firmware', 'sections', 'types', 'updated'} or None"""
+        key = capability_key(model, firmware)
+        with self._lock:
+            entry = self.entries.get(key)
+            if self.refresh and key not in self._refreshed:
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def identify(self, camera, model, firmware):
+        """Record which model and firmware a camera runs
+
+        Returns True if the camera's firmware (or model) changed since it was
+        last seen; capabilities cached for the old version are dropped once
+        no camera reports it any more.
+        """
+        key = capability_key(model, firmware)
+        with self._lock:
+            previous = self.devices.get(camera)
+            if previous == key:
+                return False
+            self.devices[camera] = key
+            if previous is not None and previous not in self.devices.values():
+                self.entries.pop(previous, None)
+            self._save()
+            return previous is not None
+
+    def update(self, model, firmware, sections=None, types=None):
+        """Merge capability documents and types blocks into an entry and save"""
+        key = capability_key(model, firmware)
+        with self._lock:
+            if self.refresh and key not in self._refreshed:
+                self.entries.pop(key, None)
+                self._refreshed.add(key)
+            entry = self.entries.setdefault(key, {'model': model, 'firmware': firmware, 'sections': {}, 'types': {}})
+            entry['sections'].update(sections or {})
+            entry['types'].update(types or {})
+            entry['updated'] = time.time()
+            self._save()
+            return entry
+
+    def update_from_snapshot(self, snapshot):
+        """Store the capabilities found in a device snapshot; returns (model, firmware) or None"""
+        sections = snapshot['sections']
+        info = sections.get('GetDeviceInfo')
+        identity = device_identity(info['data']) if info and info['status'] == 'ok' else None
+        if identity is None:
+            return None
+
+        self.identify(snapshot['camera'], *identity)
+        capabilities = {}
+        types = {}
+        for section, entry in sections.items():
+            if entry['status'] != 'ok' or entry.get('cached'):
+                continue
+            if section in CAPABILITY_ENDPOINTS:
+                capabilities[section] = entry['data']
+            block = types_block(entry['data'])
+            if block is not None:
+                types[section] = block
+        if capabilities or types:
+            self.update(*identity, capabilities, types)
+        return identity
+
+    def _save(self):
+        write_json_atomic(self.path, {'entries': self.entries, 'devices': self.devices})
+
+    def stats(self):
+        """Report cache size and hit counts"""
+        with self._lock:
+            return {
+                'models': len(self.entries),
+                'devices': len(self.devices),
+                'hits': self.hits,
+                'misses': self.misses
+            }
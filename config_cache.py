@@ -0,0 +1,238 @@
+"""
+Configuration Cache
+===================
+
+An on-disk SQLite cache of normalized configuration documents with a
+content hash per (camera, section, channel), for drift detection polls
+across the fleet. Two hashes are kept for every section:
+
+- raw_hash, of the response bytes: an identical response is recognized
+  without parsing it at all;
+- hash, of the normalized document: responses that differ only in
+  formatting count as unchanged, and the hash is what fleet diffs compare.
+
+Only sections whose normalized hash changed are reported, with the paths
+of the fields that changed.
+
+Example:
+    with ConfigCache() as cache, CameraClient(host, port, username, password) as client:
+        snapshot = collect_snapshot(client, endpoints=DRIFT_ENDPOINTS, cache=cache)
+        for section, entry in snapshot['sections'].items():
+            if entry.get('change') == 'changed':
+                print(section, entry['changed_paths'])
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from device_snapshot import normalize_response, snapshot_fleet
+
+DEFAULT_CACHE_PATH = "config_cache.db"
+
+# Configuration endpoints worth polling for drift; status endpoints such
+# as GetDateAndTime or GetDiskInfo change on every call
+DRIFT_ENDPOINTS = {
+    'GetDeviceInfo', 'GetNetBasicConfig', 'GetStreamCaps', 'GetImageConfig',
+    'GetSmartVehicleConfig', 'GetVideoStreamConfig', 'GetImageOsdConfig',
+    'GetPrivacyMaskConfig', 'PtzGetCaps', 'GetMotionConfig', 'GetSmartVfdConfig',
+    'GetSmartPerimeterConfig', 'GetSmartCddConfig', 'GetSmartCpcConfig',
+    'GetSubscriptionConfig', 'GetAlarmTriggerConfig'
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS configs (
+    camera TEXT NOT NULL,
+    section TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    raw_hash TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    document TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (camera, section, channel)
+);
+"""
+
+def raw_hash(content):
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+def canonical_json(document):
+    """Serialize a document the same way every time, whatever its key order"""
+    return json.dumps(document, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+def document_hash(document):
+    """Content hash of a normalized document"""
+    return hashlib.sha256(canonical_json(document).encode('utf-8')).hexdigest()
+
+def changed_paths(old, new, prefix=""):
+    """Paths ('motion/area/0') of the fields that differ between two documents"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        paths = []
+        for key in list(old) + [key for key in new if key not in old]:
+            path = f"{prefix}/{key}" if prefix else str(key)
+            if key not in old or key not in new:
+                paths.append(path)
+            elif old[key] != new[key]:
+                paths.extend(changed_paths(old[key], new[key], path))
+        return paths
+    if isinstance(old, list) and isinstance(new, list):
+        paths = []
+        for index in range(max(len(old), len(new))):
+            path = f"{prefix}/{index}" if prefix else str(index)
+            if index >= len(old) or index >= len(new):
+                paths.append(path)
+            elif old[index] != new[index]:
+                paths.extend(changed_paths(old[index], new[index], path))
+        return paths
+    return [prefix] if old != new else []
+
+class ConfigChange:
+    """Outcome of storing one section: state is new, changed, unchanged or failed"""
+    __slots__ = ('camera', 'section', 'channel', 'state', 'hash', 'document', 'changed_paths', 'error_code')
+
+    def __init__(self, camera, section, channel, state, hash=None, document=None, changed_paths=(), error_code=None):
+        self.camera = camera
+        self.section = section
+        self.channel = channel
+        self.state = state
+        self.hash = hash
+        self.document = document
+        self.changed_paths = list(changed_paths)
+        self.error_code = error_code
+
+    def __repr__(self):
+        return f"ConfigChange({self.camera!r}, {self.section!r}, channel={self.channel!r}, state={self.state!r})"
+
+class ConfigCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+        # One connection shared by every worker thread, serialized by a lock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def _row(self, camera, section, channel):
+        return self._db.execute(
+            "SELECT raw_hash, hash, document FROM configs WHERE camera = ? AND section = ? AND channel = ?",
+            (camera, section, str(channel))
+        ).fetchone()
+
+    def get(self, camera, section, channel=""):
+        """Return {'hash', 'document', 'updated'} for a cached section, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT hash, document, updated FROM configs WHERE camera = ? AND section = ? AND channel = ?",
+                (camera, section, str(channel))
+            ).fetchone()
+        if row is None:
+            return None
+        return {'hash': row[0], 'document': json.loads(row[1]), 'updated': row[2]}
+
+    def channels(self, camera):
+        """The channels a camera has cached sections for"""
+        with self._lock:
+            rows = self._db.execute("SELECT DISTINCT channel FROM configs WHERE camera = ? ORDER BY channel",
+                                    (camera,)).fetchall()
+        return [row[0] for row in rows]
+
+    def hashes(self, camera, channel):
+        """{section: hash} for every cached section of one channel of a camera
+
+        A section is cached per channel, so the channel is required; see
+        channels() for the ones a camera has.
+        """
+        with self._lock:
+            return dict(self._db.execute("SELECT section, hash FROM configs WHERE camera = ? AND channel = ?",
+                                         (camera, str(channel))).fetchall())
+
+    def documents(self, camera, channel, sections=None):
+        """{section: document} for one channel of a camera, optionally only some sections"""
+        with self._lock:
+            rows = self._db.execute("SELECT section, document FROM configs WHERE camera = ? AND channel = ?",
+                                    (camera, str(channel))).fetchall()
+        return {section: json.loads(document) for section, document in rows
+                if sections is None or section in sections}
+
+    def update(self, camera, section, channel, content):
+        """Store a raw response for a section and report what changed
+
+        A response byte-identical to the cached one is not parsed.
+        Failed responses (status="failed") are reported but not stored.
+        """
+        channel = str(channel)
+        digest = raw_hash(content)
+        with self._lock:
+            row = self._row(camera, section, channel)
+        if row is not None and row[0] == digest:
+            self.hits += 1
+            return ConfigChange(camera, section, channel, 'unchanged', row[1], json.loads(row[2]))
+
+        self.misses += 1
+        status, error_code, document = normalize_response(content)
+        if status == 'failed':
+            return ConfigChange(camera, section, channel, 'failed', error_code=error_code)
+
+        new_hash = document_hash(document)
+        if row is None:
+            state, paths = 'new', []
+        elif row[1] == new_hash:
+            state, paths = 'unchanged', []
+        else:
+            state, paths = 'changed', changed_paths(json.loads(row[2]), document)
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO configs (camera, section, channel, raw_hash, hash, document, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (camera, section, channel, digest, new_hash, canonical_json(document), time.time())
+            )
+            self._db.commit()
+        return ConfigChange(camera, section, channel, state, new_hash, document, paths)
+
+    def stats(self):
+        """Report cache size and raw-hash hit counts"""
+        with self._lock:
+            sections = self._db.execute("SELECT COUNT(*) FROM configs").fetchone()[0]
+            cameras = self._db.execute("SELECT COUNT(DISTINCT camera) FROM configs").fetchone()[0]
+        return {'sections': sections, 'cameras': cameras, 'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def poll_fleet_changes(fleet, cache, channel=1, endpoints=DRIFT_ENDPOINTS, timeout=None, role=None, tags=(), support=None):
+    """Snapshot the fleet through the cache and return only what changed
+
+    Returns {camera name: {section: changed paths}} for changed sections
+    ('new' sections are reported with an empty path list) plus an
+    {camera name: error} dict for cameras that could not be polled. Pass
+    an EndpointSupport to stop polling endpoints a model does not have.
+    """
+    if support is not None and endpoints is not None:
+        # GetDeviceInfo identifies the model the rejections are recorded for
+        endpoints = set(endpoints) | {'GetDeviceInfo'}
+    results = snapshot_fleet(fleet, channel, endpoints, timeout, role=role, tags=tags, cache=cache, support=support)
+    changes = {}
+    errors = {}
+    for name, (success, snapshot) in results.items():
+        if not success:
+            errors[name] = snapshot
+            continue
+        changed = {section: entry['changed_paths'] for section, entry in snapshot['sections'].items()
+                   if entry.get('change') in ('new', 'changed')}
+        if changed:
+            changes[name] = changed
+    return changes, errors
@@ -0,0 +1,269 @@
+"""
+Configuration Diff
+==================
+
+Compare the normalized configuration of many cameras against a golden
+camera or a template, field by field, with the report grouped by endpoint.
+
+The comparison is hash-first. Whole sections are compared by their
+content hash (read straight from the ConfigCache, without loading the
+document) and only sections that differ are loaded. Those are turned
+into Merkle trees, where every node's hash covers its subtree, and the
+diff descends only into children whose hashes differ. Cameras that match
+the golden configuration cost one hash comparison per section, which
+keeps fleet-wide diffs over hundreds of cameras fast.
+
+Example:
+    with ConfigCache() as cache:
+        report = diff_cached_fleet(cache, "192.168.60.254:80", ["192.168.60.253:80", ...])
+    print(format_report(report))
+
+From the command line, after polling the fleet into the cache:
+
+    python config_diff.py --golden gate-1
+    python config_diff.py --template golden_snapshot.json
+"""
+
+import argparse
+import hashlib
+import json
+from config_cache import canonical_json, document_hash
+
+# Sections that identify or describe one device rather than configure it
+DEFAULT_IGNORED_SECTIONS = frozenset({
+    'GetDeviceInfo', 'GetDeviceDetail', 'GetDiskInfo', 'GetDateAndTime',
+    'GetNetBasicConfig', 'GetVehiclePlateProgress'
+})
+
+class MerkleNode:
+    """A document node with a hash covering its whole subtree
+
+    kind is 'dict', 'list' or 'value'; an empty dict and an empty list
+    both have no children, so it is what tells them apart.
+    """
+    __slots__ = ('hash', 'kind', 'children', 'value')
+
+    def __init__(self, hash, kind, children=None, value=None):
+        self.hash = hash
+        self.kind = kind
+        self.children = children
+        self.value = value
+
+def _digest(*parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part)
+    return h.digest()
+
+def build_tree(document):
+    """Build the Merkle tree of a normalized document
+
+    Dicts and lists keep their children (keyed by field name or index);
+    leaves keep their value. A dict's hash does not depend on key order.
+    """
+    if isinstance(document, dict):
+        children = {key: build_tree(value) for key, value in document.items()}
+        parts = [b'd'] + [key.encode('utf-8') + b'\0' + children[key].hash for key in sorted(children)]
+        return MerkleNode(_digest(*parts), 'dict', children)
+    if isinstance(document, list):
+        children = {index: build_tree(value) for index, value in enumerate(document)}
+        return MerkleNode(_digest(b'l', *(child.hash for child in children.values())), 'list', children)
+    return MerkleNode(_digest(b's', json.dumps(document).encode('utf-8')), 'value', value=document)
+
+def tree_value(node):
+    """The plain document a tree was built from"""
+    if node is None:
+        return None
+    if node.kind == 'value':
+        return node.value
+    if node.kind == 'list':
+        return [tree_value(child) for child in node.children.values()]
+    return {key: tree_value(child) for key, child in node.children.items()}
+
+def diff_trees(expected, actual, prefix=""):
+    """Yield (path, expected value, actual value) for every differing field
+
+    Subtrees with equal hashes are skipped without being visited. A value
+    of None means the field is missing on that side.
+    """
+    if expected is not None and actual is not None and expected.hash == actual.hash:
+        return
+    if expected is None or actual is None or expected.kind != actual.kind or expected.kind == 'value':
+        yield prefix, tree_value(expected), tree_value(actual)
+        return
+    for key, child in expected.children.items():
+        path = f"{prefix}/{key}" if prefix else str(key)
+        yield from diff_trees(child, actual.children.get(key), path)
+    for key, child in actual.children.items():
+        if key not in expected.children:
+            path = f"{prefix}/{key}" if prefix else str(key)
+            yield path, None, tree_value(child)
+
+class ConfigDiff:
+    """Diff section documents against a golden configuration
+
+    golden maps section names to normalized documents. Golden trees are
+    built once and shared by every comparison, and trees of differing
+    documents are memoized by hash, since misconfigured cameras tend to
+    share the same wrong configuration.
+    """
+
+    def __init__(self, golden, ignore=DEFAULT_IGNORED_SECTIONS):
+        self.ignore = frozenset(ignore)
+        self.golden = {section: document for section, document in golden.items() if section not in self.ignore}
+        self.golden_hashes = {section: document_hash(document) for section, document in self.golden.items()}
+        self._trees = {}
+
+    def _tree(self, digest, document):
+        tree = self._trees.get(digest)
+        if tree is None:
+            tree = self._trees[digest] = build_tree(document)
+        return tree
+
+    def differing_sections(self, hashes):
+        """Sections whose hash differs from the golden one (or is missing on either side)"""
+        sections = (set(self.golden_hashes) | set(hashes)) - self.ignore
+        return sorted(section for section in sections if self.golden_hashes.get(section) != hashes.get(section))
+
+    def compare(self, documents, hashes=None):
+        """Return {section: [(path, expected, actual)]} for one camera
+
+        documents maps sections to documents; pass their hashes (e.g. from
+        ConfigCache.hashes) to skip hashing, in which case documents only
+        needs to hold the differing sections.
+        """
+        if hashes is None:
+            hashes = {section: document_hash(document) for section, document in documents.items()
+                      if section not in self.ignore}
+        report = {}
+        for section in self.differing_sections(hashes):
+            if section not in hashes:
+                report[section] = [("", self.golden[section], None)]
+                continue
+            actual = self._tree(hashes[section], documents[section])
+            if section not in self.golden:
+                report[section] = [("", None, tree_value(actual))]
+                continue
+            expected = self._tree(self.golden_hashes[section], self.golden[section])
+            differences = list(diff_trees(expected, actual))
+            if differences:
+                report[section] = differences
+        return report
+
+def group_by_section(camera_reports):
+    """Turn {camera: {section: differences}} into {section: {camera: differences}}"""
+    grouped = {}
+    for camera, report in camera_reports.items():
+        for section, differences in report.items():
+            grouped.setdefault(section, {})[camera] = differences
+    return {section: grouped[section] for section in sorted(grouped)}
+
+def diff_fleet(golden, cameras, ignore=DEFAULT_IGNORED_SECTIONS):
+    """Diff {camera: {section: document}} against golden sections, grouped by section"""
+    engine = ConfigDiff(golden, ignore)
+    return group_by_section({camera: engine.compare(documents) for camera, documents in cameras.items()})
+
+def diff_cached_fleet(cache, golden, cameras, channel=None, ignore=DEFAULT_IGNORED_SECTIONS):
+    """Diff cached cameras against a golden camera (cache key) or a {section: document} template
+
+    Every cached channel of a camera is diffed on its own, with paths
+    prefixed by "ch<channel>/"; pass channel to diff just that one. A golden
+    camera is compared channel by channel, using its first channel for
+    channels it does not have. Only sections whose cached hash differs from
+    the golden one are loaded.
+    """
+    engines = {}
+    golden_channels = cache.channels(golden) if isinstance(golden, str) else []
+
+    def engine_for(camera_channel):
+        if not isinstance(golden, str):
+            key = None
+        elif camera_channel in golden_channels or not golden_channels:
+            key = camera_channel
+        else:
+            key = golden_channels[0]
+        if key not in engines:
+            engines[key] = ConfigDiff(golden if key is None else cache.documents(golden, key), ignore)
+        return engines[key]
+
+    reports = {}
+    for camera in cameras:
+        channels = [str(channel)] if channel is not None else cache.channels(camera)
+        report = {}
+        for camera_channel in channels:
+            engine = engine_for(camera_channel)
+            hashes = {section: digest for section, digest in cache.hashes(camera, camera_channel).items()
+                      if section not in engine.ignore}
+            differing = engine.differing_sections(hashes)
+            documents = cache.documents(camera, camera_channel, set(differing) & set(hashes)) if differing else {}
+            for section, differences in engine.compare(documents, hashes).items():
+                if channel is None:
+                    prefix = f"ch{camera_channel}"
+                    differences = [(f"{prefix}/{path}" if path else prefix, expected, actual)
+                                   for path, expected, actual in differences]
+                report.setdefault(section, []).extend(differences)
+        reports[camera] = report
+    return group_by_section(reports)
+
+def sections_from_snapshot(snapshot):
+    """{section: document} of the successful sections of a device snapshot"""
+    return {section: entry['data'] for section, entry in snapshot['sections'].items() if entry['status'] == 'ok'}
+
+def load_template(path):
+    """Load a golden template: a saved device snapshot or a {section: document} file"""
+    with open(path, encoding='utf-8') as f:
+        template = json.load(f)
+    if 'sections' in template:
+        return sections_from_snapshot(template)
+    return template
+
+def format_value(value):
+    if value is None:
+        return "(missing)"
+    if isinstance(value, str):
+        return repr(value)
+    return canonical_json(value)
+
+def format_report(report):
+    """Render a grouped report as text, one block per endpoint"""
+    if not report:
+        return "No differences from the golden configuration."
+    lines = []
+    for section, cameras in report.items():
+        lines.append(f"{section} ({len(cameras)} camera{'s' if len(cameras) != 1 else ''})")
+        for camera, differences in sorted(cameras.items()):
+            for path, expected, actual in differences:
+                lines.append(f"  {camera}: {path or '(section)'}: expected {format_value(expected)}, found {format_value(actual)}")
+    return "\n".join(lines)
+
+def main():
+    from config_cache import ConfigCache, DEFAULT_CACHE_PATH
+    from fleet import load_fleet
+
+    parser = argparse.ArgumentParser(description="Diff cached camera configuration against a golden camera or template")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--golden', help="name of the golden camera in the fleet registry")
+    group.add_argument('--template', help="golden template: a saved snapshot or {section: document} JSON")
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH)
+    parser.add_argument('--channel', type=int, default=None, help="diff only this channel (default: every channel)")
+    args = parser.parse_args()
+
+    fleet = load_fleet()
+    cameras = {camera.name: camera.address for camera in fleet}
+    if args.golden:
+        if args.golden not in cameras:
+            parser.error(f"Unknown camera: {args.golden}")
+        golden = cameras.pop(args.golden)
+    else:
+        golden = load_template(args.template)
+
+    with ConfigCache(args.cache) as cache:
+        report = diff_cached_fleet(cache, golden, list(cameras.values()), args.channel)
+    # Report by fleet name rather than cache key
+    names = {address: name for name, address in cameras.items()}
+    report = {section: {names.get(camera, camera): diffs for camera, diffs in by_camera.items()}
+              for section, by_camera in report.items()}
+    print(format_report(report))
+
+if __name__ == "__main__":
+    main()
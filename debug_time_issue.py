@@ -10,41 +10,16 @@ the camera and your system.
 import datetime
 import requests
 import base64
-import xml.etree.ElementTree as ET
+from xml_accessor import XmlIndex
 from vehicle_recognition import VehicleRecognition
+from fleet import prompt_for_camera
 
 def select_camera():
     """Let user select which camera to use"""
     
     print("📹 Camera Selection")
     print("=" * 20)
-    print("Available cameras:")
-    print("1. Camera 1 - 192.168.60.254")
-    print("2. Camera 2 - 192.168.60.253")
-    print("3. Custom IP address")
-    
-    while True:
-        choice = input("\nSelect camera (1-3): ").strip()
-        
-        if choice == "1":
-            HOST = "192.168.60.254"
-            break
-        elif choice == "2":
-            HOST = "192.168.60.253"
-            break
-        elif choice == "3":
-            HOST = input("Enter custom IP address: ").strip()
-            if HOST:
-                break
-            else:
-                print("Invalid IP address. Please try again.")
-        else:
-            print("Invalid choice. Please enter 1, 2, or 3.")
-    
-    # Get other configuration
-    PORT = input("Enter port (default 80): ").strip() or "80"
-    USERNAME = input("Enter username (default admin): ").strip() or "admin"
-    PASSWORD = input("Enter password (default admin): ").strip() or "admin"
+    HOST, PORT, USERNAME, PASSWORD = prompt_for_camera()
     
     print(f"\n📹 Selected camera: {HOST}:{PORT}")
     print(f"👤 Username: {USERNAME}")
@@ -79,13 +54,13 @@ def check_camera_time(HOST, PORT, USERNAME, PASSWORD):
         response.raise_for_status()
         
         # Parse response
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
         
         # Get current time from camera
-        sync_info = root.find('.//ipc:synchronizeInfo', ns) if ns else root.find('.//synchronizeInfo')
+        sync_info = doc.find(root, 'synchronizeInfo')
         if sync_info is not None:
-            current_time = sync_info.find('.//ipc:currentTime', ns) if ns else sync_info.find('.//currentTime')
+            current_time = doc.find(sync_info, 'currentTime')
             if current_time is not None:
                 camera_time = current_time.text.strip()
                 print(f"📅 Camera Time: {camera_time}")
@@ -159,7 +134,7 @@ def search_with_different_times(HOST, PORT, USERNAME, PASSWORD):
                 print(f"   🎯 SUCCESS! Found vehicles in {description}")
                 print(f"   📋 First few vehicles:")
                 for i, vehicle in enumerate(data['vehicles'][:3], 1):
-                    snap_time = int(vehicle['snapTime'])
+                    snap_time = vehicle.snap_time
                     timestamp_seconds = snap_time / 1000000
                     readable_time = datetime.datetime.fromtimestamp(timestamp_seconds)
                     print(f"      {i}. ID: {vehicle['vehicleID']}, Time: {readable_time.strftime('%Y-%m-%d %H:%M:%S')}")
@@ -195,12 +170,10 @@ def search_all_vehicles(HOST, PORT, USERNAME, PASSWORD):
         if data['count'] > 0:
             print(f"\n📋 Recent vehicles:")
             # Sort by time and show most recent
-            sorted_vehicles = sorted(data['vehicles'], 
-                                   key=lambda x: int(x['snapTime']), 
-                                   reverse=True)
+            sorted_vehicles = data['vehicles'].sorted_by_time(reverse=True)
             
             for i, vehicle in enumerate(sorted_vehicles[:5], 1):
-                snap_time = int(vehicle['snapTime'])
+                snap_time = vehicle.snap_time
                 timestamp_seconds = snap_time / 1000000
                 readable_time = datetime.datetime.fromtimestamp(timestamp_seconds)
                 time_diff = now - readable_time
@@ -0,0 +1,351 @@
+"""
+Device Snapshot
+===============
+
+A non-interactive audit of a camera's configuration. Every read-only
+Get*/PtzGetCaps endpoint for a channel is requested concurrently over the
+camera's pooled client, and the responses are normalized into one JSON
+document with the status and timing of each endpoint, so a full audit
+takes about as long as the slowest endpoint rather than the sum of all.
+
+    with CameraClient(host, port, username, password) as client:
+        snapshot = collect_snapshot(client, channel=1)
+    save_snapshot(snapshot, "gate-1.json")
+
+Run from the command line to snapshot one camera or the whole fleet:
+
+    python device_snapshot.py --fleet --output snapshots/
+"""
+
+import argparse
+import datetime
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from camera_client import CameraClient
+from capability_cache import device_identity
+from xml_accessor import XmlIndex, split_namespace
+
+# (endpoint, takes a channel id); write endpoints, searches and snapshots
+# (GetSnapshot returns an image) are deliberately left out
+SNAPSHOT_ENDPOINTS = [
+    ('GetDeviceInfo', False),
+    ('GetDeviceDetail', False),
+    ('GetDiskInfo', False),
+    ('GetDateAndTime', False),
+    ('GetNetBasicConfig', False),
+    ('GetStreamCaps', False),
+    ('GetImageConfig', False),
+    ('GetSmartVehicleConfig', False),
+    ('GetVideoStreamConfig', True),
+    ('GetImageOsdConfig', True),
+    ('GetPrivacyMaskConfig', True),
+    ('PtzGetCaps', True),
+    ('GetMotionConfig', True),
+    ('GetSmartVfdConfig', True),
+    ('GetSmartPerimeterConfig', True),
+    ('GetSmartCddConfig', True),
+    ('GetSmartCpcConfig', True),
+    ('GetSubscriptionConfig', True),
+    ('GetVehiclePlateProgress', True),
+]
+
+ALARM_TRIGGER_ACTIONS = [
+    "alarmIn", "motion", "avd", "cdd", "cpc", "ipd",
+    "tripwire", "osc", "perimeter", "vfd", "vehicle",
+    "aoientry", "aoileave", "passlinecount"
+]
+
+# Requests in flight per camera; matches CameraClient's default pool size
+SNAPSHOT_WORKERS = 10
+
+# Attributes describing the XML encoding rather than the configuration
+IGNORED_ATTRIBUTES = ('type', 'version')
+
+def snapshot_requests(channel=1, endpoints=None, alarm_actions=ALARM_TRIGGER_ACTIONS):
+    """List the (key, endpoint, path) requests that make up a snapshot
+
+    The key names the section in the snapshot document, e.g. 'GetMotionConfig'
+    or 'GetAlarmTriggerConfig/motion'.
+    """
+    requests = []
+    for endpoint, per_channel in SNAPSHOT_ENDPOINTS:
+        if endpoints is None or endpoint in endpoints:
+            requests.append((endpoint, endpoint, (channel,) if per_channel else ()))
+    if endpoints is None or 'GetAlarmTriggerConfig' in endpoints:
+        for action in alarm_actions:
+            requests.append((f"GetAlarmTriggerConfig/{action}", 'GetAlarmTriggerConfig', (channel, action)))
+    return requests
+
+def normalize_element(elem):
+    """Convert an element into plain JSON data, without namespaces
+
+    Leaf elements become their stripped text. Child elements become a dict
+    keyed by tag, and tags that repeat (or children of type="list"
+    elements) become lists. Attributes other than type/version are kept
+    under '@name' keys, and the text of an element that has them under '#text'.
+    """
+    attributes = {f"@{split_namespace(name)[1]}": value for name, value in elem.attrib.items()
+                  if split_namespace(name)[1] not in IGNORED_ATTRIBUTES}
+    children = [child for child in elem if isinstance(child.tag, str)]
+    if not children:
+        text = (elem.text or '').strip()
+        if not attributes:
+            return text
+        if text:
+            attributes['#text'] = text
+        return attributes
+
+    groups = {}
+    for child in children:
+        groups.setdefault(split_namespace(child.tag)[1], []).append(normalize_element(child))
+    as_list = elem.get('type') == 'list'
+    node = attributes
+    for tag, values in groups.items():
+        node[tag] = values if as_list or len(values) > 1 else values[0]
+    return node
+
+def normalize_response(content):
+    """Normalize a camera XML response into (status, error_code, data)"""
+    doc = XmlIndex(content)
+    root = doc.root
+    status = root.get('status') or 'success'
+    error_code = root.get('errorCode')
+    data = normalize_element(root)
+    if isinstance(data, dict):
+        data.pop('@status', None)
+        data.pop('@errorCode', None)
+    return status, error_code, data
+
+def fetch_section(client, endpoint, path, timeout=None, cache=None, section=None, channel=""):
+    """Request one endpoint and return its snapshot entry
+
+    With a ConfigCache the response goes through the cache: an unchanged
+    response is not parsed again, and the entry gains its content 'hash',
+    'change' (new, changed or unchanged) and 'changed_paths'.
+    """
+    entry = {
+        'endpoint': endpoint,
+        'path': [str(part) for part in path],
+        'status': 'error',
+        'http_status': None,
+        'error_code': None,
+        'elapsed_ms': 0.0,
+        'data': None
+    }
+    started = time.perf_counter()
+    try:
+        response = client.post(endpoint, *path, timeout=timeout)
+        entry['http_status'] = response.status_code
+        content = response.content
+    except Exception as e:
+        entry['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        entry['error'] = str(e)
+        return entry
+    entry['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+    if cache is not None and response.status_code < 400:
+        try:
+            change = cache.update(f"{client.host}:{client.port}", section or endpoint, channel, content)
+        except Exception as e:
+            entry['error'] = f"Unparseable response: {e}"
+            return entry
+        entry['error_code'] = change.error_code
+        if change.state == 'failed':
+            entry['status'] = 'failed'
+        else:
+            entry.update(status='ok', data=change.document, hash=change.hash,
+                         change=change.state, changed_paths=change.changed_paths)
+        return entry
+
+    try:
+        status, error_code, data = normalize_response(content)
+    except Exception as e:
+        entry['error'] = f"Unparseable response: {e}"
+        return entry
+
+    entry['error_code'] = error_code
+    if response.status_code >= 400 or status == 'failed':
+        entry['status'] = 'failed'
+    else:
+        entry['status'] = 'ok'
+        entry['data'] = data
+    return entry
+
+def cached_section(endpoint, path, data):
+    """Snapshot entry for a section served from the capability cache"""
+    return {
+        'endpoint': endpoint,
+        'path': [str(part) for part in path],
+        'status': 'ok',
+        'http_status': None,
+        'error_code': None,
+        'elapsed_ms': 0.0,
+        'data': data,
+        'cached': True
+    }
+
+def unsupported_section(endpoint, path, rejection):
+    """Snapshot entry for an endpoint the camera's model is known to reject"""
+    return {
+        'endpoint': endpoint,
+        'path': [str(part) for part in path],
+        'status': 'unsupported',
+        'http_status': rejection['http_status'],
+        'error_code': rejection['error_code'],
+        'elapsed_ms': 0.0,
+        'data': None
+    }
+
+def collect_snapshot(client, channel=1, endpoints=None, workers=SNAPSHOT_WORKERS, timeout=None, cache=None,
+                     capabilities=None, support=None):
+    """Fetch every snapshot endpoint of one camera concurrently
+
+    Keep workers within the client's pool size so every request reuses a
+    pooled connection. Pass a ConfigCache to detect changed sections. With
+    a CapabilityCache or EndpointSupport, GetDeviceInfo is fetched first to
+    learn the model and firmware; static capabilities already known are
+    then served from the cache, and endpoints the model is known to reject
+    are skipped (status 'unsupported'). New rejections are recorded.
+    """
+    camera = f"{client.host}:{client.port}"
+    requests = snapshot_requests(channel, endpoints)
+    order = [key for key, _, _ in requests]
+    started = time.perf_counter()
+    taken_at = datetime.datetime.now().isoformat(timespec='seconds')
+
+    def fetch(request):
+        return fetch_section(client, request[1], request[2], timeout, cache, request[0], channel)
+
+    sections = {}
+    identity = None
+    if (capabilities is not None or support is not None) and requests and requests[0][0] == 'GetDeviceInfo':
+        sections['GetDeviceInfo'] = fetch(requests[0])
+        requests = requests[1:]
+        identity = device_identity(sections['GetDeviceInfo']['data'])
+
+    if identity is not None and capabilities is not None:
+        # A firmware change maps the camera to a new key and drops the old one
+        capabilities.identify(camera, *identity)
+        known = capabilities.get(*identity)
+        if known is not None:
+            for key, endpoint, path in requests:
+                if key in known['sections']:
+                    sections[key] = cached_section(endpoint, path, known['sections'][key])
+    if identity is not None and support is not None:
+        for key, endpoint, path in requests:
+            rejection = None if key in sections else support.rejection(identity[0], identity[1], key)
+            if rejection is not None:
+                sections[key] = unsupported_section(endpoint, path, rejection)
+    requests = [request for request in requests if request[0] not in sections]
+
+    if requests:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(requests)))) as executor:
+            sections.update(zip((key for key, _, _ in requests), executor.map(fetch, requests)))
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    if identity is not None and support is not None:
+        for key, _, _ in requests:
+            entry = sections[key]
+            if entry['status'] == 'failed':
+                support.record(identity[0], identity[1], key, entry['http_status'], entry['error_code'])
+
+    sections = {key: sections[key] for key in order}
+    snapshot = {
+        'camera': camera,
+        'channel': channel,
+        'taken_at': taken_at,
+        'elapsed_ms': elapsed_ms,
+        'sum_elapsed_ms': round(sum(entry['elapsed_ms'] for entry in sections.values()), 1),
+        'summary': {
+            status: sum(1 for entry in sections.values() if entry['status'] == status)
+            for status in ('ok', 'failed', 'unsupported', 'error')
+        },
+        'sections': sections
+    }
+    if capabilities is not None:
+        capabilities.update_from_snapshot(snapshot)
+    return snapshot
+
+def snapshot_camera(camera, channel=1, endpoints=None, timeout=None, cache=None, capabilities=None, support=None):
+    """Snapshot a fleet Camera; suitable for Fleet.run()"""
+    with CameraClient(*camera.credentials, timeout=timeout) as client:
+        snapshot = collect_snapshot(client, channel, endpoints, timeout=timeout, cache=cache,
+                                    capabilities=capabilities, support=support)
+    snapshot['name'] = camera.name
+    return snapshot
+
+def snapshot_fleet(fleet, channel=1, endpoints=None, timeout=None, role=None, tags=(), cache=None, capabilities=None,
+                   support=None):
+    """Snapshot every selected camera; returns {camera name: (success, snapshot)}"""
+    return fleet.run(snapshot_camera, channel, endpoints, timeout, cache, capabilities, support, role=role, tags=tags)
+
+def save_snapshot(snapshot, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, indent=2, ensure_ascii=False)
+
+def default_snapshot_filename(snapshot):
+    """Timestamped file name for a snapshot, e.g. snapshot_gate-1_20240101_120000.json"""
+    name = snapshot.get('name') or snapshot['camera'].replace(':', '_')
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"snapshot_{name}_{timestamp}.json"
+
+def print_snapshot_summary(snapshot):
+    """Print per-endpoint status and timing, slowest first"""
+    print(f"\nSnapshot of {snapshot['camera']} (channel {snapshot['channel']})")
+    sections = sorted(snapshot['sections'].items(), key=lambda item: item[1]['elapsed_ms'], reverse=True)
+    for key, entry in sections:
+        detail = ""
+        if entry['status'] in ('failed', 'unsupported'):
+            detail = f" (errorCode {entry['error_code']})" if entry['error_code'] else f" (HTTP {entry['http_status']})"
+        elif entry['status'] == 'error':
+            detail = f" ({entry.get('error', 'unknown error')})"
+        elif entry.get('cached'):
+            detail = " (capability cache)"
+        print(f"  {key:<40} {entry['status']:<11} {entry['elapsed_ms']:>8.1f} ms{detail}")
+    summary = snapshot['summary']
+    print(f"  {summary['ok']} ok, {summary['failed']} failed, {summary['unsupported']} skipped as unsupported, "
+          f"{summary['error']} errors in {snapshot['elapsed_ms']:.0f} ms (sequential total {snapshot['sum_elapsed_ms']:.0f} ms)")
+
+def main():
+    from capability_cache import CapabilityCache
+    from endpoint_support import EndpointSupport
+    from fleet import Camera, load_fleet, prompt_for_camera
+
+    parser = argparse.ArgumentParser(description="Snapshot camera configuration to JSON")
+    parser.add_argument('--fleet', action='store_true', help="snapshot every camera in the fleet registry")
+    parser.add_argument('--role', help="only fleet cameras with this role")
+    parser.add_argument('--channel', type=int, default=1)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--output', default='.', help="directory for the JSON files")
+    parser.add_argument('--refresh-capabilities', action='store_true', help="query capabilities again and update the cache")
+    parser.add_argument('--probe-all', action='store_true', help="request endpoints known to be unsupported")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    capabilities = CapabilityCache(refresh=args.refresh_capabilities)
+    support = EndpointSupport()
+    if args.probe_all:
+        support.ttl = 0
+    if args.fleet:
+        results = snapshot_fleet(load_fleet(), args.channel, timeout=args.timeout, role=args.role,
+                                 capabilities=capabilities, support=support)
+    else:
+        host, port, username, password = prompt_for_camera()
+        camera = Camera(f"{host}_{port}", host, port, username, password)
+        snapshot = snapshot_camera(camera, args.channel, timeout=args.timeout, capabilities=capabilities,
+                                   support=support)
+        results = {camera.name: (True, snapshot)}
+
+    for name, (success, snapshot) in results.items():
+        if not success:
+            print(f"{name}: {snapshot}")
+            continue
+        print_snapshot_summary(snapshot)
+        path = os.path.join(args.output, default_snapshot_filename(snapshot))
+        save_snapshot(snapshot, path)
+        print(f"  Saved to {path}")
+
+if __name__ == "__main__":
+    main()
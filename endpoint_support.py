@@ -0,0 +1,103 @@
+"""
+Endpoint Support
+================
+
+A negative cache of the endpoints each camera model rejects. Not every
+model has PTZ, VFD, CDD or CPC, and asking anyway costs a full request
+per endpoint in every snapshot, fleet sweep and polling loop. Rejections
+(HTTP 404 or 501, or errorCode 1 in a status="failed" response) are
+recorded per model in a small JSON file and those endpoints are skipped
+afterwards.
+
+Entries are re-probed once they are older than the TTL, and at once when
+a camera reports a different firmware version than the one the rejection
+was recorded on, since a firmware update may add the feature.
+
+Example:
+    support = EndpointSupport()
+    snapshot = collect_snapshot(client, support=support)
+"""
+
+import json
+import os
+import threading
+import time
+from capability_cache import write_json_atomic
+
+DEFAULT_SUPPORT_PATH = "endpoint_support.json"
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Only answers that say the endpoint does not exist are cached. Bad
+# credentials, session errors (errorCode 499), a busy device, throttling
+# and timeouts are transient and always requested again.
+UNSUPPORTED_HTTP_STATUSES = {404, 501}
+# errorCode 1, "Invalid Request": the request URL is not supported by the
+# device (API V1.9, 1.3.6)
+UNSUPPORTED_ERROR_CODES = {'1'}
+
+def is_rejection(http_status, error_code=None):
+    """True if a failed response means the endpoint is not supported"""
+    if http_status is None:
+        return False
+    return http_status in UNSUPPORTED_HTTP_STATUSES or str(error_code) in UNSUPPORTED_ERROR_CODES
+
+class EndpointSupport:
+    def __init__(self, path=DEFAULT_SUPPORT_PATH, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self.models = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self.models = json.load(f).get('models', {})
+            except (OSError, ValueError) as e:
+                print(f"Warning: Ignoring unreadable endpoint support file {path}: {e}")
+
+    def rejection(self, model, firmware, endpoint, now=None):
+        """The recorded rejection of an endpoint, or None if it should be requested
+
+        Returns {'firmware', 'http_status', 'error_code', 'recorded'}.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self.models.get(model, {}).get(endpoint)
+            if entry is None or entry['firmware'] != firmware or now - entry['recorded'] > self.ttl:
+                return None
+            self.skipped += 1
+            return entry
+
+    def is_supported(self, model, firmware, endpoint):
+        return self.rejection(model, firmware, endpoint) is None
+
+    def record(self, model, firmware, endpoint, http_status, error_code=None):
+        """Record a failed response; returns True if it was cached as unsupported"""
+        if not is_rejection(http_status, error_code):
+            return False
+        with self._lock:
+            self.models.setdefault(model, {})[endpoint] = {
+                'firmware': firmware,
+                'http_status': http_status,
+                'error_code': error_code,
+                'recorded': time.time()
+            }
+            self._save()
+        return True
+
+    def forget(self, model, endpoint=None):
+        """Re-probe one endpoint, or every endpoint of a model, on the next request"""
+        with self._lock:
+            if endpoint is None:
+                self.models.pop(model, None)
+            else:
+                self.models.get(model, {}).pop(endpoint, None)
+            self._save()
+
+    def unsupported(self, model):
+        """{endpoint: rejection} recorded for a model, including expired entries"""
+        with self._lock:
+            return dict(self.models.get(model, {}))
+
+    def _save(self):
+        write_json_atomic(self.path, {'models': self.models})
@@ -0,0 +1,503 @@
+"""
+Event Bus
+=========
+
+Fans events out to several sinks (a JSON lines file, SQLite, a webhook,
+stdout) without letting a slow sink stall ingestion. Every sink has its
+own bounded queue and worker task, and its own overflow policy for when
+that queue is full:
+
+- block: publish() waits for room (lossless, but it slows the publisher);
+- drop_oldest: the oldest queued event is dropped to make room;
+- spill: events go to a file on disk until the sink catches up, and are
+  then delivered from there in order. What is still undelivered when the
+  bus closes stays in the file (one per sink name in spill_dir) and is
+  delivered first the next time the bus runs.
+
+Workers hand sinks batches of whatever is queued, so a sink that commits
+or POSTs per batch keeps up under load. A batch the sink fails to write is
+retried with backoff until it succeeds, so a sink that is down loses
+nothing while the bus runs; its queue fills and its overflow policy
+applies. Closing the bus waits at most drain_timeout for the sinks, and
+reports what a sink that is still down had not delivered. Each sink
+reports lag (events waiting, age of the last delivered event) and
+throughput.
+
+Example:
+    bus = EventBus()
+    bus.add_sink(StdoutSink())
+    bus.add_sink(SQLiteSink("events.db"), policy='spill')
+    async with bus:
+        await bus.run(receiver.queue)
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import requests
+import xml_backend
+from event_demux import EVENT_CLASSES
+from event_journal import RECORD_HEADER, decode_record, encode_record
+from event_subscription import parse_messages
+
+POLICIES = ('block', 'drop_oldest', 'spill')
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_SPILL_DIR = "event_spill"
+# Seconds over which throughput is measured
+RATE_WINDOW = 1.0
+# Seconds before a failed batch is retried, doubling up to MAX_RETRY_DELAY
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 30.0
+# Seconds close() waits for sinks to deliver what is pending
+DRAIN_TIMEOUT = 30.0
+
+def event_record(event):
+    """An event as plain JSON data"""
+    return {
+        'camera': event.camera,
+        'smart_type': event.smart_type,
+        'relation': event.relation,
+        'received_at': event.received_at,
+        'fields': event.fields(),
+    }
+
+class Sink:
+    """Base class of bus sinks: write_batch() is awaited with lists of events"""
+    name = "sink"
+
+    async def write_batch(self, events):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+class StdoutSink(Sink):
+    name = "stdout"
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    async def write_batch(self, events):
+        for event in events:
+            stamp = time.strftime('%H:%M:%S', time.localtime(event.received_at))
+            self.stream.write(f"[{stamp}] {event.camera} {event.smart_type}: {event.fields()}\n")
+        self.stream.flush()
+
+class FileSink(Sink):
+    """Append events to a JSON lines file"""
+    name = "file"
+
+    def __init__(self, path="events.jsonl"):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+
+    async def write_batch(self, events):
+        self._file.write("".join(json.dumps(event_record(event), ensure_ascii=False) + "\n" for event in events))
+        self._file.flush()
+
+    async def close(self):
+        self._file.close()
+
+class SQLiteSink(Sink):
+    """Insert events into an SQLite table, one transaction per batch, off the event loop"""
+    name = "sqlite"
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS events (
+        camera TEXT,
+        smart_type TEXT NOT NULL,
+        received_at REAL NOT NULL,
+        fields TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS events_received_at ON events (received_at);
+    """
+
+    def __init__(self, path="events.db"):
+        self.path = path
+        # Used from executor threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(self.SCHEMA)
+
+    def _insert(self, rows):
+        with self._lock:
+            self._db.executemany("INSERT INTO events (camera, smart_type, received_at, fields) VALUES (?, ?, ?, ?)", rows)
+            self._db.commit()
+
+    async def write_batch(self, events):
+        rows = [(event.camera, event.smart_type, event.received_at, json.dumps(event.fields(), ensure_ascii=False))
+                for event in events]
+        await asyncio.get_running_loop().run_in_executor(None, self._insert, rows)
+
+    async def close(self):
+        with self._lock:
+            self._db.close()
+
+class WebhookSink(Sink):
+    """POST each batch as a JSON array to a URL"""
+    name = "webhook"
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def _post(self, body):
+        response = self._session.post(self.url, data=body, timeout=self.timeout,
+                                      headers={'Content-Type': 'application/json'})
+        response.raise_for_status()
+
+    async def write_batch(self, events):
+        body = json.dumps([event_record(event) for event in events], ensure_ascii=False).encode('utf-8')
+        await asyncio.get_running_loop().run_in_executor(None, self._post, body)
+
+    async def close(self):
+        self._session.close()
+
+def spill_record(event):
+    header, payload = encode_record(int(event.received_at * 1000000), event.camera, event.smart_type,
+                                    xml_backend.tostring(event.element))
+    return header + payload
+
+class SpillFile:
+    """A FIFO of events on disk, framed like the event journal
+
+    The file is emptied once everything written has been read back.
+    Events still in it when it is closed stay on disk, and a SpillFile
+    opened on the same path later delivers them first.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._read_offset = 0
+        if os.path.exists(path):
+            self._file = open(path, 'r+b')
+            self._recover()
+        else:
+            self._file = open(path, 'w+b')
+
+    def _recover(self):
+        """Count the events left by a previous run, dropping a torn last record"""
+        buffer = self._file.read()
+        offset = 0
+        while True:
+            record, next_offset = decode_record(buffer, offset)
+            if record is None:
+                break
+            self.count += 1
+            offset = next_offset
+        self._file.truncate(offset)
+
+    def push(self, event):
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(spill_record(event))
+        self.count += 1
+
+    def pop_batch(self, limit):
+        """Read back up to limit events, oldest first"""
+        self._file.flush()
+        self._file.seek(self._read_offset)
+        events = []
+        while len(events) < limit and self.count:
+            header = self._file.read(RECORD_HEADER.size)
+            record, _ = decode_record(header + self._file.read(RECORD_HEADER.unpack(header)[0]), 0)
+            self.count -= 1
+            if record is not None:
+                events.extend(parse_messages(record.body, record.camera, record.received_at, EVENT_CLASSES))
+        self._read_offset = self._file.tell()
+        if not self.count:
+            self._read_offset = 0
+            self._file.seek(0)
+            self._file.truncate()
+        return events
+
+    def close(self, unread=()):
+        """Close the file; returns the number of events left in it
+
+        unread are events taken out (or queued ahead of the file) but never
+        delivered; they are kept in front of what is still on disk. The file
+        is only deleted when nothing is left.
+        """
+        self._file.flush()
+        self._file.seek(self._read_offset)
+        remainder = self._file.read()
+        left = len(unread) + self.count
+        if left:
+            self._file.seek(0)
+            self._file.write(b''.join(spill_record(event) for event in unread) + remainder)
+            self._file.truncate()
+        self._file.close()
+        if not left:
+            os.unlink(self.path)
+        return left
+
+class SinkChannel:
+    """A sink's queue, overflow policy, worker and metrics"""
+
+    def __init__(self, sink, policy, maxsize, batch_size, spill_dir, name=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.sink = sink
+        self.name = name or sink.name
+        self.policy = policy
+        self.batch_size = batch_size
+        self.retry_delay = RETRY_DELAY
+        self.max_retry_delay = MAX_RETRY_DELAY
+        self.queue = asyncio.Queue(maxsize)
+        self.spill = None
+        if policy == 'spill':
+            os.makedirs(spill_dir, exist_ok=True)
+            # Named after the sink, so events left by a previous run are resumed
+            self.spill = SpillFile(os.path.join(spill_dir, f"{self.name}.spill"))
+        self.worker = None
+        self.stats = {'published': 0, 'delivered': 0, 'dropped': 0, 'spilled': 0, 'errors': 0}
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.rate = 0.0
+        self._rate_start = time.monotonic()
+        self._rate_count = 0
+        self._in_flight = []
+        self._wakeup = asyncio.Event()
+
+    async def put(self, event):
+        self.stats['published'] += 1
+        if self.spill is not None and self.spill.count:
+            # Keep order: once spilling, everything goes to disk until it drains
+            self._spill(event)
+        elif not self.queue.full():
+            self.queue.put_nowait(event)
+        elif self.policy == 'block':
+            await self.queue.put(event)
+        elif self.policy == 'drop_oldest':
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.stats['dropped'] += 1
+            self.queue.put_nowait(event)
+        else:
+            self._spill(event)
+        self._wakeup.set()
+
+    def _spill(self, event):
+        self.spill.push(event)
+        self.stats['spilled'] += 1
+
+    def _take_batch(self):
+        batch = []
+        while len(batch) < self.batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+            self.queue.task_done()
+        if not batch and self.spill is not None and self.spill.count:
+            batch = self.spill.pop_batch(self.batch_size)
+        return batch
+
+    @property
+    def pending(self):
+        """Events waiting for this sink, in memory and on disk"""
+        return self.queue.qsize() + (self.spill.count if self.spill is not None else 0) + len(self._in_flight)
+
+    async def run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            # The batch stays pending until written, so drain() and lag see it,
+            # and close() still counts it if the worker is cancelled mid-retry
+            self._in_flight = batch
+            await self._write(batch)
+            self._in_flight = []
+            self._delivered(batch)
+
+    async def _write(self, batch):
+        """Write a batch, retrying with backoff until the sink accepts it"""
+        delay = self.retry_delay
+        while True:
+            try:
+                await self.sink.write_batch(batch)
+                return
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"Warning: Sink {self.name} failed to write {len(batch)} events, retrying in {delay:g}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+
+    def _delivered(self, batch):
+        now = time.time()
+        self.stats['delivered'] += len(batch)
+        self.last_lag = now - batch[-1].received_at
+        self.max_lag = max(self.max_lag, self.last_lag)
+        self._rate_count += len(batch)
+        elapsed = time.monotonic() - self._rate_start
+        if elapsed >= RATE_WINDOW:
+            self.rate = self._rate_count / elapsed
+            self._rate_start = time.monotonic()
+            self._rate_count = 0
+
+    def metrics(self):
+        return dict(self.stats, policy=self.policy, pending=self.pending, lag_seconds=round(self.last_lag, 3),
+                    max_lag_seconds=round(self.max_lag, 3), events_per_second=round(self.rate, 1))
+
+    async def drain(self, timeout=None):
+        """Wait until everything published has been delivered, or for timeout seconds
+
+        Returns True if nothing is pending any more.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self._wakeup.set()
+            await asyncio.sleep(0.01)
+        return True
+
+    async def close(self):
+        """Stop the worker and close the sink; returns the number of undelivered events dropped
+
+        With the spill policy nothing is dropped: undelivered events stay in
+        the spill file for the next run.
+        """
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+        unread = list(self._in_flight)
+        self._in_flight = []
+        while not self.queue.empty():
+            unread.append(self.queue.get_nowait())
+            self.queue.task_done()
+        undelivered = 0
+        if self.spill is not None:
+            kept = self.spill.close(unread)
+            if kept:
+                print(f"Warning: Sink {self.name} closed with {kept} undelivered events, kept in {self.spill.path}")
+        elif unread:
+            undelivered = len(unread)
+            self.stats['dropped'] += undelivered
+            print(f"Warning: Sink {self.name} closed with {undelivered} undelivered events")
+        await self.sink.close()
+        return undelivered
+
+class EventBus:
+    """Bounded fan-out of events to sinks, one queue and worker per sink"""
+
+    def __init__(self, spill_dir=DEFAULT_SPILL_DIR):
+        self.spill_dir = spill_dir
+        self.channels = []
+        self._started = False
+
+    def add_sink(self, sink, policy='block', maxsize=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE):
+        """Add a sink with its overflow policy: block, drop_oldest or spill"""
+        names = {existing.name for existing in self.channels}
+        name = sink.name
+        suffix = 2
+        while name in names:
+            name = f"{sink.name}-{suffix}"
+            suffix += 1
+        channel = SinkChannel(sink, policy, maxsize, batch_size, self.spill_dir, name)
+        self.channels.append(channel)
+        if self._started:
+            channel.worker = asyncio.ensure_future(channel.run())
+        return channel
+
+    async def start(self):
+        self._started = True
+        for channel in self.channels:
+            if channel.worker is None:
+                channel.worker = asyncio.ensure_future(channel.run())
+        return self
+
+    async def publish(self, event):
+        """Hand an event to every sink (usable as an async EventDemux handler)"""
+        for channel in self.channels:
+            await channel.put(event)
+
+    async def run(self, queue):
+        """Publish everything from an asyncio.Queue (e.g. EventReceiver.queue) forever"""
+        while True:
+            event = await queue.get()
+            try:
+                await self.publish(event)
+            finally:
+                queue.task_done()
+
+    def metrics(self):
+        """{sink name: metrics} for every sink"""
+        return {channel.name: channel.metrics() for channel in self.channels}
+
+    async def close(self, drain=True, drain_timeout=DRAIN_TIMEOUT):
+        """Deliver what is queued (unless drain=False), then stop workers and close sinks
+
+        Draining gives up after drain_timeout seconds (None waits for as
+        long as it takes), so a sink that stays down cannot block shutdown.
+        Returns {sink name: undelivered events dropped}.
+        """
+        if drain:
+            await asyncio.gather(*(channel.drain(drain_timeout) for channel in self.channels))
+        dropped = {}
+        for channel in self.channels:
+            dropped[channel.name] = await channel.close()
+        self._started = False
+        return dropped
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+async def report_metrics(bus, interval=10):
+    """Print sink metrics every interval seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        for name, metrics in bus.metrics().items():
+            print(f"[bus] {name}: {metrics['events_per_second']} events/s, {metrics['pending']} pending, "
+                  f"lag {metrics['lag_seconds']}s, {metrics['dropped']} dropped, {metrics['spilled']} spilled")
+
+def main():
+    import argparse
+    from event_receiver import DEFAULT_PORT, EventReceiver
+
+    parser = argparse.ArgumentParser(description="Receive pushed camera events and fan them out to sinks")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--file', help="append events to this JSON lines file")
+    parser.add_argument('--sqlite', help="insert events into this SQLite database")
+    parser.add_argument('--webhook', help="POST event batches to this URL")
+    parser.add_argument('--stdout', action='store_true', help="print events")
+    parser.add_argument('--policy', default='spill', choices=POLICIES, help="overflow policy of every sink")
+    args = parser.parse_args()
+
+    bus = EventBus()
+    if args.file:
+        bus.add_sink(FileSink(args.file), args.policy)
+    if args.sqlite:
+        bus.add_sink(SQLiteSink(args.sqlite), args.policy)
+    if args.webhook:
+        bus.add_sink(WebhookSink(args.webhook), args.policy)
+    if args.stdout or not bus.channels:
+        bus.add_sink(StdoutSink(), args.policy)
+
+    def parse(content, camera, received_at):
+        return parse_messages(content, camera, received_at, EVENT_CLASSES)
+
+    async def run():
+        async with EventReceiver(port=args.port, parser=parse) as receiver, bus:
+            print(f"Listening for events on port {receiver.port}. Press Ctrl+C to stop.")
+            await asyncio.gather(bus.run(receiver.queue), report_metrics(bus))
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\nStopping...")
+
+if __name__ == "__main__":
+    main()
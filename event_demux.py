@@ -0,0 +1,234 @@
+"""
+Event Demultiplexer
+===================
+
+Turns one REALTIME_SUBSCRIBE stream carrying all 15 smart types into
+typed events, delivered only to the handlers registered for each type.
+
+The dispatch table is built once, with an entry per smart type (event
+class and handler list), so routing an event is one dict lookup. Before a
+payload is parsed its smartType values are sniffed with a regular
+expression. A payload carrying only types nobody handles is dropped
+without being parsed, and in mixed batches only handled events are
+built. An event's fields are normalized on first access.
+
+Example:
+    demux = EventDemux()
+
+    @demux.on('VEHICE')
+    def vehicle(event):
+        print(event.camera, event.vehicle_id, event.plate)
+
+    # pull: typed events straight from the subscription
+    subscription = PullSubscription(client, demux.smart_types, parser=demux.parse)
+    for event in subscription.messages():
+        demux.handle(event)
+
+    # push: the receiver parses with the demux, a task drains its queue
+    receiver = EventReceiver(parser=demux.parse)
+    await demux.run(receiver.queue)
+"""
+
+import inspect
+import re
+from event_subscription import SMART_TYPES, EventMessage, parse_messages
+
+# smartType values of a payload, whatever its namespace prefix
+SMART_TYPE_PATTERN = re.compile(rb'<(?:[\w.-]+:)?smartType\b[^>]*>\s*(?:<!\[CDATA\[)?\s*(\w+)')
+# A failed response carries no events but must still raise SubscriptionError
+FAILED_PATTERN = re.compile(rb'status\s*=\s*["\']failed["\']')
+
+class SmartEvent(EventMessage):
+    """Base class of the typed events"""
+    __slots__ = ()
+
+    def int_field(self, *tags):
+        """Integer value of the first of tags present, or None"""
+        for tag in tags:
+            value = self.text(tag)
+            if value is not None and value.strip().isdigit():
+                return int(value)
+        return None
+
+class MotionEvent(SmartEvent):
+    __slots__ = ()
+
+class SensorEvent(SmartEvent):
+    __slots__ = ()
+
+class PerimeterEvent(SmartEvent):
+    __slots__ = ()
+
+class VideoAnomalyEvent(SmartEvent):
+    __slots__ = ()
+
+class ObjectLeftRemovedEvent(SmartEvent):
+    __slots__ = ()
+
+class PeopleCountEvent(SmartEvent):
+    __slots__ = ()
+
+class CrowdDensityEvent(SmartEvent):
+    __slots__ = ()
+
+class IntrusionEvent(SmartEvent):
+    __slots__ = ()
+
+class FaceDetectionEvent(SmartEvent):
+    __slots__ = ()
+
+class FaceMatchEvent(SmartEvent):
+    __slots__ = ()
+
+class VehicleEvent(SmartEvent):
+    """A license plate capture; the keys SearchSnapVehicleByKey needs when present"""
+    __slots__ = ()
+
+    @property
+    def vehicle_id(self):
+        return self.int_field('vehicleID', 'vehicleId')
+
+    @property
+    def snap_time(self):
+        return self.int_field('snapTime')
+
+    @property
+    def plate(self):
+        for tag in ('vehiclePlate', 'plateNumber', 'carPlateNumber'):
+            value = self.text(tag)
+            if value:
+                return value.strip()
+        return None
+
+class AreaEntryEvent(SmartEvent):
+    __slots__ = ()
+
+class AreaExitEvent(SmartEvent):
+    __slots__ = ()
+
+class LineCrossingCountEvent(SmartEvent):
+    __slots__ = ()
+
+class TrafficEvent(SmartEvent):
+    __slots__ = ()
+
+EVENT_CLASSES = {
+    'MOTION': MotionEvent,
+    'SENSOR': SensorEvent,
+    'PEA': PerimeterEvent,
+    'AVD': VideoAnomalyEvent,
+    'OSC': ObjectLeftRemovedEvent,
+    'CPC': PeopleCountEvent,
+    'CDD': CrowdDensityEvent,
+    'IPD': IntrusionEvent,
+    'VFD': FaceDetectionEvent,
+    'VFD_MATCH': FaceMatchEvent,
+    'VEHICE': VehicleEvent,
+    'AOIENTRY': AreaEntryEvent,
+    'AOILEAVE': AreaExitEvent,
+    'PASSLINECOUNT': LineCrossingCountEvent,
+    'TRAFFIC': TrafficEvent,
+}
+
+def sniff_smart_types(content):
+    """The smartType values in a raw payload, without parsing it"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return {match.decode('ascii') for match in SMART_TYPE_PATTERN.findall(content)}
+
+class EventDemux:
+    """Route typed events to per-type handlers"""
+
+    def __init__(self, classes=EVENT_CLASSES):
+        # The dispatch table: smart type -> (event class, handlers)
+        self._table = {smart_type: (event_class, []) for smart_type, event_class in classes.items()}
+        self._active = {}
+        self.stats = {'payloads': 0, 'skipped': 0, 'events': 0, 'handler_errors': 0}
+
+    @property
+    def smart_types(self):
+        """Smart types with at least one handler, in protocol order"""
+        return [smart_type for smart_type in SMART_TYPES if smart_type in self._active]
+
+    def register(self, smart_types, handler):
+        """Call handler(event) for events of the given smart type(s)"""
+        if isinstance(smart_types, str):
+            smart_types = [smart_types]
+        for smart_type in smart_types:
+            if smart_type not in self._table:
+                raise ValueError(f"Unknown smart type: {smart_type}")
+            self._table[smart_type][1].append(handler)
+        self._refresh()
+        return handler
+
+    def unregister(self, smart_types, handler):
+        """Stop calling handler for the given smart type(s)"""
+        if isinstance(smart_types, str):
+            smart_types = [smart_types]
+        for smart_type in smart_types:
+            handlers = self._table[smart_type][1]
+            if handler in handlers:
+                handlers.remove(handler)
+        self._refresh()
+
+    def on(self, *smart_types):
+        """Decorator form of register"""
+        return lambda handler: self.register(smart_types, handler)
+
+    def _refresh(self):
+        self._active = {smart_type: event_class for smart_type, (event_class, handlers) in self._table.items() if handlers}
+
+    def parse(self, content, camera=None, received_at=None):
+        """Typed events of the handled types in a payload
+
+        Has the signature of parse_messages, so it can be passed as the
+        parser of a PullSubscription or EventReceiver.
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        self.stats['payloads'] += 1
+        if self._active.keys().isdisjoint(sniff_smart_types(content)) and not FAILED_PATTERN.search(content):
+            self.stats['skipped'] += 1
+            return []
+        return parse_messages(content, camera, received_at, self._active)
+
+    def handle(self, event):
+        """Call the handlers registered for an event's type; returns their results"""
+        entry = self._table.get(event.smart_type)
+        if entry is None:
+            return []
+        event_class, handlers = entry
+        if type(event) is not event_class:
+            # A plain EventMessage, e.g. from parse_messages
+            event = event_class(event.smart_type, event.relation, event.camera, event.received_at, event.element, event.doc)
+        self.stats['events'] += 1
+        results = []
+        for handler in list(handlers):
+            try:
+                results.append(handler(event))
+            except Exception as e:
+                self.stats['handler_errors'] += 1
+                print(f"Warning: {event.smart_type} handler {getattr(handler, '__name__', handler)} failed: {e}")
+        return results
+
+    def dispatch(self, content, camera=None, received_at=None):
+        """Parse a payload and handle its events; returns the number handled"""
+        events = self.parse(content, camera, received_at)
+        for event in events:
+            self.handle(event)
+        return len(events)
+
+    async def run(self, queue):
+        """Handle events from an asyncio.Queue forever, awaiting coroutine handlers"""
+        while True:
+            event = await queue.get()
+            try:
+                for result in self.handle(event):
+                    if inspect.isawaitable(result):
+                        try:
+                            await result
+                        except Exception as e:
+                            self.stats['handler_errors'] += 1
+                            print(f"Warning: {event.smart_type} handler failed: {e}")
+            finally:
+                queue.task_done()
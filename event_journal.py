@@ -0,0 +1,360 @@
+"""
+Event Journal
+=============
+
+An append-only on-disk journal of subscription and push events, so they
+survive the process and analytics or exports can be rebuilt later without
+asking the camera again.
+
+Layout of a journal directory:
+
+- <n>.seg: fixed-size segment files, preallocated and filled with
+  records; a new segment is started when the next record does not fit;
+- <n>.idx: a sparse time index per segment, one (timestamp, offset)
+  entry for the first record and then one every index_interval bytes.
+
+Record framing (little-endian):
+
+    uint32 length     payload bytes; 0 marks the end of written data
+    uint32 crc32      of the timestamp and payload
+    int64  timestamp  microseconds since the epoch (receive time, kept
+                      non-decreasing)
+    payload           uint16 camera length, uint8 smart type length,
+                      camera, smart type, event XML
+
+The payload is written before its header, so a reader that finds a
+non-zero length finds a complete record behind it. Readers memory-map the
+segments: a time range is replayed by bisecting the sparse index of the
+segments that overlap it, and tail() follows the live journal as it grows.
+
+Example:
+    with EventJournal("journal") as journal:
+        demux.register(SMART_TYPES, journal.append)
+
+    reader = JournalReader("journal")
+    for event in reader.events(start=time.time() - 3600):
+        print(event.camera, event.smart_type)
+"""
+
+import bisect
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+import xml_backend
+from event_subscription import parse_messages
+
+DEFAULT_JOURNAL_DIR = "journal"
+DEFAULT_SEGMENT_SIZE = 64 * 1024 * 1024
+# Bytes of records between sparse index entries
+DEFAULT_INDEX_INTERVAL = 64 * 1024
+
+RECORD_HEADER = struct.Struct('<IIq')
+PAYLOAD_HEADER = struct.Struct('<HB')
+INDEX_ENTRY = struct.Struct('<qQ')
+
+class JournalRecord:
+    """One journaled event; body is the XML of the event element"""
+    __slots__ = ('timestamp', 'camera', 'smart_type', 'body')
+
+    def __init__(self, timestamp, camera, smart_type, body):
+        self.timestamp = timestamp
+        self.camera = camera
+        self.smart_type = smart_type
+        self.body = body
+
+    @property
+    def received_at(self):
+        """Receive time in seconds"""
+        return self.timestamp / 1000000
+
+    def to_message(self, parser=parse_messages):
+        """Parse the record back into an event (parser may be EventDemux.parse); None if skipped"""
+        messages = parser(self.body, self.camera, self.received_at)
+        return messages[0] if messages else None
+
+    def __repr__(self):
+        return f"JournalRecord({self.timestamp}, {self.camera!r}, {self.smart_type!r})"
+
+def encode_record(timestamp, camera, smart_type, body):
+    """Frame one record as (header, payload) bytes"""
+    camera = (camera or "").encode('utf-8')
+    smart_type = smart_type.encode('ascii')
+    payload = PAYLOAD_HEADER.pack(len(camera), len(smart_type)) + camera + smart_type + body
+    crc = zlib.crc32(payload, zlib.crc32(struct.pack('<q', timestamp)))
+    return RECORD_HEADER.pack(len(payload), crc, timestamp), payload
+
+def decode_record(buffer, offset):
+    """Return (record, next offset), or (None, offset) at the end of written data
+
+    A record whose checksum does not match (a torn write) also ends the data.
+    """
+    if offset + RECORD_HEADER.size > len(buffer):
+        return None, offset
+    length, crc, timestamp = RECORD_HEADER.unpack_from(buffer, offset)
+    start = offset + RECORD_HEADER.size
+    end = start + length
+    if length == 0 or end > len(buffer):
+        return None, offset
+    payload = buffer[start:end]
+    if zlib.crc32(payload, zlib.crc32(struct.pack('<q', timestamp))) != crc:
+        return None, offset
+    camera_length, type_length = PAYLOAD_HEADER.unpack_from(payload)
+    position = PAYLOAD_HEADER.size
+    camera = payload[position:position + camera_length].decode('utf-8')
+    position += camera_length
+    smart_type = payload[position:position + type_length].decode('ascii')
+    position += type_length
+    return JournalRecord(timestamp, camera or None, smart_type, payload[position:]), end
+
+def segment_paths(directory):
+    """[(segment number, .seg path)] in order"""
+    segments = []
+    for name in os.listdir(directory):
+        stem, extension = os.path.splitext(name)
+        if extension == '.seg' and stem.isdigit():
+            segments.append((int(stem), os.path.join(directory, name)))
+    return sorted(segments)
+
+def read_index(path):
+    """[(timestamp, offset)] from a segment's sparse index"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    usable = len(data) - len(data) % INDEX_ENTRY.size
+    return list(INDEX_ENTRY.iter_unpack(data[:usable]))
+
+class EventJournal:
+    """Append events to a segmented journal directory (thread-safe)"""
+
+    def __init__(self, directory=DEFAULT_JOURNAL_DIR, segment_size=DEFAULT_SEGMENT_SIZE,
+                 index_interval=DEFAULT_INDEX_INTERVAL, sync=False):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.index_interval = index_interval
+        self.sync = sync
+        self.stats = {'records': 0, 'bytes': 0, 'segments': 0}
+        self._lock = threading.Lock()
+        self._last_timestamp = 0
+        os.makedirs(directory, exist_ok=True)
+
+        segments = segment_paths(directory)
+        if segments:
+            self._open_segment(segments[-1][0], recover=True)
+        else:
+            self._open_segment(0)
+
+    def _open_segment(self, number, recover=False):
+        self.segment = number
+        path = os.path.join(self.directory, f"{number:08d}.seg")
+        self._file = open(path, 'r+b' if recover else 'w+b')
+        if not recover:
+            self._file.truncate(self.segment_size)
+        self._index = open(os.path.join(self.directory, f"{number:08d}.idx"), 'ab')
+        self._offset = 0
+        self._last_indexed = None
+        if recover:
+            self._recover()
+        self.stats['segments'] += 1
+
+    def _recover(self):
+        """Find the end of the records in a reopened segment and clear any torn write"""
+        entries = read_index(self._index.name)
+        with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            # Start from the last indexed record rather than the beginning
+            offset = entries[-1][1] if entries else 0
+            while True:
+                record, next_offset = decode_record(buffer, offset)
+                if record is None:
+                    break
+                self._last_timestamp = record.timestamp
+                offset = next_offset
+            tail = buffer[offset:offset + RECORD_HEADER.size]
+        self._offset = offset
+        self._last_indexed = entries[-1][1] if entries else None
+        if tail.strip(b'\0'):
+            os.pwrite(self._file.fileno(), b'\0' * RECORD_HEADER.size, offset)
+
+    def append(self, event):
+        """Journal an EventMessage (usable as an EventDemux handler)"""
+        return self.append_raw(event.camera, event.smart_type, xml_backend.tostring(event.element), event.received_at)
+
+    def append_raw(self, camera, smart_type, body, received_at=None):
+        """Journal one event given its XML; returns (segment, offset)"""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        timestamp = int((time.time() if received_at is None else received_at) * 1000000)
+        with self._lock:
+            # Events from several sources arrive slightly out of order; keeping
+            # timestamps non-decreasing keeps the sparse index searchable
+            timestamp = self._last_timestamp = max(timestamp, self._last_timestamp)
+            header, payload = encode_record(timestamp, camera, smart_type, body)
+            size = len(header) + len(payload)
+            # Keep room for the zero header that ends the data
+            if size + RECORD_HEADER.size > self.segment_size:
+                raise ValueError(f"Event of {size} bytes does not fit in a {self.segment_size} byte segment")
+            if self._offset + size + RECORD_HEADER.size > self.segment_size:
+                self._roll()
+            offset = self._offset
+            fd = self._file.fileno()
+            os.pwrite(fd, payload, offset + len(header))
+            os.pwrite(fd, header, offset)
+            if self._last_indexed is None or offset - self._last_indexed >= self.index_interval:
+                self._index.write(INDEX_ENTRY.pack(timestamp, offset))
+                self._index.flush()
+                self._last_indexed = offset
+            if self.sync:
+                os.fsync(fd)
+            self._offset = offset + size
+            self.stats['records'] += 1
+            self.stats['bytes'] += size
+            return self.segment, offset
+
+    def _roll(self):
+        self._close_segment()
+        self._open_segment(self.segment + 1)
+
+    def _close_segment(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._index.close()
+
+    def flush(self):
+        """Force written records to disk"""
+        with self._lock:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            self._close_segment()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class JournalReader:
+    """Replay or tail a journal directory through memory-mapped segments"""
+
+    def __init__(self, directory=DEFAULT_JOURNAL_DIR):
+        self.directory = directory
+
+    def _segments(self):
+        """[(number, seg path, sparse index)] of the journal"""
+        return [(number, path, read_index(path[:-4] + '.idx')) for number, path in segment_paths(self.directory)]
+
+    @staticmethod
+    def _map(path):
+        with open(path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _start(self, segments, start_us):
+        """(position in segments, offset) of the first record that may be at or after start_us"""
+        if start_us is None:
+            return 0, 0
+        firsts = [index[0][0] if index else None for _, _, index in segments]
+        position = 0
+        for i, first in enumerate(firsts):
+            if first is not None and first <= start_us:
+                position = i
+        index = segments[position][2] if segments else []
+        if not index:
+            return position, 0
+        entry = bisect.bisect_right(index, (start_us, float('inf'))) - 1
+        return position, index[max(entry, 0)][1]
+
+    def _records(self, buffer, offset, start_us=None):
+        """Yield (record, next offset) from a mapped segment, skipping records before start_us"""
+        while True:
+            record, offset = decode_record(buffer, offset)
+            if record is None:
+                return
+            if start_us is None or record.timestamp >= start_us:
+                yield record, offset
+
+    def replay(self, start=None, end=None, smart_types=None, cameras=None):
+        """Yield JournalRecords received between start and end (seconds, inclusive)"""
+        start_us = None if start is None else int(start * 1000000)
+        end_us = None if end is None else int(end * 1000000)
+        segments = self._segments()
+        position, offset = self._start(segments, start_us)
+        for number, path, index in segments[position:]:
+            if end_us is not None and index and index[0][0] > end_us:
+                break
+            with self._map(path) as buffer:
+                for record, _ in self._records(buffer, offset, start_us):
+                    if end_us is not None and record.timestamp > end_us:
+                        return
+                    if smart_types is not None and record.smart_type not in smart_types:
+                        continue
+                    if cameras is not None and record.camera not in cameras:
+                        continue
+                    yield record
+            offset = 0
+
+    def events(self, start=None, end=None, smart_types=None, cameras=None, parser=parse_messages):
+        """Yield parsed events (EventMessages, or typed ones with parser=EventDemux.parse)"""
+        for record in self.replay(start, end, smart_types, cameras):
+            message = record.to_message(parser)
+            if message is not None:
+                yield message
+
+    def tail(self, start=None, stop=None, poll_interval=0.1):
+        """Yield records from start (seconds; default now) as they are appended, until stop is set"""
+        start_us = int((time.time() if start is None else start) * 1000000)
+        segments = self._segments()
+        position, offset = self._start(segments, start_us)
+        number = segments[position][0] if segments else 0
+        buffer = None
+        try:
+            while stop is None or not stop.is_set():
+                if buffer is None:
+                    path = os.path.join(self.directory, f"{number:08d}.seg")
+                    if not os.path.exists(path):
+                        self._wait(stop, poll_interval)
+                        continue
+                    buffer = self._map(path)
+                found = False
+                while True:
+                    record, next_offset = decode_record(buffer, offset)
+                    if record is None:
+                        break
+                    # Records before start are stepped over too, so the roll
+                    # check below starts from the end of the data
+                    offset = next_offset
+                    if record.timestamp < start_us:
+                        continue
+                    found = True
+                    yield record
+                    if stop is not None and stop.is_set():
+                        return
+                if found:
+                    continue
+                if os.path.exists(os.path.join(self.directory, f"{number + 1:08d}.seg")):
+                    # The writer moved on; nothing more is written to this segment.
+                    # Check once more for records written just before it rolled.
+                    record, _ = decode_record(buffer, offset)
+                    if record is not None:
+                        continue
+                    buffer.close()
+                    buffer = None
+                    number += 1
+                    offset = 0
+                    continue
+                self._wait(stop, poll_interval)
+        finally:
+            if buffer is not None:
+                buffer.close()
+
+    @staticmethod
+    def _wait(stop, interval):
+        if stop is not None:
+            stop.wait(interval)
+        else:
+            time.sleep(interval)
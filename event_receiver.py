@@ -0,0 +1,280 @@
+"""
+Event Push Receiver
+===================
+
+An asyncio HTTP server for cameras that push their alarm and feature
+events to the serverAddress given in SetSubscribe, instead of being
+polled with GetPullMessages.
+
+Requests are handled in two stages so a burst from many cameras never
+waits on XML parsing:
+
+1. the accept path reads a POST, queues its raw body and answers 200 at
+   once (or 503 while the backlog is full, so the camera retries);
+2. a parser task drains the backlog in batches and puts one
+   EventMessage per event on the output asyncio.Queue.
+
+Every camera gets its own path (address_for), which tells the receiver
+which camera an event came from even behind NAT.
+
+Example:
+    async with EventReceiver(port=8080) as receiver:
+        server_address = receiver.address_for("gate-1", "10.20.18.23")
+        # ... SetSubscribe with server_address on the camera ...
+        while True:
+            message = await receiver.queue.get()
+            print(message.camera, message.smart_type)
+
+Measure throughput with benchmarks/push_load.py.
+"""
+
+import argparse
+import asyncio
+import time
+from event_subscription import SMART_TYPES, parse_messages, subscribe_push
+
+DEFAULT_PORT = 8080
+# Raw payloads waiting to be parsed before the receiver answers 503
+DEFAULT_MAX_PENDING = 10000
+# Payloads parsed per batch before yielding to the accept path
+PARSE_BATCH = 100
+MAX_BODY_SIZE = 16 * 1024 * 1024
+# Seconds stop() waits for queued payloads to be parsed
+STOP_TIMEOUT = 10.0
+
+RESPONSES = {
+    200: b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n",
+    400: b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n",
+    404: b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n",
+    413: b"HTTP/1.1 413 Payload Too Large\r\nContent-Length: 0\r\nConnection: close\r\n\r\n",
+    503: b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nRetry-After: 1\r\n\r\n",
+}
+
+class BadRequest(Exception):
+    """Raised for requests the receiver cannot frame"""
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+async def read_request(reader):
+    """Read one request; returns (method, path, headers, body) or None at end of stream"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    parts = request_line.decode('latin-1').split()
+    if len(parts) != 3:
+        raise BadRequest(400)
+    method, path, _ = parts
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        size = 0
+        while True:
+            chunk_size = int((await reader.readline()).split(b';')[0], 16)
+            if chunk_size == 0:
+                # Skip trailers
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            size += chunk_size
+            if size > MAX_BODY_SIZE:
+                raise BadRequest(413)
+            chunks.append(await reader.readexactly(chunk_size))
+            await reader.readline()
+        body = b''.join(chunks)
+    else:
+        length = int(headers.get('content-length', 0))
+        if length > MAX_BODY_SIZE:
+            raise BadRequest(413)
+        body = await reader.readexactly(length) if length else b''
+    return method, path, headers, body
+
+class EventReceiver:
+    """Receive pushed camera events and queue them as EventMessages
+
+    queue is the output asyncio.Queue (unbounded unless one is passed);
+    max_pending bounds the raw payloads waiting to be parsed. parser
+    turns a payload into messages (e.g. EventDemux.parse for typed events).
+    """
+
+    def __init__(self, host="0.0.0.0", port=DEFAULT_PORT, queue=None, max_pending=DEFAULT_MAX_PENDING, base_path="/event",
+                 parser=parse_messages):
+        self.host = host
+        self.port = port
+        self.queue = queue if queue is not None else asyncio.Queue()
+        self.max_pending = max_pending
+        self.base_path = base_path.rstrip('/')
+        self.parser = parser
+        self.cameras = {}
+        self.stats = {'requests': 0, 'events': 0, 'rejected': 0, 'parse_errors': 0}
+
+        self._pending = None
+        self._server = None
+        self._parser = None
+        self._connections = set()
+
+    def address_for(self, camera, advertise_host, advertise_port=None):
+        """Register a camera and return the serverAddress to subscribe it with"""
+        path = f"{self.base_path}/{camera}"
+        self.cameras[path] = camera
+        return f"http://{advertise_host}:{advertise_port or self.port}{path}"
+
+    @property
+    def pending(self):
+        """Raw payloads received but not yet parsed"""
+        return self._pending.qsize() if self._pending is not None else 0
+
+    async def start(self):
+        """Start listening; with port=0 the bound port is stored in self.port"""
+        self._pending = asyncio.Queue(self.max_pending)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._parser = asyncio.ensure_future(self._parse_loop())
+        return self
+
+    async def stop(self, timeout=STOP_TIMEOUT):
+        """Stop accepting, parse what is still queued and close connections
+
+        Parsing is given timeout seconds: with a bounded output queue that
+        nobody drains it would never finish. Payloads still unparsed then
+        are dropped with a warning.
+        """
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        await self._server.wait_closed()
+        try:
+            await asyncio.wait_for(self._pending.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Warning: Stopped with {self.pending} unparsed payloads; the event queue is not being drained")
+        self._parser.cancel()
+        try:
+            await self._parser
+        except asyncio.CancelledError:
+            pass
+        self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.stop()
+
+    async def _handle(self, reader, writer):
+        """The accept path: frame requests, queue bodies, answer at once"""
+        self._connections.add(writer)
+        peer = writer.get_extra_info('peername')
+        peer_host = peer[0] if peer else None
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except BadRequest as e:
+                    writer.write(RESPONSES[e.status])
+                    break
+                except (ValueError, asyncio.IncompleteReadError):
+                    writer.write(RESPONSES[400])
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                self.stats['requests'] += 1
+                if method != 'POST' or not path.startswith(self.base_path):
+                    status = 404
+                else:
+                    try:
+                        self._pending.put_nowait((self.cameras.get(path, peer_host), body, time.time()))
+                        status = 200
+                    except asyncio.QueueFull:
+                        self.stats['rejected'] += 1
+                        status = 503
+                writer.write(RESPONSES[status])
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _parse_loop(self):
+        """Parse queued payloads in batches, off the accept path"""
+        pending = self._pending
+        parse = self.parser
+        while True:
+            batch = [await pending.get()]
+            while len(batch) < PARSE_BATCH and not pending.empty():
+                batch.append(pending.get_nowait())
+            for camera, body, received_at in batch:
+                try:
+                    try:
+                        messages = parse(body, camera, received_at)
+                    except Exception as e:
+                        # Malformed XML, a failed status or a bug in a pluggable
+                        # parser must not stop the parser task
+                        self.stats['parse_errors'] += 1
+                        print(f"Warning: Unparseable event from {camera}: {e}")
+                        messages = ()
+                    for message in messages:
+                        await self.queue.put(message)
+                    self.stats['events'] += len(messages)
+                finally:
+                    pending.task_done()
+            # Let the accept path run between batches
+            await asyncio.sleep(0)
+
+async def print_events(receiver):
+    while True:
+        message = await receiver.queue.get()
+        stamp = time.strftime('%H:%M:%S', time.localtime(message.received_at))
+        print(f"[{stamp}] {message.camera} {message.smart_type}: {message.fields()}")
+
+def subscribe_fleet(receiver, advertise_host, smart_types=SMART_TYPES):
+    """Subscribe every camera of the fleet registry to push to the receiver"""
+    from camera_client import CameraClient
+    from fleet import load_fleet
+
+    def subscribe(camera):
+        with CameraClient(*camera.credentials) as client:
+            return subscribe_push(client, receiver.address_for(camera.name, advertise_host), smart_types)
+
+    results = load_fleet().run(subscribe)
+    for name, (success, result) in results.items():
+        print(f"{name}: {'subscribed' if success else result}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Receive events pushed by cameras and print them")
+    parser.add_argument('--host', default="0.0.0.0")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--subscribe', metavar='ADVERTISE_HOST',
+                        help="subscribe every fleet camera to push here, reachable at this address")
+    parser.add_argument('--types', nargs='+', default=list(SMART_TYPES), choices=SMART_TYPES, metavar='TYPE')
+    args = parser.parse_args()
+
+    async def run():
+        async with EventReceiver(args.host, args.port) as receiver:
+            if args.subscribe:
+                await asyncio.get_running_loop().run_in_executor(None, subscribe_fleet, receiver, args.subscribe, args.types)
+            print(f"Listening for events on {args.host}:{receiver.port}{receiver.base_path}/<camera>. Press Ctrl+C to stop.")
+            await print_events(receiver)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\nStopping...")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+Event Subscription
+==================
+
+A long-running pull subscription to a camera's smart events, so new
+events arrive as they happen instead of being found by re-running range
+searches. The client follows the SetSubscribe / GetPullMessages /
+SetRenew / SetUnSubscribe exchange of the protocol samples in
+"API Test Tool/protocol_long":
+
+1. SetSubscribe with the chosen smartTypes returns the subscription's
+   serverAddress;
+2. GetPullMessages long-polls that address: the camera answers as soon
+   as events are queued (at most messageLimit of them) or after timeout
+   seconds with none, and the next poll is sent at once;
+3. SetRenew extends the subscription before renewTime runs out;
+4. SetUnSubscribe ends it.
+
+Example:
+    with CameraClient(host, port, username, password) as client:
+        with PullSubscription(client, smart_types=['VEHICE', 'MOTION']) as subscription:
+            for message in subscription.messages():
+                print(message.smart_type, message.fields())
+"""
+
+import argparse
+import time
+from camera_client import CameraClient
+from device_snapshot import normalize_element
+from xml_accessor import XmlIndex
+
+# Every smartType of the protocol samples ("VEHICE" and "openAlramObj"
+# are the camera's spelling)
+SMART_TYPES = (
+    'MOTION', 'SENSOR', 'PEA', 'AVD', 'OSC', 'CPC', 'CDD', 'IPD', 'VFD',
+    'VFD_MATCH', 'VEHICE', 'AOIENTRY', 'AOILEAVE', 'PASSLINECOUNT', 'TRAFFIC'
+)
+SUBSCRIBE_RELATIONS = ('ALARM', 'FEATURE_RESULT', 'ALARM_FEATURE')
+SUBSCRIBE_FLAGS = ('BASE_SUBSCRIBE', 'REALTIME_SUBSCRIBE', 'STREAM_SUBSCRIBE')
+
+DEFAULT_PULL_TIMEOUT = 20
+DEFAULT_MESSAGE_LIMIT = 10
+DEFAULT_RENEW_TIME = 60
+# Seconds of slack between renewing and the subscription running out
+RENEW_MARGIN = 5
+
+class SubscriptionError(Exception):
+    """Raised when the camera rejects a subscription request"""
+
+def enum_block(name, values):
+    return f"<{name}>\n" + "".join(f"<enum>{value}</enum>\n" for value in values) + f"</{name}>\n"
+
+def types_block():
+    return ("<types>\n" + enum_block('openAlramObj', SMART_TYPES) + enum_block('subscribeRelation', SUBSCRIBE_RELATIONS)
+            + enum_block('subscribeTypes', SUBSCRIBE_FLAGS) + "</types>\n")
+
+def subscription_items(smart_types, relation):
+    return "".join(
+        f'<item>\n<smartType type="openAlramObj">{smart_type}</smartType>\n'
+        f'<subscribeRelation type="subscribeRelation">{relation}</subscribeRelation>\n</item>\n'
+        for smart_type in smart_types
+    )
+
+def server_address_element(server_address):
+    return f'<serverAddress type="string"><![CDATA[{server_address}]]></serverAddress>\n'
+
+def check_smart_types(smart_types, relation):
+    unknown = [smart_type for smart_type in smart_types if smart_type not in SMART_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown smart types: {', '.join(unknown)}")
+    if relation not in SUBSCRIBE_RELATIONS:
+        raise ValueError(f"Unknown subscribe relation: {relation}")
+
+def build_subscribe_body(smart_types=SMART_TYPES, relation='ALARM_FEATURE', flag='REALTIME_SUBSCRIBE', channel=0,
+                         init_term_time=0, server_address=None):
+    """Build the SetSubscribe body; server_address asks the camera to push to that URL"""
+    check_smart_types(smart_types, relation)
+    if flag not in SUBSCRIBE_FLAGS:
+        raise ValueError(f"Unknown subscribe flag: {flag}")
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n<config version="1.7" xmlns="http://www.ipc.com/ver10">\n'
+            + types_block()
+            + (server_address_element(server_address) if server_address else "")
+            + f'<channelID type="uint32">{int(channel)}</channelID>\n'
+            + f'<initTermTime type="uint32">{int(init_term_time)}</initTermTime>\n'
+            + f'<subscribeFlag type="subscribeTypes">{flag}</subscribeFlag>\n'
+            + f'<subscribeList type="list" count="{len(smart_types)}">\n'
+            + subscription_items(smart_types, relation)
+            + '</subscribeList>\n</config>')
+
+def build_pull_body(server_address, timeout=DEFAULT_PULL_TIMEOUT, message_limit=DEFAULT_MESSAGE_LIMIT):
+    """Build the GetPullMessages body"""
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n<config version="1.7" xmlns="http://www.ipc.com/ver10">\n'
+            + server_address_element(server_address)
+            + f'<timeout type="uint32">{int(timeout)}</timeout>\n'
+            + f'<messageLimit type="uint32">{int(message_limit)}</messageLimit>\n</config>')
+
+def build_renew_body(server_address, renew_time=DEFAULT_RENEW_TIME):
+    """Build the SetRenew body"""
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n<config version="1.7" xmlns="http://www.ipc.com/ver10">\n'
+            + server_address_element(server_address)
+            + f'<renewTime type="uint32">{int(renew_time)}</renewTime>\n</config>')
+
+def build_unsubscribe_body(server_address, smart_types=SMART_TYPES, relation='ALARM_FEATURE'):
+    """Build the SetUnSubscribe body"""
+    check_smart_types(smart_types, relation)
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n<config version="1.7" xmlns="http://www.ipc.com/ver10">\n'
+            + types_block()
+            + server_address_element(server_address)
+            + f'<unsubscribeList type="list" count="{len(smart_types)}">\n'
+            + subscription_items(smart_types, relation)
+            + '</unsubscribeList>\n</config>')
+
+def check_status(doc, action):
+    """Raise SubscriptionError for a status="failed" response"""
+    if doc.root.get('status') == 'failed':
+        raise SubscriptionError(f"{action} failed with error code: {doc.root.get('errorCode', 'unknown')}")
+
+def parse_subscribe_response(content):
+    """Parse a SetSubscribe response into {'server_address', 'termination_time'}"""
+    doc = XmlIndex(content)
+    root = doc.root
+    if root.get('status') == 'failed':
+        return False, f"Subscribe failed with error code: {root.get('errorCode', 'unknown')}"
+    server_address = doc.text(root, 'serverAddress')
+    if not server_address:
+        return False, "No serverAddress in subscribe response"
+    return True, {
+        'server_address': server_address.strip(),
+        'termination_time': doc.text(root, 'terminationTime'),
+    }
+
+def subscribe_push(client, server_address, smart_types=SMART_TYPES, relation='ALARM_FEATURE', flag='REALTIME_SUBSCRIBE',
+                   channel=0):
+    """Ask a camera to push events to server_address (e.g. an EventReceiver URL)"""
+    try:
+        body = build_subscribe_body(smart_types, relation, flag, channel, server_address=server_address)
+        response = client.post('SetSubscribe', data=body, timeout=10)
+        response.raise_for_status()
+        return parse_subscribe_response(response.content)
+    except Exception as e:
+        return False, f"Subscribe failed: {e}"
+
+class EventMessage:
+    """One event from a subscription: its smartType and the XML element carrying it"""
+    __slots__ = ('smart_type', 'relation', 'camera', 'received_at', 'element', '_doc')
+
+    def __init__(self, smart_type, relation, camera, received_at, element, doc=None):
+        self.smart_type = smart_type
+        self.relation = relation
+        self.camera = camera
+        self.received_at = received_at
+        self.element = element
+        self._doc = doc
+
+    @property
+    def doc(self):
+        """XmlIndex the element belongs to (built over the element if not given)"""
+        if self._doc is None:
+            self._doc = XmlIndex(root=self.element)
+        return self._doc
+
+    def text(self, tag, default=None):
+        """Text of the first field with the given tag"""
+        return self.doc.text(self.element, tag, default)
+
+    def fields(self):
+        """The whole event as plain JSON data"""
+        return normalize_element(self.element)
+
+    def __repr__(self):
+        return f"EventMessage({self.smart_type!r}, camera={self.camera!r})"
+
+def parse_messages(content, camera=None, received_at=None, classes=None):
+    """Split a GetPullMessages response or pushed payload into EventMessages
+
+    Every element with a smartType child is one event, wherever the
+    message list sits in the document, so pulled batches and single
+    pushed events are handled the same way. classes maps smart types to
+    EventMessage subclasses; when given, events of other types are skipped.
+    """
+    doc = XmlIndex(content)
+    root = doc.root
+    check_status(doc, "GetPullMessages")
+    received_at = time.time() if received_at is None else received_at
+    messages = []
+    for element in root.iter():
+        smart_types = doc.children(element, 'smartType') if len(element) else ()
+        smart_type = (smart_types[0].text or '').strip() if smart_types else None
+        if smart_type:
+            if classes is not None and smart_type not in classes:
+                continue
+            relations = doc.children(element, 'subscribeRelation')
+            relation = (relations[0].text or '').strip() if relations else None
+            event_class = EventMessage if classes is None else classes[smart_type]
+            messages.append(event_class(smart_type, relation, camera, received_at, element, doc))
+    return messages
+
+class PullSubscription:
+    """A pull-point subscription that renews itself while it is polled
+
+    The long poll waits up to timeout seconds, so renewal is checked
+    between polls and happens once less than timeout + RENEW_MARGIN
+    seconds of the subscription are left. parser turns each response
+    into messages (e.g. EventDemux.parse for typed events).
+    """
+
+    def __init__(self, client, smart_types=SMART_TYPES, relation='ALARM_FEATURE', flag='REALTIME_SUBSCRIBE', channel=0,
+                 timeout=DEFAULT_PULL_TIMEOUT, message_limit=DEFAULT_MESSAGE_LIMIT, renew_time=DEFAULT_RENEW_TIME,
+                 parser=parse_messages):
+        check_smart_types(smart_types, relation)
+        if renew_time <= timeout + RENEW_MARGIN:
+            raise ValueError(f"renew_time must exceed the pull timeout by more than {RENEW_MARGIN} seconds")
+        self.client = client
+        self.camera = f"{client.host}:{client.port}"
+        self.smart_types = list(smart_types)
+        self.relation = relation
+        self.flag = flag
+        self.channel = channel
+        self.timeout = timeout
+        self.message_limit = message_limit
+        self.renew_time = renew_time
+        self.parser = parser
+        self.server_address = None
+        self.expires_at = 0.0
+        self.stats = {'pulls': 0, 'messages': 0, 'renewals': 0, 'resubscribes': 0}
+
+    def _post(self, endpoint, body, timeout=None):
+        response = self.client.post(endpoint, data=body, timeout=timeout or self.timeout + 10)
+        response.raise_for_status()
+        return response.content
+
+    def subscribe(self):
+        """Open the subscription; returns the serverAddress the camera assigned"""
+        body = build_subscribe_body(self.smart_types, self.relation, self.flag, self.channel)
+        success, result = parse_subscribe_response(self._post('SetSubscribe', body))
+        if not success:
+            raise SubscriptionError(result)
+        self.server_address = result['server_address']
+        self.expires_at = time.monotonic() + self.renew_time
+        return self.server_address
+
+    def renew(self):
+        """Extend the subscription by renew_time seconds"""
+        check_status(XmlIndex(self._post('SetRenew', build_renew_body(self.server_address, self.renew_time))), "Renew")
+        self.expires_at = time.monotonic() + self.renew_time
+        self.stats['renewals'] += 1
+
+    def pull(self):
+        """Long-poll once; returns the EventMessages received (possibly none)"""
+        if self.server_address is None:
+            self.subscribe()
+        elif time.monotonic() >= self.expires_at - self.timeout - RENEW_MARGIN:
+            self.renew()
+        content = self._post('GetPullMessages', build_pull_body(self.server_address, self.timeout, self.message_limit))
+        messages = self.parser(content, self.camera)
+        self.stats['pulls'] += 1
+        self.stats['messages'] += len(messages)
+        return messages
+
+    def messages(self, stop=None, retry_delay=1.0, max_retry_delay=30.0):
+        """Yield events as they arrive until stop (a threading.Event) is set
+
+        Errors (camera reboot, expired subscription, network loss) drop the
+        subscription and subscribe again, backing off up to max_retry_delay.
+        """
+        delay = retry_delay
+        while stop is None or not stop.is_set():
+            try:
+                messages = self.pull()
+            except Exception as e:
+                print(f"Warning: Subscription to {self.camera} failed: {e}; resubscribing in {delay:.0f}s")
+                self.server_address = None
+                self.stats['resubscribes'] += 1
+                if stop is not None:
+                    stop.wait(delay)
+                else:
+                    time.sleep(delay)
+                delay = min(delay * 2, max_retry_delay)
+                continue
+            delay = retry_delay
+            yield from messages
+
+    def unsubscribe(self):
+        """End the subscription; errors are ignored since it expires anyway"""
+        if self.server_address is None:
+            return
+        try:
+            body = build_unsubscribe_body(self.server_address, self.smart_types, self.relation)
+            check_status(XmlIndex(self._post('SetUnSubscribe', body, timeout=10)), "Unsubscribe")
+        except Exception as e:
+            print(f"Warning: Unsubscribe from {self.camera} failed: {e}")
+        finally:
+            self.server_address = None
+
+    def __enter__(self):
+        self.subscribe()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.unsubscribe()
+
+def main():
+    from fleet import prompt_for_camera
+
+    parser = argparse.ArgumentParser(description="Print a camera's smart events as they happen")
+    parser.add_argument('--types', nargs='+', default=list(SMART_TYPES), choices=SMART_TYPES, metavar='TYPE')
+    parser.add_argument('--relation', default='ALARM_FEATURE', choices=SUBSCRIBE_RELATIONS)
+    parser.add_argument('--timeout', type=int, default=DEFAULT_PULL_TIMEOUT)
+    args = parser.parse_args()
+
+    host, port, username, password = prompt_for_camera()
+    with CameraClient(host, port, username, password) as client:
+        with PullSubscription(client, args.types, args.relation, timeout=args.timeout) as subscription:
+            print(f"Subscribed to {', '.join(args.types)} on {host}:{port}. Press Ctrl+C to stop.")
+            try:
+                for message in subscription.messages():
+                    stamp = time.strftime('%H:%M:%S', time.localtime(message.received_at))
+                    print(f"[{stamp}] {message.smart_type}: {message.fields()}")
+            except KeyboardInterrupt:
+                print("\nStopping...")
+
+if __name__ == "__main__":
+    main()
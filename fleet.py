@@ -0,0 +1,236 @@
+"""
+Camera Fleet
+============
+
+A registry of every camera we run, loaded from a JSON file, and a fleet
+executor that runs one operation against many cameras at once with a
+bound on how many run in parallel.
+
+fleet.json (see fleet.example.json):
+
+    {
+        "defaults": {"port": 80, "username": "admin", "password": "admin"},
+        "cameras": [
+            {"name": "gate-1", "host": "192.168.60.254", "role": "anpr", "tags": ["entrance"]},
+            {"name": "gate-2", "host": "192.168.60.253", "role": "anpr", "tags": ["exit"]}
+        ]
+    }
+
+Example:
+    fleet = Fleet.load()
+    results = fleet.search_vehicles_by_time(start_time, end_time, role="anpr")
+    for name, (success, result) in results.items():
+        ...
+
+The registry path defaults to fleet.json and can be set with the
+CAMERA_FLEET environment variable.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_FLEET_FILE = "fleet.json"
+# Offered by prompt_for_camera when there is no registry yet
+EXAMPLE_FLEET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fleet.example.json")
+DEFAULT_MAX_WORKERS = 8
+
+class FleetError(Exception):
+    """Raised when the fleet registry is missing or malformed"""
+
+class Camera:
+    """One registry entry: where a camera is, how to log in and what it does"""
+    __slots__ = ('name', 'host', 'port', 'username', 'password', 'role', 'tags')
+
+    def __init__(self, name, host, port=80, username="admin", password="admin", role="", tags=()):
+        self.name = name
+        self.host = host
+        self.port = int(port)
+        self.username = username
+        self.password = password
+        self.role = role
+        self.tags = frozenset(tags)
+
+    @classmethod
+    def from_dict(cls, entry, defaults=None):
+        """Build a camera from a registry entry, filling gaps from defaults"""
+        fields = dict(defaults or {})
+        fields.update(entry)
+        if not fields.get('host'):
+            raise FleetError(f"Camera entry without a host: {entry}")
+        fields.setdefault('name', f"{fields['host']}:{fields.get('port', 80)}")
+        unknown = set(fields) - set(cls.__slots__)
+        if unknown:
+            raise FleetError(f"Unknown camera fields for {fields['name']}: {', '.join(sorted(unknown))}")
+        return cls(**fields)
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    @property
+    def credentials(self):
+        """(host, port, username, password), as taken by the API clients"""
+        return self.host, self.port, self.username, self.password
+
+    def matches(self, role=None, tags=()):
+        """True if the camera has the role (when given) and every tag"""
+        if role is not None and self.role != role:
+            return False
+        return self.tags.issuperset(tags)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'host': self.host,
+            'port': self.port,
+            'username': self.username,
+            'password': self.password,
+            'role': self.role,
+            'tags': sorted(self.tags)
+        }
+
+    def __repr__(self):
+        return f"Camera(name={self.name!r}, address={self.address!r}, role={self.role!r})"
+
+class Fleet:
+    """An ordered set of cameras with a concurrent executor"""
+
+    def __init__(self, cameras=(), max_workers=DEFAULT_MAX_WORKERS):
+        self.cameras = list(cameras)
+        self.max_workers = max_workers
+        names = [camera.name for camera in self.cameras]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise FleetError(f"Duplicate camera names: {', '.join(duplicates)}")
+
+    @classmethod
+    def load(cls, path=None, max_workers=None):
+        """Load the registry from path, $CAMERA_FLEET or fleet.json"""
+        path = path or os.environ.get('CAMERA_FLEET') or DEFAULT_FLEET_FILE
+        try:
+            with open(path, encoding='utf-8') as f:
+                registry = json.load(f)
+        except OSError as e:
+            raise FleetError(f"Cannot read fleet registry {path}: {e}") from e
+        except ValueError as e:
+            raise FleetError(f"Invalid fleet registry {path}: {e}") from e
+        return cls.from_dict(registry, max_workers)
+
+    @classmethod
+    def from_dict(cls, registry, max_workers=None):
+        defaults = registry.get('defaults', {})
+        cameras = [Camera.from_dict(entry, defaults) for entry in registry.get('cameras', [])]
+        return cls(cameras, max_workers or registry.get('max_workers', DEFAULT_MAX_WORKERS))
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'max_workers': self.max_workers, 'cameras': [camera.to_dict() for camera in self.cameras]}, f, indent=4)
+
+    def __len__(self):
+        return len(self.cameras)
+
+    def __iter__(self):
+        return iter(self.cameras)
+
+    def get(self, name):
+        """Camera by name, or None"""
+        for camera in self.cameras:
+            if camera.name == name:
+                return camera
+        return None
+
+    def select(self, role=None, tags=()):
+        """A sub-fleet of the cameras with the given role and tags"""
+        return Fleet([camera for camera in self.cameras if camera.matches(role, tags)], self.max_workers)
+
+    def run(self, operation, *args, role=None, tags=(), max_workers=None, **kwargs):
+        """Run operation(camera, *args, **kwargs) on every selected camera concurrently
+
+        Returns {camera name: (success, result)} in registry order. An
+        operation that returns a (success, result) tuple is passed through;
+        any other return value counts as success and an exception as
+        failure, so one unreachable camera does not stop the rest.
+        """
+        cameras = [camera for camera in self.cameras if camera.matches(role, tags)]
+        if not cameras:
+            return {}
+
+        def call(camera):
+            try:
+                result = operation(camera, *args, **kwargs)
+            except Exception as e:
+                return False, f"{camera.name} ({camera.address}): {e}"
+            if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], bool):
+                return result
+            return True, result
+
+        workers = min(max_workers or self.max_workers, len(cameras))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(call, cameras))
+        return {camera.name: result for camera, result in zip(cameras, results)}
+
+    def vehicle_systems(self, role=None, tags=(), cache=None):
+        """{camera name: VehicleRecognition} for the selected cameras; close them when done"""
+        from vehicle_recognition import VehicleRecognition
+        return {
+            camera.name: VehicleRecognition(*camera.credentials, cache=cache)
+            for camera in self.cameras if camera.matches(role, tags)
+        }
+
+    def search_vehicles_by_time(self, start_time, end_time, vehicle_plate="", list_type="", role=None, tags=(), cache=None):
+        """Search every selected camera at once; returns {camera name: (success, result)}"""
+        from vehicle_recognition import VehicleRecognition
+
+        def search(camera):
+            with VehicleRecognition(*camera.credentials, cache=cache) as system:
+                return system.search_vehicles_by_time(start_time, end_time, vehicle_plate, list_type)
+
+        return self.run(search, role=role, tags=tags)
+
+def load_fleet(path=None):
+    """Load the registry, or return an empty fleet if there is none"""
+    try:
+        return Fleet.load(path)
+    except FleetError as e:
+        if os.path.exists(path or os.environ.get('CAMERA_FLEET') or DEFAULT_FLEET_FILE):
+            print(f"Warning: {e}")
+        return Fleet()
+
+def prompt_for_camera(fleet=None):
+    """Let the user pick a registry camera or enter a custom address
+
+    Returns (host, port, username, password). Registry cameras use their
+    stored credentials; a custom address prompts for them. Without a
+    registry the cameras of fleet.example.json are offered.
+    """
+    if fleet is None:
+        fleet = load_fleet()
+        if not fleet and os.path.exists(EXAMPLE_FLEET_FILE):
+            fleet = load_fleet(EXAMPLE_FLEET_FILE)
+
+    print("Available cameras:")
+    for i, camera in enumerate(fleet, 1):
+        details = ", ".join(filter(None, [camera.role] + sorted(camera.tags)))
+        print(f"{i}. {camera.name} - {camera.address}" + (f" ({details})" if details else ""))
+    custom = len(fleet) + 1
+    print(f"{custom}. Custom IP address")
+
+    while True:
+        choice = input(f"\nSelect camera (1-{custom}): ").strip()
+        if choice.isdigit() and 1 <= int(choice) < custom:
+            return fleet.cameras[int(choice) - 1].credentials
+        elif choice == str(custom):
+            host = input("Enter custom IP address: ").strip()
+            if host:
+                break
+            else:
+                print("Invalid IP address. Please try again.")
+        else:
+            print(f"Invalid choice. Please enter a number from 1 to {custom}.")
+
+    # Get other configuration
+    port = input("Enter port (default 80): ").strip() or "80"
+    username = input("Enter username (default admin): ").strip() or "admin"
+    password = input("Enter password (default admin): ").strip() or "admin"
+    return host, int(port), username, password
@@ -1,9 +1,14 @@
 import requests
-import base64
-import xml.etree.ElementTree as ET
+import xml_backend
 import os
 import datetime
 import time
+from camera_client import CameraClient
+from fleet import prompt_for_camera
+from capability_cache import CapabilityCache, device_identity, types_block
+from endpoint_support import EndpointSupport
+from device_snapshot import collect_snapshot, default_snapshot_filename, fetch_section, print_snapshot_summary, save_snapshot
+from xml_accessor import XmlIndex
 
 # Import vehicle recognition module
 try:
@@ -15,33 +20,8 @@ except ImportError:
 # Configuration - User will input IP address
 def get_device_config():
     print("=== IP Camera Device Information Tool ===")
-    print("\nAvailable cameras:")
-    print("1. Camera 1 - 192.168.60.254")
-    print("2. Camera 2 - 192.168.60.253")
-    print("3. Custom IP address")
-    
-    while True:
-        choice = input("\nSelect camera (1-3): ").strip()
-        
-        if choice == "1":
-            host = "192.168.60.254"
-            break
-        elif choice == "2":
-            host = "192.168.60.253"
-            break
-        elif choice == "3":
-            host = input("Enter custom IP address: ").strip()
-            if host:
-                break
-            else:
-                print("Invalid IP address. Please try again.")
-        else:
-            print("Invalid choice. Please enter 1, 2, or 3.")
-    
-    # Get other configuration
-    port = input("Enter port (default 80): ").strip() or "80"
-    username = input("Enter username (default admin): ").strip() or "admin"
-    password = input("Enter password (default admin): ").strip() or "admin"
+    print()
+    host, port, username, password = prompt_for_camera()
     
     print(f"\nConnecting to: {host}:{port}")
     print(f"Username: {username}")
@@ -52,50 +32,69 @@ def get_device_config():
 # Get device configuration from user
 HOST, PORT, USERNAME, PASSWORD = get_device_config()
 
-# Build URLs
-url_device = f"http://{HOST}:{PORT}/GetDeviceInfo"
-url_disk = f"http://{HOST}:{PORT}/GetDiskInfo"
-url_detail = f"http://{HOST}:{PORT}/GetDeviceDetail"
-url_time = f"http://{HOST}:{PORT}/GetDateAndTime"
-url_stream = f"http://{HOST}:{PORT}/GetStreamCaps"
-url_image = f"http://{HOST}:{PORT}/GetImageConfig"
-url_privacy_mask = f"http://{HOST}:{PORT}/GetPrivacyMaskConfig"
-url_ptz_caps = f"http://{HOST}:{PORT}/PtzGetCaps"
-url_ptz_control = f"http://{HOST}:{PORT}/PtzControl"
-url_motion = f"http://{HOST}:{PORT}/GetMotionConfig"
-url_alarm_trigger = f"http://{HOST}:{PORT}/GetAlarmTriggerConfig"
-url_net_basic = f"http://{HOST}:{PORT}/GetNetBasicConfig"
-url_reboot = f"http://{HOST}:{PORT}/Reboot"
-url_vfd = f"http://{HOST}:{PORT}/GetSmartVfdConfig"
-url_perimeter = f"http://{HOST}:{PORT}/GetSmartPerimeterConfig"
-url_vehicle = f"http://{HOST}:{PORT}/GetSmartVehicleConfig"
-url_vehicle_plate = f"http://{HOST}:{PORT}/GetVehiclePlate"
-url_cdd = f"http://{HOST}:{PORT}/GetSmartCddConfig"
-url_cpc = f"http://{HOST}:{PORT}/GetSmartCpcConfig"
-url_subscription = f"http://{HOST}:{PORT}/GetSubscriptionConfig"
-url_vehicle_plate_progress = f"http://{HOST}:{PORT}/GetVehiclePlateProgress"
-url_add_vehicle_plate = f"http://{HOST}:{PORT}/AddVehiclePlate"
-
-# Prepare headers
-auth_str = f"{USERNAME}:{PASSWORD}"
-auth_bytes = auth_str.encode('ascii')
-base64_auth = base64.b64encode(auth_bytes).decode('ascii')
-headers = {
-    'Connection': 'Keep-Alive',
-    'Content-Type': 'application/xml; charset=UTF-8',
-    'Accept': 'application/xml; charset=UTF-8',
-    'Authorization': f'Basic {base64_auth}',
-    'User-Agent': 'Mozilla/5.0'
-}
+# Pooled HTTP client for the selected camera
+client = CameraClient(HOST, PORT, USERNAME, PASSWORD)
+
+# Static capabilities per model and firmware, shared across sessions
+capabilities = CapabilityCache()
+
+# Endpoints each model rejects, skipped in later snapshots
+endpoint_support = EndpointSupport()
+
+# (model, firmware) of the camera, read once per session
+camera_identity = None
+
+def get_camera_identity():
+    """Model and firmware from GetDeviceInfo, or None if unknown"""
+    global camera_identity
+    if camera_identity is None:
+        entry = fetch_section(client, 'GetDeviceInfo', ())
+        if entry['status'] == 'ok':
+            camera_identity = device_identity(entry['data'])
+            if camera_identity is not None:
+                capabilities.identify(f"{HOST}:{PORT}", *camera_identity)
+    return camera_identity
+
+def get_capabilities(endpoint, *path):
+    """A normalized capability document and its <types> block
+
+    Served from the capability cache when this model and firmware were seen
+    before; otherwise requested and cached.
+    """
+    identity = get_camera_identity()
+    if identity is not None:
+        known = capabilities.get(*identity)
+        if known is not None and endpoint in known['sections']:
+            return known['sections'][endpoint], known['types'].get(endpoint) or {}
+
+    entry = fetch_section(client, endpoint, path)
+    if entry['status'] != 'ok':
+        raise Exception(entry.get('error') or f"{endpoint} failed (HTTP {entry['http_status']}, "
+                                               f"error code {entry['error_code']})")
+    data = entry['data'] if isinstance(entry['data'], dict) else {}
+    types = types_block(data) or {}
+    if identity is not None:
+        capabilities.update(*identity, {endpoint: data}, {endpoint: types} if types else None)
+    return data, types
+
+def as_list(value):
+    """A normalized node that may be a single value or a list, as a list"""
+    if value is None or value == '':
+        return []
+    return value if isinstance(value, list) else [value]
+
+def node_text(value):
+    """Text of a normalized leaf, with or without attributes"""
+    return value.get('#text', '') if isinstance(value, dict) else value
 
 def print_device_info():
     print("\n--- Device Info ---")
     try:
-        response = requests.post(url_device, headers=headers)
+        response = client.post('GetDeviceInfo')
         response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
-        device_info = root.find('.//ipc:deviceInfo', ns) if ns else root.find('.//deviceInfo')
+        doc = XmlIndex(response.content)
+        root = doc.root
+        device_info = doc.find(root, 'deviceInfo')
         device_description = None
         if device_info is None:
             print("Device info not found in response.")
@@ -116,17 +115,17 @@ def print_device_info():
 def print_disk_info():
     print("\n--- Disk Info ---")
     try:
-        response = requests.post(url_disk, headers=headers)
+        response = client.post('GetDiskInfo')
         response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
-        disk_info = root.find('.//ipc:diskInfo', ns) if ns else root.find('.//diskInfo')
+        doc = XmlIndex(response.content)
+        root = doc.root
+        disk_info = doc.find(root, 'diskInfo')
         if disk_info is None:
             print("Disk info not found in response.")
             print("Raw XML response:")
             print(response.content.decode(errors='replace'))
         else:
-            items = disk_info.findall('ipc:item', ns) if ns else disk_info.findall('item')
+            items = doc.children(disk_info, 'item')
             if not items:
                 print("No disk found on device.")
             for item in items:
@@ -141,13 +140,13 @@ def print_disk_info():
 def print_device_detail():
     print("\n--- Device Detail ---")
     try:
-        response = requests.post(url_detail, headers=headers)
+        response = client.post('GetDeviceDetail')
         response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
         
         # Find the detail section
-        detail = root.find('.//ipc:detail', ns) if ns else root.find('.//detail')
+        detail = doc.find(root, 'detail')
         if detail is None:
             print("Device detail not found in response.")
             print("Raw XML response:")
@@ -155,7 +154,7 @@ def print_device_detail():
             return
 
         # Process property section
-        property_section = detail.find('.//ipc:property', ns) if ns else detail.find('.//property')
+        property_section = doc.find(detail, 'property')
         if property_section is not None:
             print("\nDevice Properties:")
             for prop in property_section:
@@ -165,7 +164,7 @@ def print_device_detail():
                 print(f"  {prop_name} ({prop_type}): {prop_value}")
 
         # Process smart features
-        smart_section = detail.find('.//ipc:smart', ns) if ns else detail.find('.//smart')
+        smart_section = doc.find(detail, 'smart')
         if smart_section is not None:
             print("\nSmart Features:")
             for feature in smart_section:
@@ -174,7 +173,7 @@ def print_device_detail():
                 print(f"  {feature_name}: {feature_value}")
 
         # Process image features
-        image_section = detail.find('.//ipc:image', ns) if ns else detail.find('.//image')
+        image_section = doc.find(detail, 'image')
         if image_section is not None:
             print("\nImage Features:")
             for feature in image_section:
@@ -183,7 +182,7 @@ def print_device_detail():
                 print(f"  {feature_name}: {feature_value}")
 
         # Process alarm features
-        alarm_section = detail.find('.//ipc:alarm', ns) if ns else detail.find('.//alarm')
+        alarm_section = doc.find(detail, 'alarm')
         if alarm_section is not None:
             print("\nAlarm Features:")
             for feature in alarm_section:
@@ -192,7 +191,7 @@ def print_device_detail():
                 print(f"  {feature_name}: {feature_value}")
 
         # Process system features
-        system_section = detail.find('.//ipc:system', ns) if ns else detail.find('.//system')
+        system_section = doc.find(detail, 'system')
         if system_section is not None:
             print("\nSystem Features:")
             for feature in system_section:
@@ -208,13 +207,13 @@ def print_device_detail():
 def print_date_time():
     print("\n--- Date and Time Information ---")
     try:
-        response = requests.post(url_time, headers=headers)
+        response = client.post('GetDateAndTime')
         response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
         
         # Find the time section
-        time_section = root.find('.//ipc:time', ns) if ns else root.find('.//time')
+        time_section = doc.find(root, 'time')
         if time_section is None:
             print("Time information not found in response.")
             print("Raw XML response:")
@@ -222,11 +221,11 @@ def print_date_time():
             return
 
         # Process timezone information
-        timezone_info = time_section.find('.//ipc:timezoneInfo', ns) if ns else time_section.find('.//timezoneInfo')
+        timezone_info = doc.find(time_section, 'timezoneInfo')
         if timezone_info is not None:
             print("\nTimezone Information:")
-            timezone = timezone_info.find('.//ipc:timeZone', ns) if ns else timezone_info.find('.//timeZone')
-            daylight_switch = timezone_info.find('.//ipc:daylightSwitch', ns) if ns else timezone_info.find('.//daylightSwitch')
+            timezone = doc.find(timezone_info, 'timeZone')
+            daylight_switch = doc.find(timezone_info, 'daylightSwitch')
             
             if timezone is not None:
                 timezone_value = timezone.text.strip() if timezone.text else ''
@@ -244,12 +243,12 @@ def print_date_time():
                 print(f"  Daylight Saving Enabled: {daylight_value}")
 
         # Process synchronization information
-        sync_info = time_section.find('.//ipc:synchronizeInfo', ns) if ns else time_section.find('.//synchronizeInfo')
+        sync_info = doc.find(time_section, 'synchronizeInfo')
         if sync_info is not None:
             print("\nSynchronization Information:")
-            sync_type = sync_info.find('.//ipc:type', ns) if ns else sync_info.find('.//type')
-            ntp_server = sync_info.find('.//ipc:ntpServer', ns) if ns else sync_info.find('.//ntpServer')
-            current_time = sync_info.find('.//ipc:currentTime', ns) if ns else sync_info.find('.//currentTime')
+            sync_type = doc.find(sync_info, 'type')
+            ntp_server = doc.find(sync_info, 'ntpServer')
+            current_time = doc.find(sync_info, 'currentTime')
             
             if sync_type is not None:
                 sync_value = sync_type.text.strip() if sync_type.text else ''
@@ -271,80 +270,74 @@ def print_date_time():
 def print_stream_caps():
     print("\n--- Stream Capabilities ---")
     try:
-        response = requests.post(url_stream, headers=headers)
-        response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        caps, types = get_capabilities('GetStreamCaps')
         
         # Get RTSP port
-        rtsp_port = root.find('.//ipc:rtspPort', ns) if ns else root.find('.//rtspPort')
-        if rtsp_port is not None:
-            print(f"RTSP Port: {rtsp_port.text}")
+        rtsp_port = caps.get('rtspPort')
+        if rtsp_port:
+            print(f"RTSP Port: {rtsp_port}")
 
         # Get stream list
-        stream_list = root.find('.//ipc:streamList', ns) if ns else root.find('.//streamList')
+        stream_list = caps.get('streamList')
         if stream_list is None:
             print("Stream capabilities not found in response.")
-            print("Raw XML response:")
-            print(response.content.decode(errors='replace'))
             return
 
         # Get available resolutions
-        resolutions = root.findall('.//ipc:resolution/ipc:enum', ns) if ns else root.findall('.//resolution/enum')
+        resolutions = as_list((types.get('resolution') or {}).get('enum'))
         if resolutions:
             print("\nAvailable Resolutions:")
             for res in resolutions:
-                print(f"  - {res.text}")
+                print(f"  - {res}")
 
         # Get available encode types
-        encode_types = root.findall('.//ipc:encodeType/ipc:enum', ns) if ns else root.findall('.//encodeType/enum')
+        encode_types = as_list((types.get('encodeType') or {}).get('enum'))
         if encode_types:
             print("\nAvailable Encode Types:")
             for enc in encode_types:
-                print(f"  - {enc.text}")
+                print(f"  - {enc}")
 
         # Get available encode levels
-        encode_levels = root.findall('.//ipc:encodeLevel/ipc:enum', ns) if ns else root.findall('.//encodeLevel/enum')
+        encode_levels = as_list((types.get('encodeLevel') or {}).get('enum'))
         if encode_levels:
             print("\nAvailable Encode Levels:")
             for level in encode_levels:
-                print(f"  - {level.text}")
+                print(f"  - {level}")
 
         # Process each stream
-        streams = stream_list.findall('ipc:item', ns) if ns else stream_list.findall('item')
+        streams = as_list(stream_list.get('item')) if isinstance(stream_list, dict) else []
         if streams:
             print("\nStream Profiles:")
             for stream in streams:
-                stream_id = stream.get('id', 'unknown')
-                stream_name = stream.find('.//ipc:streamName', ns) if ns else stream.find('.//streamName')
-                stream_name = stream_name.text if stream_name is not None else 'unknown'
+                stream_id = stream.get('@id', 'unknown')
+                stream_name = stream.get('streamName') or 'unknown'
                 
                 print(f"\nStream {stream_id} ({stream_name}):")
                 
                 # Get resolution capabilities
-                res_caps = stream.find('.//ipc:resolutionCaps', ns) if ns else stream.find('.//resolutionCaps')
-                if res_caps is not None:
+                res_caps = stream.get('resolutionCaps')
+                if isinstance(res_caps, dict):
                     print("  Resolution Capabilities:")
-                    for res in res_caps.findall('ipc:item', ns) if ns else res_caps.findall('item'):
-                        max_fps = res.get('maxFrameRate', 'N/A')
-                        print(f"    - {res.text} (Max FPS: {max_fps})")
+                    for res in as_list(res_caps.get('item')):
+                        max_fps = res.get('@maxFrameRate', 'N/A') if isinstance(res, dict) else 'N/A'
+                        print(f"    - {node_text(res)} (Max FPS: {max_fps})")
 
                 # Get encode type capabilities
-                enc_caps = stream.find('.//ipc:encodeTypeCaps', ns) if ns else stream.find('.//encodeTypeCaps')
-                if enc_caps is not None:
+                enc_caps = stream.get('encodeTypeCaps')
+                if isinstance(enc_caps, dict):
                     print("  Encode Type Capabilities:")
-                    for enc in enc_caps.findall('ipc:item', ns) if ns else enc_caps.findall('item'):
-                        print(f"    - {enc.text}")
+                    for enc in as_list(enc_caps.get('item')):
+                        print(f"    - {node_text(enc)}")
 
                 # Get encode level capabilities
-                level_caps = stream.find('.//ipc:encodeLevelCaps', ns) if ns else stream.find('.//encodeLevelCaps')
-                if level_caps is not None:
+                level_caps = stream.get('encodeLevelCaps')
+                if isinstance(level_caps, dict):
                     print("  Encode Level Capabilities:")
-                    for level in level_caps.findall('ipc:item', ns) if ns else level_caps.findall('item'):
-                        print(f"    - {level.text}")
+                    for level in as_list(level_caps.get('item')):
+                        print(f"    - {node_text(level)}")
 
                 # Print RTSP URL format
-                print(f"  RTSP URL Format: rtsp://{HOST}:{rtsp_port.text}/{stream_name}")
+                print(f"  RTSP URL Format: rtsp://{HOST}:{rtsp_port}/{stream_name}")
 
     except Exception as e:
         print(f"Error: {e}")
@@ -354,39 +347,39 @@ def print_stream_caps():
 def print_image_config():
     print("\n--- Image Configuration ---")
     try:
-        response = requests.post(url_image, headers=headers)
+        response = client.post('GetImageConfig')
         response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
         
         # Get available types
-        types = root.find('.//ipc:types', ns) if ns else root.find('.//types')
+        types = doc.find(root, 'types')
         if types is not None:
             print("\nAvailable Types:")
             
             # Frequency options
-            frequencies = types.findall('.//ipc:frequency/ipc:enum', ns) if ns else types.findall('.//frequency/enum')
+            frequencies = doc.findall(types, 'frequency/enum')
             if frequencies:
                 print("\nFrequency Options:")
                 for freq in frequencies:
                     print(f"  - {freq.text}")
             
             # White balance modes
-            wb_modes = types.findall('.//ipc:whitebalanceMode/ipc:enum', ns) if ns else types.findall('.//whitebalanceMode/enum')
+            wb_modes = doc.findall(types, 'whitebalanceMode/enum')
             if wb_modes:
                 print("\nWhite Balance Modes:")
                 for mode in wb_modes:
                     print(f"  - {mode.text}")
             
             # IR Cut modes
-            ircut_modes = types.findall('.//ipc:IRCutMode/ipc:enum', ns) if ns else types.findall('.//IRCutMode/enum')
+            ircut_modes = doc.findall(types, 'IRCutMode/enum')
             if ircut_modes:
                 print("\nIR Cut Modes:")
                 for mode in ircut_modes:
                     print(f"  - {mode.text}")
 
         # Get current image settings
-        image = root.find('.//ipc:image', ns) if ns else root.find('.//image')
+        image = doc.find(root, 'image')
         if image is None:
             print("Image configuration not found in response.")
             print("Raw XML response:")
@@ -399,30 +392,30 @@ def print_image_config():
         basic_settings = ['frequency', 'bright', 'contrast', 'hue', 'saturation', 
                          'mirrorSwitch', 'flipSwitch', 'irisSwitch', 'IRCutMode']
         for setting in basic_settings:
-            elem = image.find(f'.//ipc:{setting}', ns) if ns else image.find(f'.//{setting}')
+            elem = doc.find(image, setting)
             if elem is not None:
                 value = elem.text.strip() if elem.text else ''
                 default = elem.get('default', 'N/A')
                 print(f"  {setting}: {value} (Default: {default})")
 
         # WDR settings
-        wdr = image.find('.//ipc:WDR', ns) if ns else image.find('.//WDR')
+        wdr = doc.find(image, 'WDR')
         if wdr is not None:
             print("\nWDR Settings:")
-            switch = wdr.find('.//ipc:switch', ns) if ns else wdr.find('.//switch')
-            value = wdr.find('.//ipc:value', ns) if ns else wdr.find('.//value')
+            switch = doc.find(wdr, 'switch')
+            value = doc.find(wdr, 'value')
             if switch is not None:
                 print(f"  Switch: {switch.text} (Default: {switch.get('default', 'N/A')})")
             if value is not None:
                 print(f"  Value: {value.text} (Default: {value.get('default', 'N/A')})")
 
         # White Balance settings
-        wb = image.find('.//ipc:whiteBalance', ns) if ns else image.find('.//whiteBalance')
+        wb = doc.find(image, 'whiteBalance')
         if wb is not None:
             print("\nWhite Balance Settings:")
-            mode = wb.find('.//ipc:mode', ns) if ns else wb.find('.//mode')
-            red = wb.find('.//ipc:red', ns) if ns else wb.find('.//red')
-            blue = wb.find('.//ipc:blue', ns) if ns else wb.find('.//blue')
+            mode = doc.find(wb, 'mode')
+            red = doc.find(wb, 'red')
+            blue = doc.find(wb, 'blue')
             if mode is not None:
                 print(f"  Mode: {mode.text} (Default: {mode.get('default', 'N/A')})")
             if red is not None:
@@ -431,33 +424,33 @@ def print_image_config():
                 print(f"  Blue: {blue.text} (Default: {blue.get('default', 'N/A')})")
 
         # Denoise settings
-        denoise = image.find('.//ipc:denoise', ns) if ns else image.find('.//denoise')
+        denoise = doc.find(image, 'denoise')
         if denoise is not None:
             print("\nDenoise Settings:")
-            switch = denoise.find('.//ipc:switch', ns) if ns else denoise.find('.//switch')
-            value = denoise.find('.//ipc:value', ns) if ns else denoise.find('.//value')
+            switch = doc.find(denoise, 'switch')
+            value = doc.find(denoise, 'value')
             if switch is not None:
                 print(f"  Switch: {switch.text} (Default: {switch.get('default', 'N/A')})")
             if value is not None:
                 print(f"  Value: {value.text} (Default: {value.get('default', 'N/A')})")
 
         # Sharpen settings
-        sharpen = image.find('.//ipc:sharpen', ns) if ns else image.find('.//sharpen')
+        sharpen = doc.find(image, 'sharpen')
         if sharpen is not None:
             print("\nSharpen Settings:")
-            switch = sharpen.find('.//ipc:switch', ns) if ns else sharpen.find('.//switch')
-            value = sharpen.find('.//ipc:value', ns) if ns else sharpen.find('.//value')
+            switch = doc.find(sharpen, 'switch')
+            value = doc.find(sharpen, 'value')
             if switch is not None:
                 print(f"  Switch: {switch.text} (Default: {switch.get('default', 'N/A')})")
             if value is not None:
                 print(f"  Value: {value.text} (Default: {value.get('default', 'N/A')})")
 
         # Back Light Adjust settings
-        backlight = image.find('.//ipc:backLightAdjust', ns) if ns else image.find('.//backLightAdjust')
+        backlight = doc.find(image, 'backLightAdjust')
         if backlight is not None:
             print("\nBack Light Adjust Settings:")
-            switch = backlight.find('.//ipc:switch', ns) if ns else backlight.find('.//switch')
-            value = backlight.find('.//ipc:value', ns) if ns else backlight.find('.//value')
+            switch = doc.find(backlight, 'switch')
+            value = doc.find(backlight, 'value')
             if switch is not None:
                 print(f"  Switch: {switch.text} (Default: {switch.get('default', 'N/A')})")
             if value is not None:
@@ -474,8 +467,7 @@ def print_snapshot():
         channel_id = input("Enter channel ID (default 1): ").strip()
         if not channel_id:
             channel_id = "1"
-        url = f"http://{HOST}:{PORT}/GetSnapshot/{channel_id}" if channel_id else f"http://{HOST}:{PORT}/GetSnapshot"
-        response = requests.post(url, headers=headers)
+        response = client.post('GetSnapshot', channel_id)
         response.raise_for_status()
         # Save the image
         now = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -501,9 +493,8 @@ def print_snapshot_by_time():
         length = input("Enter length in seconds (default 10): ").strip()
         if not length:
             length = "10"
-        url = f"http://{HOST}:{PORT}/GetSnapshotByTime/{channel_id}" if channel_id else f"http://{HOST}:{PORT}/GetSnapshotByTime"
         xml_body = f'''<?xml version="1.0" encoding="UTF-8"?>\n<config version="1.0" xmlns="http://www.ipc.com/ver10">\n  <search>\n    <time type="string"><![CDATA[{time_str}]]></time>\n    <length type="uint16">{length}</length>\n  </search>\n</config>'''
-        response = requests.post(url, headers=headers, data=xml_body.encode('utf-8'))
+        response = client.post('GetSnapshotByTime', channel_id, data=xml_body)
         response.raise_for_status()
         # Determine file extension from Content-Type
         content_type = response.headers.get('Content-Type', '').lower()
@@ -532,54 +523,53 @@ def print_video_stream_config():
         channel_id = input("Enter channel ID (default 1): ").strip()
         if not channel_id:
             channel_id = "1"
-        url = f"http://{HOST}:{PORT}/GetVideoStreamConfig/{channel_id}" if channel_id else f"http://{HOST}:{PORT}/GetVideoStreamConfig"
-        response = requests.post(url, headers=headers)
+        response = client.post('GetVideoStreamConfig', channel_id)
         response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
 
         # Print available types
-        types = root.find('.//ipc:types', ns) if ns else root.find('.//types')
+        types = doc.find(root, 'types')
         if types is not None:
             print("\nAvailable Types:")
             # bitRateType
-            br_types = types.findall('.//ipc:bitRateType/ipc:enum', ns) if ns else types.findall('.//bitRateType/enum')
+            br_types = doc.findall(types, 'bitRateType/enum')
             if br_types:
                 print("  Bit Rate Types:")
                 for br in br_types:
                     print(f"    - {br.text}")
             # quality
-            qualities = types.findall('.//ipc:quality/ipc:enum', ns) if ns else types.findall('.//quality/enum')
+            qualities = doc.findall(types, 'quality/enum')
             if qualities:
                 print("  Quality Levels:")
                 for q in qualities:
                     print(f"    - {q.text}")
             # encodeType
-            enc_types = types.findall('.//ipc:encodeType/ipc:enum', ns) if ns else types.findall('.//encodeType/enum')
+            enc_types = doc.findall(types, 'encodeType/enum')
             if enc_types:
                 print("  Encode Types:")
                 for enc in enc_types:
                     print(f"    - {enc.text}")
 
         # Print stream configs
-        streams = root.find('.//ipc:streams', ns) if ns else root.find('.//streams')
+        streams = doc.find(root, 'streams')
         if streams is not None:
             count = streams.get('count', 'unknown')
             print(f"\nStreams (count={count}):")
-            items = streams.findall('ipc:item', ns) if ns else streams.findall('item')
+            items = doc.children(streams, 'item')
             for item in items:
                 stream_id = item.get('id', 'unknown')
-                name = item.find('.//ipc:name', ns) if ns else item.find('.//name')
-                resolution = item.find('.//ipc:resolution', ns) if ns else item.find('.//resolution')
-                frame_rate = item.find('.//ipc:frameRate', ns) if ns else item.find('.//frameRate')
-                bit_rate_type = item.find('.//ipc:bitRateType', ns) if ns else item.find('.//bitRateType')
-                max_bit_rate = item.find('.//ipc:maxBitRate', ns) if ns else item.find('.//maxBitRate')
-                bit_rate_lists = item.find('.//ipc:bitRateLists', ns) if ns else item.find('.//bitRateLists')
-                encode_type_caps = item.find('.//ipc:encodeTypeCaps', ns) if ns else item.find('.//encodeTypeCaps')
-                encode_type = item.find('.//ipc:encodeType', ns) if ns else item.find('.//encodeType')
-                encode_level = item.find('.//ipc:encodeLevel', ns) if ns else item.find('.//encodeLevel')
-                quality = item.find('.//ipc:quality', ns) if ns else item.find('.//quality')
-                gop = item.find('.//ipc:GOP', ns) if ns else item.find('.//GOP')
+                name = doc.find(item, 'name')
+                resolution = doc.find(item, 'resolution')
+                frame_rate = doc.find(item, 'frameRate')
+                bit_rate_type = doc.find(item, 'bitRateType')
+                max_bit_rate = doc.find(item, 'maxBitRate')
+                bit_rate_lists = doc.find(item, 'bitRateLists')
+                encode_type_caps = doc.find(item, 'encodeTypeCaps')
+                encode_type = doc.find(item, 'encodeType')
+                encode_level = doc.find(item, 'encodeLevel')
+                quality = doc.find(item, 'quality')
+                gop = doc.find(item, 'GOP')
                 print(f"\n  Stream ID: {stream_id}")
                 if name is not None:
                     print(f"    Name: {name.text}")
@@ -593,11 +583,11 @@ def print_video_stream_config():
                     print(f"    Max Bit Rate: {max_bit_rate.text}")
                 if bit_rate_lists is not None:
                     print("    Bit Rate List:")
-                    for br in bit_rate_lists.findall('ipc:item', ns) if ns else bit_rate_lists.findall('item'):
+                    for br in doc.children(bit_rate_lists, 'item'):
                         print(f"      - {br.text}")
                 if encode_type_caps is not None:
                     print("    Encode Type Caps:")
-                    for enc in encode_type_caps.findall('ipc:item', ns) if ns else encode_type_caps.findall('item'):
+                    for enc in doc.children(encode_type_caps, 'item'):
                         print(f"      - {enc.text}")
                 if encode_type is not None:
                     print(f"    Encode Type: {encode_type.text}")
@@ -622,42 +612,41 @@ def print_image_osd_config():
         channel_id = input("Enter channel ID (default 1): ").strip()
         if not channel_id:
             channel_id = "1"
-        url = f"http://{HOST}:{PORT}/GetImageOsdConfig/{channel_id}" if channel_id else f"http://{HOST}:{PORT}/GetImageOsdConfig"
-        response = requests.post(url, headers=headers)
+        response = client.post('GetImageOsdConfig', channel_id)
         response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
 
         # Print available types
-        types = root.find('.//ipc:types', ns) if ns else root.find('.//types')
+        types = doc.find(root, 'types')
         if types is not None:
             print("\nAvailable Types:")
             # dateFormat
-            date_formats = types.findall('.//ipc:dateFormat/ipc:enum', ns) if ns else types.findall('.//dateFormat/enum')
+            date_formats = doc.findall(types, 'dateFormat/enum')
             if date_formats:
                 print("  Date Formats:")
                 for fmt in date_formats:
                     print(f"    - {fmt.text}")
             # osdOverlayType
-            overlay_types = types.findall('.//ipc:osdOverlayType/ipc:enum', ns) if ns else types.findall('.//osdOverlayType/enum')
+            overlay_types = doc.findall(types, 'osdOverlayType/enum')
             if overlay_types:
                 print("  OSD Overlay Types:")
                 for ot in overlay_types:
                     print(f"    - {ot.text}")
 
         # Print OSD configuration
-        image_osd = root.find('.//ipc:imageOsd', ns) if ns else root.find('.//imageOsd')
+        image_osd = doc.find(root, 'imageOsd')
         if image_osd is not None:
             print("\nOSD Configuration:")
             
             # Time settings
-            time = image_osd.find('.//ipc:time', ns) if ns else image_osd.find('.//time')
+            time = doc.find(image_osd, 'time')
             if time is not None:
                 print("\nTime Display:")
-                switch = time.find('.//ipc:switch', ns) if ns else time.find('.//switch')
-                x = time.find('.//ipc:X', ns) if ns else time.find('.//X')
-                y = time.find('.//ipc:Y', ns) if ns else time.find('.//Y')
-                date_format = time.find('.//ipc:dateFormat', ns) if ns else time.find('.//dateFormat')
+                switch = doc.find(time, 'switch')
+                x = doc.find(time, 'X')
+                y = doc.find(time, 'Y')
+                date_format = doc.find(time, 'dateFormat')
                 if switch is not None:
                     print(f"  Enabled: {switch.text}")
                 if x is not None:
@@ -668,13 +657,13 @@ def print_image_osd_config():
                     print(f"  Date Format: {date_format.text}")
 
             # Channel name settings
-            channel_name = image_osd.find('.//ipc:channelName', ns) if ns else image_osd.find('.//channelName')
+            channel_name = doc.find(image_osd, 'channelName')
             if channel_name is not None:
                 print("\nChannel Name Display:")
-                switch = channel_name.find('.//ipc:switch', ns) if ns else channel_name.find('.//switch')
-                x = channel_name.find('.//ipc:X', ns) if ns else channel_name.find('.//X')
-                y = channel_name.find('.//ipc:Y', ns) if ns else channel_name.find('.//Y')
-                name = channel_name.find('.//ipc:name', ns) if ns else channel_name.find('.//name')
+                switch = doc.find(channel_name, 'switch')
+                x = doc.find(channel_name, 'X')
+                y = doc.find(channel_name, 'Y')
+                name = doc.find(channel_name, 'name')
                 if switch is not None:
                     print(f"  Enabled: {switch.text}")
                 if x is not None:
@@ -685,20 +674,20 @@ def print_image_osd_config():
                     print(f"  Name: {name.text}")
 
             # Text overlay settings
-            text_overlay = image_osd.find('.//ipc:textOverLay', ns) if ns else image_osd.find('.//textOverLay')
+            text_overlay = doc.find(image_osd, 'textOverLay')
             if text_overlay is not None:
                 count = text_overlay.get('count', 'unknown')
                 print(f"\nText Overlays (count={count}):")
-                items = text_overlay.findall('ipc:item', ns) if ns else text_overlay.findall('item')
+                items = doc.children(text_overlay, 'item')
                 for i, item in enumerate(items, 1):
                     print(f"\n  Overlay {i}:")
-                    switch = item.find('.//ipc:switch', ns) if ns else item.find('.//switch')
-                    x = item.find('.//ipc:X', ns) if ns else item.find('.//X')
-                    y = item.find('.//ipc:Y', ns) if ns else item.find('.//Y')
-                    value = item.find('.//ipc:value', ns) if ns else item.find('.//value')
-                    show_level = item.find('.//ipc:showLevel', ns) if ns else item.find('.//showLevel')
-                    flicker = item.find('.//ipc:flickerSwitch', ns) if ns else item.find('.//flickerSwitch')
-                    overlay_type = item.find('.//ipc:osdOverlayType', ns) if ns else item.find('.//osdOverlayType')
+                    switch = doc.find(item, 'switch')
+                    x = doc.find(item, 'X')
+                    y = doc.find(item, 'Y')
+                    value = doc.find(item, 'value')
+                    show_level = doc.find(item, 'showLevel')
+                    flicker = doc.find(item, 'flickerSwitch')
+                    overlay_type = doc.find(item, 'osdOverlayType')
                     
                     if switch is not None:
                         print(f"    Enabled: {switch.text}")
@@ -729,42 +718,41 @@ def print_privacy_mask_config():
         channel_id = input("Enter channel ID (default 1): ").strip()
         if not channel_id:
             channel_id = "1"
-        url = f"http://{HOST}:{PORT}/GetPrivacyMaskConfig/{channel_id}" if channel_id else f"http://{HOST}:{PORT}/GetPrivacyMaskConfig"
-        response = requests.post(url, headers=headers)
+        response = client.post('GetPrivacyMaskConfig', channel_id)
         response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
 
         # Print available types
-        types = root.find('.//ipc:types', ns) if ns else root.find('.//types')
+        types = doc.find(root, 'types')
         if types is not None:
             print("\nAvailable Types:")
             # color options
-            colors = types.findall('.//ipc:color/ipc:enum', ns) if ns else types.findall('.//color/enum')
+            colors = doc.findall(types, 'color/enum')
             if colors:
                 print("  Available Colors:")
                 for color in colors:
                     print(f"    - {color.text}")
 
         # Print privacy mask configuration
-        privacy_mask = root.find('.//ipc:privacyMask', ns) if ns else root.find('.//privacyMask')
+        privacy_mask = doc.find(root, 'privacyMask')
         if privacy_mask is not None:
             count = privacy_mask.get('count', 'unknown')
             print(f"\nPrivacy Masks (count={count}):")
-            items = privacy_mask.findall('ipc:item', ns) if ns else privacy_mask.findall('item')
+            items = doc.children(privacy_mask, 'item')
             for i, item in enumerate(items, 1):
                 print(f"\n  Mask {i}:")
-                switch = item.find('.//ipc:switch', ns) if ns else item.find('.//switch')
-                rectangle = item.find('.//ipc:rectangle', ns) if ns else item.find('.//rectangle')
-                color = item.find('.//ipc:color', ns) if ns else item.find('.//color')
+                switch = doc.find(item, 'switch')
+                rectangle = doc.find(item, 'rectangle')
+                color = doc.find(item, 'color')
                 
                 if switch is not None:
                     print(f"    Enabled: {switch.text}")
                 if rectangle is not None:
-                    x = rectangle.find('.//ipc:X', ns) if ns else rectangle.find('.//X')
-                    y = rectangle.find('.//ipc:Y', ns) if ns else rectangle.find('.//Y')
-                    width = rectangle.find('.//ipc:width', ns) if ns else rectangle.find('.//width')
-                    height = rectangle.find('.//ipc:height', ns) if ns else rectangle.find('.//height')
+                    x = doc.find(rectangle, 'X')
+                    y = doc.find(rectangle, 'Y')
+                    width = doc.find(rectangle, 'width')
+                    height = doc.find(rectangle, 'height')
                     
                     if x is not None and y is not None and width is not None and height is not None:
                         print(f"    Position: ({x.text}, {y.text})")
@@ -787,52 +775,46 @@ def print_ptz_caps():
         channel_id = input("Enter channel ID (default 1): ").strip()
         if not channel_id:
             channel_id = "1"
-        url = f"http://{HOST}:{PORT}/PtzGetCaps/{channel_id}" if channel_id else f"http://{HOST}:{PORT}/PtzGetCaps"
-        response = requests.post(url, headers=headers)
-        response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        ptz_caps, _ = get_capabilities('PtzGetCaps', channel_id)
 
         # Print PTZ capabilities
-        caps = root.find('.//ipc:caps', ns) if ns else root.find('.//caps')
-        if caps is not None:
+        caps = ptz_caps.get('caps')
+        if isinstance(caps, dict):
             print("\nPTZ Capabilities:")
             
             # Control speed range
-            min_speed = caps.find('.//ipc:controlMinSpeed', ns) if ns else caps.find('.//controlMinSpeed')
-            max_speed = caps.find('.//ipc:controlMaxSpeed', ns) if ns else caps.find('.//controlMaxSpeed')
+            min_speed = caps.get('controlMinSpeed')
+            max_speed = caps.get('controlMaxSpeed')
             if min_speed is not None and max_speed is not None:
-                print(f"  Control Speed Range: {min_speed.text} - {max_speed.text}")
+                print(f"  Control Speed Range: {min_speed} - {max_speed}")
             
             # Preset count
-            preset_count = caps.find('.//ipc:presetMaxCount', ns) if ns else caps.find('.//presetMaxCount')
+            preset_count = caps.get('presetMaxCount')
             if preset_count is not None:
-                print(f"  Maximum Preset Count: {preset_count.text}")
+                print(f"  Maximum Preset Count: {preset_count}")
             
             # Cruise settings
-            cruise_count = caps.find('.//ipc:cruiseMaxCount', ns) if ns else caps.find('.//cruiseMaxCount')
+            cruise_count = caps.get('cruiseMaxCount')
             if cruise_count is not None:
-                print(f"  Maximum Cruise Count: {cruise_count.text}")
+                print(f"  Maximum Cruise Count: {cruise_count}")
             
             # Cruise preset speed range
-            cruise_min_speed = caps.find('.//ipc:cruisePresetMinSpeed', ns) if ns else caps.find('.//cruisePresetMinSpeed')
-            cruise_max_speed = caps.find('.//ipc:cruisePresetMaxSpeed', ns) if ns else caps.find('.//cruisePresetMaxSpeed')
+            cruise_min_speed = caps.get('cruisePresetMinSpeed')
+            cruise_max_speed = caps.get('cruisePresetMaxSpeed')
             if cruise_min_speed is not None and cruise_max_speed is not None:
-                print(f"  Cruise Preset Speed Range: {cruise_min_speed.text} - {cruise_max_speed.text}")
+                print(f"  Cruise Preset Speed Range: {cruise_min_speed} - {cruise_max_speed}")
             
             # Cruise preset hold time
-            cruise_hold_time = caps.find('.//ipc:cruisePresetMaxHoldTime', ns) if ns else caps.find('.//cruisePresetMaxHoldTime')
+            cruise_hold_time = caps.get('cruisePresetMaxHoldTime')
             if cruise_hold_time is not None:
-                print(f"  Maximum Cruise Preset Hold Time: {cruise_hold_time.text} seconds")
+                print(f"  Maximum Cruise Preset Hold Time: {cruise_hold_time} seconds")
             
             # Cruise preset count
-            cruise_preset_count = caps.find('.//ipc:cruisePresetMaxCount', ns) if ns else caps.find('.//cruisePresetMaxCount')
+            cruise_preset_count = caps.get('cruisePresetMaxCount')
             if cruise_preset_count is not None:
-                print(f"  Maximum Cruise Preset Count: {cruise_preset_count.text}")
+                print(f"  Maximum Cruise Preset Count: {cruise_preset_count}")
         else:
             print("No PTZ capabilities found in response.")
-            print("Raw XML response:")
-            print(response.content.decode(errors='replace'))
     except Exception as e:
         print(f"Error: {e}")
         if hasattr(e, 'response') and getattr(e.response, 'text', None):
@@ -877,15 +859,14 @@ def print_ptz_control():
             except ValueError:
                 print("Invalid input. Please enter a number.")
         
-        # Build URL and XML request
-        url = f"http://{HOST}:{PORT}/PtzControl/{channel_id}/{action}" if channel_id else f"http://{HOST}:{PORT}/PtzControl/{action}"
+        # Build XML request
         xml_body = f'''<?xml version="1.0" encoding="utf-8" ?>
 <actionInfo version="1.0" xmlns="http://www.ipc.com/ver10">
 <speed>{speed}</speed>
 </actionInfo>'''
         
         # Send request
-        response = requests.post(url, headers=headers, data=xml_body.encode('utf-8'))
+        response = client.post('PtzControl', channel_id, action, data=xml_body)
         response.raise_for_status()
         
         print(f"\nPTZ Control command sent successfully:")
@@ -904,19 +885,18 @@ def print_motion_config():
         channel_id = input("Enter channel ID (default 1): ").strip()
         if not channel_id:
             channel_id = "1"
-        url = f"http://{HOST}:{PORT}/GetMotionConfig/{channel_id}" if channel_id else f"http://{HOST}:{PORT}/GetMotionConfig"
-        response = requests.post(url, headers=headers)
+        response = client.post('GetMotionConfig', channel_id)
         response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
 
         # Print motion configuration
-        motion = root.find('.//ipc:motion', ns) if ns else root.find('.//motion')
+        motion = doc.find(root, 'motion')
         if motion is not None:
             # Basic settings
-            switch = motion.find('.//ipc:switch', ns) if ns else motion.find('.//switch')
-            sensitivity = motion.find('.//ipc:sensitivity', ns) if ns else motion.find('.//sensitivity')
-            alarm_hold_time = motion.find('.//ipc:alarmHoldTime', ns) if ns else motion.find('.//alarmHoldTime')
+            switch = doc.find(motion, 'switch')
+            sensitivity = doc.find(motion, 'sensitivity')
+            alarm_hold_time = doc.find(motion, 'alarmHoldTime')
             
             print("\nBasic Settings:")
             if switch is not None:
@@ -929,11 +909,11 @@ def print_motion_config():
                 print(f"  Alarm Hold Time: {alarm_hold_time.text} seconds")
 
             # Motion detection areas
-            area = motion.find('.//ipc:area', ns) if ns else motion.find('.//area')
+            area = doc.find(motion, 'area')
             if area is not None:
                 count = area.get('count', 'unknown')
                 print(f"\nMotion Detection Areas (22x{count} grid):")
-                items = area.findall('ipc:item', ns) if ns else area.findall('item')
+                items = doc.children(area, 'item')
                 for i, item in enumerate(items, 1):
                     area_map = item.text.strip() if item.text else ''
                     print(f"\n  Row {i}:")
@@ -943,11 +923,11 @@ def print_motion_config():
                         print(f"    Cell {j}: {status}")
 
             # Alarm output triggers
-            trigger_alarm = motion.find('.//ipc:triggerAlarmOut', ns) if ns else motion.find('.//triggerAlarmOut')
+            trigger_alarm = doc.find(motion, 'triggerAlarmOut')
             if trigger_alarm is not None:
                 count = trigger_alarm.get('count', 'unknown')
                 print(f"\nAlarm Output Triggers (count={count}):")
-                items = trigger_alarm.findall('ipc:item', ns) if ns else trigger_alarm.findall('item')
+                items = doc.children(trigger_alarm, 'item')
                 for item in items:
                     alarm_id = item.get('id', 'unknown')
                     status = "Enabled" if item.text.lower() == 'true' else "Disabled"
@@ -990,69 +970,68 @@ def print_alarm_trigger_config():
         if not channel_id:
             channel_id = "1"
         
-        # Build URL and make request
-        url = f"http://{HOST}:{PORT}/GetAlarmTriggerConfig/{channel_id}/{action}"
-        response = requests.post(url, headers=headers)
+        # Make request
+        response = client.post('GetAlarmTriggerConfig', channel_id, action)
         response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
 
         # Print trigger configuration
-        trigger_config = root.find('.//ipc:triggerConfig', ns) if ns else root.find('.//triggerConfig')
+        trigger_config = doc.find(root, 'triggerConfig')
         if trigger_config is not None:
             print(f"\nTrigger Configuration for {action} (Channel {channel_id}):")
             
             # Snapshot settings
-            snap = trigger_config.find('.//ipc:snap', ns) if ns else trigger_config.find('.//snap')
+            snap = doc.find(trigger_config, 'snap')
             if snap is not None:
                 print("\nSnapshot Settings:")
-                items = snap.findall('ipc:item', ns) if ns else snap.findall('item')
+                items = doc.children(snap, 'item')
                 for item in items:
-                    ch_id = item.find('.//ipc:channelId', ns) if ns else item.find('.//channelId')
-                    switch = item.find('.//ipc:switch', ns) if ns else item.find('.//switch')
+                    ch_id = doc.find(item, 'channelId')
+                    switch = doc.find(item, 'switch')
                     if ch_id is not None and switch is not None:
                         print(f"  Channel {ch_id.text}: {'Enabled' if switch.text.lower() == 'true' else 'Disabled'}")
             
             # Record settings
-            record = trigger_config.find('.//ipc:record', ns) if ns else trigger_config.find('.//record')
+            record = doc.find(trigger_config, 'record')
             if record is not None:
                 print("\nRecording Settings:")
-                items = record.findall('ipc:item', ns) if ns else record.findall('item')
+                items = doc.children(record, 'item')
                 for item in items:
-                    ch_id = item.find('.//ipc:channelId', ns) if ns else item.find('.//channelId')
-                    switch = item.find('.//ipc:switch', ns) if ns else item.find('.//switch')
+                    ch_id = doc.find(item, 'channelId')
+                    switch = doc.find(item, 'switch')
                     if ch_id is not None and switch is not None:
                         print(f"  Channel {ch_id.text}: {'Enabled' if switch.text.lower() == 'true' else 'Disabled'}")
             
             # Alarm output settings
-            trigger_alarm = trigger_config.find('.//ipc:triggerAlarmOut', ns) if ns else trigger_config.find('.//triggerAlarmOut')
+            trigger_alarm = doc.find(trigger_config, 'triggerAlarmOut')
             if trigger_alarm is not None:
                 print("\nAlarm Output Settings:")
-                alarm_list = trigger_alarm.find('.//ipc:alarmOutList', ns) if ns else trigger_alarm.find('.//alarmOutList')
+                alarm_list = doc.find(trigger_alarm, 'alarmOutList')
                 if alarm_list is not None:
-                    items = alarm_list.findall('ipc:item', ns) if ns else alarm_list.findall('item')
+                    items = doc.children(alarm_list, 'item')
                     for item in items:
-                        alarm_id = item.find('.//ipc:alarmOutId', ns) if ns else item.find('.//alarmOutId')
+                        alarm_id = doc.find(item, 'alarmOutId')
                         if alarm_id is not None:
                             print(f"  Alarm Output {alarm_id.text}")
             
             # Audio settings
-            audio = trigger_config.find('.//ipc:audio', ns) if ns else trigger_config.find('.//audio')
+            audio = doc.find(trigger_config, 'audio')
             if audio is not None:
                 print("\nAudio Settings:")
-                items = audio.findall('ipc:item', ns) if ns else audio.findall('item')
+                items = doc.children(audio, 'item')
                 for item in items:
-                    switch = item.find('.//ipc:switch', ns) if ns else item.find('.//switch')
+                    switch = doc.find(item, 'switch')
                     if switch is not None:
                         print(f"  Audio: {'Enabled' if switch.text.lower() == 'true' else 'Disabled'}")
             
             # White light settings
-            white_light = trigger_config.find('.//ipc:whiteLight', ns) if ns else trigger_config.find('.//whiteLight')
+            white_light = doc.find(trigger_config, 'whiteLight')
             if white_light is not None:
                 print("\nWhite Light Settings:")
-                items = white_light.findall('ipc:item', ns) if ns else white_light.findall('item')
+                items = doc.children(white_light, 'item')
                 for item in items:
-                    switch = item.find('.//ipc:switch', ns) if ns else item.find('.//switch')
+                    switch = doc.find(item, 'switch')
                     if switch is not None:
                         print(f"  White Light: {'Enabled' if switch.text.lower() == 'true' else 'Disabled'}")
         else:
@@ -1067,52 +1046,52 @@ def print_alarm_trigger_config():
 def print_net_basic_config():
     print("\n--- Basic Network Configuration ---")
     try:
-        response = requests.post(url_net_basic, headers=headers)
+        response = client.post('GetNetBasicConfig')
         response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
 
         # Print available types
-        types = root.find('.//ipc:types', ns) if ns else root.find('.//types')
+        types = doc.find(root, 'types')
         if types is not None:
             print("\nAvailable IP Setting Modes:")
-            ip_modes = types.findall('.//ipc:ipSettingMode/ipc:enum', ns) if ns else types.findall('.//ipSettingMode/enum')
+            ip_modes = doc.findall(types, 'ipSettingMode/enum')
             for mode in ip_modes:
                 print(f"  - {mode.text}")
 
         # Print TCP/IP configuration
-        tcp_ip = root.find('.//ipc:tcpIp', ns) if ns else root.find('.//tcpIp')
+        tcp_ip = doc.find(root, 'tcpIp')
         if tcp_ip is not None:
             print("\nTCP/IP Configuration:")
             
             # IP Setting Mode
-            ip_mode = tcp_ip.find('.//ipc:ipSettingMode', ns) if ns else tcp_ip.find('.//ipSettingMode')
+            ip_mode = doc.find(tcp_ip, 'ipSettingMode')
             if ip_mode is not None:
                 print(f"  IP Setting Mode: {ip_mode.text}")
             
             # Static IP settings
-            static_ip = tcp_ip.find('.//ipc:staticIp', ns) if ns else tcp_ip.find('.//staticIp')
+            static_ip = doc.find(tcp_ip, 'staticIp')
             if static_ip is not None:
                 print(f"  Static IP: {static_ip.text}")
             
-            static_route = tcp_ip.find('.//ipc:staticIpRoute', ns) if ns else tcp_ip.find('.//staticIpRoute')
+            static_route = doc.find(tcp_ip, 'staticIpRoute')
             if static_route is not None:
                 print(f"  Default Gateway: {static_route.text}")
             
-            static_mask = tcp_ip.find('.//ipc:staticIpMask', ns) if ns else tcp_ip.find('.//staticIpMask')
+            static_mask = doc.find(tcp_ip, 'staticIpMask')
             if static_mask is not None:
                 print(f"  Subnet Mask: {static_mask.text}")
             
             # DNS settings
-            dns_dhcp = tcp_ip.find('.//ipc:dnsFromDhcpSwitch', ns) if ns else tcp_ip.find('.//dnsFromDhcpSwitch')
+            dns_dhcp = doc.find(tcp_ip, 'dnsFromDhcpSwitch')
             if dns_dhcp is not None:
                 print(f"  DNS from DHCP: {'Enabled' if dns_dhcp.text.lower() == 'true' else 'Disabled'}")
             
-            dns1 = tcp_ip.find('.//ipc:dnsServer1', ns) if ns else tcp_ip.find('.//dnsServer1')
+            dns1 = doc.find(tcp_ip, 'dnsServer1')
             if dns1 is not None:
                 print(f"  Primary DNS: {dns1.text}")
             
-            dns2 = tcp_ip.find('.//ipc:dnsServer2', ns) if ns else tcp_ip.find('.//dnsServer2')
+            dns2 = doc.find(tcp_ip, 'dnsServer2')
             if dns2 is not None:
                 print(f"  Secondary DNS: {dns2.text}")
         else:
@@ -1134,15 +1113,15 @@ def print_reboot():
             return
 
         print("Sending reboot command...")
-        response = requests.post(url_reboot, headers=headers)
+        response = client.post('Reboot')
         response.raise_for_status()
         
         # Parse response
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
         
         # Check for result
-        result = root.find('.//ipc:result', ns) if ns else root.find('.//result')
+        result = doc.find(root, 'result')
         if result is not None:
             print(f"\nReboot command result: {result.text}")
             if result.text.lower() == 'success':
@@ -1162,84 +1141,83 @@ def print_vfd_config():
         channel_id = input("Enter channel ID (default 1): ").strip()
         if not channel_id:
             channel_id = "1"
-        url = f"http://{HOST}:{PORT}/GetSmartVfdConfig/{channel_id}" if channel_id else url_vfd
-        response = requests.post(url, headers=headers)
+        response = client.post('GetSmartVfdConfig', channel_id)
         response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
 
         # Print available types
-        types = root.find('.//ipc:types', ns) if ns else root.find('.//types')
+        types = doc.find(root, 'types')
         if types is not None:
             print("\nAvailable Types:")
             
             # Mutex Object Types
-            mutex_types = types.findall('.//ipc:mutexObjectType/ipc:enum', ns) if ns else types.findall('.//mutexObjectType/enum')
+            mutex_types = doc.findall(types, 'mutexObjectType/enum')
             if mutex_types:
                 print("\nMutex Object Types:")
                 for mt in mutex_types:
                     print(f"  - {mt.text}")
             
             # Detect Mode Types
-            detect_modes = types.findall('.//ipc:detectModeType/ipc:enum', ns) if ns else types.findall('.//detectModeType/enum')
+            detect_modes = doc.findall(types, 'detectModeType/enum')
             if detect_modes:
                 print("\nDetect Mode Types:")
                 for dm in detect_modes:
                     print(f"  - {dm.text}")
             
             # Alarm List Types
-            alarm_lists = types.findall('.//ipc:alarmListType/ipc:enum', ns) if ns else types.findall('.//alarmListType/enum')
+            alarm_lists = doc.findall(types, 'alarmListType/enum')
             if alarm_lists:
                 print("\nAlarm List Types:")
                 for al in alarm_lists:
                     print(f"  - {al.text}")
             
             # Alarm Mode Types
-            alarm_modes = types.findall('.//ipc:alarmModeType/ipc:enum', ns) if ns else types.findall('.//alarmModeType/enum')
+            alarm_modes = doc.findall(types, 'alarmModeType/enum')
             if alarm_modes:
                 print("\nAlarm Mode Types:")
                 for am in alarm_modes:
                     print(f"  - {am.text}")
             
             # Scene Mode Types
-            scene_modes = types.findall('.//ipc:senceModeType/ipc:enum', ns) if ns else types.findall('.//senceModeType/enum')
+            scene_modes = doc.findall(types, 'senceModeType/enum')
             if scene_modes:
                 print("\nScene Mode Types:")
                 for sm in scene_modes:
                     print(f"  - {sm.text}")
 
         # Print VFD configuration
-        vfd = root.find('.//ipc:vfd', ns) if ns else root.find('.//vfd')
+        vfd = doc.find(root, 'vfd')
         if vfd is not None:
             print("\nVFD Configuration:")
             
             # Basic settings
-            function_status = vfd.find('.//ipc:functionStatus', ns) if ns else vfd.find('.//functionStatus')
-            switch = vfd.find('.//ipc:switch', ns) if ns else vfd.find('.//switch')
+            function_status = doc.find(vfd, 'functionStatus')
+            switch = doc.find(vfd, 'switch')
             if function_status is not None:
                 print(f"\nFunction Status: {function_status.text}")
             if switch is not None:
                 print(f"VFD Enabled: {switch.text}")
             
             # Mutex List
-            mutex_list = vfd.find('.//ipc:mutexList', ns) if ns else vfd.find('.//mutexList')
+            mutex_list = doc.find(vfd, 'mutexList')
             if mutex_list is not None:
                 count = mutex_list.get('count', 'unknown')
                 print(f"\nMutex List (count={count}):")
-                items = mutex_list.findall('ipc:item', ns) if ns else mutex_list.findall('item')
+                items = doc.children(mutex_list, 'item')
                 for item in items:
-                    obj = item.find('.//ipc:object', ns) if ns else item.find('.//object')
-                    status = item.find('.//ipc:status', ns) if ns else item.find('.//status')
+                    obj = doc.find(item, 'object')
+                    status = doc.find(item, 'status')
                     if obj is not None and status is not None:
                         print(f"  {obj.text}: {'Enabled' if status.text.lower() == 'true' else 'Disabled'}")
             
             # Detect Mode
-            detect_mode = vfd.find('.//ipc:detectMode', ns) if ns else vfd.find('.//detectMode')
+            detect_mode = doc.find(vfd, 'detectMode')
             if detect_mode is not None:
                 print("\nDetect Mode Settings:")
-                mode = detect_mode.find('.//ipc:mode', ns) if ns else detect_mode.find('.//mode')
-                interval = detect_mode.find('.//ipc:intervalTime', ns) if ns else detect_mode.find('.//intervalTime')
-                cycle = detect_mode.find('.//ipc:captureCycle', ns) if ns else detect_mode.find('.//captureCycle')
+                mode = doc.find(detect_mode, 'mode')
+                interval = doc.find(detect_mode, 'intervalTime')
+                cycle = doc.find(detect_mode, 'captureCycle')
                 if mode is not None:
                     print(f"  Mode: {mode.text}")
                 if interval is not None:
@@ -1254,9 +1232,9 @@ def print_vfd_config():
                     print(f"  Capture Cycle: {cycle.text} (Range: {min_val}-{max_val}, Default: {default})")
             
             # Alarm Settings
-            alarm_hold = vfd.find('.//ipc:alarmHoldTime', ns) if ns else vfd.find('.//alarmHoldTime')
-            save_face = vfd.find('.//ipc:saveFacePicture', ns) if ns else vfd.find('.//saveFacePicture')
-            save_source = vfd.find('.//ipc:saveSourcePicture', ns) if ns else vfd.find('.//saveSourcePicture')
+            alarm_hold = doc.find(vfd, 'alarmHoldTime')
+            save_face = doc.find(vfd, 'saveFacePicture')
+            save_source = doc.find(vfd, 'saveSourcePicture')
             if alarm_hold is not None:
                 print(f"\nAlarm Hold Time: {alarm_hold.text} seconds")
             if save_face is not None:
@@ -1265,39 +1243,39 @@ def print_vfd_config():
                 print(f"Save Source Picture: {save_source.text}")
             
             # Region Info
-            region_info = vfd.find('.//ipc:regionInfo', ns) if ns else vfd.find('.//regionInfo')
+            region_info = doc.find(vfd, 'regionInfo')
             if region_info is not None:
                 count = region_info.get('count', 'unknown')
                 max_count = region_info.get('maxCount', 'unknown')
                 print(f"\nDetection Region (count={count}, max={max_count}):")
-                items = region_info.findall('ipc:item', ns) if ns else region_info.findall('item')
+                items = doc.children(region_info, 'item')
                 for item in items:
-                    x1 = item.find('.//ipc:X1', ns) if ns else item.find('.//X1')
-                    y1 = item.find('.//ipc:Y1', ns) if ns else item.find('.//Y1')
-                    x2 = item.find('.//ipc:X2', ns) if ns else item.find('.//X2')
-                    y2 = item.find('.//ipc:Y2', ns) if ns else item.find('.//Y2')
+                    x1 = doc.find(item, 'X1')
+                    y1 = doc.find(item, 'Y1')
+                    x2 = doc.find(item, 'X2')
+                    y2 = doc.find(item, 'Y2')
                     if all([x1, y1, x2, y2]):
                         print(f"  Rectangle: ({x1.text}, {y1.text}) to ({x2.text}, {y2.text})")
                         print("  Note: Coordinates represent diagonal points of the rectangle")
             
             # Face Frame Settings
-            max_frame = vfd.find('.//ipc:maxFaceFrame', ns) if ns else vfd.find('.//maxFaceFrame')
-            min_frame = vfd.find('.//ipc:minFaceFrame', ns) if ns else vfd.find('.//minFaceFrame')
+            max_frame = doc.find(vfd, 'maxFaceFrame')
+            min_frame = doc.find(vfd, 'minFaceFrame')
             if max_frame is not None:
                 print(f"\nMaximum Face Frame: {max_frame.text}")
             if min_frame is not None:
                 print(f"Minimum Face Frame: {min_frame.text}")
             
             # Face Match Settings
-            face_match = vfd.find('.//ipc:faceMatch', ns) if ns else vfd.find('.//faceMatch')
+            face_match = doc.find(vfd, 'faceMatch')
             if face_match is not None:
                 print("\nFace Match Settings:")
                 
                 # Push Mode
-                push_mode = face_match.find('.//ipc:pushMode', ns) if ns else face_match.find('.//pushMode')
+                push_mode = doc.find(face_match, 'pushMode')
                 if push_mode is not None:
-                    mode = push_mode.find('.//ipc:mode', ns) if ns else push_mode.find('.//mode')
-                    interval = push_mode.find('.//ipc:intervalTime', ns) if ns else push_mode.find('.//intervalTime')
+                    mode = doc.find(push_mode, 'mode')
+                    interval = doc.find(push_mode, 'intervalTime')
                     if mode is not None:
                         print(f"  Push Mode: {mode.text}")
                     if interval is not None:
@@ -1307,9 +1285,9 @@ def print_vfd_config():
                         print(f"  Interval Time: {interval.text} (Range: {min_val}-{max_val}, Default: {default})")
                 
                 # Similarity and Alarm Settings
-                similarity = face_match.find('.//ipc:similarityThreshold', ns) if ns else face_match.find('.//similarityThreshold')
-                alarm_mode = face_match.find('.//ipc:alarmMode', ns) if ns else face_match.find('.//alarmMode')
-                alarm_list = face_match.find('.//ipc:alarmList', ns) if ns else face_match.find('.//alarmList')
+                similarity = doc.find(face_match, 'similarityThreshold')
+                alarm_mode = doc.find(face_match, 'alarmMode')
+                alarm_list = doc.find(face_match, 'alarmList')
                 if similarity is not None:
                     min_val = similarity.get('min', 'N/A')
                     max_val = similarity.get('max', 'N/A')
@@ -1321,26 +1299,26 @@ def print_vfd_config():
                     print(f"  Alarm List: {alarm_list.text}")
                 
                 # Alarm Output Triggers
-                trigger_alarm = face_match.find('.//ipc:triggerAlarmOut', ns) if ns else face_match.find('.//triggerAlarmOut')
+                trigger_alarm = doc.find(face_match, 'triggerAlarmOut')
                 if trigger_alarm is not None:
-                    io = trigger_alarm.find('.//ipc:Io', ns) if ns else trigger_alarm.find('.//Io')
+                    io = doc.find(trigger_alarm, 'Io')
                     if io is not None:
                         count = io.get('count', 'unknown')
                         max_count = io.get('maxCount', 'unknown')
                         print(f"\nAlarm Output Triggers (count={count}, max={max_count}):")
-                        items = io.findall('ipc:item', ns) if ns else io.findall('item')
+                        items = doc.children(io, 'item')
                         for item in items:
-                            alarm_id = item.find('.//ipc:alarmId', ns) if ns else item.find('.//alarmId')
-                            switch = item.find('.//ipc:switch', ns) if ns else item.find('.//switch')
+                            alarm_id = doc.find(item, 'alarmId')
+                            switch = doc.find(item, 'switch')
                             if alarm_id is not None and switch is not None:
                                 print(f"  Alarm Output {alarm_id.text}: {'Enabled' if switch.text.lower() == 'true' else 'Disabled'}")
             
             # Face Exposure Settings
-            face_exp = vfd.find('.//ipc:faceExp', ns) if ns else vfd.find('.//faceExp')
+            face_exp = doc.find(vfd, 'faceExp')
             if face_exp is not None:
                 print("\nFace Exposure Settings:")
-                switch = face_exp.find('.//ipc:switch', ns) if ns else face_exp.find('.//switch')
-                strength = face_exp.find('.//ipc:faceExpStrength', ns) if ns else face_exp.find('.//faceExpStrength')
+                switch = doc.find(face_exp, 'switch')
+                strength = doc.find(face_exp, 'faceExpStrength')
                 if switch is not None:
                     print(f"  Enabled: {switch.text}")
                 if strength is not None:
@@ -1350,12 +1328,12 @@ def print_vfd_config():
                     print(f"  Strength: {strength.text} (Range: {min_val}-{max_val}, Default: {default})")
             
             # Scene Mode Settings
-            scene_mode = vfd.find('.//ipc:senceMode', ns) if ns else vfd.find('.//senceMode')
+            scene_mode = doc.find(vfd, 'senceMode')
             if scene_mode is not None:
                 print("\nScene Mode Settings:")
-                mode = scene_mode.find('.//ipc:mode', ns) if ns else scene_mode.find('.//mode')
-                spare_time = scene_mode.find('.//ipc:spareTimeMatch', ns) if ns else scene_mode.find('.//spareTimeMatch')
-                near_priority = scene_mode.find('.//ipc:nearPriority', ns) if ns else scene_mode.find('.//nearPriority')
+                mode = doc.find(scene_mode, 'mode')
+                spare_time = doc.find(scene_mode, 'spareTimeMatch')
+                near_priority = doc.find(scene_mode, 'nearPriority')
                 if mode is not None:
                     print(f"  Mode: {mode.text}")
                 if spare_time is not None:
@@ -1364,18 +1342,18 @@ def print_vfd_config():
                     print(f"  Near Priority: {near_priority.text}")
             
             # Scene Mode Info
-            scene_info = vfd.find('.//ipc:senceModeInfo', ns) if ns else vfd.find('.//senceModeInfo')
+            scene_info = doc.find(vfd, 'senceModeInfo')
             if scene_info is not None:
                 print("\nScene Mode Information:")
                 
                 # Access Control Mode
-                access_control = scene_info.find('.//ipc:accessControlMode', ns) if ns else scene_info.find('.//accessControlMode')
+                access_control = doc.find(scene_info, 'accessControlMode')
                 if access_control is not None:
                     print("\nAccess Control Mode:")
-                    interval = access_control.find('.//ipc:intervalTime', ns) if ns else access_control.find('.//intervalTime')
-                    cycle = access_control.find('.//ipc:captureCycle', ns) if ns else access_control.find('.//captureCycle')
-                    spare_time = access_control.find('.//ipc:spareTimeMatch', ns) if ns else access_control.find('.//spareTimeMatch')
-                    near_priority = access_control.find('.//ipc:nearPriority', ns) if ns else access_control.find('.//nearPriority')
+                    interval = doc.find(access_control, 'intervalTime')
+                    cycle = doc.find(access_control, 'captureCycle')
+                    spare_time = doc.find(access_control, 'spareTimeMatch')
+                    near_priority = doc.find(access_control, 'nearPriority')
                     if interval is not None:
                         print(f"  Interval Time: {interval.text}ms")
                     if cycle is not None:
@@ -1386,13 +1364,13 @@ def print_vfd_config():
                         print(f"  Near Priority: {near_priority.text}")
                 
                 # Security Monitor Mode
-                security_monitor = scene_info.find('.//ipc:securityMonitorMode', ns) if ns else scene_info.find('.//securityMonitorMode')
+                security_monitor = doc.find(scene_info, 'securityMonitorMode')
                 if security_monitor is not None:
                     print("\nSecurity Monitor Mode:")
-                    interval = security_monitor.find('.//ipc:intervalTime', ns) if ns else security_monitor.find('.//intervalTime')
-                    cycle = security_monitor.find('.//ipc:captureCycle', ns) if ns else security_monitor.find('.//captureCycle')
-                    spare_time = security_monitor.find('.//ipc:spareTimeMatch', ns) if ns else security_monitor.find('.//spareTimeMatch')
-                    near_priority = security_monitor.find('.//ipc:nearPriority', ns) if ns else security_monitor.find('.//nearPriority')
+                    interval = doc.find(security_monitor, 'intervalTime')
+                    cycle = doc.find(security_monitor, 'captureCycle')
+                    spare_time = doc.find(security_monitor, 'spareTimeMatch')
+                    near_priority = doc.find(security_monitor, 'nearPriority')
                     if interval is not None:
                         print(f"  Interval Time: {interval.text}ms")
                     if cycle is not None:
@@ -1416,36 +1394,35 @@ def print_perimeter_config():
         channel_id = input("Enter channel ID (default 1): ").strip()
         if not channel_id:
             channel_id = "1"
-        url = f"http://{HOST}:{PORT}/GetSmartPerimeterConfig/{channel_id}" if channel_id else url_perimeter
-        response = requests.post(url, headers=headers)
+        response = client.post('GetSmartPerimeterConfig', channel_id)
         response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
 
         # Print perimeter configuration
-        perimeter = root.find('.//ipc:perimeter', ns) if ns else root.find('.//perimeter')
+        perimeter = doc.find(root, 'perimeter')
         if perimeter is not None:
             print("\nPerimeter Configuration:")
             
             # Basic settings
-            switch = perimeter.find('.//ipc:switch', ns) if ns else perimeter.find('.//switch')
-            alarm_hold = perimeter.find('.//ipc:alarmHoldTime', ns) if ns else perimeter.find('.//alarmHoldTime')
+            switch = doc.find(perimeter, 'switch')
+            alarm_hold = doc.find(perimeter, 'alarmHoldTime')
             if switch is not None:
                 print(f"Perimeter Detection: {'Enabled' if switch.text.lower() == 'true' else 'Disabled'}")
             if alarm_hold is not None:
                 print(f"Alarm Hold Time: {alarm_hold.text} seconds")
             
             # Object Filter settings
-            object_filter = perimeter.find('.//ipc:objectFilter', ns) if ns else perimeter.find('.//objectFilter')
+            object_filter = doc.find(perimeter, 'objectFilter')
             if object_filter is not None:
                 print("\nObject Filter Settings:")
                 
                 # Car settings
-                car = object_filter.find('.//ipc:car', ns) if ns else object_filter.find('.//car')
+                car = doc.find(object_filter, 'car')
                 if car is not None:
                     print("\nCar Detection:")
-                    car_switch = car.find('.//ipc:switch', ns) if ns else car.find('.//switch')
-                    car_sensitivity = car.find('.//ipc:sensitivity', ns) if ns else car.find('.//sensitivity')
+                    car_switch = doc.find(car, 'switch')
+                    car_sensitivity = doc.find(car, 'sensitivity')
                     if car_switch is not None:
                         print(f"  Enabled: {car_switch.text}")
                     if car_sensitivity is not None:
@@ -1455,11 +1432,11 @@ def print_perimeter_config():
                         print(f"  Sensitivity: {car_sensitivity.text} (Range: {min_val}-{max_val}, Default: {default})")
                 
                 # Person settings
-                person = object_filter.find('.//ipc:person', ns) if ns else object_filter.find('.//person')
+                person = doc.find(object_filter, 'person')
                 if person is not None:
                     print("\nPerson Detection:")
-                    person_switch = person.find('.//ipc:switch', ns) if ns else person.find('.//switch')
-                    person_sensitivity = person.find('.//ipc:sensitivity', ns) if ns else person.find('.//sensitivity')
+                    person_switch = doc.find(person, 'switch')
+                    person_sensitivity = doc.find(person, 'sensitivity')
                     if person_switch is not None:
                         print(f"  Enabled: {person_switch.text}")
                     if person_sensitivity is not None:
@@ -1469,11 +1446,11 @@ def print_perimeter_config():
                         print(f"  Sensitivity: {person_sensitivity.text} (Range: {min_val}-{max_val}, Default: {default})")
                 
                 # Motor settings
-                motor = object_filter.find('.//ipc:motor', ns) if ns else object_filter.find('.//motor')
+                motor = doc.find(object_filter, 'motor')
                 if motor is not None:
                     print("\nMotor Detection:")
-                    motor_switch = motor.find('.//ipc:switch', ns) if ns else motor.find('.//switch')
-                    motor_sensitivity = motor.find('.//ipc:sensitivity', ns) if ns else motor.find('.//sensitivity')
+                    motor_switch = doc.find(motor, 'switch')
+                    motor_sensitivity = doc.find(motor, 'sensitivity')
                     if motor_switch is not None:
                         print(f"  Enabled: {motor_switch.text}")
                     if motor_sensitivity is not None:
@@ -1483,38 +1460,38 @@ def print_perimeter_config():
                         print(f"  Sensitivity: {motor_sensitivity.text} (Range: {min_val}-{max_val}, Default: {default})")
             
             # Target Frame Settings
-            max_frame = perimeter.find('.//ipc:maxTargetFrame', ns) if ns else perimeter.find('.//maxTargetFrame')
-            min_frame = perimeter.find('.//ipc:minTargetFrame', ns) if ns else perimeter.find('.//minTargetFrame')
+            max_frame = doc.find(perimeter, 'maxTargetFrame')
+            min_frame = doc.find(perimeter, 'minTargetFrame')
             if max_frame is not None:
                 print(f"\nMaximum Target Frame: {max_frame.text}")
             if min_frame is not None:
                 print(f"Minimum Target Frame: {min_frame.text}")
             
             # Picture Save Settings
-            save_target = perimeter.find('.//ipc:saveTargetPicture', ns) if ns else perimeter.find('.//saveTargetPicture')
-            save_source = perimeter.find('.//ipc:saveSourcePicture', ns) if ns else perimeter.find('.//saveSourcePicture')
+            save_target = doc.find(perimeter, 'saveTargetPicture')
+            save_source = doc.find(perimeter, 'saveSourcePicture')
             if save_target is not None:
                 print(f"Save Target Picture: {save_target.text}")
             if save_source is not None:
                 print(f"Save Source Picture: {save_source.text}")
             
             # Region Info
-            region_info = perimeter.find('.//ipc:regionInfo', ns) if ns else perimeter.find('.//regionInfo')
+            region_info = doc.find(perimeter, 'regionInfo')
             if region_info is not None:
                 count = region_info.get('count', 'unknown')
                 max_count = region_info.get('maxCount', 'unknown')
                 print(f"\nDetection Regions (count={count}, max={max_count}):")
-                items = region_info.findall('ipc:item', ns) if ns else region_info.findall('item')
+                items = doc.children(region_info, 'item')
                 for i, item in enumerate(items, 1):
-                    point_group = item.find('.//ipc:pointGroup', ns) if ns else item.find('.//pointGroup')
+                    point_group = doc.find(item, 'pointGroup')
                     if point_group is not None:
                         group_count = point_group.get('count', 'unknown')
                         group_max = point_group.get('maxCount', 'unknown')
                         print(f"\n  Region {i} (points={group_count}, max={group_max}):")
-                        points = point_group.findall('ipc:item', ns) if ns else point_group.findall('item')
+                        points = doc.children(point_group, 'item')
                         for j, point in enumerate(points, 1):
-                            x = point.find('.//ipc:X', ns) if ns else point.find('.//X')
-                            y = point.find('.//ipc:Y', ns) if ns else point.find('.//Y')
+                            x = doc.find(point, 'X')
+                            y = doc.find(point, 'Y')
                             if x is not None and y is not None:
                                 print(f"    Point {j}: ({x.text}, {y.text})")
         else:
@@ -1529,54 +1506,54 @@ def print_perimeter_config():
 def print_vehicle_config():
     print("\n--- Vehicle Configuration ---")
     try:
-        response = requests.post(url_vehicle, headers=headers)
+        response = client.post('GetSmartVehicleConfig')
         response.raise_for_status()
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
 
         # Print available types
-        types = root.find('.//ipc:types', ns) if ns else root.find('.//types')
+        types = doc.find(root, 'types')
         if types is not None:
             print("\nAvailable Types:")
             
             # Detect Mode Types
-            detect_modes = types.findall('.//ipc:detectModeType/ipc:enum', ns) if ns else types.findall('.//detectModeType/enum')
+            detect_modes = doc.findall(types, 'detectModeType/enum')
             if detect_modes:
                 print("\nDetect Mode Types:")
                 for mode in detect_modes:
                     print(f"  - {mode.text}")
             
             # Mutex Object Types
-            mutex_types = types.findall('.//ipc:mutexObjectType/ipc:enum', ns) if ns else types.findall('.//mutexObjectType/enum')
+            mutex_types = doc.findall(types, 'mutexObjectType/enum')
             if mutex_types:
                 print("\nMutex Object Types:")
                 for mt in mutex_types:
                     print(f"  - {mt.text}")
             
             # Plate Area Types
-            plate_areas = types.findall('.//ipc:plateAreaType/ipc:enum', ns) if ns else types.findall('.//plateAreaType/enum')
+            plate_areas = doc.findall(types, 'plateAreaType/enum')
             if plate_areas:
                 print("\nPlate Area Types:")
                 for pa in plate_areas:
                     print(f"  - {pa.text}")
             
             # Alarm List Types
-            alarm_lists = types.findall('.//ipc:alarmListType/ipc:enum', ns) if ns else types.findall('.//alarmListType/enum')
+            alarm_lists = doc.findall(types, 'alarmListType/enum')
             if alarm_lists:
                 print("\nAlarm List Types:")
                 for al in alarm_lists:
                     print(f"  - {al.text}")
 
         # Print vehicle configuration
-        vehicle = root.find('.//ipc:vehicle', ns) if ns else root.find('.//vehicle')
+        vehicle = doc.find(root, 'vehicle')
         if vehicle is not None:
             print("\nVehicle Configuration:")
             
             # Basic settings
-            switch = vehicle.find('.//ipc:switch', ns) if ns else vehicle.find('.//switch')
-            plate_sensitivity = vehicle.find('.//ipc:plateSencitivity', ns) if ns else vehicle.find('.//plateSencitivity')
-            plate_area = vehicle.find('.//ipc:plateSupportArea', ns) if ns else vehicle.find('.//plateSupportArea')
-            fault_tolerance = vehicle.find('.//ipc:faultTolerance', ns) if ns else vehicle.find('.//faultTolerance')
+            switch = doc.find(vehicle, 'switch')
+            plate_sensitivity = doc.find(vehicle, 'plateSencitivity')
+            plate_area = doc.find(vehicle, 'plateSupportArea')
+            fault_tolerance = doc.find(vehicle, 'faultTolerance')
             
             if switch is not None:
                 print(f"Vehicle Detection: {'Enabled' if switch.text.lower() == 'true' else 'Disabled'}")
@@ -1588,76 +1565,76 @@ def print_vehicle_config():
                 print(f"Fault Tolerance: {fault_tolerance.text}")
             
             # Mutex List
-            mutex_list = vehicle.find('.//ipc:mutexList', ns) if ns else vehicle.find('.//mutexList')
+            mutex_list = doc.find(vehicle, 'mutexList')
             if mutex_list is not None:
                 count = mutex_list.get('count', 'unknown')
                 print(f"\nMutex List (count={count}):")
-                items = mutex_list.findall('ipc:item', ns) if ns else mutex_list.findall('item')
+                items = doc.children(mutex_list, 'item')
                 for item in items:
-                    obj = item.find('.//ipc:object', ns) if ns else item.find('.//object')
-                    status = item.find('.//ipc:status', ns) if ns else item.find('.//status')
+                    obj = doc.find(item, 'object')
+                    status = doc.find(item, 'status')
                     if obj is not None and status is not None:
                         print(f"  {obj.text}: {'Enabled' if status.text.lower() == 'true' else 'Disabled'}")
             
             # Region Info
-            region_info = vehicle.find('.//ipc:regionInfo', ns) if ns else vehicle.find('.//regionInfo')
+            region_info = doc.find(vehicle, 'regionInfo')
             if region_info is not None:
                 count = region_info.get('count', 'unknown')
                 max_count = region_info.get('maxCount', 'unknown')
                 print(f"\nDetection Regions (count={count}, max={max_count}):")
-                items = region_info.findall('ipc:item', ns) if ns else region_info.findall('item')
+                items = doc.children(region_info, 'item')
                 for i, item in enumerate(items, 1):
-                    x1 = item.find('.//ipc:X1', ns) if ns else item.find('.//X1')
-                    y1 = item.find('.//ipc:Y1', ns) if ns else item.find('.//Y1')
-                    x2 = item.find('.//ipc:X2', ns) if ns else item.find('.//X2')
-                    y2 = item.find('.//ipc:Y2', ns) if ns else item.find('.//Y2')
+                    x1 = doc.find(item, 'X1')
+                    y1 = doc.find(item, 'Y1')
+                    x2 = doc.find(item, 'X2')
+                    y2 = doc.find(item, 'Y2')
                     if all([x1, y1, x2, y2]):
                         print(f"  Region {i}: ({x1.text}, {y1.text}) to ({x2.text}, {y2.text})")
             
             # Plate Size
-            plate_size = vehicle.find('.//ipc:plateSize', ns) if ns else vehicle.find('.//plateSize')
+            plate_size = doc.find(vehicle, 'plateSize')
             if plate_size is not None:
                 print("\nPlate Size Settings:")
-                items = plate_size.findall('ipc:item', ns) if ns else plate_size.findall('item')
+                items = doc.children(plate_size, 'item')
                 for item in items:
-                    min_width = item.find('.//ipc:MinWidth', ns) if ns else item.find('.//MinWidth')
-                    min_height = item.find('.//ipc:MinHeight', ns) if ns else item.find('.//MinHeight')
-                    max_width = item.find('.//ipc:MaxWidth', ns) if ns else item.find('.//MaxWidth')
-                    max_height = item.find('.//ipc:MaxHeight', ns) if ns else item.find('.//MaxHeight')
+                    min_width = doc.find(item, 'MinWidth')
+                    min_height = doc.find(item, 'MinHeight')
+                    max_width = doc.find(item, 'MaxWidth')
+                    max_height = doc.find(item, 'MaxHeight')
                     if all([min_width, min_height, max_width, max_height]):
                         print(f"  Minimum Size: {min_width.text}x{min_height.text}")
                         print(f"  Maximum Size: {max_width.text}x{max_height.text}")
             
             # Plate Match Settings
-            plate_match = vehicle.find('.//ipc:plateMatch', ns) if ns else vehicle.find('.//plateMatch')
+            plate_match = doc.find(vehicle, 'plateMatch')
             if plate_match is not None:
                 print("\nPlate Match Settings:")
-                items = plate_match.findall('ipc:item', ns) if ns else plate_match.findall('item')
+                items = doc.children(plate_match, 'item')
                 for i, item in enumerate(items, 1):
-                    alarm_list = item.find('.//ipc:alarmList', ns) if ns else item.find('.//alarmList')
-                    trigger_alarm = item.find('.//ipc:triggerAlarmOut', ns) if ns else item.find('.//triggerAlarmOut')
+                    alarm_list = doc.find(item, 'alarmList')
+                    trigger_alarm = doc.find(item, 'triggerAlarmOut')
                     if alarm_list is not None:
                         print(f"\n  Match {i}:")
                         print(f"    Alarm List: {alarm_list.text}")
                         if trigger_alarm is not None:
-                            io = trigger_alarm.find('.//ipc:Io', ns) if ns else trigger_alarm.find('.//Io')
+                            io = doc.find(trigger_alarm, 'Io')
                             if io is not None:
-                                items = io.findall('ipc:item', ns) if ns else io.findall('item')
+                                items = doc.children(io, 'item')
                                 for alarm in items:
-                                    alarm_id = alarm.find('.//ipc:alarmId', ns) if ns else alarm.find('.//alarmId')
-                                    switch = alarm.find('.//ipc:switch', ns) if ns else alarm.find('.//switch')
+                                    alarm_id = doc.find(alarm, 'alarmId')
+                                    switch = doc.find(alarm, 'switch')
                                     if alarm_id is not None and switch is not None:
                                         print(f"    Alarm Output {alarm_id.text}: {'Enabled' if switch.text.lower() == 'true' else 'Disabled'}")
             
             # Trigger Configuration
-            trigger_config = vehicle.find('.//ipc:triggerConfig', ns) if ns else vehicle.find('.//triggerConfig')
+            trigger_config = doc.find(vehicle, 'triggerConfig')
             if trigger_config is not None:
                 print("\nTrigger Configuration:")
                 
                 # Basic settings
-                alarm_hold = trigger_config.find('.//ipc:alarmHoldTime', ns) if ns else trigger_config.find('.//alarmHoldTime')
-                sd_snap = trigger_config.find('.//ipc:sdSnapSwitch', ns) if ns else trigger_config.find('.//sdSnapSwitch')
-                sd_rec = trigger_config.find('.//ipc:sdRecSwitch', ns) if ns else trigger_config.find('.//sdRecSwitch')
+                alarm_hold = doc.find(trigger_config, 'alarmHoldTime')
+                sd_snap = doc.find(trigger_config, 'sdSnapSwitch')
+                sd_rec = doc.find(trigger_config, 'sdRecSwitch')
                 
                 if alarm_hold is not None:
                     print(f"  Alarm Hold Time: {alarm_hold.text} seconds")
@@ -1667,25 +1644,25 @@ def print_vehicle_config():
                     print(f"  SD Recording: {'Enabled' if sd_rec.text.lower() == 'true' else 'Disabled'}")
                 
                 # Alarm Output settings
-                trigger_alarm = trigger_config.find('.//ipc:triggerAlarmOut', ns) if ns else trigger_config.find('.//triggerAlarmOut')
+                trigger_alarm = doc.find(trigger_config, 'triggerAlarmOut')
                 if trigger_alarm is not None:
-                    alarm_list = trigger_alarm.find('.//ipc:alarmOutList', ns) if ns else trigger_alarm.find('.//alarmOutList')
+                    alarm_list = doc.find(trigger_alarm, 'alarmOutList')
                     if alarm_list is not None:
-                        items = alarm_list.findall('ipc:item', ns) if ns else alarm_list.findall('item')
+                        items = doc.children(alarm_list, 'item')
                         for item in items:
-                            alarm_id = item.find('.//ipc:alarmOutId', ns) if ns else item.find('.//alarmOutId')
-                            alarm_switch = item.find('.//ipc:alarmSwitch', ns) if ns else item.find('.//alarmSwitch')
+                            alarm_id = doc.find(item, 'alarmOutId')
+                            alarm_switch = doc.find(item, 'alarmSwitch')
                             if alarm_id is not None and alarm_switch is not None:
                                 print(f"  Alarm Output {alarm_id.text}: {'Enabled' if alarm_switch.text.lower() == 'true' else 'Disabled'}")
                 
                 # Email settings
-                trigger_mail = trigger_config.find('.//ipc:triggerMail', ns) if ns else trigger_config.find('.//triggerMail')
+                trigger_mail = doc.find(trigger_config, 'triggerMail')
                 if trigger_mail is not None:
                     print("\nEmail Settings:")
-                    switch = trigger_mail.find('.//ipc:switch', ns) if ns else trigger_mail.find('.//switch')
-                    subject = trigger_mail.find('.//ipc:subject', ns) if ns else trigger_mail.find('.//subject')
-                    content = trigger_mail.find('.//ipc:content', ns) if ns else trigger_mail.find('.//content')
-                    recv_list = trigger_mail.find('.//ipc:recvList', ns) if ns else trigger_mail.find('.//recvList')
+                    switch = doc.find(trigger_mail, 'switch')
+                    subject = doc.find(trigger_mail, 'subject')
+                    content = doc.find(trigger_mail, 'content')
+                    recv_list = doc.find(trigger_mail, 'recvList')
                     
                     if switch is not None:
                         print(f"  Email Alerts: {'Enabled' if switch.text.lower() == 'true' else 'Disabled'}")
@@ -1698,11 +1675,11 @@ def print_vehicle_config():
                         print(f"  Recipients: {count}")
                 
                 # FTP settings
-                trigger_ftp = trigger_config.find('.//ipc:triggerFtp', ns) if ns else trigger_config.find('.//triggerFtp')
+                trigger_ftp = doc.find(trigger_config, 'triggerFtp')
                 if trigger_ftp is not None:
                     print("\nFTP Settings:")
-                    switch = trigger_ftp.find('.//ipc:switch', ns) if ns else trigger_ftp.find('.//switch')
-                    server_list = trigger_ftp.find('.//ipc:ftpServerList', ns) if ns else trigger_ftp.find('.//ftpServerList')
+                    switch = doc.find(trigger_ftp, 'switch')
+                    server_list = doc.find(trigger_ftp, 'ftpServerList')
                     
                     if switch is not None:
                         print(f"  FTP Upload: {'Enabled' if switch.text.lower() == 'true' else 'Disabled'}")
@@ -1723,7 +1700,7 @@ def print_vehicle_plate():
     try:
         # First test authentication with GetDeviceInfo
         print("Testing authentication...")
-        test_response = requests.post(url_device, headers=headers)
+        test_response = client.post('GetDeviceInfo')
         test_response.raise_for_status()
         print("Authentication successful!")
         
@@ -1754,13 +1731,13 @@ def print_vehicle_plate():
 </config>'''
         
         # Make request with retry logic for authentication
-        url = f"http://{HOST}:{PORT}/GetVehiclePlate/{channel_id}" if channel_id else url_vehicle_plate
+        url = client.url('GetVehiclePlate', channel_id)
         max_retries = 3
         for attempt in range(max_retries):
             try:
                 print(f"\nMaking request to {url}")
                 print("Request headers:")
-                for key, value in headers.items():
+                for key, value in client.headers.items():
                     print(f"{key}: {value}")
                 print("\nRequest body:")
                 print(xml_body)
@@ -1769,7 +1746,7 @@ def print_vehicle_plate():
                 if attempt > 0:
                     time.sleep(1)
                 
-                response = requests.post(url, headers=headers, data=xml_body.encode('utf-8'))
+                response = client.post('GetVehiclePlate', channel_id, data=xml_body)
                 
                 print(f"\nResponse status code: {response.status_code}")
                 print("Response headers:")
@@ -1779,7 +1756,7 @@ def print_vehicle_plate():
                 print(response.content.decode(errors='replace'))
                 
                 # Parse response to check for authentication error
-                root = ET.fromstring(response.content)
+                root = xml_backend.fromstring(response.content)
                 status = root.get('status')
                 error_code = root.get('errorCode')
                 
@@ -1789,7 +1766,7 @@ def print_vehicle_plate():
                             print(f"\nAuthentication error detected. Retry attempt {attempt + 1} of {max_retries}...")
                             # Try to refresh authentication
                             print("Refreshing authentication...")
-                            refresh_response = requests.post(url_device, headers=headers)
+                            refresh_response = client.post('GetDeviceInfo')
                             refresh_response.raise_for_status()
                             print("Authentication refreshed successfully.")
                             continue
@@ -1815,32 +1792,32 @@ def print_vehicle_plate():
                     raise
         
         # Parse response
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
         
         # Get vehicle plates list
-        vehicle_plates = root.find('.//ipc:vehiclePlates', ns) if ns else root.find('.//vehiclePlates')
+        vehicle_plates = doc.find(root, 'vehiclePlates')
         if vehicle_plates is not None:
             count = vehicle_plates.get('count', '0')
             max_count = vehicle_plates.get('maxCount', 'unknown')
             print(f"\nVehicle Plates (count={count}, max={max_count}):")
             
             # Process each plate
-            items = vehicle_plates.findall('ipc:item', ns) if ns else vehicle_plates.findall('item')
+            items = doc.children(vehicle_plates, 'item')
             for i, item in enumerate(items, 1):
                 print(f"\nPlate {i}:")
                 
                 # Get plate details
-                key_id = item.find('.//ipc:keyId', ns) if ns else item.find('.//keyId')
-                plate_number = item.find('.//ipc:carPlateNumber', ns) if ns else item.find('.//carPlateNumber')
-                begin_time = item.find('.//ipc:beginTime', ns) if ns else item.find('.//beginTime')
-                end_time = item.find('.//ipc:endTime', ns) if ns else item.find('.//endTime')
-                plate_color = item.find('.//ipc:carPlateColor', ns) if ns else item.find('.//carPlateColor')
-                plate_type = item.find('.//ipc:carPlateType', ns) if ns else item.find('.//carPlateType')
-                car_type = item.find('.//ipc:carType', ns) if ns else item.find('.//carType')
-                car_owner = item.find('.//ipc:carOwner', ns) if ns else item.find('.//carOwner')
-                car_color = item.find('.//ipc:carColor', ns) if ns else item.find('.//carColor')
-                plate_item_type = item.find('.//ipc:plateItemType', ns) if ns else item.find('.//plateItemType')
+                key_id = doc.find(item, 'keyId')
+                plate_number = doc.find(item, 'carPlateNumber')
+                begin_time = doc.find(item, 'beginTime')
+                end_time = doc.find(item, 'endTime')
+                plate_color = doc.find(item, 'carPlateColor')
+                plate_type = doc.find(item, 'carPlateType')
+                car_type = doc.find(item, 'carType')
+                car_owner = doc.find(item, 'carOwner')
+                car_color = doc.find(item, 'carColor')
+                plate_item_type = doc.find(item, 'plateItemType')
                 
                 if key_id is not None:
                     print(f"  Key ID: {key_id.text}")
@@ -1880,32 +1857,31 @@ def print_cdd_config():
             channel_id = "1"
         
         # Make request
-        url = f"http://{HOST}:{PORT}/GetSmartCddConfig/{channel_id}" if channel_id else url_cdd
-        response = requests.post(url, headers=headers)
+        response = client.post('GetSmartCddConfig', channel_id)
         response.raise_for_status()
         
         # Parse response
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
         
         # Print available types
-        types = root.find('.//ipc:types', ns) if ns else root.find('.//types')
+        types = doc.find(root, 'types')
         if types is not None:
             print("\nAvailable Refresh Frequencies:")
-            frequencies = types.findall('.//ipc:refreshFrequency/ipc:enum', ns) if ns else types.findall('.//refreshFrequency/enum')
+            frequencies = doc.findall(types, 'refreshFrequency/enum')
             for freq in frequencies:
                 print(f"  - {freq.text}ms")
         
         # Print CDD configuration
-        cdd = root.find('.//ipc:cdd', ns) if ns else root.find('.//cdd')
+        cdd = doc.find(root, 'cdd')
         if cdd is not None:
             print("\nCDD Configuration:")
             
             # Basic settings
-            switch = cdd.find('.//ipc:switch', ns) if ns else cdd.find('.//switch')
-            alarm_hold = cdd.find('.//ipc:alarmHoldTime', ns) if ns else cdd.find('.//alarmHoldTime')
-            detect_freq = cdd.find('.//ipc:detectFrequency', ns) if ns else cdd.find('.//detectFrequency')
-            trigger_level = cdd.find('.//ipc:triggerAlarmLevel', ns) if ns else cdd.find('.//triggerAlarmLevel')
+            switch = doc.find(cdd, 'switch')
+            alarm_hold = doc.find(cdd, 'alarmHoldTime')
+            detect_freq = doc.find(cdd, 'detectFrequency')
+            trigger_level = doc.find(cdd, 'triggerAlarmLevel')
             
             if switch is not None:
                 print(f"CDD Enabled: {switch.text}")
@@ -1919,18 +1895,18 @@ def print_cdd_config():
                 print(f"Trigger Alarm Level: {trigger_level.text} (Range: {min_val}-{max_val})")
             
             # Region Info
-            region_info = cdd.find('.//ipc:regionInfo', ns) if ns else cdd.find('.//regionInfo')
+            region_info = doc.find(cdd, 'regionInfo')
             if region_info is not None:
                 count = region_info.get('count', '0')
                 max_count = region_info.get('maxCount', 'unknown')
                 print(f"\nDetection Regions (count={count}, max={max_count}):")
                 
-                items = region_info.findall('ipc:item', ns) if ns else region_info.findall('item')
+                items = doc.children(region_info, 'item')
                 for i, item in enumerate(items, 1):
-                    x1 = item.find('.//ipc:X1', ns) if ns else item.find('.//X1')
-                    y1 = item.find('.//ipc:Y1', ns) if ns else item.find('.//Y1')
-                    x2 = item.find('.//ipc:X2', ns) if ns else item.find('.//X2')
-                    y2 = item.find('.//ipc:Y2', ns) if ns else item.find('.//Y2')
+                    x1 = doc.find(item, 'X1')
+                    y1 = doc.find(item, 'Y1')
+                    x2 = doc.find(item, 'X2')
+                    y2 = doc.find(item, 'Y2')
                     
                     if all([x1, y1, x2, y2]):
                         print(f"\n  Region {i}:")
@@ -1955,36 +1931,35 @@ def print_cpc_config():
             channel_id = "1"
         
         # Make request
-        url = f"http://{HOST}:{PORT}/GetSmartCpcConfig/{channel_id}" if channel_id else url_cpc
-        response = requests.post(url, headers=headers)
+        response = client.post('GetSmartCpcConfig', channel_id)
         response.raise_for_status()
         
         # Parse response
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
         
         # Print available types
-        types = root.find('.//ipc:types', ns) if ns else root.find('.//types')
+        types = doc.find(root, 'types')
         if types is not None:
             print("\nAvailable Statistical Periods:")
-            periods = types.findall('.//ipc:statisticalPeriod/ipc:enum', ns) if ns else types.findall('.//statisticalPeriod/enum')
+            periods = doc.findall(types, 'statisticalPeriod/enum')
             for period in periods:
                 print(f"  - {period.text}")
         
         # Print CPC configuration
-        cpc = root.find('.//ipc:cpc', ns) if ns else root.find('.//cpc')
+        cpc = doc.find(root, 'cpc')
         if cpc is not None:
             print("\nCPC Configuration:")
             
             # Basic settings
-            switch = cpc.find('.//ipc:switch', ns) if ns else cpc.find('.//switch')
-            alarm_hold = cpc.find('.//ipc:alarmHoldTime', ns) if ns else cpc.find('.//alarmHoldTime')
-            detect_sensitivity = cpc.find('.//ipc:detectSensitivity', ns) if ns else cpc.find('.//detectSensitivity')
-            cross_in = cpc.find('.//ipc:crossInThreshold', ns) if ns else cpc.find('.//crossInThreshold')
-            cross_out = cpc.find('.//ipc:crossOutThreshold', ns) if ns else cpc.find('.//crossOutThreshold')
-            two_way_diff = cpc.find('.//ipc:twoWayDiffThreshold', ns) if ns else cpc.find('.//twoWayDiffThreshold')
-            force_reset = cpc.find('.//ipc:forceReset', ns) if ns else cpc.find('.//forceReset')
-            stat_period = cpc.find('.//ipc:statisticalPeriod', ns) if ns else cpc.find('.//statisticalPeriod')
+            switch = doc.find(cpc, 'switch')
+            alarm_hold = doc.find(cpc, 'alarmHoldTime')
+            detect_sensitivity = doc.find(cpc, 'detectSensitivity')
+            cross_in = doc.find(cpc, 'crossInThreshold')
+            cross_out = doc.find(cpc, 'crossOutThreshold')
+            two_way_diff = doc.find(cpc, 'twoWayDiffThreshold')
+            force_reset = doc.find(cpc, 'forceReset')
+            stat_period = doc.find(cpc, 'statisticalPeriod')
             
             if switch is not None:
                 print(f"CPC Enabled: {switch.text}")
@@ -2012,18 +1987,18 @@ def print_cpc_config():
                 print(f"Statistical Period: {stat_period.text}")
             
             # Region Info
-            region_info = cpc.find('.//ipc:regionInfo', ns) if ns else cpc.find('.//regionInfo')
+            region_info = doc.find(cpc, 'regionInfo')
             if region_info is not None:
                 count = region_info.get('count', '0')
                 max_count = region_info.get('maxCount', 'unknown')
                 print(f"\nDetection Regions (count={count}, max={max_count}):")
                 
-                items = region_info.findall('ipc:item', ns) if ns else region_info.findall('item')
+                items = doc.children(region_info, 'item')
                 for i, item in enumerate(items, 1):
-                    x1 = item.find('.//ipc:X1', ns) if ns else item.find('.//X1')
-                    y1 = item.find('.//ipc:Y1', ns) if ns else item.find('.//Y1')
-                    x2 = item.find('.//ipc:X2', ns) if ns else item.find('.//X2')
-                    y2 = item.find('.//ipc:Y2', ns) if ns else item.find('.//Y2')
+                    x1 = doc.find(item, 'X1')
+                    y1 = doc.find(item, 'Y1')
+                    x2 = doc.find(item, 'X2')
+                    y2 = doc.find(item, 'Y2')
                     
                     if all([x1, y1, x2, y2]):
                         print(f"\n  Region {i}:")
@@ -2032,18 +2007,18 @@ def print_cpc_config():
                         print("    Note: Coordinates represent diagonal points of the rectangle")
             
             # Direction Info
-            direction_info = cpc.find('.//ipc:directionInfo', ns) if ns else cpc.find('.//directionInfo')
+            direction_info = doc.find(cpc, 'directionInfo')
             if direction_info is not None:
                 count = direction_info.get('count', '0')
                 max_count = direction_info.get('maxCount', 'unknown')
                 print(f"\nDirection Lines (count={count}, max={max_count}):")
                 
-                items = direction_info.findall('ipc:item', ns) if ns else direction_info.findall('item')
+                items = doc.children(direction_info, 'item')
                 for i, item in enumerate(items, 1):
-                    start_x = item.find('.//ipc:startX', ns) if ns else item.find('.//startX')
-                    start_y = item.find('.//ipc:startY', ns) if ns else item.find('.//startY')
-                    end_x = item.find('.//ipc:endX', ns) if ns else item.find('.//endX')
-                    end_y = item.find('.//ipc:endY', ns) if ns else item.find('.//endY')
+                    start_x = doc.find(item, 'startX')
+                    start_y = doc.find(item, 'startY')
+                    end_x = doc.find(item, 'endX')
+                    end_y = doc.find(item, 'endY')
                     
                     if all([start_x, start_y, end_x, end_y]):
                         print(f"\n  Line {i}:")
@@ -2067,42 +2042,41 @@ def print_subscription_config():
             channel_id = "0"
         
         # Make request
-        url = f"http://{HOST}:{PORT}/GetSubscriptionConfig/{channel_id}" if channel_id else url_subscription
-        response = requests.post(url, headers=headers)
+        response = client.post('GetSubscriptionConfig', channel_id)
         response.raise_for_status()
         
         # Parse response
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
         
         # Print available types
-        types = root.find('.//ipc:types', ns) if ns else root.find('.//types')
+        types = doc.find(root, 'types')
         if types is not None:
             # Print Open Alarm Objects
-            alarm_objs = types.findall('.//ipc:openAlramObj/ipc:enum', ns) if ns else types.findall('.//openAlramObj/enum')
+            alarm_objs = doc.findall(types, 'openAlramObj/enum')
             if alarm_objs:
                 print("\nAvailable Alarm Objects:")
                 for obj in alarm_objs:
                     print(f"  - {obj.text}")
             
             # Print Subscribe Relations
-            relations = types.findall('.//ipc:subscribeRelation/ipc:enum', ns) if ns else types.findall('.//subscribeRelation/enum')
+            relations = doc.findall(types, 'subscribeRelation/enum')
             if relations:
                 print("\nAvailable Subscribe Relations:")
                 for rel in relations:
                     print(f"  - {rel.text}")
             
             # Print Subscribe Types
-            sub_types = types.findall('.//ipc:subscribeTypes/ipc:enum', ns) if ns else types.findall('.//subscribeTypes/enum')
+            sub_types = doc.findall(types, 'subscribeTypes/enum')
             if sub_types:
                 print("\nAvailable Subscribe Types:")
                 for st in sub_types:
                     print(f"  - {st.text}")
         
         # Print current configuration
-        channel_id = root.find('.//ipc:channelID', ns) if ns else root.find('.//channelID')
-        init_term_time = root.find('.//ipc:initTermTime', ns) if ns else root.find('.//initTermTime')
-        subscribe_flag = root.find('.//ipc:subscribeFlag', ns) if ns else root.find('.//subscribeFlag')
+        channel_id = doc.find(root, 'channelID')
+        init_term_time = doc.find(root, 'initTermTime')
+        subscribe_flag = doc.find(root, 'subscribeFlag')
         
         print("\nCurrent Configuration:")
         if channel_id is not None:
@@ -2113,15 +2087,15 @@ def print_subscription_config():
             print(f"Subscribe Flag: {subscribe_flag.text}")
         
         # Print subscription list
-        subscribe_list = root.find('.//ipc:subscribeList', ns) if ns else root.find('.//subscribeList')
+        subscribe_list = doc.find(root, 'subscribeList')
         if subscribe_list is not None:
             count = subscribe_list.get('count', '0')
             print(f"\nActive Subscriptions (count={count}):")
             
-            items = subscribe_list.findall('ipc:item', ns) if ns else subscribe_list.findall('item')
+            items = doc.children(subscribe_list, 'item')
             for i, item in enumerate(items, 1):
-                smart_type = item.find('.//ipc:smartType', ns) if ns else item.find('.//smartType')
-                subscribe_relation = item.find('.//ipc:subscribeRelation', ns) if ns else item.find('.//subscribeRelation')
+                smart_type = doc.find(item, 'smartType')
+                subscribe_relation = doc.find(item, 'subscribeRelation')
                 
                 print(f"\n  Subscription {i}:")
                 if smart_type is not None:
@@ -2143,16 +2117,15 @@ def print_vehicle_plate_progress():
             channel_id = "1"
         
         # Make request
-        url = f"http://{HOST}:{PORT}/GetVehiclePlateProgress/{channel_id}" if channel_id else url_vehicle_plate_progress
-        response = requests.post(url, headers=headers)
+        response = client.post('GetVehiclePlateProgress', channel_id)
         response.raise_for_status()
         
         # Parse response
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
         
         # Get progress
-        vehicle_plates_reply = root.find('.//ipc:vehiclePlatesReply', ns) if ns else root.find('.//vehiclePlatesReply')
+        vehicle_plates_reply = doc.find(root, 'vehiclePlatesReply')
         if vehicle_plates_reply is not None:
             progress_value = int(vehicle_plates_reply.text)
             progress_percentage = progress_value / 100
@@ -2206,16 +2179,15 @@ def add_vehicle_plate():
 </config>'''
         
         # Make request
-        url = f"http://{HOST}:{PORT}/AddVehiclePlate/{channel_id}" if channel_id else url_add_vehicle_plate
-        response = requests.post(url, headers=headers, data=xml_body.encode('utf-8'))
+        response = client.post('AddVehiclePlate', channel_id, data=xml_body)
         response.raise_for_status()
         
         # Parse response
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
         
         # Check response
-        vehicle_plates_reply = root.find('.//ipc:vehiclePlatesReply', ns) if ns else root.find('.//vehiclePlatesReply')
+        vehicle_plates_reply = doc.find(root, 'vehiclePlatesReply')
         if vehicle_plates_reply is not None:
             count = vehicle_plates_reply.get('count', '0')
             if count == '0':
@@ -2223,7 +2195,7 @@ def add_vehicle_plate():
             else:
                 print(f"\nWarning: {count} vehicle plates failed to be added.")
                 # Print failed items if any
-                items = vehicle_plates_reply.findall('ipc:item', ns) if ns else vehicle_plates_reply.findall('item')
+                items = doc.children(vehicle_plates_reply, 'item')
                 for item in items:
                     print(f"Failed to add plate: {item.text}")
         else:
@@ -2298,66 +2270,37 @@ def get_user_choice():
 
 def get_all_info():
     print("\n=== Retrieving All Device Information ===")
-    print_device_info()
-    print_disk_info()
-    print_device_detail()
-    print_date_time()
-    print_stream_caps()
-    print_image_config()
-    print_snapshot()
-    print_snapshot_by_time()
-    print_video_stream_config()
-    print_image_osd_config()
-    print_privacy_mask_config()
-    print_ptz_caps()
-    print_motion_config()
-    print_alarm_trigger_config()
-    print_net_basic_config()
-    print_vfd_config()
-    print_perimeter_config()
-    print_vehicle_config()
-    print_vehicle_plate()
-    print_vehicle_plate_progress()
-    add_vehicle_plate()
-    print_cdd_config()
-    print_cpc_config()
-    print_subscription_config()
+    channel_id = input("Enter channel ID (default 1): ").strip()
+    if not channel_id:
+        channel_id = "1"
+    
+    # Every read-only endpoint is fetched concurrently; nothing is changed on the device
+    snapshot = collect_snapshot(client, channel_id, capabilities=capabilities, support=endpoint_support)
+    print_snapshot_summary(snapshot)
+    
+    output_file = default_snapshot_filename(snapshot)
+    save_snapshot(snapshot, output_file)
+    print(f"\nFull snapshot saved to: {output_file}")
+    print_connection_stats()
     print("\n=== All Information Retrieved ===")
 
+def print_connection_stats():
+    stats = client.connection_stats()
+    print(f"\nConnection reuse for {HOST}:{PORT}:")
+    print(f"  Requests sent: {stats['requests']}")
+    print(f"  Connections opened: {stats['connections_opened']}")
+    print(f"  Connections reused: {stats['connections_reused']} ({stats['reuse_ratio']:.0%})")
+
 def change_camera_connection():
-    global HOST, PORT, USERNAME, PASSWORD
-    global url_device, url_disk, url_detail, url_time, url_stream, url_image
-    global url_privacy_mask, url_ptz_caps, url_ptz_control, url_motion, url_alarm_trigger
-    global url_net_basic, url_reboot, url_vfd, url_perimeter, url_vehicle
-    global url_vehicle_plate, url_cdd, url_cpc, url_subscription
-    global url_vehicle_plate_progress, url_add_vehicle_plate
+    global HOST, PORT, USERNAME, PASSWORD, client
     
     print("\n=== Change Camera Connection ===")
+    print_connection_stats()
+    client.close()
     HOST, PORT, USERNAME, PASSWORD = get_device_config()
     
-    # Rebuild URLs with new connection
-    url_device = f"http://{HOST}:{PORT}/GetDeviceInfo"
-    url_disk = f"http://{HOST}:{PORT}/GetDiskInfo"
-    url_detail = f"http://{HOST}:{PORT}/GetDeviceDetail"
-    url_time = f"http://{HOST}:{PORT}/GetDateAndTime"
-    url_stream = f"http://{HOST}:{PORT}/GetStreamCaps"
-    url_image = f"http://{HOST}:{PORT}/GetImageConfig"
-    url_privacy_mask = f"http://{HOST}:{PORT}/GetPrivacyMaskConfig"
-    url_ptz_caps = f"http://{HOST}:{PORT}/PtzGetCaps"
-    url_ptz_control = f"http://{HOST}:{PORT}/PtzControl"
-    url_motion = f"http://{HOST}:{PORT}/GetMotionConfig"
-    url_alarm_trigger = f"http://{HOST}:{PORT}/GetAlarmTriggerConfig"
-    url_net_basic = f"http://{HOST}:{PORT}/GetNetBasicConfig"
-    url_reboot = f"http://{HOST}:{PORT}/Reboot"
-    url_vfd = f"http://{HOST}:{PORT}/GetSmartVfdConfig"
-    url_perimeter = f"http://{HOST}:{PORT}/GetSmartPerimeterConfig"
-    url_vehicle = f"http://{HOST}:{PORT}/GetSmartVehicleConfig"
-    url_vehicle_plate = f"http://{HOST}:{PORT}/GetVehiclePlate"
-    url_cdd = f"http://{HOST}:{PORT}/GetSmartCddConfig"
-    url_cpc = f"http://{HOST}:{PORT}/GetSmartCpcConfig"
-    url_subscription = f"http://{HOST}:{PORT}/GetSubscriptionConfig"
-    url_vehicle_plate_progress = f"http://{HOST}:{PORT}/GetVehiclePlateProgress"
-    url_add_vehicle_plate = f"http://{HOST}:{PORT}/AddVehiclePlate"
+    # Open a new pooled client for the new connection
+    client = CameraClient(HOST, PORT, USERNAME, PASSWORD)
     
     print(f"\nSuccessfully changed connection to: {HOST}:{PORT}")
     print("=" * 50)
@@ -2368,6 +2311,8 @@ def main():
         choice = get_user_choice()
         
         if choice == 0:
+            print_connection_stats()
+            client.close()
             print("\nExiting program. Goodbye!")
             break
         elif choice == 1:
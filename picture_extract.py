@@ -0,0 +1,117 @@
+"""
+Picture Extraction
+==================
+
+SearchSnapVehicleByKey responses carry the snapshot as a few hundred KB of
+base64 text in <pictureData>. Instead of letting the XML parser turn that
+text into a str (then bytes, then another copy in the archive), this module
+finds the pictureData span in the raw response buffer and decodes it in
+fixed-size chunks straight into a file, archive member or any writable
+object. The rest of the response, with the picture cut out, is small and
+cheap to parse.
+
+    stripped, picture = split_picture(response.content)
+    success, details = parse_vehicle_details(stripped)
+    with open("snap.jpg", "wb") as f:
+        picture.write_to(f)
+"""
+
+import binascii
+import re
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+PICTURE_START = re.compile(rb'<(?:[\w.-]+:)?pictureData\b[^>]*?(/?)>')
+CDATA_START = b'<![CDATA['
+CDATA_END = b']]>'
+WHITESPACE = b' \t\r\n'
+
+class PictureSpan:
+    """The base64 pictureData text of a response, located but not copied"""
+    __slots__ = ('buffer', 'start', 'end')
+
+    def __init__(self, buffer, start, end):
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def from_text(cls, text):
+        """Wrap base64 picture text that is already in memory (e.g. from a cache)"""
+        if isinstance(text, str):
+            text = text.encode('ascii')
+        return cls(text, 0, len(text))
+
+    def __len__(self):
+        """Length of the base64 text"""
+        return self.end - self.start
+
+    def iter_decoded(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Yield the decoded picture in chunks of about chunk_size * 3 / 4 bytes"""
+        view = memoryview(self.buffer)[self.start:self.end]
+        carry = b''
+        for offset in range(0, len(view), chunk_size):
+            # Drop line-wrapping whitespace and decode whole 4-character groups
+            chunk = carry + view[offset:offset + chunk_size].tobytes().translate(None, WHITESPACE)
+            usable = len(chunk) - len(chunk) % 4
+            carry = chunk[usable:]
+            if usable:
+                yield binascii.a2b_base64(chunk[:usable])
+        if carry:
+            yield binascii.a2b_base64(carry + b'=' * (-len(carry) % 4))
+
+    def write_to(self, out, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Decode the picture into a writable binary file object; returns bytes written"""
+        written = 0
+        for data in self.iter_decoded(chunk_size):
+            out.write(data)
+            written += len(data)
+        return written
+
+    def save(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Decode the picture into a file at path; returns bytes written"""
+        with open(path, 'wb') as out:
+            return self.write_to(out, chunk_size)
+
+    def text(self):
+        """The base64 text as a str, for callers that need the old pictureData value"""
+        return self.buffer[self.start:self.end].decode('ascii')
+
+def find_picture(content):
+    """Locate the pictureData text in a response; returns a PictureSpan or None"""
+    match = PICTURE_START.search(content)
+    if match is None or match.group(1):
+        return None
+    start = match.end()
+    # base64 never contains '<', so the next tag closes the element
+    end = content.find(b'<', start)
+    if end < 0:
+        return None
+    if content.startswith(CDATA_START, end):
+        start = end + len(CDATA_START)
+        end = content.find(CDATA_END, start)
+        if end < 0:
+            return None
+    if end == start:
+        return None
+    return PictureSpan(content, start, end)
+
+def split_picture(content):
+    """Cut the pictureData text out of a response
+
+    Returns (content without the picture text, PictureSpan or None). The
+    pictureData element itself is kept, empty, so the rest of the response
+    parses as before.
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    picture = find_picture(content)
+    if picture is None:
+        return content, None
+
+    # Drop a surrounding CDATA section along with the text
+    start, end = picture.start, picture.end
+    if content.endswith(CDATA_START, 0, start):
+        start -= len(CDATA_START)
+        end += len(CDATA_END)
+    return content[:start] + content[end:], picture
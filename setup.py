@@ -8,6 +8,12 @@ setup(
         "ctypes",
     ],
     extras_require={
+        'analytics': [
+            'numpy>=1.17',
+        ],
+        'fast': [
+            'lxml>=4.6',
+        ],
         'dev': [
             'pytest>=6.0',
             'pytest-cov>=2.0',
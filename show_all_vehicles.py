@@ -3,11 +3,14 @@
 Show All Vehicles Script
 ========================
 
-A simple script to show all vehicles found in the last one hour, sorted by time.
+A simple script to show all vehicles found in the last one hour, sorted by time,
+then optionally follow new vehicles live from the camera's VEHICE events.
 """
 
 import datetime
 from vehicle_recognition import VehicleRecognition
+from sighting_cache import SightingCache
+from vehicle_capture_pipeline import follow_live
 
 def show_all_vehicles():
     """Show all vehicles found in the last one hour, sorted by time"""
@@ -25,7 +28,7 @@ def show_all_vehicles():
     
     # Initialize the system
     try:
-        vehicle_system = VehicleRecognition(HOST, PORT, USERNAME, PASSWORD)
+        vehicle_system = VehicleRecognition(HOST, PORT, USERNAME, PASSWORD, cache=SightingCache())
         print("✅ Connected successfully!")
     except Exception as e:
         print(f"❌ Connection failed: {e}")
@@ -48,15 +51,13 @@ def show_all_vehicles():
         
         if data['count'] > 0:
             # Sort vehicles by snap time (most recent first)
-            sorted_vehicles = sorted(data['vehicles'], 
-                                   key=lambda x: int(x['snapTime']), 
-                                   reverse=True)
+            sorted_vehicles = data['vehicles'].sorted_by_time(reverse=True)
             
             print(f"\n📋 All {data['count']} vehicles (sorted by time, most recent first):")
             print("-" * 60)
             
             for i, vehicle in enumerate(sorted_vehicles, 1):
-                snap_time = int(vehicle['snapTime'])
+                snap_time = vehicle.snap_time
                 
                 # Convert timestamp to readable time
                 timestamp_seconds = snap_time / 1000000
@@ -99,7 +100,7 @@ def show_all_vehicles():
             
             print(f"\n🎯 Most Recent Vehicle:")
             print(f"   Vehicle ID: {most_recent['vehicleID']}")
-            most_recent_time = datetime.datetime.fromtimestamp(int(most_recent['snapTime']) / 1000000)
+            most_recent_time = datetime.datetime.fromtimestamp(most_recent.snap_time / 1000000)
             print(f"   Time: {most_recent_time.strftime('%Y-%m-%d %H:%M:%S')}")
             
             # Calculate time difference for most recent
@@ -116,6 +117,10 @@ def show_all_vehicles():
             print("ℹ️  No vehicles found in the last hour")
     else:
         print(f"❌ Search failed: {result}")
+    
+    # New vehicles arrive as subscription events; no need to search again
+    if input("\nFollow new vehicles live? (y/n): ").strip().lower() == "y":
+        follow_live(vehicle_system)
 
 if __name__ == "__main__":
     show_all_vehicles() 
\ No newline at end of file
@@ -8,6 +8,8 @@ A script to show vehicles sorted by time, with the most recent first.
 
 import datetime
 from vehicle_recognition import VehicleRecognition
+from sighting_cache import SightingCache
+from vehicle_capture_pipeline import follow_live
 
 def show_recent_vehicles():
     """Show vehicles sorted by time, most recent first"""
@@ -25,7 +27,7 @@ def show_recent_vehicles():
     
     # Initialize the system
     try:
-        vehicle_system = VehicleRecognition(HOST, PORT, USERNAME, PASSWORD)
+        vehicle_system = VehicleRecognition(HOST, PORT, USERNAME, PASSWORD, cache=SightingCache())
         print("✅ Connected successfully!")
     except Exception as e:
         print(f"❌ Connection failed: {e}")
@@ -37,12 +39,16 @@ def show_recent_vehicles():
     print("2. Last 6 hours")
     print("3. Today (full day)")
     print("4. Custom time range")
+    print("5. Live (follow new vehicles as they are captured)")
     
-    choice = input("\nEnter your choice (1-4): ").strip()
+    choice = input("\nEnter your choice (1-5): ").strip()
     
     now = datetime.datetime.now()
     
-    if choice == "1":
+    if choice == "5":
+        follow_live(vehicle_system)
+        return
+    elif choice == "1":
         # Last 1 hour
         start_time = (now - datetime.timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S")
         end_time = now.strftime("%Y-%m-%d %H:%M:%S")
@@ -80,15 +86,13 @@ def show_recent_vehicles():
         
         if data['count'] > 0:
             # Sort vehicles by snap time (most recent first)
-            sorted_vehicles = sorted(data['vehicles'], 
-                                   key=lambda x: int(x['snapTime']), 
-                                   reverse=True)
+            sorted_vehicles = data['vehicles'].sorted_by_time(reverse=True)
             
             print(f"\n📋 Vehicles sorted by time (most recent first):")
             print("-" * 60)
             
             for i, vehicle in enumerate(sorted_vehicles, 1):
-                snap_time = int(vehicle['snapTime'])
+                snap_time = vehicle.snap_time
                 
                 # Convert timestamp to readable time
                 # The timestamp appears to be in microseconds, so divide by 1000000
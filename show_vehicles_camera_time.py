@@ -10,8 +10,10 @@ to avoid time synchronization issues.
 import datetime
 import requests
 import base64
-import xml.etree.ElementTree as ET
+from xml_accessor import XmlIndex
 from vehicle_recognition import VehicleRecognition
+from fleet import prompt_for_camera
+from sighting_cache import SightingCache
 
 def get_camera_time(HOST, PORT, USERNAME, PASSWORD):
     """Get the current time from the camera"""
@@ -36,13 +38,13 @@ def get_camera_time(HOST, PORT, USERNAME, PASSWORD):
         response.raise_for_status()
         
         # Parse response
-        root = ET.fromstring(response.content)
-        ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
+        doc = XmlIndex(response.content)
+        root = doc.root
         
         # Get current time from camera
-        sync_info = root.find('.//ipc:synchronizeInfo', ns) if ns else root.find('.//synchronizeInfo')
+        sync_info = doc.find(root, 'synchronizeInfo')
         if sync_info is not None:
-            current_time = sync_info.find('.//ipc:currentTime', ns) if ns else sync_info.find('.//currentTime')
+            current_time = doc.find(sync_info, 'currentTime')
             if current_time is not None:
                 camera_time_str = current_time.text.strip()
                 camera_dt = datetime.datetime.strptime(camera_time_str, "%Y-%m-%d %H:%M:%S")
@@ -59,33 +61,7 @@ def select_camera():
     
     print("📹 Camera Selection")
     print("=" * 20)
-    print("Available cameras:")
-    print("1. Camera 1 - 192.168.60.254")
-    print("2. Camera 2 - 192.168.60.253")
-    print("3. Custom IP address")
-    
-    while True:
-        choice = input("\nSelect camera (1-3): ").strip()
-        
-        if choice == "1":
-            HOST = "192.168.60.254"
-            break
-        elif choice == "2":
-            HOST = "192.168.60.253"
-            break
-        elif choice == "3":
-            HOST = input("Enter custom IP address: ").strip()
-            if HOST:
-                break
-            else:
-                print("Invalid IP address. Please try again.")
-        else:
-            print("Invalid choice. Please enter 1, 2, or 3.")
-    
-    # Get other configuration
-    PORT = input("Enter port (default 80): ").strip() or "80"
-    USERNAME = input("Enter username (default admin): ").strip() or "admin"
-    PASSWORD = input("Enter password (default admin): ").strip() or "admin"
+    HOST, PORT, USERNAME, PASSWORD = prompt_for_camera()
     
     print(f"\n📹 Selected camera: {HOST}:{PORT}")
     print(f"👤 Username: {USERNAME}")
@@ -111,7 +87,7 @@ def show_vehicles_using_camera_time():
     
     # Initialize the system
     try:
-        vehicle_system = VehicleRecognition(HOST, PORT, USERNAME, PASSWORD)
+        vehicle_system = VehicleRecognition(HOST, PORT, USERNAME, PASSWORD, cache=SightingCache())
         print("✅ Connected successfully!")
     except Exception as e:
         print(f"❌ Connection failed: {e}")
@@ -170,15 +146,13 @@ def show_vehicles_using_camera_time():
         
         if data['count'] > 0:
             # Sort vehicles by snap time (most recent first)
-            sorted_vehicles = sorted(data['vehicles'], 
-                                   key=lambda x: int(x['snapTime']), 
-                                   reverse=True)
+            sorted_vehicles = data['vehicles'].sorted_by_time(reverse=True)
             
             print(f"\n📋 Vehicles sorted by time (most recent first):")
             print("-" * 60)
             
             for i, vehicle in enumerate(sorted_vehicles, 1):
-                snap_time = int(vehicle['snapTime'])
+                snap_time = vehicle.snap_time
                 
                 # Convert timestamp to readable time
                 timestamp_seconds = snap_time / 1000000
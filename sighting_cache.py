@@ -0,0 +1,152 @@
+"""
+Sighting Detail Cache
+=====================
+
+An on-disk SQLite cache of SearchSnapVehicleByKey results. A capture record
+never changes once the camera has written it, so details are cached forever
+per (camera, vehicleID, snapTime). Picture data is large, so it is stored
+in a separate table and evicted least-recently-used once the total size
+passes a byte budget.
+
+Example:
+    cache = SightingCache("sighting_cache.db")
+    vehicle_system = VehicleRecognition(host, port, username, password, cache=cache)
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = "sighting_cache.db"
+DEFAULT_MAX_PICTURE_BYTES = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sightings (
+    camera TEXT NOT NULL,
+    vehicle_id TEXT NOT NULL,
+    snap_time TEXT NOT NULL,
+    details TEXT NOT NULL,
+    PRIMARY KEY (camera, vehicle_id, snap_time)
+);
+CREATE TABLE IF NOT EXISTS pictures (
+    camera TEXT NOT NULL,
+    vehicle_id TEXT NOT NULL,
+    snap_time TEXT NOT NULL,
+    data TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (camera, vehicle_id, snap_time)
+);
+CREATE INDEX IF NOT EXISTS pictures_last_used ON pictures (last_used);
+"""
+
+class SightingCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_picture_bytes=DEFAULT_MAX_PICTURE_BYTES):
+        self.path = path
+        self.max_picture_bytes = max_picture_bytes
+        self.hits = 0
+        self.misses = 0
+
+        # One connection shared by every worker thread, serialized by a lock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._picture_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pictures").fetchone()[0]
+
+    def get(self, camera, vehicle_id, snap_time, with_picture=False):
+        """Return cached details, or None if they (or the picture) are not cached"""
+        key = (camera, str(vehicle_id), str(snap_time))
+        with self._lock:
+            row = self._db.execute(
+                "SELECT details FROM sightings WHERE camera = ? AND vehicle_id = ? AND snap_time = ?", key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            details = json.loads(row[0])
+            if with_picture:
+                picture = self._db.execute(
+                    "SELECT data FROM pictures WHERE camera = ? AND vehicle_id = ? AND snap_time = ?", key
+                ).fetchone()
+                if picture is None:
+                    self.misses += 1
+                    return None
+                details['pictureData'] = picture[0]
+                self._db.execute(
+                    "UPDATE pictures SET last_used = ? WHERE camera = ? AND vehicle_id = ? AND snap_time = ?",
+                    (time.time(),) + key
+                )
+                self._db.commit()
+
+            self.hits += 1
+            return details
+
+    def put(self, camera, vehicle_id, snap_time, details):
+        """Store details, keeping any picture within the byte budget"""
+        key = (camera, str(vehicle_id), str(snap_time))
+        record = {field: value for field, value in details.items() if field != 'pictureData'}
+        picture = details.get('pictureData')
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sightings (camera, vehicle_id, snap_time, details) VALUES (?, ?, ?, ?)",
+                key + (json.dumps(record),)
+            )
+            if picture and len(picture) <= self.max_picture_bytes:
+                previous = self._db.execute(
+                    "SELECT size FROM pictures WHERE camera = ? AND vehicle_id = ? AND snap_time = ?", key
+                ).fetchone()
+                if previous is not None:
+                    self._picture_bytes -= previous[0]
+                self._db.execute(
+                    "INSERT OR REPLACE INTO pictures (camera, vehicle_id, snap_time, data, size, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    key + (picture, len(picture), time.time())
+                )
+                self._picture_bytes += len(picture)
+                self._evict_pictures()
+            self._db.commit()
+
+    def _evict_pictures(self):
+        """Drop least-recently-used pictures until the budget is met"""
+        while self._picture_bytes > self.max_picture_bytes:
+            oldest = self._db.execute(
+                "SELECT camera, vehicle_id, snap_time, size FROM pictures ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not oldest:
+                self._picture_bytes = 0
+                break
+            for camera, vehicle_id, snap_time, size in oldest:
+                if self._picture_bytes <= self.max_picture_bytes:
+                    break
+                self._db.execute(
+                    "DELETE FROM pictures WHERE camera = ? AND vehicle_id = ? AND snap_time = ?",
+                    (camera, vehicle_id, snap_time)
+                )
+                self._picture_bytes -= size
+
+    def stats(self):
+        """Report cache size and hit counts"""
+        with self._lock:
+            sightings = self._db.execute("SELECT COUNT(*) FROM sightings").fetchone()[0]
+            pictures = self._db.execute("SELECT COUNT(*) FROM pictures").fetchone()[0]
+            return {
+                'sightings': sightings,
+                'pictures': pictures,
+                'picture_bytes': self._picture_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,190 @@
+"""
+Shared fixtures: a local stub camera speaking the vehicle recognition API
+"""
+
+import base64
+import datetime
+import re
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+NS = "http://www.ipc.com/ver10"
+
+def to_snap_time(time_str):
+    """Convert 'YYYY-MM-DD HH:MM:SS' local time to a microsecond timestamp"""
+    dt = datetime.datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S")
+    return int(time.mktime(dt.timetuple())) * 1000000
+
+def make_vehicles(count, start="2024-01-01 08:00:00", step_seconds=60):
+    """Build a list of fake sightings spaced step_seconds apart"""
+    list_types = ["outOfList", "whiteList", "blackList", "temporaryList"]
+    base = to_snap_time(start)
+    vehicles = []
+    for i in range(count):
+        snap_time = base + i * step_seconds * 1000000
+        vehicles.append({
+            'vehicleID': i + 1,
+            'snapTime': snap_time,
+            'vehiclePlate': f"ABC{i:04d}",
+            'listType': list_types[i % len(list_types)],
+            'color': "white",
+            'picture': f"jpeg-bytes-{i}".encode() * 50,
+        })
+    return vehicles
+
+class StubCamera:
+    def __init__(self, vehicles, max_results=None, delay=0.0, configs=None, pull_wait=0.5):
+        self.vehicles = vehicles
+        self.configs = configs or {}
+        self.pull_wait = pull_wait
+        self.events = []
+        self.subscriptions = {}
+        self.events_ready = threading.Condition()
+        self.max_results = max_results
+        self.delay = delay
+        self.requests = {}
+        self.pictures_sent = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.server = None
+
+    @property
+    def address(self):
+        return self.server.server_address
+
+    def count(self, endpoint):
+        return self.requests.get(endpoint, 0)
+
+    def search(self, body):
+        start = to_snap_time(re.search(r'<starttime[^>]*><!\[CDATA\[(.*?)\]\]>', body).group(1))
+        end = to_snap_time(re.search(r'<endtime[^>]*><!\[CDATA\[(.*?)\]\]>', body).group(1))
+        list_type = re.search(r'<listType[^>]*>(.*?)</listType>', body)
+        matches = [v for v in self.vehicles
+                   if start <= v['snapTime'] <= end + 999999
+                   and (list_type is None or v['listType'] == list_type.group(1))]
+        shown = matches if self.max_results is None else matches[:self.max_results]
+        items = "".join(
+            f"<item><vehicleID type=\"uint32\">{v['vehicleID']}</vehicleID>"
+            f"<snapTime type=\"uint64\">{v['snapTime']}</snapTime></item>"
+            for v in shown
+        )
+        return (f'<?xml version="1.0" encoding="UTF-8"?><config version="1.0" xmlns="{NS}" status="success">'
+                f'<captureVehicleList type="list" count="{len(matches)}">{items}</captureVehicleList></config>')
+
+    def details(self, body):
+        vehicle_id = int(re.search(r'<vehicleID[^>]*>(\d+)</vehicleID>', body).group(1))
+        snap_time = int(re.search(r'<snapTime[^>]*>(\d+)</snapTime>', body).group(1))
+        with_picture = '<requestPanoramicPic type="boolean">true' in body
+        for v in self.vehicles:
+            if v['vehicleID'] == vehicle_id and v['snapTime'] == snap_time:
+                dt = datetime.datetime.fromtimestamp(snap_time / 1000000)
+                picture = ""
+                if with_picture:
+                    self.pictures_sent += 1
+                    picture = f"<pictureData type=\"string\">{base64.b64encode(v['picture']).decode()}</pictureData>"
+                return (f'<?xml version="1.0" encoding="UTF-8"?><config version="1.0" xmlns="{NS}" status="success">'
+                        f'<snapVehicle><snapInfo><time type="string">{dt.strftime("%Y-%m-%d %H:%M:%S")}.123</time>'
+                        f'<vehiclePlate type="string"><![CDATA[{v["vehiclePlate"]}]]></vehiclePlate>'
+                        f'<listType type="listType">{v["listType"]}</listType>'
+                        f'<color type="string">{v["color"]}</color>{picture}</snapInfo></snapVehicle></config>')
+        return f'<?xml version="1.0" encoding="UTF-8"?><config version="1.0" xmlns="{NS}" status="failed" errorCode="3"/>'
+
+    def push_event(self, smart_type, **fields):
+        """Queue an event for the next GetPullMessages"""
+        item = f"<smartType>{smart_type}</smartType><subscribeRelation>ALARM_FEATURE</subscribeRelation>"
+        item += "".join(f"<{tag}>{value}</{tag}>" for tag, value in fields.items())
+        with self.events_ready:
+            self.events.append((smart_type, f"<item>{item}</item>"))
+            self.events_ready.notify_all()
+
+    def subscription(self, endpoint, body):
+        address = re.search(r'<serverAddress[^>]*><!\[CDATA\[(.*?)\]\]>', body)
+        address = address.group(1) if address else None
+        if endpoint == 'SetSubscribe':
+            address = f"/subscription/{len(self.subscriptions) + 1}"
+            self.subscriptions[address] = re.findall(r'<smartType[^>]*>(\w+)</smartType>', body)
+            return (f'<?xml version="1.0" encoding="UTF-8"?><config version="1.0" xmlns="{NS}" status="success">'
+                    f'<serverAddress type="string"><![CDATA[{address}]]></serverAddress></config>')
+        if address not in self.subscriptions:
+            return f'<?xml version="1.0" encoding="UTF-8"?><config version="1.0" xmlns="{NS}" status="failed" errorCode="5"/>'
+        if endpoint == 'SetUnSubscribe':
+            del self.subscriptions[address]
+        items = ""
+        if endpoint == 'GetPullMessages':
+            limit = int(re.search(r'<messageLimit[^>]*>(\d+)</messageLimit>', body).group(1))
+            with self.events_ready:
+                self.events_ready.wait_for(lambda: self.events, self.pull_wait)
+                wanted = self.subscriptions[address]
+                sent = [event for event in self.events if event[0] in wanted][:limit]
+                self.events = [event for event in self.events if event not in sent]
+            items = f'<messageList type="list" count="{len(sent)}">' + "".join(item for _, item in sent) + '</messageList>'
+        return f'<?xml version="1.0" encoding="UTF-8"?><config version="1.0" xmlns="{NS}" status="success">{items}</config>'
+
+    def handle(self, endpoint, body):
+        if endpoint == 'GetSdCardStatus':
+            return (f'<?xml version="1.0" encoding="UTF-8"?><config version="1.0" xmlns="{NS}">'
+                    '<sdCardInfo><status type="string">normal</status></sdCardInfo></config>')
+        if endpoint == 'SearchSnapVehicleByTime':
+            return self.search(body)
+        if endpoint == 'SearchSnapVehicleByKey':
+            return self.details(body)
+        if endpoint in ('SetSubscribe', 'GetPullMessages', 'SetRenew', 'SetUnSubscribe'):
+            return self.subscription(endpoint, body)
+        return self.configs.get(endpoint)
+
+def make_handler(camera):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            endpoint = self.path.strip('/').split('/')[0]
+            length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(length).decode('utf-8')
+            with camera.lock:
+                camera.requests[endpoint] = camera.requests.get(endpoint, 0) + 1
+                camera.in_flight += 1
+                camera.max_in_flight = max(camera.max_in_flight, camera.in_flight)
+            try:
+                if camera.delay:
+                    time.sleep(camera.delay)
+                payload = camera.handle(endpoint, body)
+            finally:
+                with camera.lock:
+                    camera.in_flight -= 1
+
+            if payload is None:
+                data = b'<?xml version="1.0" encoding="utf-8"?><config status="failed" errorCode="1"/>'
+                self.send_response(400)
+            else:
+                data = payload.encode('utf-8')
+                self.send_response(200)
+            self.send_header('Content-Type', 'application/xml')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+@pytest.fixture
+def stub_camera():
+    """Start a stub camera; call the fixture with vehicles and options"""
+    servers = []
+
+    def start(vehicles=None, **options):
+        camera = StubCamera(vehicles if vehicles is not None else make_vehicles(10), **options)
+        camera.server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(camera))
+        camera.server.daemon_threads = True
+        threading.Thread(target=camera.server.serve_forever, daemon=True).start()
+        servers.append(camera.server)
+        return camera
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
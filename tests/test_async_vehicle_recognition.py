@@ -0,0 +1,163 @@
+"""
+Tests for the asyncio vehicle recognition client
+"""
+
+import asyncio
+import pytest
+import zipfile
+from async_camera_client import AsyncCameraClient
+from async_vehicle_recognition import AsyncVehicleRecognition
+from conftest import make_vehicles
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_check_sd_status(stub_camera):
+    """Test SD card status check against the stub camera"""
+    camera = stub_camera()
+    host, port = camera.address
+
+    async def scenario():
+        async with AsyncVehicleRecognition(host, port, "admin", "admin") as system:
+            return await system.check_sd_status()
+
+    assert run(scenario()) == (True, "SD card is ready")
+
+def test_search_and_details(stub_camera):
+    """Test search results and details match the synchronous dict shape"""
+    camera = stub_camera(make_vehicles(5))
+    host, port = camera.address
+
+    async def scenario():
+        async with AsyncVehicleRecognition(host, port, "admin", "admin") as system:
+            success, result = await system.search_vehicles_by_time("2024-01-01 00:00:00", "2024-01-01 23:59:59")
+            assert success
+            first = result['vehicles'][0]
+            details = await system.get_vehicle_details(first['vehicleID'], first['snapTime'], False)
+            return result, details
+
+    result, (success, details) = run(scenario())
+    assert result['count'] == 5
+    assert len(result['vehicles']) == 5
+    assert success
+    assert details['vehiclePlate'] == "ABC0000"
+    assert 'pictureData' not in details
+
+def test_concurrency_cap_per_camera(stub_camera):
+    """Test that in-flight requests never exceed the per-camera cap"""
+    camera = stub_camera(make_vehicles(20), delay=0.02)
+    host, port = camera.address
+
+    async def scenario():
+        async with AsyncVehicleRecognition(host, port, "admin", "admin", max_concurrency=3) as system:
+            success, result = await system.get_vehicle_statistics("2024-01-01 00:00:00", "2024-01-01 23:59:59")
+            return success, result, system.client.connection_stats()
+
+    success, stats, connections = run(scenario())
+    assert success
+    assert stats['total_vehicles'] == 20
+    assert sum(stats['list_types'].values()) == 20
+    assert camera.max_in_flight <= 3
+    assert connections['connections_opened'] <= 3
+
+def test_many_cameras_one_loop(stub_camera):
+    """Test searching several cameras concurrently on one event loop"""
+    cameras = [stub_camera(make_vehicles(3 + i)) for i in range(4)]
+
+    async def scenario():
+        systems = [AsyncVehicleRecognition(c.address[0], c.address[1], "admin", "admin") for c in cameras]
+        results = await asyncio.gather(*[
+            s.search_vehicles_by_time("2024-01-01 00:00:00", "2024-01-01 23:59:59") for s in systems
+        ])
+        for s in systems:
+            await s.close()
+        return results
+
+    results = run(scenario())
+    assert [result['count'] for _, result in results] == [3, 4, 5, 6]
+
+def test_export_vehicle_data(stub_camera, tmp_path):
+    """Test exporting to a ZIP archive with images"""
+    camera = stub_camera(make_vehicles(4))
+    host, port = camera.address
+    output_file = str(tmp_path / "export.zip")
+
+    async def scenario():
+        async with AsyncVehicleRecognition(host, port, "admin", "admin") as system:
+            return await system.export_vehicle_data(
+                "2024-01-01 00:00:00", "2024-01-01 23:59:59", output_file=output_file
+            )
+
+    success, message = run(scenario())
+    assert success, message
+    with zipfile.ZipFile(output_file) as archive:
+        names = archive.namelist()
+        csv_text = archive.read("VehicleMatchResult.csv").decode('utf-8-sig')
+    assert len([n for n in names if n.startswith("SnapPic/")]) == 4
+    assert csv_text.splitlines()[1].startswith("1,ABC0000,Stranger Vehicle")
+
+def test_unreachable_camera_returns_error():
+    """Test that connection failures come back as (False, message)"""
+    async def scenario():
+        async with AsyncVehicleRecognition("127.0.0.1", 1, "admin", "admin", timeout=2) as system:
+            return await system.check_sd_status()
+
+    success, message = run(scenario())
+    assert not success
+    assert message.startswith("Error checking SD card status")
+
+async def raw_server(handle):
+    """Start a bare TCP server on a free port and return it with its port"""
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+def test_idle_connection_closed_by_camera_is_skipped():
+    """Test that a pooled connection the camera closed is not written to"""
+    requests = []
+
+    async def handle(reader, writer):
+        # Answer one request with keep-alive framing, then hang up
+        await reader.readuntil(b"\r\n\r\n")
+        requests.append(1)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+        await writer.drain()
+        writer.close()
+
+    async def scenario():
+        server, port = await raw_server(handle)
+        async with server:
+            async with AsyncCameraClient("127.0.0.1", port, "admin", "admin", timeout=2) as client:
+                first = await client.post("API/Test")
+                await asyncio.sleep(0.1)
+                second = await client.post("API/Test")
+                return first, second, client.connection_stats()
+
+    first, second, stats = run(scenario())
+    assert first.content == second.content == b"ok"
+    assert len(requests) == 2
+    assert stats['connections_opened'] == 2
+
+def test_written_request_is_not_resent():
+    """Test that a POST is sent once even if the camera drops the connection"""
+    requests = []
+
+    async def handle(reader, writer):
+        # Read the request on the reused connection, then hang up unanswered
+        await reader.readuntil(b"\r\n\r\n")
+        requests.append(1)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+        await writer.drain()
+        await reader.readuntil(b"\r\n\r\n")
+        requests.append(2)
+        writer.close()
+
+    async def scenario():
+        server, port = await raw_server(handle)
+        async with server:
+            async with AsyncCameraClient("127.0.0.1", port, "admin", "admin", timeout=2) as client:
+                await client.post("API/Test")
+                await client.post("API/Test")
+
+    with pytest.raises((ConnectionError, asyncio.IncompleteReadError)):
+        run(scenario())
+    assert requests == [1, 2]
@@ -0,0 +1,62 @@
+"""
+Tests for the pooled camera HTTP client
+"""
+
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from camera_client import CameraClient, build_headers
+
+class StubCameraHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        body = b'<?xml version="1.0"?><config status="success"/>'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def stub_server():
+    """Start a keep-alive stub camera on a free local port"""
+    server = HTTPServer(('127.0.0.1', 0), StubCameraHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_build_headers():
+    """Test Basic-auth header generation"""
+    headers = build_headers("admin", "admin")
+    assert headers['Authorization'] == 'Basic YWRtaW46YWRtaW4='
+    assert headers['Connection'] == 'Keep-Alive'
+
+def test_url_skips_empty_segments():
+    """Test URL building with optional channel and action segments"""
+    client = CameraClient("192.168.1.100", 80, "admin", "admin")
+    assert client.url('GetDeviceInfo') == "http://192.168.1.100:80/GetDeviceInfo"
+    assert client.url('GetMotionConfig', "1") == "http://192.168.1.100:80/GetMotionConfig/1"
+    assert client.url('PtzControl', "", "Up") == "http://192.168.1.100:80/PtzControl/Up"
+    assert client.url('GetAlarmTriggerConfig', 1, "motion") == "http://192.168.1.100:80/GetAlarmTriggerConfig/1/motion"
+
+def test_connections_are_reused(stub_server):
+    """Test that sequential requests share one pooled connection"""
+    host, port = stub_server.server_address
+    with CameraClient(host, port, "admin", "admin") as client:
+        for _ in range(5):
+            response = client.post('GetDeviceInfo', data='<config/>')
+            response.raise_for_status()
+
+        stats = client.connection_stats()
+        assert stats['requests'] == 5
+        assert stats['connections_opened'] == 1
+        assert stats['connections_reused'] == 4
+        assert stats['reuse_ratio'] == pytest.approx(0.8)
@@ -0,0 +1,89 @@
+"""
+Tests for the model and firmware keyed capability cache
+"""
+
+from camera_client import CameraClient
+from capability_cache import CapabilityCache, device_identity
+from device_snapshot import collect_snapshot
+
+NS = "http://www.ipc.com/ver10"
+
+def device_info(firmware):
+    return (f'<?xml version="1.0" encoding="UTF-8"?><config version="1.0" xmlns="{NS}"><deviceInfo>'
+            f'<deviceName type="string">gate</deviceName><model type="string">IPC-1</model>'
+            f'<softwareVersion type="string">{firmware}</softwareVersion></deviceInfo></config>')
+
+CONFIGS = {
+    'GetDeviceInfo': device_info("1.0"),
+    'GetStreamCaps': (f'<config xmlns="{NS}"><encodeType type="list"><enum>h264</enum><enum>h265</enum>'
+                      '</encodeType></config>'),
+    'GetDeviceDetail': f'<config xmlns="{NS}"><detail><smart><vfd>true</vfd></smart></detail></config>',
+    'GetSmartVfdConfig': (f'<config xmlns="{NS}"><types><mode><enum>a</enum><enum>b</enum></mode></types>'
+                          '<vfd><switch>true</switch></vfd></config>'),
+}
+
+ENDPOINTS = {'GetDeviceInfo', 'GetStreamCaps', 'GetDeviceDetail', 'PtzGetCaps', 'GetSmartVfdConfig'}
+
+def test_device_identity():
+    """Test model and firmware extraction from deviceInfo"""
+    assert device_identity({'deviceInfo': {'model': 'IPC-1', 'firmwareVersion': '1.0'}}) == ('IPC-1', '1.0')
+    assert device_identity({'deviceInfo': {'model': 'TD-9421M', 'softwareVersion': '4.0.0beta1'}}) == ('TD-9421M', '4.0.0beta1')
+    assert device_identity({'deviceInfo': {'model': 'IPC-1'}}) is None
+    assert device_identity(None) is None
+
+def test_capabilities_survive_restart_and_skip_requests(stub_camera, tmp_path):
+    """Test that a second session reuses capabilities without requesting them"""
+    camera = stub_camera([], configs=dict(CONFIGS))
+    path = str(tmp_path / "capabilities.json")
+    with CameraClient(*camera.address, "admin", "admin") as client:
+        first = collect_snapshot(client, endpoints=ENDPOINTS, capabilities=CapabilityCache(path))
+        assert camera.count('GetStreamCaps') == 1
+
+        # A fresh cache object loads the file written by the first session
+        capabilities = CapabilityCache(path)
+        entry = capabilities.get('IPC-1', '1.0')
+        assert set(entry['sections']) == {'GetStreamCaps', 'GetDeviceDetail'}
+        assert entry['types']['GetSmartVfdConfig'] == {'mode': {'enum': ['a', 'b']}}
+
+        second = collect_snapshot(client, endpoints=ENDPOINTS, capabilities=capabilities)
+    assert camera.count('GetStreamCaps') == 1
+    assert camera.count('GetDeviceDetail') == 1
+    # Unsupported endpoints are not cached as capabilities
+    assert camera.count('PtzGetCaps') == 2
+    assert second['sections']['GetStreamCaps']['cached'] is True
+    assert second['sections']['GetStreamCaps']['data'] == first['sections']['GetStreamCaps']['data']
+    assert list(second['sections']) == list(first['sections'])
+
+def test_refresh_requeries_and_replaces_entries(stub_camera, tmp_path):
+    """Test refresh=True queries capabilities again and writes them back once per model"""
+    camera = stub_camera([], configs=dict(CONFIGS))
+    path = str(tmp_path / "capabilities.json")
+    with CameraClient(*camera.address, "admin", "admin") as client:
+        collect_snapshot(client, endpoints=ENDPOINTS, capabilities=CapabilityCache(path))
+        camera.configs['GetStreamCaps'] = f'<config xmlns="{NS}"><encodeType type="list"><enum>h265</enum></encodeType></config>'
+        del camera.configs['GetDeviceDetail']
+
+        capabilities = CapabilityCache(path, refresh=True)
+        refreshed = collect_snapshot(client, endpoints=ENDPOINTS, capabilities=capabilities)
+        again = collect_snapshot(client, endpoints=ENDPOINTS, capabilities=capabilities)
+    assert 'cached' not in refreshed['sections']['GetStreamCaps']
+    assert again['sections']['GetStreamCaps']['cached'] is True
+    assert camera.count('GetStreamCaps') == 2
+    entry = CapabilityCache(path).get('IPC-1', '1.0')
+    assert entry['sections']['GetStreamCaps'] == {'encodeType': {'enum': ['h265']}}
+    # A section the camera no longer returns is not kept from the stale entry
+    assert 'GetDeviceDetail' not in entry['sections']
+
+def test_firmware_change_invalidates(stub_camera, tmp_path):
+    """Test that a new firmware version is queried again and the old entry dropped"""
+    camera = stub_camera([], configs=dict(CONFIGS))
+    capabilities = CapabilityCache(str(tmp_path / "capabilities.json"))
+    with CameraClient(*camera.address, "admin", "admin") as client:
+        collect_snapshot(client, endpoints=ENDPOINTS, capabilities=capabilities)
+        camera.configs['GetDeviceInfo'] = device_info("2.0")
+        snapshot = collect_snapshot(client, endpoints=ENDPOINTS, capabilities=capabilities)
+    assert camera.count('GetStreamCaps') == 2
+    assert 'cached' not in snapshot['sections']['GetStreamCaps']
+    assert capabilities.get('IPC-1', '1.0') is None
+    assert capabilities.get('IPC-1', '2.0') is not None
+    assert capabilities.stats()['devices'] == 1
@@ -0,0 +1,82 @@
+"""
+Tests for the hashed configuration cache and change detection
+"""
+
+from camera_client import CameraClient
+from config_cache import ConfigCache, changed_paths, document_hash, poll_fleet_changes
+from device_snapshot import collect_snapshot
+from fleet import Camera, Fleet
+
+NS = "http://www.ipc.com/ver10"
+
+def motion_config(sensitivity, spacing=""):
+    return (f'<?xml version="1.0" encoding="UTF-8"?><config version="1.0" xmlns="{NS}">{spacing}'
+            f'<motion><switch type="boolean">true</switch>{spacing}'
+            f'<sensitivity type="uint32">{sensitivity}</sensitivity></motion></config>')
+
+def test_changed_paths():
+    """Test that only differing leaves are reported"""
+    old = {'motion': {'switch': 'true', 'area': ['1', '0']}, 'removed': '1'}
+    new = {'motion': {'switch': 'false', 'area': ['1', '1', '0']}, 'added': '2'}
+    assert changed_paths(old, new) == ['motion/switch', 'motion/area/1', 'motion/area/2', 'removed', 'added']
+    assert document_hash({'a': 1, 'b': 2}) == document_hash({'b': 2, 'a': 1})
+
+def test_update_states(tmp_path):
+    """Test new, unchanged, reformatted and changed responses"""
+    with ConfigCache(str(tmp_path / "config.db")) as cache:
+        first = cache.update("cam", "GetMotionConfig", 1, motion_config(5))
+        assert first.state == 'new'
+
+        same = cache.update("cam", "GetMotionConfig", 1, motion_config(5))
+        assert (same.state, same.hash) == ('unchanged', first.hash)
+        assert cache.stats()['hits'] == 1
+
+        # Formatting-only changes are parsed but still unchanged
+        reformatted = cache.update("cam", "GetMotionConfig", "1", motion_config(5, spacing="\n  "))
+        assert reformatted.state == 'unchanged'
+        assert cache.stats()['misses'] == 2
+
+        changed = cache.update("cam", "GetMotionConfig", 1, motion_config(7))
+        assert changed.state == 'changed'
+        assert changed.changed_paths == ['motion/sensitivity']
+        assert cache.get("cam", "GetMotionConfig", 1)['document']['motion']['sensitivity'] == '7'
+
+        failed = cache.update("cam", "PtzGetCaps", 1, f'<config xmlns="{NS}" status="failed" errorCode="4"/>')
+        assert (failed.state, failed.error_code) == ('failed', '4')
+        assert cache.get("cam", "PtzGetCaps", 1) is None
+
+def test_sections_are_kept_per_channel(tmp_path):
+    """Test the same section of two channels is cached and read back separately"""
+    with ConfigCache(str(tmp_path / "config.db")) as cache:
+        cache.update("nvr", "GetMotionConfig", 1, motion_config(5))
+        cache.update("nvr", "GetMotionConfig", 2, motion_config(8))
+        assert cache.channels("nvr") == ['1', '2']
+        assert cache.hashes("nvr", 1) != cache.hashes("nvr", 2)
+        assert cache.documents("nvr", 2)['GetMotionConfig']['motion']['sensitivity'] == '8'
+        assert cache.documents("nvr", 1, {'PtzGetCaps'}) == {}
+
+def test_snapshot_reports_changed_sections(stub_camera, tmp_path):
+    """Test polling a camera twice through the cache"""
+    camera = stub_camera([], configs={'GetMotionConfig': motion_config(5)})
+    endpoints = {'GetMotionConfig', 'GetSmartCddConfig'}
+    with ConfigCache(str(tmp_path / "config.db")) as cache, CameraClient(*camera.address, "admin", "admin") as client:
+        first = collect_snapshot(client, endpoints=endpoints, cache=cache)
+        assert first['sections']['GetMotionConfig']['change'] == 'new'
+        assert first['sections']['GetSmartCddConfig']['status'] == 'failed'
+
+        second = collect_snapshot(client, endpoints=endpoints, cache=cache)
+        assert second['sections']['GetMotionConfig']['change'] == 'unchanged'
+        assert second['sections']['GetMotionConfig']['data'] == first['sections']['GetMotionConfig']['data']
+
+def test_poll_fleet_changes(stub_camera, tmp_path):
+    """Test that a fleet poll only reports cameras whose configuration drifted"""
+    cameras = [stub_camera([], configs={'GetMotionConfig': motion_config(5)}) for _ in range(2)]
+    fleet = Fleet([Camera(f"cam-{i}", *camera.address) for i, camera in enumerate(cameras)])
+    with ConfigCache(str(tmp_path / "config.db")) as cache:
+        changes, errors = poll_fleet_changes(fleet, cache, endpoints={'GetMotionConfig'})
+        assert changes == {'cam-0': {'GetMotionConfig': []}, 'cam-1': {'GetMotionConfig': []}}
+        assert errors == {}
+
+        cameras[1].configs['GetMotionConfig'] = motion_config(9)
+        changes, _ = poll_fleet_changes(fleet, cache, endpoints={'GetMotionConfig'})
+        assert changes == {'cam-1': {'GetMotionConfig': ['motion/sensitivity']}}
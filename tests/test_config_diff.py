@@ -0,0 +1,105 @@
+"""
+Tests for the fleet configuration diff engine
+"""
+
+import json
+from config_cache import ConfigCache
+from config_diff import (
+    ConfigDiff, build_tree, diff_cached_fleet, diff_fleet, diff_trees, format_report, load_template, tree_value
+)
+
+NS = "http://www.ipc.com/ver10"
+
+GOLDEN = {
+    'GetMotionConfig': {'motion': {'switch': 'true', 'sensitivity': '5', 'area': ['1111', '0000']}},
+    'GetSmartCpcConfig': {'cpc': {'switch': 'false'}},
+    'GetDeviceInfo': {'deviceInfo': {'deviceName': 'gate-1'}},
+}
+
+def variant(**changes):
+    documents = json.loads(json.dumps(GOLDEN))
+    for section, document in changes.items():
+        if document is None:
+            del documents[section]
+        else:
+            documents[section] = document
+    return documents
+
+def test_diff_trees_skips_equal_subtrees():
+    """Test field-level differences, including added and missing fields"""
+    expected = build_tree({'a': {'x': '1', 'y': ['1', '2']}, 'b': '1'})
+    actual = build_tree({'b': '1', 'a': {'x': '2', 'y': ['1', '2', '3']}, 'c': '4'})
+    assert list(diff_trees(expected, actual)) == [
+        ('a/x', '1', '2'), ('a/y/2', None, '3'), ('c', None, '4')
+    ]
+    # Key order does not change a node's hash
+    assert build_tree({'a': '1', 'b': '2'}).hash == build_tree({'b': '2', 'a': '1'}).hash
+
+def test_tree_value_keeps_empty_lists():
+    """Test empty lists and dicts round-trip and differ from each other"""
+    document = {'list': [], 'dict': {}, 'items': [{'id': '1'}], 'value': ''}
+    assert tree_value(build_tree(document)) == document
+    assert list(diff_trees(build_tree({'area': []}), build_tree({'area': {}}))) == [('area', [], {})]
+
+def test_diff_fleet_groups_by_endpoint():
+    """Test a fleet report against a golden configuration"""
+    motion = {'motion': {'switch': 'true', 'sensitivity': '8', 'area': ['1111', '0000']}}
+    cameras = {
+        'cam-1': variant(GetDeviceInfo={'deviceInfo': {'deviceName': 'cam-1'}}),
+        'cam-2': variant(GetMotionConfig=motion),
+        'cam-3': variant(GetMotionConfig=motion, GetSmartCpcConfig=None),
+    }
+    report = diff_fleet(GOLDEN, cameras)
+    assert list(report) == ['GetMotionConfig', 'GetSmartCpcConfig']
+    assert report['GetMotionConfig'] == {
+        'cam-2': [('motion/sensitivity', '5', '8')],
+        'cam-3': [('motion/sensitivity', '5', '8')],
+    }
+    assert report['GetSmartCpcConfig'] == {'cam-3': [('', {'cpc': {'switch': 'false'}}, None)]}
+    text = format_report(report)
+    assert "cam-2: motion/sensitivity: expected '5', found '8'" in text
+
+def test_compare_only_loads_differing_sections():
+    """Test that sections with the golden hash are never looked at"""
+    engine = ConfigDiff(GOLDEN)
+    hashes = dict(engine.golden_hashes)
+    assert engine.compare({}, hashes) == {}
+
+def test_diff_cached_fleet(tmp_path):
+    """Test diffing cameras straight from the configuration cache"""
+    def response(sensitivity):
+        return (f'<config xmlns="{NS}"><motion><switch>true</switch>'
+                f'<sensitivity>{sensitivity}</sensitivity></motion></config>')
+
+    with ConfigCache(str(tmp_path / "config.db")) as cache:
+        for camera, sensitivity in (("golden", 5), ("a", 5), ("b", 6)):
+            cache.update(camera, "GetMotionConfig", 1, response(sensitivity))
+        report = diff_cached_fleet(cache, "golden", ["a", "b"], channel=1)
+    assert report == {'GetMotionConfig': {'b': [('motion/sensitivity', '5', '6')]}}
+
+def test_diff_cached_fleet_per_channel(tmp_path):
+    """Test every channel of a multi-channel camera is diffed on its own"""
+    def response(sensitivity):
+        return f'<config xmlns="{NS}"><motion><sensitivity>{sensitivity}</sensitivity></motion></config>'
+
+    with ConfigCache(str(tmp_path / "config.db")) as cache:
+        cache.update("golden", "GetMotionConfig", 1, response(5))
+        cache.update("golden", "GetMotionConfig", 2, response(6))
+        # Channel 1 of the NVR matches, channel 2 differs, channel 3 falls back to golden channel 1
+        for channel, sensitivity in ((1, 5), (2, 5), (3, 5)):
+            cache.update("nvr", "GetMotionConfig", channel, response(sensitivity))
+        report = diff_cached_fleet(cache, "golden", ["nvr"])
+        template = diff_cached_fleet(cache, {'GetMotionConfig': {'motion': {'sensitivity': '6'}}}, ["nvr"])
+    assert report == {'GetMotionConfig': {'nvr': [('ch2/motion/sensitivity', '6', '5')]}}
+    assert [path for path, _, _ in template['GetMotionConfig']['nvr']] == [
+        'ch1/motion/sensitivity', 'ch2/motion/sensitivity', 'ch3/motion/sensitivity'
+    ]
+
+def test_load_template_from_snapshot(tmp_path):
+    """Test that a saved device snapshot works as a template"""
+    path = tmp_path / "golden.json"
+    path.write_text(json.dumps({'sections': {
+        'GetMotionConfig': {'status': 'ok', 'data': GOLDEN['GetMotionConfig']},
+        'PtzGetCaps': {'status': 'failed', 'data': None},
+    }}))
+    assert load_template(str(path)) == {'GetMotionConfig': GOLDEN['GetMotionConfig']}
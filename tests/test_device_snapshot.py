@@ -0,0 +1,71 @@
+"""
+Tests for the concurrent device configuration snapshot
+"""
+
+import json
+from camera_client import CameraClient
+from device_snapshot import (
+    collect_snapshot, normalize_response, save_snapshot, snapshot_fleet, snapshot_requests
+)
+from fleet import Camera, Fleet
+
+NS = "http://www.ipc.com/ver10"
+
+CONFIGS = {
+    'GetDeviceInfo': (f'<?xml version="1.0" encoding="UTF-8"?><config version="1.0" xmlns="{NS}">'
+                      '<deviceInfo><deviceName type="string"><![CDATA[gate-1]]></deviceName>'
+                      '<model type="string">IPC-1</model><softwareVersion type="string">1.2.3</softwareVersion>'
+                      '</deviceInfo></config>'),
+    'GetMotionConfig': (f'<?xml version="1.0" encoding="UTF-8"?><config version="1.0" xmlns="{NS}">'
+                        '<motion><switch type="boolean">true</switch><sensitivity type="uint32">5</sensitivity>'
+                        '<area type="list" count="1"><item>1111</item></area></motion></config>'),
+    'PtzGetCaps': f'<?xml version="1.0" encoding="UTF-8"?><config xmlns="{NS}" status="failed" errorCode="4"/>',
+}
+
+def test_normalize_response():
+    """Test that lists, attributes and namespaces are normalized"""
+    status, error_code, data = normalize_response(CONFIGS['GetMotionConfig'])
+    assert (status, error_code) == ('success', None)
+    assert data == {'motion': {'switch': 'true', 'sensitivity': '5', 'area': {'@count': '1', 'item': ['1111']}}}
+
+    content = '<config><streams><item id="1">main</item><item id="2">sub</item></streams></config>'
+    assert normalize_response(content)[2] == {
+        'streams': {'item': [{'@id': '1', '#text': 'main'}, {'@id': '2', '#text': 'sub'}]}
+    }
+    assert normalize_response(CONFIGS['PtzGetCaps'])[:2] == ('failed', '4')
+
+def test_snapshot_requests_only_read():
+    """Test that the snapshot never calls a write or control endpoint"""
+    requests = snapshot_requests(channel=2)
+    endpoints = {endpoint for _, endpoint, _ in requests}
+    assert all(endpoint.startswith('Get') or endpoint == 'PtzGetCaps' for endpoint in endpoints)
+    assert ('GetAlarmTriggerConfig/motion', 'GetAlarmTriggerConfig', (2, 'motion')) in requests
+    assert ('GetDeviceInfo', 'GetDeviceInfo', ()) in requests
+
+def test_collect_snapshot_concurrently(stub_camera, tmp_path):
+    """Test that endpoints are fetched in parallel and each gets a status and timing"""
+    camera = stub_camera([], delay=0.05, configs=CONFIGS)
+    with CameraClient(*camera.address, "admin", "admin") as client:
+        snapshot = collect_snapshot(client, channel=1)
+
+    sections = snapshot['sections']
+    assert len(sections) == len(snapshot_requests())
+    assert sections['GetDeviceInfo']['data']['deviceInfo']['model'] == 'IPC-1'
+    assert sections['PtzGetCaps']['status'] == 'failed'
+    assert sections['GetSmartCddConfig']['http_status'] == 400
+    assert all(entry['elapsed_ms'] >= 50 for entry in sections.values())
+    assert camera.max_in_flight > 1
+    assert snapshot['elapsed_ms'] < snapshot['sum_elapsed_ms'] / 2
+    assert snapshot['summary']['ok'] == 2
+
+    path = tmp_path / "snapshot.json"
+    save_snapshot(snapshot, str(path))
+    assert json.loads(path.read_text())['sections']['GetMotionConfig']['data']['motion']['sensitivity'] == '5'
+
+def test_snapshot_fleet(stub_camera):
+    """Test snapshotting several cameras in one call"""
+    cameras = [stub_camera([], configs=CONFIGS) for _ in range(2)]
+    fleet = Fleet([Camera(f"cam-{i}", *camera.address) for i, camera in enumerate(cameras)])
+    results = snapshot_fleet(fleet, endpoints={'GetDeviceInfo'})
+    assert {name: snapshot['name'] for name, (success, snapshot) in results.items()} == {'cam-0': 'cam-0', 'cam-1': 'cam-1'}
+    assert all(len(snapshot['sections']) == 1 for _, snapshot in results.values())
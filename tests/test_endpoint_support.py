@@ -0,0 +1,77 @@
+"""
+Tests for the per-model negative cache of unsupported endpoints
+"""
+
+import time
+from camera_client import CameraClient
+from device_snapshot import collect_snapshot
+from endpoint_support import EndpointSupport, is_rejection
+
+NS = "http://www.ipc.com/ver10"
+
+def device_info(firmware):
+    return (f'<config xmlns="{NS}"><deviceInfo><model>IPC-1</model>'
+            f'<softwareVersion>{firmware}</softwareVersion></deviceInfo></config>')
+
+CONFIGS = {
+    'GetDeviceInfo': device_info("1.0"),
+    'GetMotionConfig': f'<config xmlns="{NS}"><motion><switch>true</switch></motion></config>',
+    'PtzGetCaps': f'<config xmlns="{NS}" status="failed" errorCode="1"/>',
+}
+
+ENDPOINTS = {'GetDeviceInfo', 'GetMotionConfig', 'PtzGetCaps', 'GetSmartCddConfig'}
+
+def test_is_rejection():
+    """Test which failures count as unsupported"""
+    assert is_rejection(404)
+    assert is_rejection(501)
+    assert is_rejection(200, "1")
+    assert not is_rejection(200)
+    assert not is_rejection(400)
+    assert not is_rejection(401)
+    # Permission denied, session expiry and busy devices are transient
+    assert not is_rejection(200, "4")
+    assert not is_rejection(200, "499")
+    assert not is_rejection(200, "-107")
+    assert not is_rejection(503)
+    assert not is_rejection(None)
+
+def test_rejections_persist_and_expire(tmp_path):
+    """Test recording, reloading, TTL expiry and firmware changes"""
+    path = str(tmp_path / "support.json")
+    support = EndpointSupport(path, ttl=60)
+    assert support.record("IPC-1", "1.0", "PtzGetCaps", 200, "1")
+    assert not support.record("IPC-1", "1.0", "GetMotionConfig", 401)
+
+    reloaded = EndpointSupport(path, ttl=60)
+    assert reloaded.rejection("IPC-1", "1.0", "PtzGetCaps")['error_code'] == "1"
+    assert reloaded.is_supported("IPC-1", "1.0", "GetMotionConfig")
+    assert reloaded.is_supported("IPC-2", "1.0", "PtzGetCaps")
+    # Re-probed after a firmware change or once the TTL has passed
+    assert reloaded.is_supported("IPC-1", "2.0", "PtzGetCaps")
+    assert reloaded.rejection("IPC-1", "1.0", "PtzGetCaps", now=time.time() + 120) is None
+
+    reloaded.forget("IPC-1", "PtzGetCaps")
+    assert EndpointSupport(path).is_supported("IPC-1", "1.0", "PtzGetCaps")
+
+def test_snapshot_skips_rejected_endpoints(stub_camera, tmp_path):
+    """Test that rejected endpoints are not requested again until the firmware changes"""
+    camera = stub_camera([], configs=dict(CONFIGS))
+    support = EndpointSupport(str(tmp_path / "support.json"))
+    with CameraClient(*camera.address, "admin", "admin") as client:
+        first = collect_snapshot(client, endpoints=ENDPOINTS, support=support)
+        assert first['sections']['PtzGetCaps']['status'] == 'failed'
+        assert first['summary']['failed'] == 2
+
+        second = collect_snapshot(client, endpoints=ENDPOINTS, support=support)
+        assert camera.count('PtzGetCaps') == 1
+        assert camera.count('GetSmartCddConfig') == 1
+        assert camera.count('GetMotionConfig') == 2
+        assert second['sections']['PtzGetCaps']['status'] == 'unsupported'
+        assert second['sections']['PtzGetCaps']['error_code'] == "1"
+        assert second['sections']['GetSmartCddConfig']['http_status'] == 400
+        assert second['summary']['unsupported'] == 2
+
+        camera.configs['GetDeviceInfo'] = device_info("2.0")
+        collect_snapshot(client, endpoints=ENDPOINTS, support=support)
+        assert camera.count('PtzGetCaps') == 2
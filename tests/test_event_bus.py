@@ -0,0 +1,230 @@
+"""
+Tests for the backpressure-aware event bus
+"""
+
+import asyncio
+import io
+import json
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from event_bus import EventBus, FileSink, Sink, SQLiteSink, StdoutSink, WebhookSink
+from event_demux import EVENT_CLASSES
+from event_subscription import parse_messages
+
+NS = "http://www.ipc.com/ver10"
+
+def run(coro):
+    return asyncio.run(coro)
+
+def make_events(count, smart_type='MOTION'):
+    payload = (f'<config xmlns="{NS}"><messageList>'
+               + "".join(f"<item><smartType>{smart_type}</smartType><seq>{i}</seq></item>" for i in range(count))
+               + '</messageList></config>')
+    return parse_messages(payload, camera="cam", classes=EVENT_CLASSES)
+
+class SlowSink(Sink):
+    name = "slow"
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.received = []
+        self.gate = None
+
+    async def write_batch(self, events):
+        if self.gate is not None:
+            await self.gate.wait()
+        await asyncio.sleep(self.delay)
+        self.received.extend(int(event.text('seq')) for event in events)
+
+def test_slow_sink_does_not_stall_other_sinks(tmp_path):
+    """Test drop_oldest keeps publishing fast and the newest events are kept"""
+    async def scenario():
+        bus = EventBus(spill_dir=str(tmp_path / "spill"))
+        slow = SlowSink()
+        fast = SlowSink(delay=0)
+        fast.name = "fast"
+        bus.add_sink(slow, policy='drop_oldest', maxsize=10, batch_size=5)
+        bus.add_sink(fast, maxsize=1000)
+        async with bus:
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            for event in make_events(200):
+                await bus.publish(event)
+            publish_time = loop.time() - started
+        return publish_time, slow.received, fast.received, bus.metrics()
+
+    publish_time, slow, fast, metrics = run(scenario())
+    assert publish_time < 0.5
+    assert fast == list(range(200))
+    assert slow[-10:] == list(range(190, 200))
+    assert metrics['slow']['dropped'] == 200 - len(slow)
+    assert metrics['fast']['delivered'] == 200 and metrics['fast']['pending'] == 0
+
+def test_spill_delivers_everything_in_order(tmp_path):
+    """Test events past the queue bound go to disk and come back in order"""
+    async def scenario():
+        bus = EventBus(spill_dir=str(tmp_path / "spill"))
+        sink = SlowSink(delay=0)
+        sink.gate = asyncio.Event()
+        channel = bus.add_sink(sink, policy='spill', maxsize=5, batch_size=7)
+        async with bus:
+            for event in make_events(50, 'VEHICE'):
+                await bus.publish(event)
+            spilled = channel.metrics()
+            sink.gate.set()
+        return sink.received, spilled, channel.metrics()
+
+    received, spilled, final = run(scenario())
+    assert received == list(range(50))
+    assert spilled['spilled'] == 45 and spilled['pending'] == 50
+    assert final['pending'] == 0 and final['delivered'] == 50
+
+class FlakySink(SlowSink):
+    """Fails its first writes, then recovers"""
+    name = "flaky"
+
+    def __init__(self, failures):
+        super().__init__(delay=0)
+        self.failures = failures
+
+    async def write_batch(self, events):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("sink unavailable")
+        await super().write_batch(events)
+
+def test_failed_batches_are_retried(tmp_path):
+    """Test a batch the sink fails to write stays pending and is delivered once it recovers"""
+    async def scenario():
+        bus = EventBus(spill_dir=str(tmp_path / "spill"))
+        sink = FlakySink(failures=3)
+        channel = bus.add_sink(sink, policy='spill', maxsize=5, batch_size=5)
+        channel.retry_delay = 0.01
+        async with bus:
+            for event in make_events(20):
+                await bus.publish(event)
+            await asyncio.sleep(0.005)
+            failing = channel.metrics()
+        return sink.received, failing, channel.metrics()
+
+    received, failing, final = run(scenario())
+    assert received == list(range(20))
+    assert failing['pending'] == 20 and failing['delivered'] == 0
+    assert final['errors'] == 3 and final['delivered'] == 20 and final['pending'] == 0
+
+def test_close_gives_up_on_a_dead_sink(tmp_path):
+    """Test closing the bus does not wait forever for a sink that never recovers"""
+    async def scenario():
+        bus = EventBus(spill_dir=str(tmp_path / "spill"))
+        sink = FlakySink(failures=float('inf'))
+        channel = bus.add_sink(sink, maxsize=50, batch_size=5)
+        channel.retry_delay = 0.01
+        await bus.start()
+        for event in make_events(20):
+            await bus.publish(event)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        dropped = await bus.close(drain_timeout=0.1)
+        return loop.time() - started, dropped, channel.metrics()
+
+    elapsed, dropped, metrics = run(asyncio.wait_for(scenario(), 5))
+    assert elapsed < 1
+    assert dropped == {'flaky': 20}
+    assert metrics['dropped'] == 20 and metrics['delivered'] == 0
+
+def test_spill_keeps_undelivered_events_for_the_next_run(tmp_path):
+    """Test events a dead sink never received stay on disk and are delivered after a restart"""
+    spill_dir = tmp_path / "spill"
+
+    async def first_run():
+        bus = EventBus(spill_dir=str(spill_dir))
+        channel = bus.add_sink(FlakySink(failures=float('inf')), policy='spill', maxsize=5, batch_size=5)
+        channel.retry_delay = 0.01
+        await bus.start()
+        for event in make_events(20):
+            await bus.publish(event)
+        await asyncio.sleep(0.05)
+        return await bus.close(drain_timeout=0.1)
+
+    async def second_run():
+        bus = EventBus(spill_dir=str(spill_dir))
+        sink = FlakySink(failures=0)
+        channel = bus.add_sink(sink, policy='spill', maxsize=5, batch_size=5)
+        pending = channel.pending
+        async with bus:
+            pass
+        return sink.received, pending
+
+    assert run(asyncio.wait_for(first_run(), 5)) == {'flaky': 0}
+    assert (spill_dir / "flaky.spill").exists()
+    received, pending = run(asyncio.wait_for(second_run(), 5))
+    assert pending == 20
+    assert received == list(range(20))
+    assert not (spill_dir / "flaky.spill").exists()
+
+def test_block_applies_backpressure(tmp_path):
+    """Test the block policy makes publish wait for the sink"""
+    async def scenario():
+        bus = EventBus(spill_dir=str(tmp_path / "spill"))
+        sink = SlowSink(delay=0.02)
+        bus.add_sink(sink, policy='block', maxsize=2, batch_size=1)
+        async with bus:
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            for event in make_events(10):
+                await bus.publish(event)
+            return loop.time() - started, sink
+
+    elapsed, sink = run(scenario())
+    assert elapsed >= 0.1
+    assert sink.received == list(range(10))
+    with pytest.raises(ValueError):
+        EventBus().add_sink(SlowSink(), policy='discard')
+
+def test_file_sqlite_stdout_and_webhook_sinks(tmp_path):
+    """Test the bundled sinks, with a local stand-in for the webhook"""
+    posted = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            posted.extend(json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stdout = io.StringIO()
+    try:
+        async def scenario():
+            bus = EventBus(spill_dir=str(tmp_path / "spill"))
+            bus.add_sink(FileSink(str(tmp_path / "events.jsonl")))
+            bus.add_sink(SQLiteSink(str(tmp_path / "events.db")), policy='spill')
+            bus.add_sink(StdoutSink(stdout), policy='drop_oldest')
+            bus.add_sink(WebhookSink(f"http://127.0.0.1:{server.server_address[1]}/hook"))
+            queue = asyncio.Queue()
+            for event in make_events(5, 'PEA'):
+                queue.put_nowait(event)
+            async with bus:
+                runner = asyncio.ensure_future(bus.run(queue))
+                await queue.join()
+                runner.cancel()
+            return bus.metrics()
+
+        metrics = run(scenario())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert set(metrics) == {'file', 'sqlite', 'stdout', 'webhook'}
+    assert all(m['delivered'] == 5 and m['errors'] == 0 for m in metrics.values())
+    lines = [json.loads(line) for line in open(tmp_path / "events.jsonl", encoding='utf-8')]
+    assert [line['fields']['seq'] for line in lines] == ["0", "1", "2", "3", "4"]
+    with sqlite3.connect(str(tmp_path / "events.db")) as db:
+        assert db.execute("SELECT COUNT(*) FROM events WHERE smart_type = 'PEA'").fetchone()[0] == 5
+    assert stdout.getvalue().count(" cam PEA: ") == 5
+    assert [item['camera'] for item in posted] == ["cam"] * 5
@@ -0,0 +1,89 @@
+"""
+Tests for the typed event demultiplexer
+"""
+
+import pytest
+from camera_client import CameraClient
+from event_demux import EVENT_CLASSES, EventDemux, VehicleEvent, sniff_smart_types
+from event_subscription import SMART_TYPES, PullSubscription, SubscriptionError, parse_messages
+import event_subscription
+
+NS = "http://www.ipc.com/ver10"
+
+def batch(*items):
+    body = "".join(f"<item><smartType>{smart_type}</smartType>{fields}</item>" for smart_type, fields in items)
+    return (f'<config xmlns="{NS}" status="success"><messageList type="list" count="{len(items)}">'
+            f'{body}</messageList></config>').encode()
+
+def test_every_smart_type_has_a_class():
+    """Test the dispatch table covers all 15 smart types"""
+    assert list(EVENT_CLASSES) == list(SMART_TYPES)
+    assert sniff_smart_types(batch(('MOTION', ''), ('VEHICE', ''))) == {'MOTION', 'VEHICE'}
+    assert sniff_smart_types('<p:smartType type="openAlramObj"><![CDATA[PEA]]></p:smartType>') == {'PEA'}
+
+def test_routes_typed_events_to_handlers():
+    """Test handlers get typed events of their own types only"""
+    demux = EventDemux()
+    vehicles = []
+    everything = []
+    demux.register('VEHICE', vehicles.append)
+
+    @demux.on('VEHICE', 'MOTION')
+    def both(event):
+        everything.append(event.smart_type)
+
+    assert demux.smart_types == ['MOTION', 'VEHICE']
+    handled = demux.dispatch(batch(
+        ('VEHICE', '<vehicleID>9</vehicleID><snapTime>1704096000000000</snapTime><vehiclePlate>ABC1</vehiclePlate>'),
+        ('PEA', '<target>person</target>'),
+        ('MOTION', ''),
+    ), camera="gate-1")
+    assert handled == 2
+    assert everything == ['VEHICE', 'MOTION']
+    event = vehicles[0]
+    assert isinstance(event, VehicleEvent)
+    assert (event.camera, event.vehicle_id, event.snap_time, event.plate) == ("gate-1", 9, 1704096000000000, "ABC1")
+
+    # Plain messages are converted on the way in
+    demux.handle(parse_messages(batch(('VEHICE', '<vehicleID>4</vehicleID>')))[0])
+    assert vehicles[-1].vehicle_id == 4
+    with pytest.raises(ValueError):
+        demux.register('PLATE', print)
+
+def test_unhandled_types_are_not_parsed(monkeypatch):
+    """Test payloads of unhandled types are skipped before parsing"""
+    demux = EventDemux()
+    demux.register('VEHICE', lambda event: None)
+    calls = []
+    real_parse = event_subscription.parse_messages
+    monkeypatch.setattr('event_demux.parse_messages', lambda *args: calls.append(args) or real_parse(*args))
+
+    assert demux.dispatch(batch(('MOTION', ''), ('AVD', ''))) == 0
+    assert calls == []
+    assert demux.stats['skipped'] == 1
+    # Failures still surface so the subscription can be reopened
+    with pytest.raises(SubscriptionError):
+        demux.parse(f'<config xmlns="{NS}" status="failed" errorCode="5"/>')
+
+def test_handler_errors_do_not_stop_dispatch():
+    """Test a failing handler is counted and the others still run"""
+    demux = EventDemux()
+    seen = []
+    demux.register('SENSOR', lambda event: 1 / 0)
+    demux.register('SENSOR', seen.append)
+    demux.dispatch(batch(('SENSOR', '')))
+    assert len(seen) == 1
+    assert demux.stats['handler_errors'] == 1
+
+def test_pull_subscription_with_demux(stub_camera):
+    """Test a subscription can yield typed events"""
+    camera = stub_camera()
+    demux = EventDemux()
+    demux.register('VEHICE', lambda event: None)
+    host, port = camera.address
+    with CameraClient(host, port, "admin", "admin") as client:
+        with PullSubscription(client, demux.smart_types, timeout=1, renew_time=30, parser=demux.parse) as subscription:
+            camera.push_event('VEHICE', vehicleID=5, snapTime=1704096000000000)
+            events = subscription.pull()
+    assert [type(event) for event in events] == [VehicleEvent]
+    assert events[0].vehicle_id == 5
@@ -0,0 +1,131 @@
+"""
+Tests for the segmented event journal
+"""
+
+import os
+import threading
+import time
+from event_demux import EventDemux, VehicleEvent
+from event_journal import EventJournal, JournalReader, RECORD_HEADER
+from event_subscription import SMART_TYPES, parse_messages
+from vehicle_analytics import journal_sightings
+
+NS = "http://www.ipc.com/ver10"
+BASE = 1704096000.0
+
+def event_xml(smart_type, **fields):
+    body = "".join(f"<{tag}>{value}</{tag}>" for tag, value in fields.items())
+    return f'<item xmlns="{NS}"><smartType>{smart_type}</smartType>{body}</item>'
+
+def fill(journal, count, step=1.0):
+    for i in range(count):
+        journal.append_raw(f"cam-{i % 2}", SMART_TYPES[i % 3], event_xml(SMART_TYPES[i % 3], seq=i), BASE + i * step)
+
+def test_segments_roll_and_replay_time_ranges(tmp_path):
+    """Test records span fixed-size segments and time ranges replay from the sparse index"""
+    directory = str(tmp_path / "journal")
+    with EventJournal(directory, segment_size=4096, index_interval=512) as journal:
+        fill(journal, 200)
+        assert journal.stats['segments'] > 1
+    assert all(os.path.getsize(os.path.join(directory, name)) == 4096
+               for name in os.listdir(directory) if name.endswith('.seg'))
+
+    reader = JournalReader(directory)
+    assert [int(r.to_message().text('seq')) for r in reader.replay()] == list(range(200))
+    window = list(reader.replay(start=BASE + 50, end=BASE + 120))
+    assert [r.timestamp for r in window] == [int((BASE + i) * 1000000) for i in range(50, 121)]
+    assert {r.camera for r in reader.replay(cameras={"cam-1"})} == {"cam-1"}
+    assert {r.smart_type for r in reader.replay(smart_types={'SENSOR'})} == {'SENSOR'}
+
+def test_reopen_appends_after_existing_records(tmp_path):
+    """Test a reopened journal continues after its last record and ignores torn writes"""
+    directory = str(tmp_path / "journal")
+    with EventJournal(directory, segment_size=8192) as journal:
+        fill(journal, 10)
+        end = journal._offset
+    # A header whose payload never made it to disk
+    with open(os.path.join(directory, "00000000.seg"), 'r+b') as f:
+        f.seek(end)
+        f.write(RECORD_HEADER.pack(50, 1234, 0))
+    with EventJournal(directory, segment_size=8192) as journal:
+        journal.append_raw("cam-9", 'MOTION', event_xml('MOTION', seq=10), BASE)
+    records = list(JournalReader(directory).replay())
+    assert len(records) == 11
+    # Timestamps never go backwards
+    assert records[-1].camera == "cam-9" and records[-1].timestamp == records[-2].timestamp
+
+def test_journal_events_from_demux_and_rebuild_sightings(tmp_path):
+    """Test journaling parsed events and rebuilding typed events and analytics"""
+    directory = str(tmp_path / "journal")
+    demux = EventDemux()
+    with EventJournal(directory) as journal:
+        demux.register(SMART_TYPES, journal.append)
+        payload = (f'<config xmlns="{NS}"><messageList>'
+                   + "".join(f'<item><smartType>VEHICE</smartType><vehicleID>{i}</vehicleID>'
+                             f'<snapTime>{1704096000000000 + i}</snapTime><listType>whiteList</listType></item>'
+                             for i in range(3))
+                   + '<item><smartType>MOTION</smartType></item></messageList></config>')
+        demux.dispatch(payload, camera="gate-1", received_at=BASE)
+
+    reader = JournalReader(directory)
+    vehicles = EventDemux()
+    vehicles.register('VEHICE', lambda event: None)
+    events = list(reader.events(parser=vehicles.parse))
+    assert [type(e) for e in events] == [VehicleEvent] * 3
+    assert [e.vehicle_id for e in events] == [0, 1, 2]
+
+    sightings = journal_sightings(reader)
+    assert len(sightings) == 3
+    assert sightings.camera_names == ["gate-1"]
+
+def test_tail_follows_new_records(tmp_path):
+    """Test tail yields records appended after it started, across segments"""
+    directory = str(tmp_path / "journal")
+    journal = EventJournal(directory, segment_size=2048)
+    stop = threading.Event()
+    seen = []
+
+    def follow():
+        for record in JournalReader(directory).tail(start=BASE, stop=stop, poll_interval=0.01):
+            seen.append(record)
+            if len(seen) == 40:
+                stop.set()
+
+    follower = threading.Thread(target=follow)
+    follower.start()
+    for i in range(40):
+        journal.append_raw("cam", 'PEA', event_xml('PEA', seq=i), BASE + i)
+        time.sleep(0.001)
+    follower.join(5)
+    journal.close()
+    assert not follower.is_alive()
+    assert [int(parse_messages(r.body)[0].text('seq')) for r in seen] == list(range(40))
+    assert journal.stats['segments'] > 1
+
+def test_tail_from_between_segments(tmp_path):
+    """Test tail starting after the last record of a rolled segment moves on to the next one"""
+    directory = str(tmp_path / "journal")
+    with EventJournal(directory, segment_size=4096) as journal:
+        fill(journal, 60)
+        assert journal.stats['segments'] > 1
+    reader = JournalReader(directory)
+    # Between the last record of segment 0 and the first of segment 1
+    start = reader._segments()[1][2][0][0] / 1000000 - 0.5
+    expected = list(reader.replay(start))
+    assert expected
+
+    stop = threading.Event()
+    seen = []
+
+    def follow():
+        for record in reader.tail(start=start, stop=stop, poll_interval=0.01):
+            seen.append(record)
+            if len(seen) == len(expected):
+                stop.set()
+
+    follower = threading.Thread(target=follow)
+    follower.start()
+    follower.join(2)
+    stop.set()
+    follower.join(1)
+    assert [r.timestamp for r in seen] == [r.timestamp for r in expected]
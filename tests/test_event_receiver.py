@@ -0,0 +1,97 @@
+"""
+Tests for the asyncio event push receiver
+"""
+
+import asyncio
+from async_camera_client import AsyncCameraClient
+from event_receiver import EventReceiver
+from event_subscription import parse_messages
+
+NS = "http://www.ipc.com/ver10"
+
+def run(coro):
+    return asyncio.run(coro)
+
+def event(smart_type, event_id):
+    return (f'<?xml version="1.0" encoding="UTF-8"?><config version="1.7" xmlns="{NS}">'
+            f'<smartType>{smart_type}</smartType><eventId>{event_id}</eventId></config>')
+
+def test_receives_events_from_many_cameras():
+    """Test concurrent pushes are parsed into typed messages tagged with their camera"""
+    async def scenario():
+        async with EventReceiver("127.0.0.1", 0) as receiver:
+            address = receiver.address_for("gate-1", "127.0.0.1")
+            assert address == f"http://127.0.0.1:{receiver.port}/event/gate-1"
+
+            async def push(camera, count):
+                async with AsyncCameraClient("127.0.0.1", receiver.port, "admin", "admin") as client:
+                    for i in range(count):
+                        response = await client.post('event', camera, data=event('VEHICE', i))
+                        assert response.status_code == 200
+
+            await asyncio.gather(push("gate-1", 20), push("unregistered", 20))
+            messages = [await asyncio.wait_for(receiver.queue.get(), 5) for _ in range(40)]
+            return messages, receiver.stats
+
+    messages, stats = run(scenario())
+    assert {m.smart_type for m in messages} == {'VEHICE'}
+    # Registered paths name the camera; others fall back to the peer address
+    assert {m.camera for m in messages} == {"gate-1", "127.0.0.1"}
+    assert sorted(int(m.text('eventId')) for m in messages if m.camera == "gate-1") == list(range(20))
+    assert stats['requests'] == 40 and stats['events'] == 40
+
+def test_rejects_bad_requests_and_full_backlog():
+    """Test unknown paths, unparseable payloads and a full backlog"""
+    async def scenario():
+        receiver = EventReceiver("127.0.0.1", 0, max_pending=1)
+        await receiver.start()
+        async with AsyncCameraClient("127.0.0.1", receiver.port, "admin", "admin") as client:
+            missing = await client.post('other', data=event('MOTION', 1))
+            # Hold the parser back so the backlog fills up
+            receiver._parser.cancel()
+            await asyncio.sleep(0)
+            first = await client.post('event', 'cam', data="not xml")
+            second = await client.post('event', 'cam', data=event('MOTION', 2))
+            receiver._parser = asyncio.ensure_future(receiver._parse_loop())
+        await receiver.stop()
+        return missing.status_code, first.status_code, second.status_code, receiver.stats
+
+    missing, first, second, stats = run(scenario())
+    assert (missing, first, second) == (404, 200, 503)
+    assert stats['rejected'] == 1
+    assert stats['parse_errors'] == 1
+
+def test_parser_errors_do_not_stop_the_receiver():
+    """Test any exception from a pluggable parser is counted and parsing goes on"""
+    def parser(content, camera, received_at):
+        if b"broken" in content:
+            raise KeyError("smartType")
+        return parse_messages(content, camera, received_at)
+
+    async def scenario():
+        async with EventReceiver("127.0.0.1", 0, parser=parser) as receiver:
+            async with AsyncCameraClient("127.0.0.1", receiver.port, "admin", "admin") as client:
+                await client.post('event', 'cam', data="<broken/>")
+                await client.post('event', 'cam', data=event('PEA', 1))
+            message = await asyncio.wait_for(receiver.queue.get(), 5)
+        return message, receiver.stats
+
+    message, stats = run(asyncio.wait_for(scenario(), 10))
+    assert message.smart_type == 'PEA'
+    assert stats['parse_errors'] == 1
+
+def test_stop_does_not_wait_on_an_undrained_queue():
+    """Test stop() returns when the bounded output queue is full and nobody reads it"""
+    async def scenario():
+        receiver = await EventReceiver("127.0.0.1", 0, queue=asyncio.Queue(1)).start()
+        async with AsyncCameraClient("127.0.0.1", receiver.port, "admin", "admin") as client:
+            for i in range(3):
+                await client.post('event', 'cam', data=event('PEA', i))
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await receiver.stop(timeout=0.2)
+        return loop.time() - started, receiver.queue.qsize()
+
+    elapsed, queued = run(asyncio.wait_for(scenario(), 5))
+    assert elapsed < 1
+    assert queued == 1
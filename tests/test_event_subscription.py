@@ -0,0 +1,95 @@
+"""
+Tests for the pull-subscription event client
+"""
+
+import threading
+import time
+import pytest
+from camera_client import CameraClient
+from event_subscription import (
+    PullSubscription, SubscriptionError, build_subscribe_body, build_pull_body, parse_messages
+)
+
+NS = "http://www.ipc.com/ver10"
+
+def client_for(camera):
+    host, port = camera.address
+    return CameraClient(host, port, "admin", "admin")
+
+def test_build_bodies():
+    """Test request bodies follow the protocol samples"""
+    body = build_subscribe_body(['VEHICE', 'MOTION'], channel=1)
+    assert '<subscribeList type="list" count="2">' in body
+    assert '<smartType type="openAlramObj">VEHICE</smartType>' in body
+    assert '<subscribeFlag type="subscribeTypes">REALTIME_SUBSCRIBE</subscribeFlag>' in body
+    assert '<channelID type="uint32">1</channelID>' in body
+    pull = build_pull_body("/subscription/1", timeout=5, message_limit=3)
+    assert '<![CDATA[/subscription/1]]>' in pull
+    assert '<messageLimit type="uint32">3</messageLimit>' in pull
+    with pytest.raises(ValueError):
+        build_subscribe_body(['PLATE'])
+
+def test_parse_messages():
+    """Test events are found in a message list or as the whole document"""
+    batch = (f'<config xmlns="{NS}" status="success"><messageList type="list" count="2">'
+             '<item><smartType>VEHICE</smartType><vehicleID>7</vehicleID></item>'
+             '<item><smartType>MOTION</smartType><subscribeRelation>ALARM</subscribeRelation></item>'
+             '</messageList></config>')
+    messages = parse_messages(batch, camera="cam")
+    assert [m.smart_type for m in messages] == ['VEHICE', 'MOTION']
+    assert messages[0].text('vehicleID') == "7"
+    assert messages[1].relation == 'ALARM'
+    assert messages[0].fields()['vehicleID'] == "7"
+
+    single = f'<config xmlns="{NS}"><smartType>PEA</smartType><target>person</target></config>'
+    assert [m.smart_type for m in parse_messages(single)] == ['PEA']
+    with pytest.raises(SubscriptionError):
+        parse_messages(f'<config xmlns="{NS}" status="failed" errorCode="5"/>')
+
+def test_pull_subscription_delivers_events(stub_camera):
+    """Test events reach a waiting long poll without range searches"""
+    camera = stub_camera()
+    with client_for(camera) as client:
+        with PullSubscription(client, ['VEHICE'], timeout=20) as subscription:
+            assert subscription.pull() == []
+            threading.Timer(0.1, camera.push_event, ('VEHICE',), {'vehicleID': 3}).start()
+            started = time.monotonic()
+            messages = subscription.pull()
+            assert time.monotonic() - started < 0.5
+            assert [m.text('vehicleID') for m in messages] == ["3"]
+
+            # Types that were not subscribed stay on the camera
+            camera.push_event('MOTION')
+            assert subscription.pull() == []
+        assert camera.subscriptions == {}
+    assert camera.count('SearchSnapVehicleByTime') == 0
+    assert camera.count('SetUnSubscribe') == 1
+
+def test_renews_before_expiry(stub_camera):
+    """Test the subscription is renewed once little of it is left"""
+    camera = stub_camera()
+    with client_for(camera) as client, PullSubscription(client, ['MOTION'], timeout=1, renew_time=10) as subscription:
+        subscription.pull()
+        assert camera.count('SetRenew') == 0
+        subscription.expires_at = time.monotonic() + 3
+        subscription.pull()
+        assert camera.count('SetRenew') == 1
+        assert subscription.stats['renewals'] == 1
+    with pytest.raises(ValueError):
+        PullSubscription(client, timeout=20, renew_time=20)
+
+def test_messages_resubscribe_after_failure(stub_camera):
+    """Test a lost subscription is opened again"""
+    camera = stub_camera(pull_wait=0.05)
+    stop = threading.Event()
+    with client_for(camera) as client:
+        subscription = PullSubscription(client, ['AVD'], timeout=1, renew_time=30)
+        subscription.subscribe()
+        camera.subscriptions.clear()
+        camera.push_event('AVD', scene="blur")
+        for message in subscription.messages(stop, retry_delay=0.01):
+            assert message.text('scene') == "blur"
+            stop.set()
+        assert camera.count('SetSubscribe') == 2
+        assert subscription.stats['resubscribes'] == 1
+        subscription.unsubscribe()
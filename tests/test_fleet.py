@@ -0,0 +1,92 @@
+"""
+Tests for the camera fleet registry and executor
+"""
+
+import json
+import threading
+import time
+import pytest
+from fleet import Camera, Fleet, FleetError, prompt_for_camera
+from vehicle_recognition import VehicleRecognition
+from conftest import make_vehicles
+
+REGISTRY = {
+    'defaults': {'username': "admin", 'password': "secret"},
+    'cameras': [
+        {'name': "gate-1", 'host': "10.0.0.1", 'role': "anpr", 'tags': ["entrance"]},
+        {'name': "gate-2", 'host': "10.0.0.2", 'port': 8080, 'role': "anpr", 'tags': ["exit"]},
+        {'host': "10.0.0.3", 'role': "overview", 'password': "other"}
+    ]
+}
+
+def test_load_registry_with_defaults(tmp_path):
+    """Test that entries inherit defaults and unnamed cameras get their address"""
+    path = tmp_path / "fleet.json"
+    path.write_text(json.dumps(REGISTRY))
+    fleet = Fleet.load(str(path))
+    assert [camera.name for camera in fleet] == ["gate-1", "gate-2", "10.0.0.3:80"]
+    assert fleet.get("gate-2").credentials == ("10.0.0.2", 8080, "admin", "secret")
+    assert fleet.get("10.0.0.3:80").password == "other"
+    assert [camera.name for camera in fleet.select(role="anpr", tags=["exit"])] == ["gate-2"]
+
+    fleet.save(str(path))
+    assert Fleet.load(str(path)).get("gate-1").tags == {"entrance"}
+
+def test_invalid_registries(tmp_path):
+    """Test that missing files, hostless entries and duplicates are rejected"""
+    with pytest.raises(FleetError):
+        Fleet.load(str(tmp_path / "missing.json"))
+    with pytest.raises(FleetError):
+        Fleet.from_dict({'cameras': [{'name': "x"}]})
+    with pytest.raises(FleetError):
+        Fleet.from_dict({'cameras': [{'name': "x", 'host': "a"}, {'name': "x", 'host': "b"}]})
+    with pytest.raises(FleetError):
+        Fleet.from_dict({'cameras': [{'host': "a", 'ip': "b"}]})
+
+def test_run_is_bounded_and_isolates_failures():
+    """Test that run() caps parallelism and reports failures per camera"""
+    fleet = Fleet([Camera(f"cam-{i}", f"10.0.0.{i}") for i in range(6)], max_workers=3)
+    lock = threading.Lock()
+    active = [0, 0]
+
+    def operation(camera):
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        if camera.name == "cam-2":
+            raise ConnectionError("unreachable")
+        return camera.host
+
+    results = fleet.run(operation)
+    assert list(results) == [f"cam-{i}" for i in range(6)]
+    assert active[1] == 3
+    assert results["cam-0"] == (True, "10.0.0.0")
+    assert results["cam-2"][0] is False and "unreachable" in results["cam-2"][1]
+
+def test_search_across_fleet(stub_camera, monkeypatch):
+    """Test that one call searches every camera"""
+    cameras = [stub_camera(make_vehicles(count)) for count in (2, 5)]
+    fleet = Fleet([Camera(f"cam-{i}", *camera.address) for i, camera in enumerate(cameras)])
+    closed = []
+    monkeypatch.setattr(VehicleRecognition, 'close', lambda self: closed.append(self.host))
+    results = fleet.search_vehicles_by_time("2024-01-01 00:00:00", "2024-01-01 23:59:59")
+    assert {name: result['count'] for name, (success, result) in results.items()} == {"cam-0": 2, "cam-1": 5}
+    # Every per-camera client is closed again
+    assert len(closed) == 2
+
+def test_prompt_uses_registry_credentials(monkeypatch):
+    """Test that picking a registry camera skips the credential prompts"""
+    answers = iter(["9", "2"])
+    monkeypatch.setattr('builtins.input', lambda prompt="": next(answers))
+    assert prompt_for_camera(Fleet.from_dict(REGISTRY)) == ("10.0.0.2", 8080, "admin", "secret")
+
+def test_prompt_offers_example_cameras_without_registry(monkeypatch, tmp_path):
+    """Test that the example cameras are still offered when there is no fleet.json"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('CAMERA_FLEET', raising=False)
+    answers = iter(["1"])
+    monkeypatch.setattr('builtins.input', lambda prompt="": next(answers))
+    assert prompt_for_camera() == ("192.168.60.254", 80, "admin", "admin")
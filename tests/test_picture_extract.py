@@ -0,0 +1,90 @@
+"""
+Tests for locating and decoding pictureData without parsing it
+"""
+
+import base64
+import io
+import os
+import zipfile
+from picture_extract import PictureSpan, find_picture, split_picture
+from vehicle_recognition import VehicleRecognition, parse_vehicle_details, parse_vehicle_snapshot
+from conftest import make_vehicles
+
+PICTURE = os.urandom(200000)
+ENCODED = base64.b64encode(PICTURE)
+
+def details_response(picture):
+    return (b'<?xml version="1.0" encoding="UTF-8"?>'
+            b'<config version="1.0" xmlns="http://www.ipc.com/ver10"><snapVehicle><snapInfo>'
+            b'<vehiclePlate type="string"><![CDATA[ABC123]]></vehiclePlate>'
+            b'<listType type="listType">whiteList</listType>'
+            b'<pictureData type="string">' + picture + b'</pictureData>'
+            b'<color type="string">red</color></snapInfo></snapVehicle></config>')
+
+def test_chunked_decode_matches_b64decode():
+    """Test that every chunk size decodes to the original bytes"""
+    span = find_picture(details_response(ENCODED))
+    assert span.text() == ENCODED.decode()
+    for chunk_size in (4, 1000, 4097, 64 * 1024):
+        assert b"".join(span.iter_decoded(chunk_size)) == PICTURE
+
+def test_wrapped_and_cdata_pictures():
+    """Test line-wrapped base64 and CDATA-wrapped pictures"""
+    wrapped = b"\r\n".join(ENCODED[i:i + 76] for i in range(0, len(ENCODED), 76))
+    out = io.BytesIO()
+    assert find_picture(details_response(wrapped)).write_to(out, chunk_size=1001) == len(PICTURE)
+    assert out.getvalue() == PICTURE
+
+    stripped, span = split_picture(details_response(b"<![CDATA[" + ENCODED + b"]]>"))
+    assert b"".join(span.iter_decoded()) == PICTURE
+    assert b'<pictureData type="string"></pictureData>' in stripped
+
+def test_missing_or_empty_picture():
+    """Test responses without picture text"""
+    assert find_picture(details_response(b"")) is None
+    assert find_picture(b'<snapInfo><pictureData/></snapInfo>') is None
+    content = details_response(b"")
+    assert split_picture(content) == (content, None)
+
+def test_parse_vehicle_details_with_and_without_picture():
+    """Test that pictures are cut out before parsing and skipped in details_only mode"""
+    content = details_response(ENCODED)
+    success, details = parse_vehicle_details(content)
+    assert success
+    assert details['vehiclePlate'] == "ABC123"
+    assert details['color'] == "red"
+    assert details['pictureData'] == ENCODED.decode()
+
+    success, details = parse_vehicle_details(content, details_only=True)
+    assert success
+    assert details.picture_data is None
+    assert details['listType'] == "whiteList"
+
+    success, (details, picture) = parse_vehicle_snapshot(content)
+    assert details.picture_data is None
+    assert picture.buffer is content
+
+def test_export_and_save_stream_pictures(stub_camera, tmp_path):
+    """Test that exported and saved pictures match the camera's bytes"""
+    vehicles = make_vehicles(3)
+    camera = stub_camera(vehicles)
+    host, port = camera.address
+    system = VehicleRecognition(host, port, "admin", "admin")
+
+    output = str(tmp_path / "export.zip")
+    success, _ = system.export_vehicle_data("2024-01-01 00:00:00", "2024-01-01 23:59:59", output_file=output)
+    assert success
+    with zipfile.ZipFile(output) as archive:
+        for v in vehicles:
+            assert archive.read(f"SnapPic/{v['snapTime']}.jpg") == v['picture']
+
+    path = tmp_path / "snap.jpg"
+    v = vehicles[0]
+    assert system.save_vehicle_picture(v['vehicleID'], v['snapTime'], str(path)) == (True, len(v['picture']))
+    assert path.read_bytes() == v['picture']
+
+def test_picture_span_from_text():
+    """Test wrapping picture text that is already in memory"""
+    span = PictureSpan.from_text(ENCODED.decode())
+    assert len(span) == len(ENCODED)
+    assert b"".join(span.iter_decoded()) == PICTURE
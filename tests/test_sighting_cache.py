@@ -0,0 +1,54 @@
+"""
+Tests for the on-disk sighting detail cache
+"""
+
+from sighting_cache import SightingCache
+from vehicle_recognition import VehicleRecognition
+from conftest import make_vehicles
+
+START = "2024-01-01 00:00:00"
+END = "2024-01-01 23:59:59"
+
+def test_details_and_pictures_round_trip(tmp_path):
+    """Test that cached details come back with and without pictures"""
+    with SightingCache(str(tmp_path / "cache.db")) as cache:
+        assert cache.get("cam", 1, 100) is None
+        cache.put("cam", 1, 100, {'vehiclePlate': "ABC", 'pictureData': "aGVsbG8="})
+        assert cache.get("cam", "1", "100") == {'vehiclePlate': "ABC"}
+        assert cache.get("cam", 1, 100, with_picture=True)['pictureData'] == "aGVsbG8="
+        assert cache.get("other", 1, 100) is None
+
+def test_pictures_evicted_least_recently_used(tmp_path):
+    """Test that the picture budget evicts the oldest picture first"""
+    with SightingCache(str(tmp_path / "cache.db"), max_picture_bytes=25) as cache:
+        for i in range(3):
+            cache.put("cam", i, i, {'vehiclePlate': str(i), 'pictureData': "x" * 10})
+            if i == 1:
+                # Touch the first picture so the second becomes the oldest
+                cache.get("cam", 0, 0, with_picture=True)
+        assert cache.get("cam", 1, 1, with_picture=True) is None
+        assert cache.get("cam", 0, 0, with_picture=True) is not None
+        assert cache.get("cam", 1, 1) == {'vehiclePlate': "1"}
+        assert cache.stats()['picture_bytes'] <= 25
+
+def test_repeat_export_makes_no_detail_requests(stub_camera, tmp_path):
+    """Test that a second export over the same period is served from the cache"""
+    camera = stub_camera(make_vehicles(6))
+    host, port = camera.address
+    cache_path = str(tmp_path / "cache.db")
+
+    with SightingCache(cache_path) as cache:
+        system = VehicleRecognition(host, port, "admin", "admin", cache=cache)
+        success, _ = system.export_vehicle_data(START, END, output_file=str(tmp_path / "first.zip"))
+        assert success
+    assert camera.count('SearchSnapVehicleByKey') == 6
+
+    # A fresh process reopening the same file makes no detail requests
+    with SightingCache(cache_path) as cache:
+        system = VehicleRecognition(host, port, "admin", "admin", cache=cache)
+        success, _ = system.export_vehicle_data(START, END, output_file=str(tmp_path / "second.zip"))
+        assert success
+        assert cache.stats()['hits'] == 6
+    assert camera.count('SearchSnapVehicleByKey') == 6
+    with open(tmp_path / "first.zip", 'rb') as first, open(tmp_path / "second.zip", 'rb') as second:
+        assert len(first.read()) == len(second.read())
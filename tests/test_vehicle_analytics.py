@@ -0,0 +1,76 @@
+"""
+Tests for the vectorized sighting analytics
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from vehicle_analytics import (
+    SightingArrays, fetch_sightings, fetch_fleet_sightings, hourly_histogram, day_of_week_histogram,
+    inter_arrival_percentiles, list_type_rates, summarize
+)
+from vehicle_recognition import VehicleRecognition
+from fleet import Camera, Fleet
+from conftest import make_vehicles
+
+# 2024-01-01 00:00:00 UTC, a Monday
+MONDAY = 1704067200 * 1000000
+HOUR = 3600 * 1000000
+
+def sightings_at(offsets, list_type="whiteList", camera="cam"):
+    return SightingArrays.from_records(
+        [{'snapTime': MONDAY + offset, 'listType': list_type} for offset in offsets], camera
+    )
+
+def test_hour_and_day_histograms():
+    """Test hourly and day-of-week bins in a fixed time zone"""
+    sightings = sightings_at([0, HOUR, HOUR + 1, 25 * HOUR])
+    assert hourly_histogram(sightings, utc_offset=0)[:3].tolist() == [1, 3, 0]
+    assert day_of_week_histogram(sightings, utc_offset=0).tolist() == [3, 1, 0, 0, 0, 0, 0]
+    # Two hours ahead of UTC shifts every sighting by two bins
+    assert hourly_histogram(sightings, utc_offset=7200)[2:5].tolist() == [1, 3, 0]
+
+def test_inter_arrival_ignores_gaps_across_cameras():
+    """Test that inter-arrival gaps are only taken within one camera"""
+    fleet = SightingArrays.concatenate([
+        sightings_at([0, 10 * 1000000, 20 * 1000000], camera="a"),
+        sightings_at([5 * 1000000, 65 * 1000000], camera="b"),
+    ])
+    assert fleet.camera_names == ["a", "b"]
+    percentiles = inter_arrival_percentiles(fleet, percentiles=(0, 100))
+    assert percentiles == {0: 10.0, 100: 60.0}
+
+def test_list_type_rates():
+    """Test list type counts, shares and hourly rates"""
+    fleet = SightingArrays.concatenate([
+        sightings_at([0, HOUR], list_type="blackList"),
+        sightings_at([2 * HOUR], list_type="nonsense"),
+    ])
+    rates = list_type_rates(fleet)
+    assert rates['blackList'] == {'count': 2, 'share': 2 / 3, 'per_hour': 1.0}
+    assert rates['unknown']['count'] == 1
+
+def test_fetch_sightings_from_camera(stub_camera):
+    """Test loading list-typed sightings without detail requests"""
+    camera = stub_camera(make_vehicles(12))
+    host, port = camera.address
+    sightings = fetch_sightings(
+        VehicleRecognition(host, port, "admin", "admin"), "2024-01-01 00:00:00", "2024-01-01 23:59:59"
+    )
+    summary = summarize(sightings)
+    assert summary['total_vehicles'] == 12
+    assert {name: rate['count'] for name, rate in summary['list_types'].items()} == {
+        'outOfList': 3, 'whiteList': 3, 'blackList': 3, 'temporaryList': 3
+    }
+    assert summary['inter_arrival_seconds'][50] == 60.0
+    assert camera.count('SearchSnapVehicleByKey') == 0
+
+def test_fetch_fleet_sightings(stub_camera):
+    """Test that fleet sightings merge per camera and failures are reported"""
+    cameras = [stub_camera(make_vehicles(count)) for count in (4, 6)]
+    fleet = Fleet([Camera(f"cam-{i}", *camera.address) for i, camera in enumerate(cameras)]
+                  + [Camera("offline", "127.0.0.1", 9)])
+    sightings, errors = fetch_fleet_sightings(fleet, "2024-01-01 00:00:00", "2024-01-01 23:59:59")
+    assert summarize(sightings)['cameras'] == {"cam-0": 4, "cam-1": 6}
+    assert list(errors) == ["offline"]
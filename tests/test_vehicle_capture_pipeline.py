@@ -0,0 +1,84 @@
+"""
+Tests for the event-driven vehicle capture pipeline
+"""
+
+import datetime
+import threading
+from conftest import make_vehicles
+from event_demux import EventDemux
+from sighting_cache import SightingCache
+from vehicle_capture_pipeline import VehicleCapturePipeline
+from vehicle_recognition import VehicleRecognition
+
+NS = "http://www.ipc.com/ver10"
+
+def vehicle_event(**fields):
+    body = "".join(f"<{tag}>{value}</{tag}>" for tag, value in fields.items())
+    return f'<config xmlns="{NS}"><smartType>VEHICE</smartType>{body}</config>'
+
+def test_fetches_only_new_captures(stub_camera, tmp_path):
+    """Test each capture is fetched once and persisted, with no range searches"""
+    vehicles = make_vehicles(3)
+    camera = stub_camera(vehicles)
+    host, port = camera.address
+    captures = []
+    with SightingCache(str(tmp_path / "cache.db")) as cache:
+        system = VehicleRecognition(host, port, "admin", "admin", cache=cache)
+        pipeline = VehicleCapturePipeline(system, on_capture=lambda sighting, details: captures.append((sighting, details)))
+        demux = EventDemux()
+        demux.register('VEHICE', pipeline.handle)
+        for vehicle in vehicles + vehicles[:2]:
+            demux.dispatch(vehicle_event(vehicleID=vehicle['vehicleID'], snapTime=vehicle['snapTime']))
+
+        assert [sighting.vehicle_id for sighting, _ in captures] == [1, 2, 3]
+        assert captures[0][1]['vehiclePlate'] == "ABC0000"
+        assert camera.count('SearchSnapVehicleByKey') == 3
+        assert camera.count('SearchSnapVehicleByTime') == 0
+        assert pipeline.stats['duplicates'] == 2
+        assert cache.stats()['sightings'] == 3
+
+        # A new pipeline (e.g. after a restart) is served from the cache
+        restarted = VehicleCapturePipeline(system)
+        restarted.capture(vehicles[0]['vehicleID'], vehicles[0]['snapTime'])
+        assert camera.count('SearchSnapVehicleByKey') == 3
+
+def test_events_without_keys_search_a_narrow_window(stub_camera):
+    """Test the fallback search around the event time"""
+    start = (datetime.datetime.now() - datetime.timedelta(minutes=5)).strftime("%Y-%m-%d %H:%M:%S")
+    camera = stub_camera(make_vehicles(6, start=start, step_seconds=60))
+    host, port = camera.address
+    system = VehicleRecognition(host, port, "admin", "admin")
+    pipeline = VehicleCapturePipeline(system)
+    demux = EventDemux()
+    demux.register('VEHICE', pipeline.handle)
+
+    demux.dispatch(vehicle_event(plate="ABC0005"))
+    assert pipeline.stats['fallback_searches'] == 1
+    assert camera.count('SearchSnapVehicleByTime') == 1
+    # Only the capture within a few seconds of now is fetched
+    assert pipeline.stats['captures'] == 1
+    assert camera.count('SearchSnapVehicleByKey') == 1
+
+def test_follow_subscription(stub_camera):
+    """Test following a live subscription until stopped"""
+    vehicles = make_vehicles(2)
+    camera = stub_camera(vehicles)
+    host, port = camera.address
+    system = VehicleRecognition(host, port, "admin", "admin")
+    stop = threading.Event()
+    captured = []
+
+    def on_capture(sighting, details):
+        captured.append(sighting.vehicle_id)
+        if len(captured) == 2:
+            stop.set()
+
+    pipeline = VehicleCapturePipeline(system, on_capture=on_capture)
+    for vehicle in vehicles:
+        camera.push_event('VEHICE', vehicleID=vehicle['vehicleID'], snapTime=vehicle['snapTime'])
+    follower = threading.Thread(target=pipeline.follow, args=(stop,), kwargs={'timeout': 1, 'renew_time': 30})
+    follower.start()
+    follower.join(10)
+    assert not follower.is_alive()
+    assert captured == [1, 2]
+    assert camera.count('SetUnSubscribe') == 1
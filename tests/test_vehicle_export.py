@@ -0,0 +1,184 @@
+"""
+Tests for the synchronous vehicle recognition client
+"""
+
+import csv
+import io
+import zipfile
+import pytest
+from vehicle_recognition import (
+    VehicleRecognition, VehicleExportWriter, ordered_parallel_map, split_time_range, merge_search_results,
+    list_type_counts, SearchResponseParser, VehicleSearchError, parse_search_response, hour_distribution
+)
+from vehicle_records import SightingBatch
+from conftest import make_vehicles
+
+START = "2024-01-01 00:00:00"
+END = "2024-01-01 23:59:59"
+
+@pytest.fixture
+def system_for(stub_camera):
+    """Build a VehicleRecognition bound to a fresh stub camera"""
+    def build(vehicles, max_concurrency=4, **options):
+        camera = stub_camera(vehicles, **options)
+        host, port = camera.address
+        return camera, VehicleRecognition(host, port, "admin", "admin", max_concurrency=max_concurrency)
+    return build
+
+def read_csv_rows(output_file):
+    with zipfile.ZipFile(output_file) as archive:
+        text = archive.read("VehicleMatchResult.csv").decode('utf-8-sig')
+    return list(csv.reader(io.StringIO(text)))
+
+def test_ordered_parallel_map_keeps_order():
+    """Test that parallel results come back in input order"""
+    import random
+    import time
+
+    def slow_square(x):
+        time.sleep(random.random() * 0.005)
+        return x * x
+
+    assert list(ordered_parallel_map(slow_square, range(50), workers=8)) == [x * x for x in range(50)]
+    assert list(ordered_parallel_map(slow_square, range(5), workers=1)) == [0, 1, 4, 9, 16]
+
+def test_search_vehicles_by_time(system_for):
+    """Test the search result dict shape"""
+    _, system = system_for(make_vehicles(3))
+    success, result = system.search_vehicles_by_time(START, END)
+    assert success
+    assert result['count'] == 3
+    assert set(result['vehicles'][0].keys()) == {'vehicleID', 'snapTime'}
+
+def test_search_parser_yields_items_as_they_complete():
+    """Test that sightings come out of the parser before the body ends"""
+    body = (b'<?xml version="1.0" encoding="UTF-8"?><config xmlns="http://www.ipc.com/ver10" status="success">'
+            b'<captureVehicleList type="list" count="3">'
+            b'<item><vehicleID>1</vehicleID><snapTime>100</snapTime></item>'
+            b'<item><vehicleID>2</vehicleID><snapTime>200</snapTime></item>'
+            b'<item><vehicleID>3</vehicleID><snapTime>300</snapTime></item>'
+            b'</captureVehicleList></config>')
+    split = body.index(b'<item><vehicleID>3')
+    parser = SearchResponseParser()
+    first = list(parser.feed(body[:split]))
+    assert parser.count == 3
+    assert [s.vehicle_id for s in first] == [1, 2]
+    assert [s.vehicle_id for s in parser.feed(body[split:])] + [s.vehicle_id for s in parser.close()] == [3]
+
+    success, result = parse_search_response([body[i:i + 7] for i in range(0, len(body), 7)])
+    assert success
+    assert list(result['vehicles'].pairs()) == [(1, 100), (2, 200), (3, 300)]
+
+def test_search_parser_reports_failure():
+    """Test that failed searches keep their error message"""
+    body = b'<config status="failed" errorCode="4"/>'
+    assert parse_search_response(body) == (False, "Search failed with error code: 4")
+    assert parse_search_response(b'<config status="success"/>') == (False, "No vehicle data found in response")
+    with pytest.raises(VehicleSearchError):
+        list(SearchResponseParser().feed(body))
+
+def test_stream_feeds_detail_fetching(system_for):
+    """Test that streamed sightings can go straight into detail fetching"""
+    camera, system = system_for(make_vehicles(12))
+    sightings = system.stream_vehicles_by_time(START, END)
+    plates = [details['vehiclePlate'] for _, success, details in system.fetch_vehicle_details(sightings, False) if success]
+    assert plates == [f"ABC{i:04d}" for i in range(12)]
+    assert camera.count('SearchSnapVehicleByTime') == 1
+
+def test_details_only_does_not_request_the_picture(system_for):
+    """Test details_only leaves the picture out of the request, not just the parse"""
+    camera, system = system_for(make_vehicles(1))
+    vehicle = make_vehicles(1)[0]
+    success, details = system.get_vehicle_details(vehicle['vehicleID'], vehicle['snapTime'], details_only=True)
+    assert success and details['vehiclePlate'] == vehicle['vehiclePlate'] and details.get('pictureData') is None
+    assert camera.pictures_sent == 0
+    success, details = system.get_vehicle_details(vehicle['vehicleID'], vehicle['snapTime'])
+    assert details.get('pictureData') is not None and camera.pictures_sent == 1
+
+def test_split_time_range():
+    """Test that windows are adjacent whole seconds covering the range"""
+    windows = split_time_range(START, END, 4)
+    assert windows[0] == ("2024-01-01 00:00:00", "2024-01-01 05:59:59")
+    assert windows[-1] == ("2024-01-01 18:00:00", "2024-01-01 23:59:59")
+    assert split_time_range(START, START, 2) == [(START, START)]
+
+def test_merge_search_results_dedupes():
+    """Test merging drops duplicate (vehicleID, snapTime) pairs"""
+    a = {'count': 2, 'vehicles': SightingBatch([2, 1], [20, 10])}
+    b = {'count': 1, 'vehicles': SightingBatch([1], [10])}
+    merged = merge_search_results([a, b])
+    assert merged == {'count': 2, 'vehicles': SightingBatch([1, 2], [10, 20])}
+
+def test_sharded_search_bisects_truncated_windows(system_for):
+    """Test that windows capped by the device are split until complete"""
+    camera, system = system_for(make_vehicles(40, step_seconds=300), max_results=8)
+    success, result = system.search_vehicles_by_time(START, END, shards=2)
+    assert success
+    assert result['count'] == 40
+    assert list(result['vehicles'].vehicle_ids) == list(range(1, 41))
+    assert camera.count('SearchSnapVehicleByTime') > 2
+
+def test_statistics_make_no_detail_requests(system_for):
+    """Test that statistics come from searches alone"""
+    camera, system = system_for(make_vehicles(8, step_seconds=1800))
+    success, stats = system.get_vehicle_statistics(START, END)
+    assert success
+    assert stats['total_vehicles'] == 8
+    assert stats['list_types'] == {'outOfList': 2, 'whiteList': 2, 'blackList': 2, 'temporaryList': 2}
+    assert stats['time_distribution'] == {8: 2, 9: 2, 10: 2, 11: 2}
+    assert camera.count('SearchSnapVehicleByKey') == 0
+    assert camera.count('SearchSnapVehicleByTime') == 5
+
+def test_hour_distribution_uses_camera_utc_offset():
+    """Test hours follow the camera's UTC offset rather than the host time zone"""
+    # 2024-01-01 08:00 and 08:30 UTC, then 23:30 UTC
+    vehicles = [{'snapTime': t * 1000000} for t in (1704096000, 1704097800, 1704151800)]
+    vehicles.append({'snapTime': 'bad'})
+    distribution, undated = hour_distribution(vehicles, utc_offset=0)
+    assert distribution == {8: 2, 23: 1}
+    assert undated == [{'snapTime': 'bad'}]
+    assert hour_distribution(vehicles, utc_offset=3600)[0] == {9: 2, 0: 1}
+
+def test_list_type_counts_rejects_untrusted_searches():
+    """Test that failed or inconsistent filtered searches force a detail fallback"""
+    found = (True, {'count': 3, 'vehicles': []})
+    assert list_type_counts([('whiteList', found)], 3) == {'whiteList': 3}
+    assert list_type_counts([('whiteList', found)], 4) is None
+    assert list_type_counts([('whiteList', found), ('blackList', (False, "error"))], 3) is None
+
+def test_parallel_export_preserves_sighting_order(system_for, tmp_path):
+    """Test that parallel detail fetching writes rows in sighting order"""
+    camera, system = system_for(make_vehicles(30), max_concurrency=3, delay=0.005)
+    output_file = str(tmp_path / "export.zip")
+
+    success, message = system.export_vehicle_data(START, END, output_file=output_file, workers=6)
+
+    assert success, message
+    assert "vehicles/s" in message
+    rows = read_csv_rows(output_file)
+    assert rows[0][:2] == ["Index", "Vehicle Plate"]
+    assert [row[1] for row in rows[1:]] == [f"ABC{i:04d}" for i in range(30)]
+    assert camera.count('SearchSnapVehicleByKey') == 30
+    assert camera.max_in_flight <= 3
+
+def test_export_writer_streams_rows_and_images(tmp_path):
+    """Test that rows are CSV-quoted and images are written as rows arrive"""
+    import base64
+
+    output_file = str(tmp_path / "export.zip")
+    with VehicleExportWriter(output_file) as writer:
+        for i in range(3):
+            writer.add({
+                'vehiclePlate': f"A,{i}",
+                'listType': "Allow List",
+                'snapTime': f"2024-01-01 08:0{i}:00",
+                'snapPicFileName': f"{i}.jpg",
+                'color': "white",
+                'pictureData': base64.b64encode(f"image-{i}".encode()).decode()
+            })
+        assert writer.images == 3
+
+    rows = read_csv_rows(output_file)
+    assert [row[1] for row in rows[1:]] == ["A,0", "A,1", "A,2"]
+    with zipfile.ZipFile(output_file) as archive:
+        assert archive.read("SnapPic/2.jpg") == b"image-2"
@@ -0,0 +1,40 @@
+"""
+Tests for the compact sighting and detail records
+"""
+
+import pytest
+from vehicle_records import Sighting, SightingBatch, VehicleDetails
+
+def test_sighting_reads_like_the_old_dict():
+    """Test that sightings keep the dict-style field access"""
+    sighting = Sighting("7", "1700000000123456")
+    assert sighting['vehicleID'] == 7
+    assert sighting['snapTime'] == 1700000000123456
+    assert set(sighting.keys()) == {'vehicleID', 'snapTime'}
+    with pytest.raises(KeyError):
+        sighting['plate']
+    with pytest.raises(AttributeError):
+        sighting.extra = 1
+
+def test_details_skip_missing_fields():
+    """Test that missing detail fields behave like absent dict keys"""
+    details = VehicleDetails.from_dict({'vehiclePlate': "ABC", 'time': "2024-01-01 08:00:00"})
+    assert details['vehiclePlate'] == "ABC"
+    assert 'pictureData' not in details
+    assert details.get('color', 'Unknown') == 'Unknown'
+    assert dict(details.items()) == {'time': "2024-01-01 08:00:00", 'vehiclePlate': "ABC"}
+    assert details == {'time': "2024-01-01 08:00:00", 'vehiclePlate': "ABC"}
+
+def test_batch_sorts_and_filters_without_parsing():
+    """Test batch indexing, slicing, sorting and time filtering"""
+    batch = SightingBatch.from_sightings([
+        {'vehicleID': '3', 'snapTime': '300'},
+        Sighting(1, 100),
+        {'vehicleID': '2', 'snapTime': '200'},
+    ])
+    assert len(batch) == 3
+    assert batch[1] == Sighting(1, 100)
+    assert list(batch.sorted_by_time().vehicle_ids) == [1, 2, 3]
+    assert list(batch.sorted_by_time(reverse=True)[:2].snap_times) == [300, 200]
+    assert list(batch.between(150, 300).pairs()) == [(3, 300), (2, 200)]
+    assert batch.vehicle_ids.itemsize + batch.snap_times.itemsize == 12
@@ -0,0 +1,54 @@
+"""
+Tests for the namespace-agnostic XML accessor
+"""
+
+import random
+import xml.etree.ElementTree as ET
+import pytest
+from xml_accessor import XmlIndex
+
+NS = "http://www.ipc.com/ver10"
+TAGS = ["item", "enum", "switch", "value", "types", "name"]
+
+def random_document(seed, namespace):
+    """Build a random nested document using a small set of repeated tags"""
+    rng = random.Random(seed)
+    prefix = f"{{{namespace}}}" if namespace else ""
+    root = ET.Element(f"{prefix}config")
+    nodes = [root]
+    for i in range(200):
+        parent = rng.choice(nodes)
+        child = ET.SubElement(parent, prefix + rng.choice(TAGS))
+        child.text = str(i)
+        nodes.append(child)
+    return ET.tostring(root), nodes
+
+@pytest.mark.parametrize("namespace", [NS, ""])
+def test_lookups_match_elementtree(namespace):
+    """Test find/findall/children against the ElementPath queries they replace"""
+    content, _ = random_document(7, namespace)
+    doc = XmlIndex(content)
+    root = doc.root
+    ns = {'ipc': namespace}
+    q = (lambda tag: f"ipc:{tag}") if namespace else (lambda tag: tag)
+
+    assert doc.namespace == namespace
+    for elem in root.iter():
+        for tag in TAGS:
+            assert doc.find(elem, tag) is elem.find(f".//{q(tag)}", ns)
+            assert doc.findall(elem, tag) == elem.findall(f".//{q(tag)}", ns)
+            assert doc.children(elem, tag) == elem.findall(q(tag), ns)
+            for child_tag in ("enum", "value"):
+                path = f".//{q(tag)}/{q(child_tag)}"
+                assert doc.findall(elem, f"{tag}/{child_tag}") == elem.findall(path, ns)
+                assert doc.find(elem, f"{tag}/{child_tag}") is elem.find(path, ns)
+
+def test_text_and_missing_tags():
+    """Test text lookups with defaults"""
+    doc = XmlIndex(f'<config xmlns="{NS}"><deviceInfo><deviceName>cam</deviceName><model/></deviceInfo></config>')
+    info = doc.find(doc.root, 'deviceInfo')
+    assert doc.tag(info) == 'deviceInfo'
+    assert doc.text(info, 'deviceName') == 'cam'
+    assert doc.text(info, 'model', 'N/A') == 'N/A'
+    assert doc.find(info, 'missing') is None
+    assert doc.findall(info, 'missing/enum') == []
@@ -0,0 +1,54 @@
+"""
+Tests for the pluggable XML parser backend
+"""
+
+import base64
+import pytest
+import xml_backend
+from xml_accessor import XmlIndex
+from vehicle_recognition import parse_vehicle_details, parse_search_response
+
+NS = "http://www.ipc.com/ver10"
+
+@pytest.fixture(params=xml_backend.available_backends())
+def backend(request):
+    """Run a test once per installed backend, restoring the default after"""
+    xml_backend.use_backend(request.param)
+    yield request.param
+    xml_backend.use_backend()
+
+def test_fromstring_accepts_declared_str(backend):
+    """Test str input with an encoding declaration on every backend"""
+    root = xml_backend.fromstring(f'<?xml version="1.0" encoding="UTF-8"?><config xmlns="{NS}"><a>1</a></config>')
+    doc = XmlIndex(root=root)
+    assert doc.namespace == NS
+    assert doc.text(root, 'a') == '1'
+
+def test_details_with_large_picture(backend):
+    """Test that multi-megabyte base64 text nodes parse on every backend"""
+    picture = base64.b64encode(b"\xff" * (8 * 1024 * 1024)).decode()
+    content = (f'<config xmlns="{NS}" status="success"><snapVehicle><snapInfo>'
+               f'<vehiclePlate>ABC</vehiclePlate><pictureData>{picture}</pictureData>'
+               f'</snapInfo></snapVehicle></config>').encode()
+    success, details = parse_vehicle_details(content)
+    assert success
+    assert details['vehiclePlate'] == "ABC"
+    assert len(details['pictureData']) == len(picture)
+
+def test_pull_parser_backends_agree():
+    """Test the streamed search on each pull parser backend"""
+    content = (f'<config xmlns="{NS}"><captureVehicleList count="2">'
+               '<item><vehicleID>1</vehicleID><snapTime>10</snapTime></item>'
+               '<item><vehicleID>2</vehicleID><snapTime>20</snapTime></item>'
+               '</captureVehicleList></config>').encode()
+    for name in xml_backend.available_backends():
+        parser = xml_backend.XMLPullParser(events=('end',), backend=name)
+        parser.feed(content)
+        ends = [elem.tag.rsplit('}', 1)[-1] for _, elem in parser.read_events()]
+        assert ends.count('item') == 2
+    assert list(parse_search_response(content)[1]['vehicles'].pairs()) == [(1, 10), (2, 20)]
+
+def test_unknown_backend_rejected():
+    """Test that asking for a missing backend fails loudly"""
+    with pytest.raises(ValueError):
+        xml_backend.use_backend('expat2')
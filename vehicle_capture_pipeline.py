@@ -0,0 +1,162 @@
+"""
+Vehicle Capture Pipeline
+========================
+
+Follows a camera's VEHICE events and fetches SearchSnapVehicleByKey
+details only for captures it has not seen yet, persisting them through the
+SightingCache. Device load follows the traffic: one detail request per new
+vehicle, instead of a range search plus a detail request per result on
+every poll.
+
+Events that carry no vehicleID/snapTime fall back to a search over a
+narrow window around the event. After the subscription had to be
+reopened, the gap since the last capture is searched once, so captures
+made while it was down are not missed.
+
+Example:
+    vehicle_system = VehicleRecognition(host, port, username, password, cache=SightingCache())
+    pipeline = VehicleCapturePipeline(vehicle_system, on_capture=print_capture)
+    pipeline.follow()
+"""
+
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from event_demux import EventDemux
+from event_subscription import DEFAULT_PULL_TIMEOUT, DEFAULT_RENEW_TIME, PullSubscription
+from vehicle_records import Sighting
+
+# Seconds searched either side of an event that carries no capture keys
+FALLBACK_WINDOW = 5
+# Capture keys remembered to recognize repeated events
+SEEN_LIMIT = 10000
+
+def format_time(timestamp):
+    """Local 'YYYY-MM-DD HH:MM:SS' for a timestamp in seconds"""
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+class VehicleCapturePipeline:
+    """Turn VEHICE events into persisted vehicle details
+
+    on_capture(sighting, details) is called once for every new capture.
+    """
+
+    def __init__(self, vehicle_system, on_capture=None, request_picture=False, fallback_window=FALLBACK_WINDOW,
+                 seen_limit=SEEN_LIMIT):
+        self.vehicle_system = vehicle_system
+        self.on_capture = on_capture
+        self.request_picture = request_picture
+        self.fallback_window = fallback_window
+        self.seen_limit = seen_limit
+        self.last_snap_time = None
+        self._seen = OrderedDict()
+        self.stats = {'events': 0, 'captures': 0, 'duplicates': 0, 'fallback_searches': 0, 'catch_ups': 0, 'errors': 0}
+
+    def _remember(self, key):
+        self._seen[key] = None
+        if len(self._seen) > self.seen_limit:
+            self._seen.popitem(last=False)
+
+    def capture(self, vehicle_id, snap_time):
+        """Fetch and persist one capture unless it was already seen; returns its details or None"""
+        sighting = Sighting(vehicle_id, snap_time)
+        if sighting.key in self._seen:
+            self.stats['duplicates'] += 1
+            return None
+
+        success, details = self.vehicle_system.get_vehicle_details(
+            sighting.vehicle_id, sighting.snap_time, request_panoramic_pic=self.request_picture,
+            details_only=not self.request_picture
+        )
+        if not success:
+            # Not remembered, so a repeated event or a catch-up retries it
+            self.stats['errors'] += 1
+            print(f"Warning: Could not fetch vehicle {sighting.vehicle_id}: {details}")
+            return None
+
+        self._remember(sighting.key)
+        self.last_snap_time = max(self.last_snap_time or 0, sighting.snap_time)
+        self.stats['captures'] += 1
+        if self.on_capture is not None:
+            self.on_capture(sighting, details)
+        return details
+
+    def search(self, start_time, end_time):
+        """Capture every unseen vehicle in a time range; returns the number of new captures"""
+        success, result = self.vehicle_system.search_vehicles_by_time(start_time, end_time)
+        if not success:
+            self.stats['errors'] += 1
+            print(f"Warning: Vehicle search failed: {result}")
+            return 0
+        captured = 0
+        for vehicle in result['vehicles'].sorted_by_time():
+            if self.capture(vehicle.vehicle_id, vehicle.snap_time) is not None:
+                captured += 1
+        return captured
+
+    def handle(self, event):
+        """Handle one VEHICE event (an EventDemux handler)"""
+        self.stats['events'] += 1
+        vehicle_id = event.vehicle_id
+        snap_time = event.snap_time
+        if vehicle_id is not None and snap_time is not None:
+            return self.capture(vehicle_id, snap_time)
+
+        # No capture keys in the event: search a few seconds around it
+        self.stats['fallback_searches'] += 1
+        center = snap_time / 1000000 if snap_time is not None else event.received_at
+        return self.search(format_time(center - self.fallback_window), format_time(center + self.fallback_window))
+
+    def catch_up(self, since=None):
+        """Search from the last capture (or since, in seconds) to now"""
+        if since is None:
+            if self.last_snap_time is None:
+                return 0
+            since = self.last_snap_time / 1000000
+        self.stats['catch_ups'] += 1
+        return self.search(format_time(since), format_time(time.time()))
+
+    def follow(self, stop=None, timeout=DEFAULT_PULL_TIMEOUT, renew_time=DEFAULT_RENEW_TIME):
+        """Subscribe to VEHICE events and handle them until stop (a threading.Event) is set"""
+        demux = EventDemux()
+        demux.register('VEHICE', self.handle)
+        subscription = PullSubscription(self.vehicle_system.client, demux.smart_types, timeout=timeout,
+                                        renew_time=renew_time, parser=demux.parse)
+        resubscribes = 0
+        try:
+            for event in subscription.messages(stop):
+                if subscription.stats['resubscribes'] != resubscribes:
+                    # Captures made while the subscription was down sent no events
+                    resubscribes = subscription.stats['resubscribes']
+                    self.catch_up()
+                demux.handle(event)
+        finally:
+            subscription.unsubscribe()
+
+def print_capture(sighting, details):
+    """Print one new capture as the show_* scripts do"""
+    snap = datetime.datetime.fromtimestamp(sighting.snap_time / 1000000)
+    print(f"🚗 {snap.strftime('%Y-%m-%d %H:%M:%S')}  Vehicle ID: {sighting.vehicle_id}  "
+          f"Plate: {details.get('vehiclePlate') or 'Unknown'}  Type: {details.get('listType') or 'Unknown'}  "
+          f"Color: {details.get('color') or 'Unknown'}")
+
+def follow_live(vehicle_system):
+    """Print new vehicles as they are captured until Ctrl+C"""
+    pipeline = VehicleCapturePipeline(vehicle_system, on_capture=print_capture)
+    stop = threading.Event()
+    worker = threading.Thread(target=pipeline.follow, args=(stop,), daemon=True)
+    print("\n📡 Following new vehicles as they are captured. Press Ctrl+C to stop.")
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(0.5)
+    except KeyboardInterrupt:
+        print("\nStopping...")
+        stop.set()
+        # The pending long poll returns within its timeout
+        worker.join(DEFAULT_PULL_TIMEOUT + 10)
+    stats = pipeline.stats
+    print(f"📊 {stats['captures']} new vehicles from {stats['events']} events "
+          f"({stats['duplicates']} repeated, {stats['fallback_searches']} fallback searches)")
+    return pipeline
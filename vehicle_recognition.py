@@ -1,156 +1,639 @@
-import requests
-import base64
-import xml.etree.ElementTree as ET
+import xml_backend
 import os
 import datetime
 import time
 import csv
+import tempfile
 import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+from camera_client import CameraClient
+from xml_accessor import XmlIndex
+from picture_extract import PictureSpan, split_picture
+from sighting_cache import SightingCache
+from vehicle_records import Sighting, SightingBatch, VehicleDetails
+
+LIST_TYPE_MAP = {
+    "outOfList": "Stranger Vehicle",
+    "temporaryList": "Temporary Vehicle",
+    "blackList": "Blacklist Vehicle",
+    "whiteList": "Whitelist Vehicle"
+}
+
+SEARCH_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Bytes read per step when streaming a search response
+SEARCH_CHUNK_SIZE = 16 * 1024
+
+SD_ERROR_MESSAGES = {
+    "no card": "No SD card detected",
+    "formatting": "SD card is being formatted",
+    "uninit": "SD card is not initialized",
+    "popup": "SD card has been ejected",
+    "timeout": "SD card operation timeout"
+}
+
+def build_search_by_time_body(start_time, end_time, vehicle_plate="", list_type=""):
+    """Build the SearchSnapVehicleByTime request body"""
+    return f'''<?xml version="1.0" encoding="utf-8"?>
+<config><search>
+<starttime type="string"><![CDATA[{start_time}]]></starttime>
+<endtime type="string"><![CDATA[{end_time}]]></endtime>
+{'' if not vehicle_plate else f'<vehiclePlate type="string"><![CDATA[{vehicle_plate}]]></vehiclePlate>'}
+{'' if not list_type else f'<listType type="listType">{list_type}</listType>'}
+</search></config>'''
+
+def build_search_by_key_body(vehicle_id, snap_time, request_panoramic_pic=True):
+    """Build the SearchSnapVehicleByKey request body"""
+    return f'''<?xml version="1.0" encoding="utf-8"?>
+<config><search>
+<snapTime type="uint64">{snap_time}</snapTime>
+<vehicleID type="uint32">{vehicle_id}</vehicleID>
+<requestPanoramicPic type="boolean">{str(request_panoramic_pic).lower()}</requestPanoramicPic>
+</search></config>'''
+
+def parse_sd_status(content):
+    """Parse a GetSdCardStatus response"""
+    doc = XmlIndex(content)
+    root = doc.root
+    
+    status = doc.find(root, 'sdCardInfo/status')
+    if status is not None:
+        status_text = status.text
+        if status_text != "normal":
+            return False, SD_ERROR_MESSAGES.get(status_text, f"SD card status: {status_text}")
+        return True, "SD card is ready"
+    return False, "Unable to determine SD card status"
+
+class VehicleSearchError(Exception):
+    """A search response reported failure or had no vehicle list"""
+
+def local_tag(elem):
+    """Element tag without its namespace"""
+    return elem.tag.rsplit('}', 1)[-1]
+
+class SearchResponseParser:
+    """Incrementally parse a SearchSnapVehicleByTime response
+
+    Feed the response body in chunks; each call yields the sightings whose
+    <item> element completed in that chunk. Finished items are cleared and
+    detached, so memory stays bounded by the chunk size rather than the
+    number of vehicles.
+    """
+    
+    def __init__(self):
+        self.status = None
+        self.error_code = None
+        self.count = None
+        self._parser = xml_backend.XMLPullParser(events=('start', 'end'))
+        self._root = None
+        self._vehicle_list = None
+        self._vehicle_id = None
+        self._snap_time = None
+    
+    def feed(self, data):
+        """Parse another chunk and yield the sightings it completed"""
+        self._parser.feed(data)
+        return self._read_events()
+    
+    def close(self):
+        """Finish parsing and yield any remaining sightings"""
+        self._parser.close()
+        for sighting in self._read_events():
+            yield sighting
+        if self._vehicle_list is None:
+            raise VehicleSearchError("No vehicle data found in response")
+    
+    def _read_events(self):
+        for event, elem in self._parser.read_events():
+            tag = local_tag(elem)
+            if event == 'start':
+                if self._root is None:
+                    self._root = elem
+                    self.status = elem.get('status')
+                    if self.status == 'failed':
+                        self.error_code = elem.get('errorCode', 'unknown')
+                        raise VehicleSearchError(f"Search failed with error code: {self.error_code}")
+                elif tag == 'captureVehicleList' and self._vehicle_list is None:
+                    self._vehicle_list = elem
+                    self.count = int(elem.get('count', '0'))
+                elif tag == 'item':
+                    self._vehicle_id = None
+                    self._snap_time = None
+            elif tag == 'vehicleID':
+                self._vehicle_id = elem.text
+            elif tag == 'snapTime':
+                self._snap_time = elem.text
+            elif tag == 'item':
+                vehicle_id, snap_time = self._vehicle_id, self._snap_time
+                elem.clear()
+                if self._vehicle_list is not None:
+                    # Finished items are detached, so the list never holds more than one
+                    try:
+                        self._vehicle_list.remove(elem)
+                    except ValueError:
+                        pass
+                if vehicle_id is not None and snap_time is not None:
+                    try:
+                        yield Sighting(vehicle_id, snap_time)
+                    except (TypeError, ValueError):
+                        continue
+
+def parse_search_response(content):
+    """Parse a SearchSnapVehicleByTime response
+
+    content is the whole body or an iterable of body chunks.
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    if isinstance(content, bytes):
+        content = [content]
+    
+    parser = SearchResponseParser()
+    vehicles = SightingBatch()
+    try:
+        for chunk in content:
+            for sighting in parser.feed(chunk):
+                vehicles.append(sighting.vehicle_id, sighting.snap_time)
+        for sighting in parser.close():
+            vehicles.append(sighting.vehicle_id, sighting.snap_time)
+    except VehicleSearchError as e:
+        return False, str(e)
+    
+    return True, {'count': parser.count, 'vehicles': vehicles}
+
+def split_time_range(start_time, end_time, shards):
+    """Split an inclusive time range into up to shards adjacent windows
+
+    Windows are whole seconds and never overlap: each one ends one second
+    before the next one starts.
+    """
+    try:
+        start = datetime.datetime.strptime(start_time, SEARCH_TIME_FORMAT)
+        end = datetime.datetime.strptime(end_time, SEARCH_TIME_FORMAT)
+    except ValueError:
+        # Leave unparseable ranges for the device to accept or reject
+        return [(start_time, end_time)]
+    total = int((end - start).total_seconds())
+    if total < 0:
+        return [(start_time, end_time)]
+    
+    shards = max(1, min(shards, total + 1))
+    step = (total + 1) / shards
+    windows = []
+    for i in range(shards):
+        window_start = start + datetime.timedelta(seconds=int(i * step))
+        window_end = start + datetime.timedelta(seconds=int((i + 1) * step) - 1)
+        windows.append((window_start.strftime(SEARCH_TIME_FORMAT), window_end.strftime(SEARCH_TIME_FORMAT)))
+    return windows
+
+def is_truncated_search(result):
+    """Return True if a search returned fewer items than its reported count"""
+    return len(result['vehicles']) < result['count']
+
+def merge_search_results(results):
+    """Merge search results, dropping duplicates by (vehicleID, snapTime)
+
+    Vehicles come back sorted by snap time in the usual search dict shape.
+    """
+    seen = set()
+    vehicles = SightingBatch()
+    for result in results:
+        for key in result['vehicles'].pairs():
+            if key not in seen:
+                seen.add(key)
+                vehicles.append(*key)
+    vehicles = vehicles.sorted_by_time()
+    return {'count': len(vehicles), 'vehicles': vehicles}
+
+def plan_search_windows(windows, results):
+    """Sort finished search windows into complete results and windows to retry
+
+    Any window whose result looks truncated is bisected and returned for
+    another round; windows that are already one second wide are kept as is.
+    """
+    complete = []
+    retry = []
+    for (start_time, end_time), result in zip(windows, results):
+        if is_truncated_search(result):
+            halves = split_time_range(start_time, end_time, 2)
+            if len(halves) > 1:
+                retry.extend(halves)
+                continue
+            print(f"Warning: {start_time} returned {len(result['vehicles'])} of {result['count']} vehicles")
+        complete.append(result)
+    return complete, retry
+
+def parse_vehicle_details(content, details_only=False):
+    """Parse a SearchSnapVehicleByKey response
+    
+    The picture is cut out of the raw response before parsing. With
+    details_only=True it is skipped entirely and pictureData stays None.
+    """
+    success, result = parse_vehicle_snapshot(content)
+    if not success:
+        return False, result
+    details, picture = result
+    if picture is not None and not details_only:
+        details.picture_data = picture.text()
+    return True, details
+
+def parse_vehicle_snapshot(content):
+    """Parse a SearchSnapVehicleByKey response into (details, PictureSpan or None)
+    
+    The picture is left undecoded in the response buffer; stream it to disk
+    or into an archive with PictureSpan.write_to()/save().
+    """
+    stripped, picture = split_picture(content)
+    doc = XmlIndex(stripped)
+    root = doc.root
+    
+    # Check for errors
+    status = root.get('status')
+    if status == 'failed':
+        error_code = root.get('errorCode', 'unknown')
+        return False, f"Failed to get vehicle details with error code: {error_code}"
+    
+    # Parse vehicle details
+    snap_vehicle = doc.find(root, 'snapVehicle')
+    if snap_vehicle is None:
+        return False, "No vehicle data found in response"
+    
+    snap_info = doc.find(snap_vehicle, 'snapInfo')
+    if snap_info is None:
+        return False, "No snap info found in response"
+    
+    details = VehicleDetails()
+    
+    # Extract all available information
+    for field in VehicleDetails.FIELDS:
+        elem = doc.find(snap_info, field)
+        if elem is not None:
+            details[field] = elem.text
+    
+    return True, (details, picture)
+
+def ordered_parallel_map(func, items, workers):
+    """Apply func to items on a thread pool, yielding results in input order
+
+    At most 2 * workers calls are pending at once, so results that arrive
+    early are never buffered for more than a short window.
+    """
+    if workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def build_export_row(vehicle, details, include_images):
+    """Build one export row from a sighting and its details"""
+    # Format time
+    time_str = details.get('time', '')
+    if time_str:
+        time_str = time_str[:19]  # Remove milliseconds
+    
+    return {
+        'vehiclePlate': details.get('vehiclePlate', ''),
+        'listType': LIST_TYPE_MAP.get(details.get('listType', ''), 'Unknown'),
+        'snapTime': time_str,
+        'color': details.get('color', ''),
+        'pictureData': details.get('pictureData', '') if include_images else '',
+        'snapPicFileName': f"{vehicle['snapTime']}.jpg"
+    }
+
+def default_export_filename():
+    """Generate a timestamped export archive name"""
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"Vehicle_Export_{timestamp}.zip"
+
+class VehicleExportWriter:
+    """Stream export rows and images into a ZIP archive as they arrive
+
+    Each image is decoded chunk by chunk into the archive as soon as its row
+    is added, and CSV rows go through a csv.writer into a spooled temporary
+    file, so memory use does not grow with the number of vehicles. The CSV
+    member is copied into the archive when the writer is closed.
+    """
+    CSV_NAME = "VehicleMatchResult.csv"
+    CSV_HEADER = ["Index", "Vehicle Plate", "List Type", "Snap Time", "SnapPicFileName", "Color"]
+    
+    def __init__(self, output_file, include_images=True):
+        self.output_file = output_file
+        self.include_images = include_images
+        self.rows = 0
+        self.images = 0
+        self._zip_file = zipfile.ZipFile(output_file, 'w')
+        self._csv_buffer = tempfile.SpooledTemporaryFile(max_size=1024 * 1024, mode='w+', encoding='utf-8', newline='')
+        # Add BOM for Chinese characters
+        self._csv_buffer.write('\ufeff')
+        self._csv = csv.writer(self._csv_buffer, lineterminator='\n')
+        self._csv.writerow(self.CSV_HEADER)
+    
+    def add(self, data, picture=None):
+        """Append one export row and write its image, if any
+        
+        picture may be a PictureSpan from parse_vehicle_snapshot(); otherwise
+        the row's base64 pictureData is used.
+        """
+        self.rows += 1
+        self._csv.writerow([self.rows, data['vehiclePlate'], data['listType'], data['snapTime'], data['snapPicFileName'], data['color']])
+        
+        if not self.include_images:
+            return
+        if picture is None and data['pictureData']:
+            picture = PictureSpan.from_text(data['pictureData'])
+        if picture is not None:
+            try:
+                # Decode base64 image data in chunks straight into the archive member
+                with self._zip_file.open(f"SnapPic/{data['snapPicFileName']}", 'w') as member:
+                    picture.write_to(member)
+                self.images += 1
+            except Exception as e:
+                print(f"Warning: Failed to add image {data['snapPicFileName']}: {e}")
+    
+    def close(self):
+        """Copy the CSV into the archive and close it"""
+        if self._zip_file is None:
+            return
+        try:
+            self._csv_buffer.seek(0)
+            with self._zip_file.open(self.CSV_NAME, 'w') as member:
+                while True:
+                    chunk = self._csv_buffer.read(64 * 1024)
+                    if not chunk:
+                        break
+                    member.write(chunk.encode('utf-8'))
+        finally:
+            self._csv_buffer.close()
+            self._zip_file.close()
+            self._zip_file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def write_export_archive(export_data, include_images, output_file):
+    """Write export rows and images to a ZIP archive"""
+    with VehicleExportWriter(output_file, include_images) as writer:
+        for data in export_data:
+            writer.add(data)
+
+def empty_statistics():
+    """Statistics result for a period without vehicles"""
+    return {
+        'total_vehicles': 0,
+        'list_types': {},
+        'time_distribution': {}
+    }
+
+def accumulate_statistics(details, list_types, time_distribution):
+    """Add one vehicle's details to the list type and hourly counters"""
+    list_type = details.get('listType', 'unknown')
+    list_types[list_type] = list_types.get(list_type, 0) + 1
+    
+    # Time distribution (by hour)
+    time_str = details.get('time', '')
+    if time_str:
+        try:
+            dt = datetime.datetime.strptime(time_str[:19], '%Y-%m-%d %H:%M:%S')
+            hour = dt.hour
+            time_distribution[hour] = time_distribution.get(hour, 0) + 1
+        except:
+            pass
+
+def snap_time_hour(snap_time, utc_offset=None):
+    """Return the local hour of a microsecond snapTime, or None if it is unusable
+
+    utc_offset is the camera's offset from UTC in seconds; with None the
+    system time zone is used, as in vehicle_analytics.local_seconds.
+    """
+    try:
+        if utc_offset is not None:
+            return (int(snap_time) // 1000000 + int(utc_offset)) // 3600 % 24
+        return datetime.datetime.fromtimestamp(int(snap_time) / 1000000).hour
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+def hour_distribution(vehicles, utc_offset=None):
+    """Count sightings per hour from their snapTime
+
+    Hours are local to utc_offset (see snap_time_hour). Returns the
+    distribution and the vehicles whose snapTime could not be used, which
+    need a detail lookup instead.
+    """
+    time_distribution = {}
+    undated = []
+    for vehicle in vehicles:
+        hour = snap_time_hour(vehicle['snapTime'], utc_offset)
+        if hour is None:
+            undated.append(vehicle)
+        else:
+            time_distribution[hour] = time_distribution.get(hour, 0) + 1
+    return time_distribution, undated
+
+def list_type_counts(results, total):
+    """Build list type counts from listType-filtered searches
+
+    results holds (list_type, (success, result)) pairs. Returns None if any
+    search failed or the counts do not add up to total, in which case list
+    types have to be read from vehicle details.
+    """
+    list_types = {}
+    for list_type, (success, result) in results:
+        if not success:
+            return None
+        if result['count']:
+            list_types[list_type] = result['count']
+    if sum(list_types.values()) != total:
+        return None
+    return list_types
 
 class VehicleRecognition:
-    def __init__(self, host, port, username, password):
+    def __init__(self, host, port, username, password, max_concurrency=4, cache=None):
         self.host = host
         self.port = port
         self.username = username
         self.password = password
         
-        # Build URLs
-        self.url_search_by_time = f"http://{host}:{port}/SearchSnapVehicleByTime"
-        self.url_search_by_key = f"http://{host}:{port}/SearchSnapVehicleByKey"
-        self.url_sd_status = f"http://{host}:{port}/GetSdCardStatus"
+        # Optional SightingCache; capture records never change, so cached
+        # details are served without a request to the camera
+        self.cache = cache
+        self.cache_key = f"{host}:{port}"
         
-        # Prepare headers
-        auth_str = f"{username}:{password}"
-        auth_bytes = auth_str.encode('ascii')
-        base64_auth = base64.b64encode(auth_bytes).decode('ascii')
-        self.headers = {
-            'Connection': 'Keep-Alive',
-            'Content-Type': 'application/xml; charset=UTF-8',
-            'Accept': 'application/xml; charset=UTF-8',
-            'Authorization': f'Basic {base64_auth}',
-            'User-Agent': 'Mozilla/5.0'
-        }
+        # Pooled keep-alive session shared by every request to this camera,
+        # with at most max_concurrency requests in flight at once
+        self.client = CameraClient(host, port, username, password, max_concurrency=max_concurrency)
+        self.headers = self.client.headers
+    
+    def close(self):
+        """Close the camera's pooled connections"""
+        self.client.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def check_sd_status(self):
         """Check SD card status before operations"""
         try:
-            response = requests.post(self.url_sd_status, headers=self.headers, timeout=15)
+            response = self.client.post('GetSdCardStatus', timeout=15)
             response.raise_for_status()
-            root = ET.fromstring(response.content)
-            ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
-            
-            status = root.find('.//ipc:sdCardInfo/ipc:status', ns) if ns else root.find('.//sdCardInfo/status')
-            if status is not None:
-                status_text = status.text
-                if status_text != "normal":
-                    error_messages = {
-                        "no card": "No SD card detected",
-                        "formatting": "SD card is being formatted",
-                        "uninit": "SD card is not initialized",
-                        "popup": "SD card has been ejected",
-                        "timeout": "SD card operation timeout"
-                    }
-                    return False, error_messages.get(status_text, f"SD card status: {status_text}")
-                return True, "SD card is ready"
-            return False, "Unable to determine SD card status"
+            return parse_sd_status(response.content)
         except Exception as e:
             return False, f"Error checking SD card status: {e}"
     
-    def search_vehicles_by_time(self, start_time, end_time, vehicle_plate="", list_type=""):
-        """Search for vehicles within a time range"""
+    def search_vehicles_by_time(self, start_time, end_time, vehicle_plate="", list_type="", shards=1, workers=None):
+        """Search for vehicles within a time range
+
+        The range is split into shards windows that are searched in
+        parallel. Any window whose result looks truncated by the device is
+        bisected and searched again, and the results are merged without
+        duplicates.
+        """
+        windows = split_time_range(start_time, end_time, shards)
+        if workers is None:
+            workers = self.client.max_concurrency or len(windows)
+        
+        def search(window):
+            return self.search_time_window(window[0], window[1], vehicle_plate, list_type)
+        
+        complete = []
+        while windows:
+            results = list(ordered_parallel_map(search, windows, min(workers, len(windows))))
+            for success, result in results:
+                if not success:
+                    return False, result
+            done, windows = plan_search_windows(windows, [result for _, result in results])
+            complete.extend(done)
+        
+        if len(complete) == 1:
+            return True, complete[0]
+        return True, merge_search_results(complete)
+    
+    def search_time_window(self, start_time, end_time, vehicle_plate="", list_type=""):
+        """Send a single SearchSnapVehicleByTime request"""
         try:
-            # Build XML request
-            xml_body = f'''<?xml version="1.0" encoding="utf-8"?>
-<config><search>
-<starttime type="string"><![CDATA[{start_time}]]></starttime>
-<endtime type="string"><![CDATA[{end_time}]]></endtime>
-{'' if not vehicle_plate else f'<vehiclePlate type="string"><![CDATA[{vehicle_plate}]]></vehiclePlate>'}
-{'' if not list_type else f'<listType type="listType">{list_type}</listType>'}
-</search></config>'''
-            
-            response = requests.post(self.url_search_by_time, headers=self.headers, data=xml_body.encode('utf-8'))
-            response.raise_for_status()
-            
-            root = ET.fromstring(response.content)
-            ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
-            
-            # Check for errors
-            status = root.get('status')
-            if status == 'failed':
-                error_code = root.get('errorCode', 'unknown')
-                return False, f"Search failed with error code: {error_code}"
-            
-            # Parse vehicle list
-            vehicle_list = root.find('.//ipc:captureVehicleList', ns) if ns else root.find('.//captureVehicleList')
-            if vehicle_list is not None:
-                count = int(vehicle_list.get('count', '0'))
-                vehicles = []
-                
-                items = vehicle_list.findall('ipc:item', ns) if ns else vehicle_list.findall('item')
-                for item in items:
-                    vehicle_id = item.find('.//ipc:vehicleID', ns) if ns else item.find('.//vehicleID')
-                    snap_time = item.find('.//ipc:snapTime', ns) if ns else item.find('.//snapTime')
-                    
-                    if vehicle_id is not None and snap_time is not None:
-                        vehicles.append({
-                            'vehicleID': vehicle_id.text,
-                            'snapTime': snap_time.text
-                        })
-                
-                return True, {'count': count, 'vehicles': vehicles}
-            else:
-                return False, "No vehicle data found in response"
-                
+            xml_body = build_search_by_time_body(start_time, end_time, vehicle_plate, list_type)
+            response = self.client.post('SearchSnapVehicleByTime', data=xml_body, stream=True)
+            with response:
+                response.raise_for_status()
+                return parse_search_response(response.iter_content(SEARCH_CHUNK_SIZE))
         except Exception as e:
             return False, f"Error searching vehicles: {e}"
     
-    def get_vehicle_details(self, vehicle_id, snap_time, request_panoramic_pic=True):
-        """Get detailed information for a specific vehicle"""
+    def stream_vehicles_by_time(self, start_time, end_time, vehicle_plate="", list_type=""):
+        """Yield sightings from one search as the response arrives
+
+        Unlike search_vehicles_by_time this sends a single request and
+        yields each sighting as soon as its <item> is parsed, so callers can
+        start fetching details before the whole list has been received:
+
+            sightings = vehicle_system.stream_vehicles_by_time(start_time, end_time)
+            for vehicle, success, details in vehicle_system.fetch_vehicle_details(sightings):
+                ...
+
+        Raises VehicleSearchError if the camera reports a failure, and
+        requests exceptions for HTTP errors.
+        """
+        xml_body = build_search_by_time_body(start_time, end_time, vehicle_plate, list_type)
+        response = self.client.post('SearchSnapVehicleByTime', data=xml_body, stream=True)
+        with response:
+            response.raise_for_status()
+            parser = SearchResponseParser()
+            for chunk in response.iter_content(SEARCH_CHUNK_SIZE):
+                for sighting in parser.feed(chunk):
+                    yield sighting
+            for sighting in parser.close():
+                yield sighting
+    
+    def get_vehicle_details(self, vehicle_id, snap_time, request_panoramic_pic=True, details_only=False):
+        """Get detailed information for a specific vehicle
+        
+        With details_only=True the picture is neither requested nor decoded,
+        and pictureData is None.
+        """
+        # Without a picture to decode there is no point in having it sent
+        request_panoramic_pic = request_panoramic_pic and not details_only
+        if self.cache is not None:
+            details = self.cache.get(self.cache_key, vehicle_id, snap_time, request_panoramic_pic)
+            if details is not None:
+                return True, VehicleDetails.from_dict(details)
+        
         try:
-            xml_body = f'''<?xml version="1.0" encoding="utf-8"?>
-<config><search>
-<snapTime type="uint64">{snap_time}</snapTime>
-<vehicleID type="uint32">{vehicle_id}</vehicleID>
-<requestPanoramicPic type="boolean">{str(request_panoramic_pic).lower()}</requestPanoramicPic>
-</search></config>'''
-            
-            response = requests.post(self.url_search_by_key, headers=self.headers, data=xml_body.encode('utf-8'))
+            xml_body = build_search_by_key_body(vehicle_id, snap_time, request_panoramic_pic)
+            response = self.client.post('SearchSnapVehicleByKey', data=xml_body)
             response.raise_for_status()
-            
-            root = ET.fromstring(response.content)
-            ns = {'ipc': root.tag.split('}')[0].strip('{')} if '}' in root.tag else {}
-            
-            # Check for errors
-            status = root.get('status')
-            if status == 'failed':
-                error_code = root.get('errorCode', 'unknown')
-                return False, f"Failed to get vehicle details with error code: {error_code}"
-            
-            # Parse vehicle details
-            snap_vehicle = root.find('.//ipc:snapVehicle', ns) if ns else root.find('.//snapVehicle')
-            if snap_vehicle is not None:
-                snap_info = snap_vehicle.find('.//ipc:snapInfo', ns) if ns else snap_vehicle.find('.//snapInfo')
-                if snap_info is not None:
-                    details = {}
-                    
-                    # Extract all available information
-                    fields = ['time', 'vehiclePlate', 'listType', 'color', 'pictureData']
-                    for field in fields:
-                        elem = snap_info.find(f'.//ipc:{field}', ns) if ns else snap_info.find(f'.//{field}')
-                        if elem is not None:
-                            details[field] = elem.text
-                    
-                    return True, details
-                else:
-                    return False, "No snap info found in response"
-            else:
-                return False, "No vehicle data found in response"
-                
+            success, details = parse_vehicle_details(response.content, details_only)
+            if success and self.cache is not None:
+                self.cache.put(self.cache_key, vehicle_id, snap_time, details)
+            return success, details
         except Exception as e:
             return False, f"Error getting vehicle details: {e}"
     
-    def export_vehicle_data(self, start_time, end_time, vehicle_plate="", list_type="", include_images=True, output_file=None):
+    def get_vehicle_snapshot(self, vehicle_id, snap_time, request_panoramic_pic=True):
+        """Get vehicle details with the picture left undecoded
+        
+        Returns (True, (details, picture)) where picture is a PictureSpan, or
+        None when the camera sent no picture.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(self.cache_key, vehicle_id, snap_time, request_panoramic_pic)
+            if cached is not None:
+                details = VehicleDetails.from_dict(cached)
+                picture = PictureSpan.from_text(details.picture_data) if details.picture_data else None
+                details.picture_data = None
+                return True, (details, picture)
+        
+        try:
+            xml_body = build_search_by_key_body(vehicle_id, snap_time, request_panoramic_pic)
+            response = self.client.post('SearchSnapVehicleByKey', data=xml_body)
+            response.raise_for_status()
+            success, result = parse_vehicle_snapshot(response.content)
+            if success and self.cache is not None:
+                details, picture = result
+                cached = details.to_dict()
+                if picture is not None:
+                    cached['pictureData'] = picture.text()
+                self.cache.put(self.cache_key, vehicle_id, snap_time, cached)
+            return success, result
+        except Exception as e:
+            return False, f"Error getting vehicle details: {e}"
+    
+    def save_vehicle_picture(self, vehicle_id, snap_time, path):
+        """Decode a vehicle's snapshot picture straight into a file"""
+        success, result = self.get_vehicle_snapshot(vehicle_id, snap_time)
+        if not success:
+            return False, result
+        details, picture = result
+        if picture is None:
+            return False, "No picture data in response"
+        try:
+            return True, picture.save(path)
+        except Exception as e:
+            return False, f"Error saving vehicle picture: {e}"
+    
+    def fetch_vehicle_details(self, vehicles, request_panoramic_pic=True, workers=4):
+        """Fetch details for many vehicles in parallel, yielding (vehicle, success, details) in input order"""
+        def fetch(vehicle):
+            success, details = self.get_vehicle_details(vehicle['vehicleID'], vehicle['snapTime'], request_panoramic_pic)
+            return vehicle, success, details
+        
+        return ordered_parallel_map(fetch, vehicles, workers)
+    
+    def export_vehicle_data(self, start_time, end_time, vehicle_plate="", list_type="", include_images=True, output_file=None, workers=4):
         """Export vehicle data to CSV/ZIP file with optional images"""
         try:
             # Check SD card status first
@@ -172,80 +655,50 @@ class VehicleRecognition:
             
             print(f"Found {count} vehicles. Starting export...")
             
-            # Prepare export data
-            export_data = []
-            list_type_map = {
-                "outOfList": "Stranger Vehicle",
-                "temporaryList": "Temporary Vehicle", 
-                "blackList": "Blacklist Vehicle",
-                "whiteList": "Whitelist Vehicle"
-            }
-            
-            # Process each vehicle
-            for i, vehicle in enumerate(vehicles):
-                print(f"Processing vehicle {i+1}/{count}...")
-                
-                success, details = self.get_vehicle_details(
-                    vehicle['vehicleID'], 
-                    vehicle['snapTime'], 
-                    include_images
-                )
-                
-                if success:
-                    # Format time
-                    time_str = details.get('time', '')
-                    if time_str:
-                        time_str = time_str[:19]  # Remove milliseconds
-                    
-                    # Get list type description
-                    list_type_desc = list_type_map.get(details.get('listType', ''), 'Unknown')
-                    
-                    export_data.append({
-                        'vehiclePlate': details.get('vehiclePlate', ''),
-                        'listType': list_type_desc,
-                        'snapTime': time_str,
-                        'color': details.get('color', ''),
-                        'pictureData': details.get('pictureData', '') if include_images else '',
-                        'snapPicFileName': f"{vehicle['snapTime']}.jpg"
-                    })
-                else:
-                    print(f"Warning: Failed to get details for vehicle {vehicle['vehicleID']}: {details}")
-            
             # Generate output file
             if output_file is None:
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_file = f"Vehicle_Export_{timestamp}.zip"
+                output_file = default_export_filename()
             
-            # Create ZIP file
-            with zipfile.ZipFile(output_file, 'w') as zip_file:
-                # Create CSV content
-                csv_content = "Index,Vehicle Plate,List Type,Snap Time,SnapPicFileName,Color\n"
-                for i, data in enumerate(export_data, 1):
-                    csv_content += f"{i},{data['vehiclePlate']},{data['listType']},{data['snapTime']},{data['snapPicFileName']},{data['color']}\n"
-                
-                # Add BOM for Chinese characters
-                csv_content = '\ufeff' + csv_content
-                zip_file.writestr("VehicleMatchResult.csv", csv_content)
-                
-                # Add images if requested
-                if include_images:
-                    for data in export_data:
-                        if data['pictureData']:
-                            try:
-                                # Decode base64 image data
-                                image_data = base64.b64decode(data['pictureData'])
-                                zip_file.writestr(f"SnapPic/{data['snapPicFileName']}", image_data)
-                            except Exception as e:
-                                print(f"Warning: Failed to add image {data['snapPicFileName']}: {e}")
+            # Fetch details in parallel; rows still come back in sighting order
+            # and are written to the archive as soon as they arrive
+            fetch_start = time.time()
+            # Pictures stay base64 in their response buffers until the
+            # writer decodes them into the archive
+            def fetch(vehicle):
+                success, result = self.get_vehicle_snapshot(vehicle['vehicleID'], vehicle['snapTime'], include_images)
+                return vehicle, success, result
+            
+            with VehicleExportWriter(output_file, include_images) as writer:
+                fetched = ordered_parallel_map(fetch, vehicles, workers)
+                for i, (vehicle, success, result) in enumerate(fetched):
+                    print(f"Processing vehicle {i+1}/{count}...")
+                    
+                    if success:
+                        details, picture = result
+                        writer.add(build_export_row(vehicle, details, include_images), picture)
+                    else:
+                        print(f"Warning: Failed to get details for vehicle {vehicle['vehicleID']}: {result}")
+            
+            elapsed = time.time() - fetch_start
+            rate = len(vehicles) / elapsed if elapsed > 0 else 0.0
+            print(f"Fetched {len(vehicles)} vehicle details in {elapsed:.1f}s ({rate:.1f} vehicles/s, {workers} workers)")
             
             print(f"Export completed successfully: {output_file}")
-            return True, f"Exported {len(export_data)} vehicles to {output_file}"
+            return True, f"Exported {writer.rows} vehicles to {output_file} ({rate:.1f} vehicles/s)"
             
         except Exception as e:
             return False, f"Error during export: {e}"
     
-    def get_vehicle_statistics(self, start_time, end_time):
-        """Get statistics about vehicle detection"""
+    def get_vehicle_statistics(self, start_time, end_time, workers=4, utc_offset=None):
+        """Get statistics about vehicle detection
+
+        The hourly distribution comes from the snapTime of each search
+        result and list type counts from one listType-filtered search per
+        type, so a period costs a handful of requests instead of one detail
+        request per vehicle. Details are only fetched for what the searches
+        cannot provide. Pass the camera's utc_offset (seconds) when it is not
+        in the system time zone.
+        """
         try:
             success, result = self.search_vehicles_by_time(start_time, end_time)
             if not success:
@@ -253,32 +706,28 @@ class VehicleRecognition:
             
             vehicles = result['vehicles']
             if not vehicles:
-                return True, {
-                    'total_vehicles': 0,
-                    'list_types': {},
-                    'time_distribution': {}
-                }
+                return True, empty_statistics()
             
             # Analyze data
-            list_types = {}
-            time_distribution = {}
+            time_distribution, undated = hour_distribution(vehicles, utc_offset)
             
-            for vehicle in vehicles:
-                # Get vehicle details for analysis
-                success, details = self.get_vehicle_details(vehicle['vehicleID'], vehicle['snapTime'], False)
-                if success:
-                    list_type = details.get('listType', 'unknown')
-                    list_types[list_type] = list_types.get(list_type, 0) + 1
-                    
-                    # Time distribution (by hour)
-                    time_str = details.get('time', '')
-                    if time_str:
-                        try:
-                            dt = datetime.datetime.strptime(time_str[:19], '%Y-%m-%d %H:%M:%S')
-                            hour = dt.hour
-                            time_distribution[hour] = time_distribution.get(hour, 0) + 1
-                        except:
-                            pass
+            def count_list_type(list_type):
+                return list_type, self.search_time_window(start_time, end_time, list_type=list_type)
+            
+            searches = ordered_parallel_map(count_list_type, list(LIST_TYPE_MAP), workers)
+            list_types = list_type_counts(searches, len(vehicles))
+            
+            # Fall back to vehicle details for anything the searches could not provide
+            need_details = vehicles if list_types is None else undated
+            if need_details:
+                undated_keys = {(vehicle['vehicleID'], vehicle['snapTime']) for vehicle in undated}
+                detail_types = {}
+                for vehicle, success, details in self.fetch_vehicle_details(need_details, False, workers):
+                    if success:
+                        hours = time_distribution if (vehicle['vehicleID'], vehicle['snapTime']) in undated_keys else {}
+                        accumulate_statistics(details, detail_types, hours)
+                if list_types is None:
+                    list_types = detail_types
             
             return True, {
                 'total_vehicles': len(vehicles),
@@ -302,7 +751,7 @@ def print_vehicle_search_menu():
 
 def vehicle_search_interface(host, port, username, password):
     """Interactive interface for vehicle recognition features"""
-    vehicle_system = VehicleRecognition(host, port, username, password)
+    vehicle_system = VehicleRecognition(host, port, username, password, cache=SightingCache())
     
     while True:
         print_vehicle_search_menu()
@@ -354,9 +803,10 @@ def vehicle_search_interface(host, port, username, password):
             list_type = input("Enter list type (optional): ").strip()
             include_images = input("Include images? (y/n): ").strip().lower() == 'y'
             output_file = input("Enter output filename (optional): ").strip() or None
+            workers = input("Enter parallel workers (default 4): ").strip() or "4"
             
             success, result = vehicle_system.export_vehicle_data(
-                start_time, end_time, vehicle_plate, list_type, include_images, output_file
+                start_time, end_time, vehicle_plate, list_type, include_images, output_file, int(workers)
             )
             if success:
                 print(f"Success: {result}")
@@ -0,0 +1,196 @@
+"""
+Vehicle Records
+===============
+
+Compact record types for vehicle recognition results. Sightings and
+details are slotted classes holding pre-parsed integer ids and
+timestamps, and large search results live in a SightingBatch backed by
+two typed arrays (about 12 bytes per sighting instead of a dict and two
+strings). Records still answer record['vehicleID'] and friends, so code
+written against the old dict results keeps working.
+"""
+
+from array import array
+
+class Sighting:
+    """One search result: a vehicle id and its microsecond snap time"""
+    __slots__ = ('vehicle_id', 'snap_time')
+
+    FIELDS = {'vehicleID': 'vehicle_id', 'snapTime': 'snap_time'}
+
+    def __init__(self, vehicle_id, snap_time):
+        self.vehicle_id = int(vehicle_id)
+        self.snap_time = int(snap_time)
+
+    @property
+    def key(self):
+        """Unique (vehicleID, snapTime) identity of the capture"""
+        return (self.vehicle_id, self.snap_time)
+
+    def __getitem__(self, field):
+        try:
+            return getattr(self, self.FIELDS[field])
+        except KeyError:
+            raise KeyError(field) from None
+
+    def get(self, field, default=None):
+        attr = self.FIELDS.get(field)
+        return getattr(self, attr) if attr else default
+
+    def keys(self):
+        return self.FIELDS.keys()
+
+    def to_dict(self):
+        return {'vehicleID': self.vehicle_id, 'snapTime': self.snap_time}
+
+    def __eq__(self, other):
+        if isinstance(other, Sighting):
+            return self.key == other.key
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"Sighting(vehicle_id={self.vehicle_id}, snap_time={self.snap_time})"
+
+class VehicleDetails:
+    """A SearchSnapVehicleByKey result; missing fields are None"""
+    __slots__ = ('time', 'vehicle_plate', 'list_type', 'color', 'picture_data')
+
+    FIELDS = {
+        'time': 'time',
+        'vehiclePlate': 'vehicle_plate',
+        'listType': 'list_type',
+        'color': 'color',
+        'pictureData': 'picture_data'
+    }
+
+    def __init__(self, time=None, vehicle_plate=None, list_type=None, color=None, picture_data=None):
+        self.time = time
+        self.vehicle_plate = vehicle_plate
+        self.list_type = list_type
+        self.color = color
+        self.picture_data = picture_data
+
+    @classmethod
+    def from_dict(cls, fields):
+        """Build details from a dict keyed by the camera's field names"""
+        details = cls()
+        for field, attr in cls.FIELDS.items():
+            if field in fields:
+                setattr(details, attr, fields[field])
+        return details
+
+    def __getitem__(self, field):
+        value = self.get(field)
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def __setitem__(self, field, value):
+        try:
+            setattr(self, self.FIELDS[field], value)
+        except KeyError:
+            raise KeyError(field) from None
+
+    def __contains__(self, field):
+        return self.get(field) is not None
+
+    def get(self, field, default=None):
+        attr = self.FIELDS.get(field)
+        value = getattr(self, attr) if attr else None
+        return default if value is None else value
+
+    def items(self):
+        for field, attr in self.FIELDS.items():
+            value = getattr(self, attr)
+            if value is not None:
+                yield field, value
+
+    def keys(self):
+        return [field for field, _ in self.items()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, VehicleDetails):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{attr}={getattr(self, attr)!r}" for attr in self.__slots__ if attr != 'picture_data')
+        return f"VehicleDetails({fields})"
+
+class SightingBatch:
+    """A list-like sequence of sightings stored in two typed arrays"""
+    __slots__ = ('vehicle_ids', 'snap_times')
+
+    def __init__(self, vehicle_ids=(), snap_times=()):
+        # vehicleID is a uint32; 'L' would take 8 bytes on 64-bit Linux
+        self.vehicle_ids = array('I', vehicle_ids)
+        self.snap_times = array('Q', snap_times)
+        if len(self.vehicle_ids) != len(self.snap_times):
+            raise ValueError("vehicle_ids and snap_times must have the same length")
+
+    @classmethod
+    def from_sightings(cls, sightings):
+        """Build a batch from Sighting objects or {'vehicleID', 'snapTime'} dicts"""
+        batch = cls()
+        for sighting in sightings:
+            batch.append(sighting['vehicleID'], sighting['snapTime'])
+        return batch
+
+    def append(self, vehicle_id, snap_time):
+        self.vehicle_ids.append(int(vehicle_id))
+        self.snap_times.append(int(snap_time))
+
+    def extend(self, other):
+        self.vehicle_ids.extend(other.vehicle_ids)
+        self.snap_times.extend(other.snap_times)
+
+    def __len__(self):
+        return len(self.vehicle_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return SightingBatch(self.vehicle_ids[index], self.snap_times[index])
+        return Sighting(self.vehicle_ids[index], self.snap_times[index])
+
+    def __iter__(self):
+        for vehicle_id, snap_time in zip(self.vehicle_ids, self.snap_times):
+            yield Sighting(vehicle_id, snap_time)
+
+    def pairs(self):
+        """Iterate over (vehicleID, snapTime) pairs without building records"""
+        return zip(self.vehicle_ids, self.snap_times)
+
+    def take(self, indices):
+        """Return a new batch holding the sightings at indices, in that order"""
+        vehicle_ids = self.vehicle_ids
+        snap_times = self.snap_times
+        return SightingBatch((vehicle_ids[i] for i in indices), (snap_times[i] for i in indices))
+
+    def sorted_by_time(self, reverse=False):
+        """Return a new batch ordered by snap time"""
+        order = sorted(range(len(self)), key=self.snap_times.__getitem__, reverse=reverse)
+        return self.take(order)
+
+    def between(self, start_time, end_time):
+        """Return the sightings with start_time <= snap time <= end_time (microseconds)"""
+        return self.take([i for i, snap_time in enumerate(self.snap_times) if start_time <= snap_time <= end_time])
+
+    def __eq__(self, other):
+        if isinstance(other, SightingBatch):
+            return self.vehicle_ids == other.vehicle_ids and self.snap_times == other.snap_times
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"SightingBatch({len(self)} sightings)"
@@ -0,0 +1,118 @@
+"""
+XML Accessor
+============
+
+A namespace-agnostic view of a camera XML response. The namespace is
+detected once per document and a flat index of every element is built in
+a single pass, so field lookups no longer re-run ElementPath searches (or
+branch on whether the document has a namespace) for every field.
+
+Lookups are scoped to an element's subtree, like ElementTree's './/tag':
+
+    doc = XmlIndex(response.content)
+    device_info = doc.find(doc.root, 'deviceInfo')
+    name = doc.text(device_info, 'deviceName')
+    for item in doc.children(disk_info, 'item'):
+        ...
+"""
+
+import xml_backend
+from bisect import bisect_left, bisect_right
+
+def split_namespace(tag):
+    """Split '{namespace}tag' into (namespace, tag)"""
+    if tag[:1] == '{':
+        namespace, _, local = tag[1:].partition('}')
+        return namespace, local
+    return '', tag
+
+class XmlIndex:
+    def __init__(self, content=None, root=None):
+        if root is None:
+            root = xml_backend.fromstring(content)
+        self.root = root
+        self.namespace = split_namespace(root.tag)[0]
+
+        # Document order: every subtree occupies a contiguous run of
+        # positions, so "descendants of X" is the range (position(X), end(X)]
+        elements = list(root.iter())
+        local_tags = {}
+        tags = []
+        by_tag = {}
+        for position, elem in enumerate(elements):
+            tag = elem.tag
+            local = local_tags.get(tag)
+            if local is None:
+                local = local_tags[tag] = split_namespace(tag)[1] if isinstance(tag, str) else tag
+            tags.append(local)
+            positions = by_tag.get(local)
+            if positions is None:
+                by_tag[local] = [position]
+            else:
+                positions.append(position)
+
+        self._elements = elements
+        self._tags = tags
+        self._by_tag = by_tag
+        self._positions = {id(elem): position for position, elem in enumerate(elements)}
+        self._ends = {}
+
+    def tag(self, elem):
+        """Tag of an element without its namespace"""
+        return self._tags[self._positions[id(elem)]]
+
+    def _scope(self, elem):
+        position = self._positions[id(elem)]
+        end = self._ends.get(position)
+        if end is None:
+            # The subtree ends at its last descendant along the last-child chain
+            last = elem
+            while len(last):
+                last = last[-1]
+            end = self._ends[position] = self._positions[id(last)]
+        return position + 1, end
+
+    def _descendants(self, elem, tag):
+        positions = self._by_tag.get(tag)
+        if not positions:
+            return []
+        start, end = self._scope(elem)
+        return positions[bisect_left(positions, start):bisect_right(positions, end)]
+
+    def find(self, elem, path):
+        """First descendant of elem matching 'tag' or 'parent/child/...', or None"""
+        if '/' not in path:
+            positions = self._by_tag.get(path)
+            if not positions:
+                return None
+            start, end = self._scope(elem)
+            i = bisect_left(positions, start)
+            if i < len(positions) and positions[i] <= end:
+                return self._elements[positions[i]]
+            return None
+        return next(iter(self.findall(elem, path)), None)
+
+    def findall(self, elem, path):
+        """All descendants of elem matching 'tag' or 'parent/child/...'
+
+        Results come in the same order as ElementTree's './/parent/child'.
+        """
+        steps = path.split('/')
+        elements = self._elements
+        matches = [elements[position] for position in self._descendants(elem, steps[0])]
+        for step in steps[1:]:
+            matches = [child for match in matches for child in self.children(match, step)]
+        return matches
+
+    def children(self, elem, tag):
+        """Direct children of elem with the given tag"""
+        tags = self._tags
+        positions = self._positions
+        return [child for child in elem if tags[positions[id(child)]] == tag]
+
+    def text(self, elem, tag, default=None):
+        """Text of the first descendant with the given tag, or default"""
+        found = self.find(elem, tag)
+        if found is None or found.text is None:
+            return default
+        return found.text
@@ -0,0 +1,87 @@
+"""
+XML Parser Backend
+==================
+
+One place to choose the XML parser. lxml is used when it is installed
+(pip install lxml) and ElementTree otherwise; both produce elements with
+the same interface for everything this project uses (find, iteration,
+attributes, text, clear/remove). lxml parses whole documents faster,
+most of all responses carrying base64 pictures; incremental parsing stays
+on ElementTree by default, where it is faster.
+
+    root = xml_backend.fromstring(response.content)
+    parser = xml_backend.XMLPullParser(events=('start', 'end'))
+
+Set the CAMERA_XML_BACKEND environment variable to "elementtree" to force
+the stdlib parser, or call use_backend() at runtime.
+"""
+
+import os
+import threading
+import xml.etree.ElementTree as ET
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+BACKENDS = ('lxml', 'elementtree')
+
+def available_backends():
+    """Names of the backends that can be used here"""
+    return [name for name in BACKENDS if name != 'lxml' or lxml_etree is not None]
+
+def use_backend(name=None):
+    """Select a backend by name, or the fastest available one if name is None"""
+    global BACKEND
+    if name is None:
+        name = 'lxml' if lxml_etree is not None else 'elementtree'
+    if name not in available_backends():
+        raise ValueError(f"XML backend not available: {name}")
+    BACKEND = name
+    return name
+
+_local = threading.local()
+
+def _lxml_parser():
+    # lxml parsers are reusable but not thread-safe, so keep one per thread.
+    # huge_tree lifts lxml's 10 MB text node limit (base64 pictures); entity
+    # resolution and network access stay off for untrusted device responses
+    parser = getattr(_local, 'parser', None)
+    if parser is None:
+        parser = _local.parser = lxml_etree.XMLParser(remove_comments=True, resolve_entities=False,
+                                                      no_network=True, huge_tree=True)
+    return parser
+
+def fromstring(content):
+    """Parse a complete XML document and return its root element"""
+    if BACKEND == 'lxml':
+        if isinstance(content, str):
+            # lxml refuses str input that carries an encoding declaration
+            content = content.encode('utf-8')
+        return lxml_etree.fromstring(content, _lxml_parser())
+    return ET.fromstring(content)
+
+def tostring(elem):
+    """Serialize an element (from either backend) back to XML bytes"""
+    if lxml_etree is not None and isinstance(elem, lxml_etree._Element):
+        return lxml_etree.tostring(elem)
+    return ET.tostring(elem)
+
+def XMLPullParser(events=('end',), backend='elementtree'):
+    """Incremental parser with feed()/read_events()/close()
+
+    Defaults to ElementTree even when lxml is installed: lxml builds a
+    Python proxy for every event, which costs more than its faster
+    tokenizer saves on long item lists (see benchmarks/bench_xml_backend.py).
+    Pass backend=None to follow the selected backend.
+    """
+    if (backend or BACKEND) == 'lxml':
+        if lxml_etree is None:
+            raise ValueError("XML backend not available: lxml")
+        return lxml_etree.XMLPullParser(events=events, remove_comments=True, resolve_entities=False,
+                                        no_network=True, huge_tree=True)
+    return ET.XMLPullParser(events=events)
+
+BACKEND = None
+use_backend(os.environ.get('CAMERA_XML_BACKEND') or None)